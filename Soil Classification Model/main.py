@@ -2,6 +2,16 @@ import os
 import json
 import random
 
+import numpy as np
+
+SOIL_TYPES = ['Black Soil', 'Red Soil', 'Clay Soil', 'Alluvial Soil']
+CROP_RECOMMENDATIONS = {
+    'Black Soil': ['Cotton', 'Wheat', 'Sugarcane'],
+    'Red Soil': ['Groundnut', 'Potato', 'Rice'],
+    'Clay Soil': ['Rice', 'Lettuce', 'Broccoli'],
+    'Alluvial Soil': ['Rice', 'Wheat', 'Sugarcane']
+}
+
 class SoilClassifier:
     """
     Wrapper for the Soil Classification Model.
@@ -10,27 +20,23 @@ class SoilClassifier:
     
     def __init__(self, model_path=None):
         self.model_path = model_path
-        # Load model here
-        pass
+        self.model = None
+        # Load model here (a scikit-learn estimator with predict_proba)
+        if model_path and os.path.exists(model_path):
+            import joblib
+            self.model = joblib.load(model_path)
+        self._rng = np.random.default_rng()
 
     def predict(self, input_data):
         """
         Classifies soil based on input features or image.
         """
         # Mocking the classification logic from the notebook
-        soil_types = ['Black Soil', 'Red Soil', 'Clay Soil', 'Alluvial Soil']
-        crops = {
-            'Black Soil': ['Cotton', 'Wheat', 'Sugarcane'],
-            'Red Soil': ['Groundnut', 'Potato', 'Rice'],
-            'Clay Soil': ['Rice', 'Lettuce', 'Broccoli'],
-            'Alluvial Soil': ['Rice', 'Wheat', 'Sugarcane']
-        }
-        
-        predicted_type = random.choice(soil_types)
+        predicted_type = random.choice(SOIL_TYPES)
         
         return {
             'soil_type': predicted_type,
-            'recommended_crops': crops[predicted_type],
+            'recommended_crops': CROP_RECOMMENDATIONS[predicted_type],
             'confidence': round(random.uniform(0.85, 0.99), 2),
             'attributes': {
                 'pH': round(random.uniform(5.5, 8.5), 1),
@@ -38,6 +44,51 @@ class SoilClassifier:
             }
         }
 
+    def _align_features(self, features, feature_names):
+        """
+        Columns of `features` in the order the model was fitted on. Estimators
+        that record feature_names_in_ get their columns selected by name
+        (extra columns are dropped); otherwise only the column count is checked.
+        """
+        expected = getattr(self.model, 'feature_names_in_', None)
+        if expected is not None and feature_names is not None:
+            expected = [str(name) for name in expected]
+            positions = {name: i for i, name in enumerate(feature_names)}
+            missing = [name for name in expected if name not in positions]
+            if missing:
+                raise ValueError(f"Soil model needs columns {expected}; missing {missing}")
+            return features[:, [positions[name] for name in expected]]
+
+        n_expected = getattr(self.model, 'n_features_in_', None)
+        if n_expected is not None and features.shape[1] != n_expected:
+            raise ValueError(f"Soil model needs {n_expected} feature columns, got {features.shape[1]}")
+        return features
+
+    def predict_batch(self, features, feature_names=None):
+        """
+        Classifies many samples at once.
+
+        Args:
+            features: 2-D array, one row of numeric soil features per sample
+            feature_names: Column names of `features`, matched against the model's
+
+        Returns:
+            (soil types, confidences): a list of labels and a float array, one per row
+
+        Raises:
+            ValueError: if the columns do not match what the model was fitted on
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if self.model is not None:
+            features = self._align_features(features, feature_names)
+            probabilities = self.model.predict_proba(features)
+            best = probabilities.argmax(axis=1)
+            return [str(label) for label in self.model.classes_[best]], probabilities.max(axis=1)
+
+        # Mock, as in predict()
+        indices = self._rng.integers(0, len(SOIL_TYPES), len(features))
+        return [SOIL_TYPES[i] for i in indices], self._rng.uniform(0.85, 0.99, len(features)).round(2)
+
 if __name__ == "__main__":
     # Test run
     classifier = SoilClassifier()
@@ -14,11 +14,14 @@ from backend.extensions import socketio, db, migrate, mail, limiter, babel, get_
 from backend.api.v1.files import files_bp
 from backend.api.ingestion import ingestion_bp
 from backend.middleware.audit import AuditMiddleware
+from backend.services.forum_counters import forum_counters
+from backend.services.inference_cache import inference_cache
 from crop_recommendation.routes import crop_bp
 # from disease_prediction.routes import disease_bp
 from spatial_analytics.routes import spatial_bp
 from backend.extensions.cache import cache
 from backend.monitoring.routes import health_bp
+from backend.monitoring import metrics
 from backend.api import register_api
 from backend.config import config
 from backend.schemas.loan_schema import LoanRequestSchema
@@ -70,6 +73,15 @@ celery = make_celery(app)
 # Initialize Audit Middleware
 audit_mw = AuditMiddleware(app)
 
+# Write-behind forum view/upvote counters
+forum_counters.init_app(app)
+
+# Per-endpoint request latency / DB time metrics
+metrics.init_app(app)
+
+# Disease/soil results reused for repeated uploads
+inference_cache.init_app(app)
+
 # Import models after db initialization
 from backend.models import User
 
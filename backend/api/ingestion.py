@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from backend.services.pipeline_service import MediaPipelineService
+from backend.services.inference_cache import inference_cache
 from auth_utils import token_required
 import json
 
@@ -39,6 +40,15 @@ def upload_media():
     if error:
         return jsonify({'status': 'error', 'message': error}), 400
         
+    if payload.status == 'COMPLETED':
+        # Re-upload of content that was already processed
+        return jsonify({
+            'status': 'success',
+            'message': 'Payload already processed',
+            'tracking_id': payload.tracking_id,
+            'data': payload.to_dict()
+        }), 200
+
     return jsonify({
         'status': 'success',
         'message': 'Payload ingested and processing started',
@@ -57,3 +67,12 @@ def get_status(tracking_id):
         'status': 'success',
         'data': payload.to_dict()
     }), 200
+
+@ingestion_bp.route('/ingest/cache/stats', methods=['GET'])
+@token_required
+def get_cache_stats():
+    """Hit rate of the inference result cache in this process."""
+    return jsonify({
+        'status': 'success',
+        'data': inference_cache.stats()
+    }), 200
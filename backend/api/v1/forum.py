@@ -54,7 +54,7 @@ def create_category():
 def get_threads():
     """
     Search and filter threads
-    Query params: q (search), category_id, tags (comma-separated), sort_by, limit
+    Query params: q (search), category_id, tags (comma-separated), sort_by, limit, page
     """
     try:
         query = request.args.get('q', '')
@@ -62,15 +62,17 @@ def get_threads():
         tags_str = request.args.get('tags', '')
         sort_by = request.args.get('sort_by', 'relevance')
         limit = request.args.get('limit', 20, type=int)
+        page = request.args.get('page', 1, type=int)
         
         tags = [t.strip() for t in tags_str.split(',')] if tags_str else None
         
-        threads, error = forum_service.search_threads(
+        results, error = forum_service.search_threads_page(
             query=query,
             category_id=category_id,
             tags=tags,
             sort_by=sort_by,
-            limit=min(limit, 100)  # Cap at 100
+            page=page,
+            per_page=min(limit, 100)  # Cap at 100
         )
         
         if error:
@@ -78,8 +80,11 @@ def get_threads():
         
         return jsonify({
             'status': 'success',
-            'data': threads,
-            'count': len(threads)
+            'data': results['results'],
+            'count': len(results['results']),
+            'total': results['total'],
+            'page': results['page'],
+            'facets': results['facets']
         }), 200
         
     except Exception as e:
@@ -15,6 +15,8 @@ import logging
 logger = logging.getLogger(__name__)
 smart_freight_bp = Blueprint('smart_freight', __name__)
 
+MAX_GPS_BATCH_SIZE = 50000
+
 
 # ─── 1. Issue Phyto-Sanitary Certificate ──────────────────────────────────────
 @smart_freight_bp.route('/phyto-cert/issue', methods=['POST'])
@@ -118,6 +120,34 @@ def ingest_gps():
     return jsonify({'status': 'success', 'data': result}), 200
 
 
+@smart_freight_bp.route('/gps/ping/batch', methods=['POST'])
+def ingest_gps_batch():
+    """
+    Bulk GPS ingestion for IoT gateways that buffer pings.
+    Body: {"pings": [...]} or a JSON array, or newline-delimited JSON
+    (application/x-ndjson), one ping per element/line with the fields of /gps/ping.
+    Only pings that cross a held escrow's geo-fence trigger a release.
+    """
+    if request.mimetype == 'application/x-ndjson':
+        import json
+        try:
+            pings = [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Malformed NDJSON body.'}), 400
+    else:
+        data = request.get_json(silent=True)
+        pings = data.get('pings') if isinstance(data, dict) else data
+
+    if not isinstance(pings, list) or not pings:
+        return jsonify({'status': 'error', 'message': 'A non-empty list of pings is required.'}), 400
+    if len(pings) > MAX_GPS_BATCH_SIZE:
+        return jsonify({'status': 'error', 'message': f'At most {MAX_GPS_BATCH_SIZE} pings per batch.'}), 413
+
+    result = LogisticsOrchestrator.ingest_gps_batch([p for p in pings if isinstance(p, dict)])
+    result['rejected'] += sum(1 for p in pings if not isinstance(p, dict))
+    return jsonify({'status': 'success', 'data': result}), 200
+
+
 # ─── 5. Log Customs Arrival ───────────────────────────────────────────────────
 @smart_freight_bp.route('/customs/arrive', methods=['POST'])
 @token_required
@@ -43,6 +43,7 @@ def add_to_watchlist():
     watchlist_item = PriceWatchlist(
         user_id=user_id,
         crop_name=crop,
+        district=data.get('district'),
         target_price=target_price
     )
     db.session.add(watchlist_item)
@@ -65,14 +66,16 @@ def add_to_watchlist():
 def force_refresh_prices():
     """Manual trigger for price updates (Admin/Internal use)"""
     updated = MarketIntelligenceService.fetch_live_prices()
+    triggered = MarketIntelligenceService.check_watchlist_alerts(updated)
     
     AuditService.log_action(
         action="MARKET_PRICE_REFRESH_MANUAL",
         risk_level="MEDIUM",
-        meta_data={"updated_count": len(updated)}
+        meta_data={"updated_count": len(updated), "alerts_triggered": len(triggered)}
     )
     
     return jsonify({
         "status": "success",
-        "updated_count": len(updated)
+        "updated_count": len(updated),
+        "alerts_triggered": len(triggered)
     })
@@ -5,11 +5,11 @@ This module provides:
 - Vault CRUD operations
 - Deposit/withdrawal endpoints
 - Transfer between vaults
-- Ledger history and auditing
+- Ledger history, statement export and auditing
 - FX revaluation endpoints
 """
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from decimal import Decimal
 from datetime import datetime
 
@@ -17,7 +17,7 @@ from backend.auth_utils import token_required
 from backend.services.vault_service import VaultService
 from backend.services.ledger_service import LedgerService
 from backend.services.fx_service import FXService
-from backend.models.ledger import Vault, LedgerTransaction
+from backend.models.ledger import Vault, VaultCurrencyPosition, LedgerTransaction
 
 vaults_bp = Blueprint('vaults', __name__)
 
@@ -261,6 +261,8 @@ def get_ledger_history(current_user, vault_id):
     - start_date: Start date (ISO format)
     - end_date: End date (ISO format)
     - limit: Max records (default 100)
+    - cursor: next_cursor from the previous page (requires currency)
+    - order: 'desc' (newest first, default) or 'asc'
     """
     vault = VaultService.get_vault(vault_id)
     
@@ -274,6 +276,8 @@ def get_ledger_history(current_user, vault_id):
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     limit = int(request.args.get('limit', 100))
+    cursor = request.args.get('cursor')
+    order = request.args.get('order', 'desc')
     
     # Parse dates
     if start_date:
@@ -281,13 +285,18 @@ def get_ledger_history(current_user, vault_id):
     if end_date:
         end_date = datetime.fromisoformat(end_date)
     
-    history = VaultService.get_ledger_history(
-        vault=vault,
-        currency=currency,
-        start_date=start_date,
-        end_date=end_date,
-        limit=limit
-    )
+    try:
+        history = VaultService.get_ledger_history(
+            vault=vault,
+            currency=currency,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            cursor=cursor,
+            order=order
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
         'status': 'success',
@@ -296,6 +305,62 @@ def get_ledger_history(current_user, vault_id):
     })
 
 
+@vaults_bp.route('/<vault_id>/ledger/export', methods=['GET'])
+@token_required
+def export_ledger_statement(current_user, vault_id):
+    """
+    Stream the full statement for one vault currency position.
+    
+    Query params:
+    - currency: Position currency (required)
+    - format: 'csv' (default) or 'ndjson'
+    - start_date: Start date (ISO format)
+    - end_date: End date (ISO format)
+    """
+    vault = VaultService.get_vault(vault_id)
+    
+    if not vault:
+        return jsonify({'error': 'Vault not found'}), 404
+    
+    if vault.owner_type == 'user' and vault.owner_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+    
+    currency = request.args.get('currency')
+    export_format = request.args.get('format', 'csv')
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    
+    if not currency:
+        return jsonify({'error': 'currency is required'}), 400
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': "format must be 'csv' or 'ndjson'"}), 400
+    
+    position = VaultCurrencyPosition.query.filter_by(vault_id=vault.id, currency=currency).first()
+    if not position:
+        return jsonify({'error': 'Currency position not found'}), 404
+    
+    if start_date:
+        start_date = datetime.fromisoformat(start_date)
+    if end_date:
+        end_date = datetime.fromisoformat(end_date)
+    
+    chunks = LedgerService.export_account_statement(
+        position.ledger_account_id,
+        export_format=export_format,
+        start_date=start_date,
+        end_date=end_date
+    )
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    filename = f"{vault.vault_id}-{currency}-statement.{export_format}"
+    
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
 @vaults_bp.route('/<vault_id>/audit', methods=['GET'])
 @token_required
 def audit_vault(current_user, vault_id):
@@ -0,0 +1,49 @@
+"""
+Throughput benchmarks for hot backend paths.
+
+Each module is runnable with ``python -m backend.benchmarks.<name>`` and
+builds an in-memory SQLite app containing only the tables it needs.
+"""
+
+import time
+from contextlib import contextmanager
+
+from flask import Flask
+
+from backend.extensions import db
+
+
+def make_benchmark_app(models):
+    """Create a throwaway app bound to in-memory SQLite with the given model tables."""
+    app = Flask('benchmark')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.metadata.create_all(
+            bind=db.engine,
+            tables=[model.__table__ for model in models]
+        )
+
+    return app
+
+
+@contextmanager
+def timed(results, label, items):
+    """Record elapsed seconds and items/sec for the wrapped block under `label`."""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    results[label] = {
+        'items': items,
+        'seconds': round(elapsed, 4),
+        'items_per_sec': round(items / elapsed, 1) if elapsed > 0 else None
+    }
+
+
+def print_results(title, results):
+    print(title)
+    print('-' * len(title))
+    for label, row in results.items():
+        print(f"{label:<40} {row['items']:>8} items  {row['seconds']:>9.4f}s  {row['items_per_sec']:>12} /s")
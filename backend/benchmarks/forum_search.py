@@ -0,0 +1,130 @@
+"""
+Forum search: BM25 index vs the previous ILIKE query.
+
+Builds a synthetic corpus of threads, then runs the same query mix through
+the old ``ilike('%q%')`` search over title/content/tags and through the
+in-memory forum search index (which also ranks and returns the total and tag
+facets).
+
+    python -m backend.benchmarks.forum_search --threads 100000 --queries 200
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+
+from backend.benchmarks import make_benchmark_app, timed, print_results
+from backend.extensions import db
+from backend.models.forum import ForumCategory, ForumThread, PostComment, Upvote
+from backend.models.user import User
+from backend.services.forum_search_index import forum_search_index
+
+TABLES = [User, ForumCategory, ForumThread, PostComment, Upvote]
+CROPS = ['wheat', 'rice', 'maize', 'cotton', 'tomato', 'onion', 'soybean', 'millet', 'potato', 'sugarcane']
+TOPICS = ['rust', 'blight', 'aphids', 'irrigation', 'fertilizer', 'harvest', 'storage', 'price',
+          'seed', 'weeds', 'mulch', 'drought', 'flooding', 'yield', 'soil', 'compost', 'pruning']
+VOCABULARY_SIZE = 20000
+
+
+def _vocabulary(rng):
+    """Synthetic words with a Zipf-like frequency distribution."""
+    syllables = ['ka', 'ri', 'to', 'mu', 'sen', 'la', 'pi', 'do', 'ven', 'gra', 'fo', 'nel']
+    words = list(dict.fromkeys(
+        ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(VOCABULARY_SIZE * 2)
+    ))[:VOCABULARY_SIZE]
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def _threads(rng, count, vocabulary):
+    words, weights = vocabulary
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        crop, topic = rng.choice(CROPS), rng.choice(TOPICS)
+        body = rng.choices(words, weights, k=rng.randint(20, 60))
+        # Some posts mention a second crop or topic in passing
+        if rng.random() < 0.3:
+            body.insert(rng.randrange(len(body)), rng.choice(CROPS + TOPICS))
+        created = now - timedelta(minutes=rng.randint(0, 525600))
+        rows.append({
+            'category_id': rng.randint(1, 5),
+            'user_id': 1,
+            'title': f"{crop.title()} {topic} {rng.choice(words[:500])}",
+            'content': ' '.join(body),
+            'tags': ','.join({crop, topic}),
+            'is_ai_approved': rng.random() > 0.02,
+            'view_count': rng.randint(0, 5000),
+            'upvote_count': rng.randint(0, 200),
+            'created_at': created,
+            'updated_at': created,
+            'last_activity': created
+        })
+    return rows
+
+
+def _legacy_search(query, tags=None, limit=20):
+    """The search_threads query this index replaced."""
+    threads_query = ForumThread.query.filter_by(is_ai_approved=True)
+    if query:
+        threads_query = threads_query.filter(or_(
+            ForumThread.title.ilike(f'%{query}%'),
+            ForumThread.content.ilike(f'%{query}%'),
+            ForumThread.tags.ilike(f'%{query}%')
+        ))
+    for tag in tags or ():
+        threads_query = threads_query.filter(ForumThread.tags.ilike(f'%{tag}%'))
+    return threads_query.order_by(
+        ForumThread.view_count.desc(), ForumThread.upvote_count.desc()
+    ).limit(limit).all()
+
+
+def run(thread_count=100000, queries=200, seed=11):
+    rng = random.Random(seed)
+    results = {}
+    app = make_benchmark_app(TABLES)
+
+    workload = []
+    for _ in range(queries):
+        kind = rng.random()
+        if kind < 0.5:
+            workload.append((rng.choice(CROPS), None))
+        elif kind < 0.8:
+            workload.append((f"{rng.choice(CROPS)} {rng.choice(TOPICS)}", None))
+        else:
+            workload.append((rng.choice(TOPICS), [rng.choice(CROPS)]))
+
+    with app.app_context():
+        db.session.bulk_insert_mappings(ForumCategory, [{'id': i, 'name': f"cat-{i}"} for i in range(1, 6)])
+        vocabulary = _vocabulary(rng)
+        for start in range(0, thread_count, 10000):
+            db.session.bulk_insert_mappings(ForumThread, _threads(rng, min(10000, thread_count - start), vocabulary))
+        db.session.commit()
+
+        with timed(results, f"index build, threads={thread_count}", thread_count):
+            forum_search_index.rebuild()
+
+        with timed(results, "legacy ILIKE search", queries):
+            for query, tags in workload:
+                _legacy_search(query, tags)
+
+        with timed(results, "BM25 index search (+total, facets)", queries):
+            for query, tags in workload:
+                found = forum_search_index.search(query, tags=tags)
+                if found['ids']:
+                    ForumThread.query.filter(ForumThread.id.in_(found['ids'])).all()
+
+        db.session.remove()
+
+    print_results(f"Forum search ({thread_count} threads, {queries} queries)", results)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    run(args.threads, args.queries)
@@ -0,0 +1,66 @@
+"""
+Ledger posting throughput: create_transaction loop vs create_transactions_bulk.
+
+    python -m backend.benchmarks.ledger_posting --count 2000
+"""
+
+import argparse
+
+from backend.benchmarks import make_benchmark_app, timed, print_results
+from backend.models.ledger import (
+    LedgerAccount, LedgerTransaction, LedgerEntry,
+    LedgerAccountBalance, LedgerBalanceCheckpoint,
+    AccountType, TransactionType
+)
+from backend.models.user import User
+from backend.services.ledger_service import LedgerService
+
+TABLES = [User, LedgerAccount, LedgerTransaction, LedgerEntry, LedgerAccountBalance, LedgerBalanceCheckpoint]
+
+
+def _payout_batch(pool_account_id, member_account_ids, count):
+    return [
+        {
+            'transaction_type': TransactionType.DIVIDEND,
+            'description': f"Pool payout #{i}",
+            'entries': [
+                {'account_id': pool_account_id, 'entry_type': 'CREDIT', 'amount': 10 + i % 50},
+                {'account_id': member_account_ids[i % len(member_account_ids)], 'entry_type': 'DEBIT', 'amount': 10 + i % 50}
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def run(count=2000, members=200):
+    app = make_benchmark_app(TABLES)
+    results = {}
+
+    with app.app_context():
+        pool = LedgerService.create_account('2100-POOL', 'Yield Pool', AccountType.LIABILITY)
+        member_ids = [
+            LedgerService.create_account(f"1200-MEMBER-{i}", f"Member {i}", AccountType.ASSET).id
+            for i in range(members)
+        ]
+        batch = _payout_batch(pool.id, member_ids, count)
+
+        with timed(results, 'create_transaction loop', count):
+            for txn in batch:
+                LedgerService.create_transaction(**txn)
+
+        with timed(results, 'create_transactions_bulk', count):
+            LedgerService.create_transactions_bulk(batch)
+
+        drift = LedgerService.verify_balance_consistency()['drift_count']
+
+    print_results(f"Ledger posting ({members} member accounts)", results)
+    print(f"snapshot drift after run: {drift}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--members', type=int, default=200)
+    args = parser.parse_args()
+    run(args.count, args.members)
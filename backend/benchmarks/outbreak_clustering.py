@@ -0,0 +1,113 @@
+"""
+Outbreak clustering cost vs incident history size.
+
+For each history size, runs an initial clustering pass over the history,
+then times an incremental pass over a fixed batch of new incidents next to a
+from-scratch DBSCAN over the same 30-day window. The reporting area grows with
+the history so incident density stays constant; the incremental pass should
+then stay flat as the history grows.
+
+    python -m backend.benchmarks.outbreak_clustering --history 5000 20000 50000 --new 200
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from backend.benchmarks import make_benchmark_app, timed, print_results
+from backend.extensions import db
+from backend.models.gews import DiseaseIncident, OutbreakZone, OutbreakClusterState
+from backend.models.user import User
+from backend.services.geospatial_service import GeospatialService
+from backend.services.incident_index import incident_index
+
+TABLES = [User, OutbreakZone, DiseaseIncident, OutbreakClusterState]
+DISEASES = ['leaf_rust', 'late_blight', 'fall_armyworm']
+INCIDENTS_PER_HOTSPOT = 125
+
+
+def _region(rng, history):
+    """Hotspots spread over an area proportional to the history size."""
+    span = 2.5 * (history / INCIDENTS_PER_HOTSPOT) ** 0.5
+    bounds = (-span / 2, span / 2, 35 - span / 2, 35 + span / 2)
+    hotspots = [
+        (rng.uniform(bounds[0], bounds[1]), rng.uniform(bounds[2], bounds[3]))
+        for _ in range(max(1, history // INCIDENTS_PER_HOTSPOT))
+    ]
+    return bounds, hotspots
+
+
+def _incidents(rng, start, count, region):
+    bounds, hotspots = region
+    now = datetime.utcnow()
+    rows = []
+    for i in range(start, start + count):
+        if rng.random() < 0.7:
+            lat, lon = rng.choice(hotspots)
+        else:
+            lat, lon = rng.uniform(bounds[0], bounds[1]), rng.uniform(bounds[2], bounds[3])
+        rows.append({
+            'incident_id': f"BENCH-{i}",
+            'user_id': 1,
+            'disease_name': rng.choice(DISEASES),
+            'crop_affected': 'maize',
+            'severity_level': rng.choice(['low', 'medium', 'high']),
+            'latitude': lat + rng.gauss(0, 0.3),
+            'longitude': lon + rng.gauss(0, 0.3),
+            'affected_area': rng.uniform(0.5, 5),
+            'verification_status': 'pending',
+            'reported_at': now - timedelta(days=rng.uniform(0, 29))
+        })
+    return rows
+
+
+def run(history_sizes=(5000, 20000), new=200, seed=7):
+    results = {}
+
+    for history in history_sizes:
+        rng = random.Random(seed)
+        region = _region(rng, history)
+        app = make_benchmark_app(TABLES)
+
+        with app.app_context():
+            db.session.bulk_insert_mappings(DiseaseIncident, _incidents(rng, 0, history, region))
+            db.session.commit()
+
+            with timed(results, f"initial pass, history={history}", history):
+                incident_index.rebuild()
+                GeospatialService.update_outbreak_zones()
+
+            db.session.bulk_insert_mappings(DiseaseIncident, _incidents(rng, history, new, region))
+            db.session.commit()
+
+            with timed(results, f"incremental pass, history={history}", new):
+                summary = GeospatialService.update_outbreak_zones()
+
+            with timed(results, f"from-scratch DBSCAN, history={history}", history + new):
+                window = DiseaseIncident.query.filter(
+                    DiseaseIncident.reported_at >= datetime.utcnow() - timedelta(days=30)
+                ).all()
+                for disease in DISEASES:
+                    GeospatialService._find_dense_clusters(
+                        [incident for incident in window if incident.disease_name == disease],
+                        GeospatialService.CLUSTERING_RADIUS_KM,
+                        GeospatialService.OUTBREAK_THRESHOLD
+                    )
+
+            print(
+                f"history={history}: +{summary['new_incidents']} incidents, "
+                f"{len(summary['zones_created'])} zones created, {len(summary['zones_grown'])} grown, "
+                f"{len(summary['zones_merged'])} merged"
+            )
+            db.session.remove()
+
+    print_results(f"Outbreak clustering (+{new} new incidents per run)", results)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--new', type=int, default=200)
+    args = parser.parse_args()
+    run(args.history, args.new)
@@ -0,0 +1,102 @@
+"""
+Route optimization sync cost vs active route count.
+
+For each route count, seeds IN_TRANSIT routes with a held escrow, a handful
+of GPS pings and a stalled customs checkpoint, then times the per-route
+query loop the task used to run next to the set-based route_optimization_sync.
+The set-based pass issues a fixed number of queries, so its run time should
+grow with row volume only, not with a query round trip per route.
+
+    python -m backend.benchmarks.route_sync --routes 500 2000 10000 --pings 5
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from backend.benchmarks import make_benchmark_app, timed, print_results
+from backend.extensions import db
+from backend.models.ledger import LedgerTransaction  # noqa: F401 (FreightEscrow FK target)
+from backend.models.logistics_v2 import (
+    TransportRoute, FreightEscrow, CustomsCheckpoint, GPSTelemetry
+)
+from backend.tasks.route_optimization import route_optimization_sync
+
+TABLES = [TransportRoute, FreightEscrow, CustomsCheckpoint, GPSTelemetry]
+
+
+def _seed(rng, routes, pings_per_route):
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(TransportRoute, [
+        {'id': i, 'origin': f"Depot {i}", 'destination': f"Market {i}", 'status': 'IN_TRANSIT'}
+        for i in range(1, routes + 1)
+    ])
+    db.session.bulk_insert_mappings(FreightEscrow, [
+        {
+            'route_id': i, 'driver_id': 1, 'total_freight_amount': 850.0, 'base_price': 850.0,
+            'fuel_surcharge': 0.0, 'customs_delay_penalty': 0.0, 'final_amount': 850.0,
+            'destination_lat': 0.0, 'destination_lng': 0.0, 'status': 'HELD'
+        }
+        for i in range(1, routes + 1)
+    ])
+    db.session.bulk_insert_mappings(CustomsCheckpoint, [
+        {
+            'route_id': i, 'checkpoint_name': f"Border {i}", 'country': 'KE',
+            'status': 'PENDING', 'arrived_at': now - timedelta(hours=rng.uniform(0, 96))
+        }
+        for i in range(1, routes + 1)
+    ])
+    db.session.bulk_insert_mappings(GPSTelemetry, [
+        {
+            'route_id': i, 'vehicle_id': 1, 'latitude': rng.uniform(-5, 5), 'longitude': rng.uniform(30, 40),
+            'fuel_price_per_liter': rng.uniform(0.9, 1.8), 'recorded_at': now - timedelta(minutes=5 * k)
+        }
+        for i in range(1, routes + 1) for k in range(pings_per_route)
+    ])
+    db.session.commit()
+
+
+def _legacy_sync():
+    """The task's previous shape: three to four queries per active route."""
+    now = datetime.utcnow()
+    stale_threshold = now - timedelta(hours=48)
+    for route in TransportRoute.query.filter(TransportRoute.status == 'IN_TRANSIT').all():
+        CustomsCheckpoint.query.filter_by(route_id=route.id, status='PENDING').filter(
+            CustomsCheckpoint.arrived_at <= stale_threshold
+        ).all()
+        latest_ping = GPSTelemetry.query.filter_by(route_id=route.id).order_by(
+            GPSTelemetry.recorded_at.desc()
+        ).first()
+        if latest_ping and latest_ping.fuel_price_per_liter:
+            FreightEscrow.query.filter_by(route_id=route.id, status='HELD').first()
+    db.session.rollback()
+
+
+def run(route_counts=(500, 2000, 10000), pings_per_route=5, seed=5):
+    rng = random.Random(seed)
+    results = {}
+
+    for routes in route_counts:
+        app = make_benchmark_app(TABLES)
+        with app.app_context():
+            _seed(rng, routes, pings_per_route)
+
+            with timed(results, f"per-route queries @ {routes}", routes):
+                _legacy_sync()
+
+            with timed(results, f"set-based sync @ {routes}", routes):
+                stats = route_optimization_sync.run()
+
+            print(f"{routes} routes: {stats}")
+            db.session.remove()
+
+    print_results(f"Route optimization sync ({pings_per_route} pings/route)", results)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--routes', type=int, nargs='+', default=[500, 2000, 10000])
+    parser.add_argument('--pings', type=int, default=5)
+    args = parser.parse_args()
+    run(args.routes, args.pings)
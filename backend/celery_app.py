@@ -49,6 +49,26 @@ celery_app.conf.update(
         'pathogen-propagation-simulation': {
             'task': 'tasks.pathogen_propagation_run',
             'schedule': 1800.0, # Every 30 mins
+        },
+        'outbreak-zone-clustering': {
+            'task': 'tasks.outbreak_zone_clustering',
+            'schedule': 600.0, # Every 10 mins
+        },
+        'ledger-balance-checkpoint-daily': {
+            'task': 'tasks.ledger_balance_checkpoint',
+            'schedule': 86400.0, # Daily
+        },
+        'flush-forum-counters': {
+            'task': 'tasks.flush_forum_counters',
+            'schedule': 30.0,
+        },
+        'ledger-balance-verification-daily': {
+            'task': 'tasks.ledger_balance_verification',
+            'schedule': 86400.0,
+        },
+        'reclaim-stale-inferences': {
+            'task': 'tasks.reclaim_stale_inferences',
+            'schedule': 300.0, # Every 5 mins
         }
     }
 )
@@ -56,6 +56,27 @@ class Config:
     CACHE_REDIS_URL = REDIS_URL
     CACHE_DEFAULT_TIMEOUT = 3600  # 1 hour default
 
+    # Audit logging (buffered writer)
+    AUDIT_ASYNC_WRITES = os.environ.get('AUDIT_ASYNC_WRITES', 'True').lower() in ['true', 'on', '1']
+    AUDIT_BUFFER_SIZE = int(os.environ.get('AUDIT_BUFFER_SIZE', 10000))
+    AUDIT_FLUSH_BATCH_SIZE = int(os.environ.get('AUDIT_FLUSH_BATCH_SIZE', 200))
+    AUDIT_FLUSH_INTERVAL_MS = int(os.environ.get('AUDIT_FLUSH_INTERVAL_MS', 250))
+    THREAT_COUNTER_BACKEND = os.environ.get('THREAT_COUNTER_BACKEND', 'memory')  # 'memory' or 'redis'
+
+    # Forum view/upvote counters are buffered and written in bulk
+    FORUM_COUNTER_BACKEND = os.environ.get('FORUM_COUNTER_BACKEND', 'memory')  # 'memory' or 'redis'
+    FORUM_COUNTER_FLUSH_SECONDS = int(os.environ.get('FORUM_COUNTER_FLUSH_SECONDS', 10))
+
+    # Metrics: set to a shared directory to aggregate gunicorn workers on /metrics
+    METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+    METRICS_SNAPSHOT_SECONDS = int(os.environ.get('METRICS_SNAPSHOT_SECONDS', 15))
+
+    # Disease/soil inference results reused for identical or near-identical uploads
+    INFERENCE_CACHE_BACKEND = os.environ.get('INFERENCE_CACHE_BACKEND', 'memory')  # 'memory' or 'redis'
+    INFERENCE_CACHE_TTL_SECONDS = int(os.environ.get('INFERENCE_CACHE_TTL_SECONDS', 86400))
+    INFERENCE_CACHE_MAX_ENTRIES = int(os.environ.get('INFERENCE_CACHE_MAX_ENTRIES', 10000))
+    INFERENCE_CACHE_PHASH_DISTANCE = int(os.environ.get('INFERENCE_CACHE_PHASH_DISTANCE', 4))  # of 64 bits
+
 class DevelopmentConfig(Config):
     """Development Configuration"""
     DEBUG = True
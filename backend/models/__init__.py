@@ -13,7 +13,7 @@ from .misc import (
     ResourceShare,
     PoolVote,
 )
-from .gews import DiseaseIncident, OutbreakZone, OutbreakAlert
+from .gews import DiseaseIncident, OutbreakZone, OutbreakAlert, OutbreakClusterState
 from .traceability import SupplyBatch, CustodyLog, QualityGrade, BatchStatus
 from .insurance import (
     InsurancePolicy,
@@ -113,7 +113,7 @@ from .transparency import ProduceReview, PriceAdjustmentLog
 from .barter import BarterTransaction, BarterResource, ResourceValueIndex
 from .financials import FarmBalanceSheet, SolvencySnapshot, ProfitabilityIndex
 from .reliability_log import ReliabilityLog
-from .market import ForwardContract, PriceHedgingLog
+from .market import ForwardContract, PriceHedgingLog, MarketPrice, PriceWatchlist
 from .arbitrage import ArbitrageOpportunity, AlgorithmicTradeRecord
 from .spatial_yield import SpatialYieldGrid, TemporalYieldForex
 from .circular import WasteInventory, BioEnergyOutput, CircularCredit
@@ -125,6 +125,8 @@ from .ledger import (
     LedgerAccount,
     LedgerTransaction,
     LedgerEntry,
+    LedgerAccountBalance,
+    LedgerBalanceCheckpoint,
     FXValuationSnapshot,
     Vault,
     VaultCurrencyPosition,
@@ -151,6 +153,7 @@ __all__ = [
     "DiseaseIncident",
     "OutbreakZone",
     "OutbreakAlert",
+    "OutbreakClusterState",
     "MigrationVector",
     "ContainmentZone",
     # Traceability
@@ -326,6 +329,8 @@ __all__ = [
     "LedgerAccount",
     "LedgerTransaction",
     "LedgerEntry",
+    "LedgerAccountBalance",
+    "LedgerBalanceCheckpoint",
     "FXValuationSnapshot",
     "Vault",
     "VaultCurrencyPosition",
@@ -76,31 +76,6 @@ class OutbreakZone(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
-class OutbreakProjection(db.Model):
-    __tablename__ = 'outbreak_projections'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    outbreak_zone_id = db.Column(db.Integer, db.ForeignKey('outbreak_zones.id'), nullable=False)
-    projection_time = db.Column(db.DateTime, nullable=False)
-    
-    projected_latitude = db.Column(db.Float, nullable=False)
-    projected_longitude = db.Column(db.Float, nullable=False)
-    expected_radius = db.Column(db.Float, nullable=False)
-    confidence_score = db.Column(db.Float, default=0.0)
-    
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'outbreak_zone_id': self.outbreak_zone_id,
-            'projection_time': self.projection_time.isoformat(),
-            'latitude': self.projected_latitude,
-            'longitude': self.projected_longitude,
-            'radius': self.expected_radius,
-            'confidence': self.confidence_score
-        }
-
     def set_center_location(self, lat, lon):
         self.center_latitude = lat
         self.center_longitude = lon
@@ -132,6 +107,31 @@ class OutbreakProjection(db.Model):
             }
         }
 
+class OutbreakProjection(db.Model):
+    __tablename__ = 'outbreak_projections'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    outbreak_zone_id = db.Column(db.Integer, db.ForeignKey('outbreak_zones.id'), nullable=False)
+    projection_time = db.Column(db.DateTime, nullable=False)
+    
+    projected_latitude = db.Column(db.Float, nullable=False)
+    projected_longitude = db.Column(db.Float, nullable=False)
+    expected_radius = db.Column(db.Float, nullable=False)
+    confidence_score = db.Column(db.Float, default=0.0)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'outbreak_zone_id': self.outbreak_zone_id,
+            'projection_time': self.projection_time.isoformat(),
+            'latitude': self.projected_latitude,
+            'longitude': self.projected_longitude,
+            'radius': self.expected_radius,
+            'confidence': self.confidence_score
+        }
+
 
 class OutbreakAlert(db.Model):
     __tablename__ = 'outbreak_alerts'
@@ -158,3 +158,12 @@ class OutbreakAlert(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'acknowledged_at': self.acknowledged_at.isoformat() if self.acknowledged_at else None
         }
+
+
+class OutbreakClusterState(db.Model):
+    """High-water mark of incidents already fed to incremental outbreak clustering."""
+    __tablename__ = 'outbreak_cluster_state'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    last_incident_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
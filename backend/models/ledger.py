@@ -47,8 +47,7 @@ class TransactionType(enum.Enum):
     CARBON_ESCROW_FEE = 'CARBON_ESCROW_FEE'      # Platform fee for managing carbon settlements
     NUTRIENT_REBALANCE_COST = 'NUTRIENT_REBALANCE_COST' # Automated billing for micronutrient injection
     WATER_TX_SETTLEMENT = 'WATER_TX_SETTLEMENT'  # Automated payment for precision water consumption
-    CARBON_CREDIT_MINT = 'CARBON_CREDIT_MINT'    # New credit minted from sequestration
-    CARBON_CREDIT_SALE = 'CARBON_CREDIT_SALE'    # Credit sold to ESG buyer
+    ARBITRAGE_EXECUTION = 'ARBITRAGE_EXECUTION'  # Autonomous arbitrage trade booked by the matrix
 
 
 class LedgerAccount(db.Model):
@@ -111,26 +110,126 @@ class LedgerAccount(db.Model):
         
         For ASSET and EXPENSE accounts: Debits increase, Credits decrease
         For LIABILITY, EQUITY, INCOME accounts: Credits increase, Debits decrease
+        
+        Reads the maintained LedgerAccountBalance snapshot when no cutoff is
+        given. For as_of_date queries only the entries after the nearest
+        LedgerBalanceCheckpoint are summed.
         """
-        from sqlalchemy import func
+        from sqlalchemy import func, case
         
+        base_debits = Decimal('0')
+        base_credits = Decimal('0')
         query = LedgerEntry.query.filter_by(account_id=self.id)
         
-        if as_of_date:
+        if as_of_date is None:
+            snapshot = LedgerAccountBalance.query.get(self.id)
+            if snapshot:
+                return self.signed_balance(snapshot.debit_total, snapshot.credit_total)
+        else:
+            checkpoint = LedgerBalanceCheckpoint.query.filter(
+                LedgerBalanceCheckpoint.account_id == self.id,
+                LedgerBalanceCheckpoint.checkpoint_date <= as_of_date
+            ).order_by(LedgerBalanceCheckpoint.checkpoint_date.desc()).first()
+            
+            if checkpoint:
+                base_debits = Decimal(str(checkpoint.debit_total))
+                base_credits = Decimal(str(checkpoint.credit_total))
+                query = query.filter(LedgerEntry.entry_date > checkpoint.checkpoint_date)
+            
             query = query.filter(LedgerEntry.entry_date <= as_of_date)
         
-        debits = query.filter_by(entry_type=EntryType.DEBIT).with_entities(
-            func.coalesce(func.sum(LedgerEntry.amount), 0)
-        ).scalar() or Decimal('0')
+        debits, credits = query.with_entities(
+            func.coalesce(func.sum(case(
+                (LedgerEntry.entry_type == EntryType.DEBIT, LedgerEntry.amount), else_=0
+            )), 0),
+            func.coalesce(func.sum(case(
+                (LedgerEntry.entry_type == EntryType.CREDIT, LedgerEntry.amount), else_=0
+            )), 0)
+        ).one()
         
-        credits = query.filter_by(entry_type=EntryType.CREDIT).with_entities(
-            func.coalesce(func.sum(LedgerEntry.amount), 0)
-        ).scalar() or Decimal('0')
+        return self.signed_balance(
+            base_debits + Decimal(str(debits or 0)),
+            base_credits + Decimal(str(credits or 0))
+        )
+    
+    def signed_balance(self, debits, credits):
+        """Apply the account's normal-balance side to raw debit/credit totals."""
+        debits = Decimal(str(debits or 0))
+        credits = Decimal(str(credits or 0))
         
         if self.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
-            return Decimal(str(debits)) - Decimal(str(credits))
+            return debits - credits
         else:
-            return Decimal(str(credits)) - Decimal(str(debits))
+            return credits - debits
+
+
+class LedgerAccountBalance(db.Model):
+    """
+    Materialized running totals for a ledger account.
+    
+    Kept current by a flush hook in ledger_service for every LedgerEntry
+    inserted or deleted through the ORM (and by LedgerService for bulk
+    posts), so current balances don't need an aggregate over LedgerEntry.
+    Can be rebuilt from raw entries with
+    LedgerService.verify_balance_consistency(repair=True).
+    """
+    __tablename__ = 'ledger_account_balances'
+    
+    account_id = db.Column(db.Integer, db.ForeignKey('ledger_accounts.id'), primary_key=True)
+    debit_total = db.Column(db.Numeric(18, 6), default=0, nullable=False)
+    credit_total = db.Column(db.Numeric(18, 6), default=0, nullable=False)
+    entry_count = db.Column(db.Integer, default=0, nullable=False)
+    last_entry_date = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    account = db.relationship('LedgerAccount', backref=db.backref('balance_snapshot', uselist=False))
+    
+    def to_dict(self):
+        return {
+            'account_id': self.account_id,
+            'debit_total': float(self.debit_total or 0),
+            'credit_total': float(self.credit_total or 0),
+            'entry_count': self.entry_count,
+            'last_entry_date': self.last_entry_date.isoformat() if self.last_entry_date else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class LedgerBalanceCheckpoint(db.Model):
+    """
+    Periodic cumulative debit/credit totals for an account.
+    
+    Historical (as_of_date) balances start from the nearest checkpoint at or
+    before the cutoff and only sum the entries posted after it. Checkpoints
+    later than a backdated entry are dropped when that entry is posted.
+    """
+    __tablename__ = 'ledger_balance_checkpoints'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('ledger_accounts.id'), nullable=False)
+    checkpoint_date = db.Column(db.DateTime, nullable=False)
+    
+    # Cumulative totals of all entries with entry_date <= checkpoint_date
+    debit_total = db.Column(db.Numeric(18, 6), default=0, nullable=False)
+    credit_total = db.Column(db.Numeric(18, 6), default=0, nullable=False)
+    entry_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('account_id', 'checkpoint_date', name='uq_ledger_checkpoint_account_date'),
+        db.Index('idx_ledger_checkpoint_account_date', 'account_id', 'checkpoint_date'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'checkpoint_date': self.checkpoint_date.isoformat() if self.checkpoint_date else None,
+            'debit_total': float(self.debit_total or 0),
+            'credit_total': float(self.credit_total or 0),
+            'entry_count': self.entry_count
+        }
 
 
 class LedgerTransaction(db.Model):
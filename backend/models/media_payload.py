@@ -17,10 +17,12 @@ class MediaPayload(db.Model):
     file_path = db.Column(db.String(512), nullable=False)
     file_type = db.Column(db.String(100), nullable=False)
     file_size = db.Column(db.Integer, nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # SHA-256 of the file
     
     # Processing state
-    status = db.Column(db.String(20), default='PENDING')  # PENDING, PROCESSING, COMPLETED, FAILED
+    status = db.Column(db.String(20), default='PENDING')  # PENDING, PROCESSING, INFERRING, COMPLETED, FAILED
     task_id = db.Column(db.String(100), nullable=True)  # Celery task ID
+    claimed_at = db.Column(db.DateTime, nullable=True)  # When a worker's disease batch claimed it
     
     # Extraction results
     processed_at = db.Column(db.DateTime, nullable=True)
@@ -39,6 +41,7 @@ class MediaPayload(db.Model):
             'user_id': self.user_id,
             'payload_type': self.payload_type,
             'filename': self.filename,
+            'content_hash': self.content_hash,
             'status': self.status,
             'task_id': self.task_id,
             'processed_at': self.processed_at.isoformat() if self.processed_at else None,
@@ -1,88 +1,539 @@
+"""
+Prometheus-compatible metrics with constant per-observation cost.
+
+Counters and histograms are written to per-thread shards, so the hot path
+takes no lock; a scrape merges the shards. Histograms keep fixed cumulative
+buckets (plus an optional quantile sketch) instead of every observation, so
+memory and scrape time depend on the number of series, not on traffic.
+
+Under gunicorn each worker process has its own collector. When
+METRICS_MULTIPROC_DIR is set, every process writes a JSON snapshot there
+every METRICS_SNAPSHOT_SECONDS (and at exit), and a scrape on any worker
+merges all snapshots: counters and histograms are summed, while gauges are
+point-in-time values that can't be added up, so each process's gauges are
+exported as their own series with a `pid` label.
+"""
+
+import atexit
+import glob
+import json
+import math
+import os
+import threading
 import time
+from bisect import bisect_left
 from functools import wraps
-from collections import defaultdict
-from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch with relative error guarantees.
+
+    Positive values go into logarithmic bins of width gamma = (1+a)/(1-a),
+    so any reported quantile is within `relative_accuracy` of the true value.
+    When more than max_bins are in use the lowest bins are collapsed, which
+    only costs accuracy at the low end.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = int(math.ceil(math.log(value) / self._log_gamma))
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        ordered = sorted(self.bins)
+        excess = len(ordered) - self.max_bins
+        target = ordered[excess]
+        for index in ordered[:excess]:
+            self.bins[target] += self.bins.pop(index)
+
+    def merge(self, other: 'QuantileSketch'):
+        for index, count in list(other.bins.items()):
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'bins': {str(index): count for index, count in self.bins.items()},
+            'zero_count': self.zero_count,
+            'count': self.count
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileSketch':
+        sketch = cls(data['relative_accuracy'])
+        sketch.bins = {int(index): count for index, count in data['bins'].items()}
+        sketch.zero_count = data['zero_count']
+        sketch.count = data['count']
+        return sketch
+
+
+class _HistogramState:
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'sketch')
+
+    def __init__(self, bounds: Tuple[float, ...], quantiles: bool):
+        self.bounds = bounds
+        # Per-bucket (non-cumulative) counts; the last slot is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.sketch = QuantileSketch() if quantiles else None
+
+
+class _Shard:
+    """Metrics written by one thread. Only the owning thread mutates it."""
+
+    __slots__ = ('owner', 'counters', 'histograms')
+
+    def __init__(self, owner=None):
+        self.owner = owner
+        self.counters = {}
+        self.histograms = {}
+
+    def fold(self, other: '_Shard'):
+        """Add another shard's values into this one."""
+        for key, value in list(other.counters.items()):
+            self.counters[key] = self.counters.get(key, 0) + value
+        for key, state in list(other.histograms.items()):
+            mine = self.histograms.get(key)
+            if mine is None or mine.bounds != state.bounds:
+                mine = self.histograms[key] = _HistogramState(state.bounds, state.sketch is not None)
+            mine.counts = [a + b for a, b in zip(mine.counts, list(state.counts))]
+            mine.sum += state.sum
+            mine.count += state.count
+            if state.sketch is not None:
+                if mine.sketch is None:
+                    mine.sketch = QuantileSketch(state.sketch.relative_accuracy)
+                mine.sketch.merge(state.sketch)
 
 
 class MetricsCollector:
-    """Simple metrics collector for Prometheus-compatible output."""
-    
+    """Thread-sharded metrics collector for Prometheus-compatible output."""
+
+    SNAPSHOT_INTERVAL_SECONDS = 15
+    # Live shards allowed before those of finished threads are folded together
+    MAX_SHARDS = 256
+    # Snapshots older than this belong to dead workers and are ignored
+    SNAPSHOT_STALE_SECONDS = 300
+
     def __init__(self):
-        self.counters = defaultdict(int)
-        self.gauges = defaultdict(float)
-        self.histograms = defaultdict(list)
+        self.gauges = {}
         self.start_time = time.time()
-    
+        self.multiproc_dir = None
+        self._local = threading.local()
+        self._shards = []
+        # Values of threads that have exited; only touched under _lock
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        # metric name -> (bucket bounds, keep quantile sketch)
+        self._histogram_config = {}
+        self._snapshot_thread = None
+        self._pid = None
+        self._atexit_registered = False
+
+    # ── Recording ─────────────────────────────────────────────────────────────
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None or getattr(self._local, 'pid', None) != os.getpid():
+            shard = _Shard(threading.current_thread())
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Shards inherited through fork belong to the parent
+                    self._shards = []
+                    self._retired = _Shard()
+                    self._pid = os.getpid()
+                if len(self._shards) >= self.MAX_SHARDS:
+                    self._retire_dead_shards()
+                self._shards.append(shard)
+            self._local.shard = shard
+            self._local.pid = os.getpid()
+        return shard
+
+    def register_histogram(self, name, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+                           quantiles: bool = False):
+        """Set bucket bounds for a histogram and whether it keeps a quantile sketch."""
+        self._histogram_config[name] = (tuple(sorted(buckets)), quantiles)
+
     def increment(self, name, value=1, labels=None):
         """Increment a counter."""
+        counters = self._shard().counters
         key = self._make_key(name, labels)
-        self.counters[key] += value
-    
+        counters[key] = counters.get(key, 0) + value
+
     def set_gauge(self, name, value, labels=None):
         """Set a gauge value."""
-        key = self._make_key(name, labels)
-        self.gauges[key] = value
-    
+        self.gauges[self._make_key(name, labels)] = value
+
     def observe(self, name, value, labels=None):
-        """Record a histogram observation."""
+        """Record a histogram observation in its fixed buckets."""
+        histograms = self._shard().histograms
         key = self._make_key(name, labels)
-        self.histograms[key].append(value)
-    
+        state = histograms.get(key)
+        if state is None:
+            bounds, quantiles = self._histogram_config.get(name, (DEFAULT_LATENCY_BUCKETS, False))
+            state = histograms[key] = _HistogramState(bounds, quantiles)
+        state.counts[bisect_left(state.bounds, value)] += 1
+        state.sum += value
+        state.count += 1
+        if state.sketch is not None:
+            state.sketch.add(value)
+
     def _make_key(self, name, labels):
         """Create a unique key for metrics with labels."""
         if labels:
             label_str = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
             return f'{name}{{{label_str}}}'
         return name
-    
+
+    # ── Aggregation ───────────────────────────────────────────────────────────
+    def _retire_dead_shards(self):
+        """Fold shards of exited threads into the retired shard. Call under _lock."""
+        live = []
+        for shard in self._shards:
+            if shard.owner is not None and shard.owner.is_alive():
+                live.append(shard)
+            else:
+                self._retired.fold(shard)
+        self._shards = live
+
+    def snapshot(self) -> Dict:
+        """This process's metrics, with thread shards merged, as plain JSON-able data."""
+        merged = _Shard()
+        with self._lock:
+            if self._pid == os.getpid():
+                self._retire_dead_shards()
+                merged.fold(self._retired)
+                for shard in self._shards:
+                    merged.fold(shard)
+
+        histograms = {
+            key: {
+                'bounds': list(state.bounds), 'counts': state.counts, 'sum': state.sum, 'count': state.count,
+                'sketch': state.sketch.to_dict() if state.sketch is not None else None
+            }
+            for key, state in merged.histograms.items()
+        }
+        return {
+            'pid': os.getpid(), 'counters': merged.counters, 'gauges': dict(self.gauges), 'histograms': histograms
+        }
+
+    @staticmethod
+    def merge_snapshots(snapshots: Iterable[Dict]) -> Dict:
+        """Sum counters and histogram buckets across process snapshots; label gauges by pid."""
+        result = {'counters': {}, 'gauges': {}, 'histograms': {}}
+        for snap in snapshots:
+            counters = result['counters']
+            for key, value in snap.get('counters', {}).items():
+                counters[key] = counters.get(key, 0) + value
+            pid = snap.get('pid')
+            for key, value in snap.get('gauges', {}).items():
+                if pid is not None:
+                    name, labels = MetricsCollector._split_key(key)
+                    key = name + MetricsCollector._with_label(labels, f'pid="{pid}"')
+                result['gauges'][key] = value
+            for key, hist in snap.get('histograms', {}).items():
+                merged = result['histograms'].get(key)
+                if merged is None or merged['bounds'] != hist['bounds']:
+                    # Bucket layouts only differ mid-deploy; the newest layout wins
+                    result['histograms'][key] = {
+                        'bounds': list(hist['bounds']), 'counts': list(hist['counts']),
+                        'sum': hist['sum'], 'count': hist['count'],
+                        'sketch': QuantileSketch.from_dict(hist['sketch']) if hist.get('sketch') else None
+                    }
+                    continue
+                merged['counts'] = [a + b for a, b in zip(merged['counts'], hist['counts'])]
+                merged['sum'] += hist['sum']
+                merged['count'] += hist['count']
+                if hist.get('sketch'):
+                    sketch = QuantileSketch.from_dict(hist['sketch'])
+                    if merged['sketch'] is None:
+                        merged['sketch'] = sketch
+                    else:
+                        merged['sketch'].merge(sketch)
+
+        for merged in result['histograms'].values():
+            if isinstance(merged['sketch'], QuantileSketch):
+                merged['sketch'] = merged['sketch'].to_dict()
+        return result
+
+    # ── Multi-process (gunicorn) snapshots ────────────────────────────────────
+    def init_app(self, app):
+        """Read multi-process settings and instrument every request of the app."""
+        self.multiproc_dir = app.config.get('METRICS_MULTIPROC_DIR') or None
+        self.SNAPSHOT_INTERVAL_SECONDS = app.config.get('METRICS_SNAPSHOT_SECONDS', self.SNAPSHOT_INTERVAL_SECONDS)
+        if self.multiproc_dir:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+            if not self._atexit_registered:
+                atexit.register(self.write_snapshot)
+                self._atexit_registered = True
+        _install_request_hooks(app)
+
+    def _snapshot_path(self, pid=None) -> str:
+        return os.path.join(self.multiproc_dir, f'metrics_{pid or os.getpid()}.json')
+
+    def write_snapshot(self):
+        """Atomically write this process's snapshot to the multi-process directory."""
+        if not self.multiproc_dir:
+            return
+        path = self._snapshot_path()
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot {path}: {e}")
+
+    def _ensure_snapshot_writer(self):
+        # Like the audit writer's flusher, the thread doesn't survive fork,
+        # so each worker starts its own
+        if not self.multiproc_dir:
+            return
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive() \
+                and getattr(self._snapshot_thread, 'pid', None) == os.getpid():
+            return
+        with self._lock:
+            if self._snapshot_thread is not None and self._snapshot_thread.is_alive() \
+                    and getattr(self._snapshot_thread, 'pid', None) == os.getpid():
+                return
+            thread = threading.Thread(target=self._snapshot_loop, name='metrics-snapshot', daemon=True)
+            thread.pid = os.getpid()
+            thread.start()
+            self._snapshot_thread = thread
+
+    def _snapshot_loop(self):
+        while True:
+            time.sleep(self.SNAPSHOT_INTERVAL_SECONDS)
+            self.write_snapshot()
+
+    def _aggregate(self) -> Dict:
+        if not self.multiproc_dir:
+            return self.snapshot()
+
+        self.write_snapshot()
+        now = time.time()
+        snapshots = []
+        for path in glob.glob(os.path.join(self.multiproc_dir, 'metrics_*.json')):
+            try:
+                if now - os.path.getmtime(path) > self.SNAPSHOT_STALE_SECONDS:
+                    continue
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return self.merge_snapshots(snapshots)
+
+    # ── Export ────────────────────────────────────────────────────────────────
+    @staticmethod
+    def _split_key(key: str) -> Tuple[str, str]:
+        name, _, rest = key.partition('{')
+        return name, rest[:-1] if rest else ''
+
+    @staticmethod
+    def _with_label(labels: str, extra: str) -> str:
+        return f'{{{labels},{extra}}}' if labels else f'{{{extra}}}'
+
     def to_prometheus(self):
         """Export metrics in Prometheus format."""
+        data = self._aggregate()
         lines = []
-        
+
         # Add uptime
         uptime = time.time() - self.start_time
         lines.append(f'# HELP agritech_uptime_seconds Application uptime in seconds')
         lines.append(f'# TYPE agritech_uptime_seconds gauge')
         lines.append(f'agritech_uptime_seconds {uptime:.2f}')
         lines.append('')
-        
-        # Counters
-        for key, value in self.counters.items():
-            lines.append(f'# TYPE {key.split("{")[0]} counter')
-            lines.append(f'{key} {value}')
-        
-        # Gauges
-        for key, value in self.gauges.items():
-            lines.append(f'# TYPE {key.split("{")[0]} gauge')
-            lines.append(f'{key} {value}')
-        
-        # Histograms (simplified - just count and sum)
-        for key, values in self.histograms.items():
-            base_name = key.split('{')[0]
-            lines.append(f'# TYPE {base_name} histogram')
-            lines.append(f'{key}_count {len(values)}')
-            lines.append(f'{key}_sum {sum(values):.4f}')
-        
+
+        for section, metric_type in (('counters', 'counter'), ('gauges', 'gauge')):
+            typed = set()
+            for key, value in sorted(data[section].items()):
+                name = key.split('{')[0]
+                if name not in typed:
+                    lines.append(f'# TYPE {name} {metric_type}')
+                    typed.add(name)
+                lines.append(f'{key} {value}')
+
+        typed = set()
+        quantile_lines = []
+        for key, hist in sorted(data['histograms'].items()):
+            name, labels = self._split_key(key)
+            if name not in typed:
+                lines.append(f'# TYPE {name} histogram')
+                typed.add(name)
+            cumulative = 0
+            for bound, count in zip(list(hist['bounds']) + ['+Inf'], hist['counts']):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f'{name}_bucket{self._with_label(labels, le)} {cumulative}')
+            suffix = f'{{{labels}}}' if labels else ''
+            lines.append(f'{name}_sum{suffix} {hist["sum"]:.4f}')
+            lines.append(f'{name}_count{suffix} {hist["count"]}')
+
+            if hist.get('sketch'):
+                sketch = QuantileSketch.from_dict(hist['sketch'])
+                for q in DEFAULT_QUANTILES:
+                    value = sketch.quantile(q)
+                    if value is not None:
+                        quantile = 'quantile="%s"' % q
+                        quantile_lines.append(
+                            (name, f'{name}_quantile{self._with_label(labels, quantile)} {value:.6f}')
+                        )
+
+        typed = set()
+        for name, line in quantile_lines:
+            if name not in typed:
+                lines.append(f'# TYPE {name}_quantile gauge')
+                typed.add(name)
+            lines.append(line)
+
         return '\n'.join(lines)
 
 
 # Global metrics collector
 metrics = MetricsCollector()
+metrics.register_histogram('agritech_request_duration_seconds', quantiles=True)
+metrics.register_histogram('agritech_request_db_seconds')
+
+
+# ── Request instrumentation ───────────────────────────────────────────────────
+_db_events_installed = False
+
+
+def _install_db_timing():
+    """Accumulate SQL execution time per request on flask.g."""
+    global _db_events_installed
+    if _db_events_installed:
+        return
+    from flask import g, has_request_context
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        if has_request_context():
+            g.metrics_db_seconds = g.get('metrics_db_seconds', 0.0) + elapsed
+            g.metrics_db_queries = g.get('metrics_db_queries', 0) + 1
+
+    _db_events_installed = True
+
+
+def _record_request(endpoint, method, status_code, duration, db_seconds, db_queries):
+    labels = {'endpoint': endpoint, 'method': method}
+    metrics.increment('agritech_requests_total', labels={**labels, 'status': f'{status_code // 100}xx'})
+    metrics.observe('agritech_request_duration_seconds', duration, labels)
+    metrics.observe('agritech_request_db_seconds', db_seconds, labels)
+    if db_queries:
+        metrics.increment('agritech_request_db_queries_total', db_queries, labels)
+
+
+def _install_request_hooks(app):
+    from flask import g, request
+
+    _install_db_timing()
+
+    @app.before_request
+    def _start_request_timer():
+        metrics._ensure_snapshot_writer()
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_seconds = 0.0
+        g.metrics_db_queries = 0
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.get('metrics_started')
+        if started is not None and not g.get('metrics_tracked'):
+            _record_request(
+                request.endpoint or 'unmatched', request.method, response.status_code,
+                time.perf_counter() - started, g.get('metrics_db_seconds', 0.0), g.get('metrics_db_queries', 0)
+            )
+        return response
 
 
 def track_request_metrics(f):
-    """Decorator to track request metrics."""
+    """
+    Decorator to track request metrics for one view: count, latency and DB
+    time per endpoint. Views on an app set up with metrics.init_app are
+    already tracked; the decorator then records once instead of twice.
+    """
     @wraps(f)
     def decorated(*args, **kwargs):
-        start = time.time()
+        from flask import g, has_request_context, request
+
+        _install_db_timing()
+        in_request = has_request_context()
+        if in_request:
+            db_seconds_before = g.get('metrics_db_seconds', 0.0)
+            db_queries_before = g.get('metrics_db_queries', 0)
+        start = time.perf_counter()
+        status_code = 500
         try:
             result = f(*args, **kwargs)
-            metrics.increment('agritech_requests_total', labels={'status': 'success'})
+            status_code = _status_of(result)
             return result
-        except Exception as e:
-            metrics.increment('agritech_requests_total', labels={'status': 'error'})
-            raise
         finally:
-            duration = time.time() - start
-            metrics.observe('agritech_request_duration_seconds', duration)
+            duration = time.perf_counter() - start
+            if in_request:
+                g.metrics_tracked = True
+                _record_request(
+                    request.endpoint or f.__name__, request.method, status_code, duration,
+                    g.get('metrics_db_seconds', 0.0) - db_seconds_before,
+                    g.get('metrics_db_queries', 0) - db_queries_before
+                )
+            else:
+                _record_request(f.__name__, 'CALL', status_code, duration, 0.0, 0)
     return decorated
+
+
+def _status_of(result) -> int:
+    """HTTP status of a view's return value (response, (body, status) tuple or body)."""
+    if isinstance(result, tuple) and len(result) > 1 and isinstance(result[1], int):
+        return result[1]
+    return getattr(result, 'status_code', 200)
@@ -45,6 +45,16 @@ def prometheus_metrics():
     Prometheus-compatible metrics endpoint.
     Returns metrics in Prometheus text format.
     """
+    from backend.services.audit_writer import audit_writer
+    for name, value in audit_writer.stats().items():
+        metrics.set_gauge(f'agritech_audit_writer_{name}', value)
+
+    from backend.services.inference_cache import inference_cache
+    # Per-process entry count; worker snapshots sum to the total. The hit rate is
+    # derived in PromQL from agritech_inference_cache_lookups_total{outcome}, since
+    # a ratio gauge would be summed across workers too.
+    metrics.set_gauge('agritech_inference_cache_entries', inference_cache.stats()['entries'])
+
     metrics_output = metrics.to_prometheus()
     return Response(metrics_output, mimetype='text/plain')
 
@@ -12,6 +12,11 @@ class AlertRegistry:
     Supports asynchronous delivery, priority-based queuing and multi-channel notification.
     """
 
+    # Recipients per preference/user lookup and alerts per flag UPDATE
+    ID_BATCH_SIZE = 1000
+    # Deliveries per queued email/SMS task
+    DELIVERY_BATCH_SIZE = 500
+
     @staticmethod
     def register_alert(
         title: str,
@@ -53,6 +58,151 @@ class AlertRegistry:
             db.session.rollback()
             return None
 
+    @staticmethod
+    def register_alerts_bulk(alerts: List[Dict[str, Any]]) -> List[Alert]:
+        """
+        Registers many alerts at once and dispatches them with a fixed number
+        of round trips, independent of the number of recipients.
+
+        Each item takes the same keys as register_alert's arguments. Alerts
+        are inserted in one flush, preferences and users are preloaded with
+        one query each per ID_BATCH_SIZE recipients, websocket emits are
+        grouped per room, email/SMS go to the alert delivery queue and the
+        delivery flags are set with one UPDATE per batch.
+
+        Returns:
+            The created alerts (empty list on failure)
+        """
+        if not alerts:
+            return []
+        try:
+            now = datetime.utcnow()
+            records = [
+                Alert(
+                    user_id=spec.get('user_id'),
+                    title=spec['title'],
+                    message=spec['message'],
+                    category=spec['category'],
+                    priority=spec.get('priority', 'MEDIUM'),
+                    group_key=spec.get('group_key'),
+                    action_url=spec.get('action_url'),
+                    metadata_json=json.dumps(spec['metadata']) if spec.get('metadata') else None,
+                    expires_at=now + timedelta(days=spec.get('ttl_days', 30)),
+                    created_at=now
+                )
+                for spec in alerts
+            ]
+            db.session.add_all(records)
+            db.session.flush()
+            # Serialize before the commit expires every record (one SELECT each to reload)
+            payloads = [alert.to_dict() for alert in records]
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to register {len(alerts)} alerts: {str(e)}", exc_info=True)
+            db.session.rollback()
+            return []
+
+        try:
+            AlertRegistry._dispatch_alerts_bulk(payloads)
+        except Exception as e:
+            logger.error(f"Bulk alert dispatch failed: {str(e)}", exc_info=True)
+            db.session.rollback()
+        return records
+
+    @staticmethod
+    def _dispatch_alerts_bulk(alerts: List[Dict]):
+        """Same channel rules as _dispatch_alert, applied to a batch of Alert.to_dict() payloads."""
+        user_ids = sorted({alert['user_id'] for alert in alerts if alert['user_id']})
+        users = {}
+        preferences = {}
+        for start in range(0, len(user_ids), AlertRegistry.ID_BATCH_SIZE):
+            chunk = user_ids[start:start + AlertRegistry.ID_BATCH_SIZE]
+            for user_id, email, phone in db.session.query(User.id, User.email, User.phone).filter(User.id.in_(chunk)):
+                users[user_id] = (email, phone)
+            for pref in AlertPreference.query.filter(AlertPreference.user_id.in_(chunk)):
+                preferences[(pref.user_id, pref.category)] = pref
+
+        rooms = {}
+        emails = []
+        sms = []
+        for alert in alerts:
+            user_id = alert['user_id']
+            if not user_id:
+                rooms.setdefault("global_alerts", []).append(alert)
+                continue
+            contact = users.get(user_id)
+            if contact is None:
+                continue
+            email, phone = contact
+            pref = preferences.get((user_id, alert['category']))
+
+            if pref and Alert.get_priority_weight(alert['priority']) < Alert.get_priority_weight(pref.min_priority):
+                continue
+            if not pref or pref.websocket_enabled:
+                rooms.setdefault(f"user_{user_id}", []).append(alert)
+            if (not pref or pref.email_enabled) and email:
+                emails.append((alert['id'], email))
+            if pref and pref.sms_enabled and phone:
+                sms.append((alert['id'], phone))
+
+        websocket_ids = AlertRegistry._emit_grouped(rooms)
+        email_ids = AlertRegistry._enqueue_deliveries('email', emails)
+        sms_ids = AlertRegistry._enqueue_deliveries('sms', sms)
+        AlertRegistry._mark_delivered(websocket_ids, email_ids, sms_ids)
+
+    @staticmethod
+    def _emit_grouped(rooms: Dict[str, List[Dict]]) -> List[int]:
+        """One socket emit per room; returns ids of alerts that were emitted."""
+        delivered = []
+        for room, room_alerts in rooms.items():
+            try:
+                if len(room_alerts) == 1:
+                    socketio.emit('new_alert', room_alerts[0], room=room)
+                else:
+                    socketio.emit('new_alerts', room_alerts, room=room)
+                delivered.extend(alert['id'] for alert in room_alerts)
+            except Exception as e:
+                logger.error(f"WebSocket delivery to {room} failed: {str(e)}")
+        logger.info(f"WebSocket alerts delivered: {len(delivered)} alerts to {len(rooms)} rooms")
+        return delivered
+
+    @staticmethod
+    def _enqueue_deliveries(channel: str, deliveries: List[tuple]) -> List[int]:
+        """Hand (alert_id, address) pairs to the delivery queue in chunks."""
+        from backend.tasks.alert_tasks import deliver_alert_batch
+
+        queued = []
+        for start in range(0, len(deliveries), AlertRegistry.DELIVERY_BATCH_SIZE):
+            chunk = deliveries[start:start + AlertRegistry.DELIVERY_BATCH_SIZE]
+            try:
+                deliver_alert_batch.delay(channel, chunk)
+                queued.extend(alert_id for alert_id, _ in chunk)
+            except Exception as e:
+                logger.error(f"Queueing {len(chunk)} {channel} alerts failed: {str(e)}")
+        return queued
+
+    @staticmethod
+    def _mark_delivered(websocket_ids: List[int], email_ids: List[int], sms_ids: List[int]):
+        """Set delivery flags with one UPDATE per ID_BATCH_SIZE alerts."""
+        flags = {
+            'websocket_delivered': set(websocket_ids),
+            'email_delivered': set(email_ids),
+            'sms_delivered': set(sms_ids)
+        }
+        touched = sorted(set().union(*flags.values()))
+        for start in range(0, len(touched), AlertRegistry.ID_BATCH_SIZE):
+            chunk = touched[start:start + AlertRegistry.ID_BATCH_SIZE]
+            values = {}
+            for column, ids in flags.items():
+                chunk_ids = [alert_id for alert_id in chunk if alert_id in ids]
+                if chunk_ids:
+                    values[column] = db.case(
+                        (Alert.id.in_(chunk_ids), True),
+                        else_=getattr(Alert, column)
+                    )
+            Alert.query.filter(Alert.id.in_(chunk)).update(values, synchronize_session=False)
+        db.session.commit()
+
     @staticmethod
     def _dispatch_alert(alert: Alert):
         """
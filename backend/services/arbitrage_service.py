@@ -6,19 +6,46 @@ arbitrage trade vectors across borders, automatically opening trades when high c
 """
 
 from datetime import datetime, timedelta
+from typing import Dict, List
+import json
 import math
+import numpy as np
 from backend.extensions import db
 from backend.models.spatial_yield import SpatialYieldGrid, TemporalYieldForex, YieldPredictionConfidence
 from backend.models.arbitrage import ArbitrageOpportunity, AlgorithmicTradeRecord
 from backend.models.farm import Farm
 from backend.services.prophet_engine import CROP_YIELD_BASE_KG_PER_HA
+from backend.utils.geo_distance import haversine_matrix, wkt_centroid
 import logging
+import random
 import uuid
 
 logger = logging.getLogger(__name__)
 
 # Base Arbitrage Execution Threshold
 PROFIT_MARGIN_TRIGGER_PCT = 12.0 # Minimum 12% margin to execute algotrade
+AUTO_EXECUTE_MARGIN_PCT = 25.0
+DEFAULT_TRADE_VOLUME_KG = 20000.0
+
+# Spot prices (USD/kg) and how yield acceleration moves them
+BASE_PRICES_PER_KG = {
+    'RICE': 0.60, 'MAIZE': 0.35, 'WHEAT': 0.45,
+    'COTTON': 1.80, 'SOYBEAN': 0.70, 'BARLEY': 0.50
+}
+DEFAULT_PRICE_PER_KG = 0.50
+OVERSUPPLY_ACCELERATION = 1.2
+OVERSUPPLY_PRICE_FACTOR = 0.75 # 25% discount due to bumper harvest oversupply
+SCARCITY_ACCELERATION = 0.8
+SCARCITY_PRICE_FACTOR = 1.40 # 40% premium due to scarcity and low yield risk
+
+# Freight: one container per CONTAINER_PAYLOAD_KG, each costing CONTAINER_COST_PER_KM
+# plus a flat carbon offset fee
+CONTAINER_PAYLOAD_KG = 25000.0
+CONTAINER_COST_PER_KM = 0.15
+CARBON_OFFSET_FEE_USD = 20.0
+
+# Source grids per distance/margin matrix block (block x all grids)
+SOURCE_BLOCK_SIZE = 512
 
 class AlgorithmicArbitrageMatrix:
     
@@ -39,13 +66,16 @@ class AlgorithmicArbitrageMatrix:
         c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
         distance_km = R * c
         
-        # $0.15 per km container cost + $20 flat carbon offset fee per trade
-        # Assume 1 container max payload = 25,000 KG
-        truckloads = math.ceil(kg_volume / 25000.0)
-        base_logistics = distance_km * 0.15 * truckloads
-        carbon_tax = truckloads * 20.0
-        
-        return base_logistics + carbon_tax
+        return AlgorithmicArbitrageMatrix._freight_cost(distance_km, kg_volume)
+    
+    @staticmethod
+    def _freight_cost(distance_km, kg_volume: float):
+        """
+        Container cost plus carbon offset fee for a distance in km, or
+        element-wise for an array of distances.
+        """
+        truckloads = math.ceil(kg_volume / CONTAINER_PAYLOAD_KG)
+        return distance_km * CONTAINER_COST_PER_KM * truckloads + truckloads * CARBON_OFFSET_FEE_USD
         
     @staticmethod
     def _estimate_dynamic_market_price(crop: str, grid: SpatialYieldGrid) -> float:
@@ -54,12 +84,7 @@ class AlgorithmicArbitrageMatrix:
         High yield (oversupply) = Price Crash. Low yield (drought) = Price Hike.
         Returns Price per KG in USD.
         """
-        base_prices = {
-            'RICE': 0.60, 'MAIZE': 0.35, 'WHEAT': 0.45,
-            'COTTON': 1.80, 'SOYBEAN': 0.70, 'BARLEY': 0.50
-        }
-        
-        base_p = base_prices.get(crop, 0.50)
+        base_p = BASE_PRICES_PER_KG.get(crop, DEFAULT_PRICE_PER_KG)
         
         forex = TemporalYieldForex.query.filter_by(grid_id=grid.id, crop_type=crop).first()
         if not forex:
@@ -67,86 +92,141 @@ class AlgorithmicArbitrageMatrix:
             
         accel = forex.growth_acceleration_factor
         
-        if accel > 1.2:
-            return base_p * 0.75 # 25% discount due to bumper harvest oversupply
-        elif accel < 0.8:
-            return base_p * 1.40 # 40% premium due to scarcity and low yield risk
+        if accel > OVERSUPPLY_ACCELERATION:
+            return base_p * OVERSUPPLY_PRICE_FACTOR
+        elif accel < SCARCITY_ACCELERATION:
+            return base_p * SCARCITY_PRICE_FACTOR
         return base_p
 
+    @staticmethod
+    def _price_vectors(grid_ids: List[int]) -> Dict[str, np.ndarray]:
+        """
+        _estimate_dynamic_market_price for every crop and grid from one query.
+        Returns {crop: prices aligned with grid_ids}.
+        """
+        position = {grid_id: i for i, grid_id in enumerate(grid_ids)}
+        crops = list(CROP_YIELD_BASE_KG_PER_HA.keys())
+        accel = {crop: np.full(len(grid_ids), np.nan) for crop in crops}
+
+        # Newest first, so the lowest id per (grid, crop) wins, as with .first()
+        rows = TemporalYieldForex.query.with_entities(
+            TemporalYieldForex.grid_id, TemporalYieldForex.crop_type, TemporalYieldForex.growth_acceleration_factor
+        ).filter(TemporalYieldForex.crop_type.in_(crops)).order_by(TemporalYieldForex.id.desc()).all()
+        for grid_id, crop, factor in rows:
+            i = position.get(grid_id)
+            if i is not None:
+                accel[crop][i] = np.nan if factor is None else factor
+
+        prices = {}
+        for crop in crops:
+            base_p = BASE_PRICES_PER_KG.get(crop, DEFAULT_PRICE_PER_KG)
+            factor = np.ones(len(grid_ids))
+            # NaN (no forecast) compares False on both sides and keeps the base price
+            factor[accel[crop] > OVERSUPPLY_ACCELERATION] = OVERSUPPLY_PRICE_FACTOR
+            factor[accel[crop] < SCARCITY_ACCELERATION] = SCARCITY_PRICE_FACTOR
+            prices[crop] = base_p * factor
+        return prices
+
     @staticmethod
     def identify_arbitrage_vectors():
         """
         Scans all grids pairwise to find geographic arbitrage loops.
         Oversupplied Zone [Low Price] -> Undersupplied Zone [High Price]
+
+        Prices are computed once per crop and grid, and margins for every
+        (source, target) pair as matrices over grid centroid distances,
+        SOURCE_BLOCK_SIZE source rows at a time to bound memory.
         """
-        grids = SpatialYieldGrid.query.all()
-        if len(grids) < 2:
-            return # Insufficient grids to trade between
-            
-        stats = {'vectors_detected': 0, 'trades_executed': 0}
-        
-        for crop in CROP_YIELD_BASE_KG_PER_HA.keys():
-            # Pairwise scan O(N^2), but N is small regional cells
-            for source_grid in grids:
-                source_price = AlgorithmicArbitrageMatrix._estimate_dynamic_market_price(crop, source_grid)
-                
-                for target_grid in grids:
-                    if source_grid.id == target_grid.id: continue
-                    
-                    target_price = AlgorithmicArbitrageMatrix._estimate_dynamic_market_price(crop, target_grid)
-                    
-                    if target_price > source_price:
-                        # Price is higher at target -> Potential Arbitrage
-                        # Try a default cargo size (20 Tons)
-                        trade_volume_kg = 20000.0 
-                        
-                        # Mock distance based on random coordinates since WKT parsing is complex here
-                        s_lat, s_lng = random.uniform(-90,90), random.uniform(-180,180)
-                        t_lat, t_lng = random.uniform(-90,90), random.uniform(-180,180)
-                        
-                        logistics_usd = AlgorithmicArbitrageMatrix.calculate_freight_logistics_cost(
-                            s_lat, s_lng, t_lat, t_lng, trade_volume_kg
-                        )
-                        
-                        cogs = (source_price * trade_volume_kg) + logistics_usd
-                        revenue = target_price * trade_volume_kg
-                        net_profit = revenue - cogs
-                        margin_pct = (net_profit / cogs) * 100.0 if cogs > 0 else 0
-                        
-                        if margin_pct >= PROFIT_MARGIN_TRIGGER_PCT:
-                            # Lucrative! Log Opportunity.
-                            opp = ArbitrageOpportunity.query.filter_by(
-                                commodity_type=crop, source_grid_id=source_grid.id, target_grid_id=target_grid.id, status='IDENTIFIED'
-                            ).first()
-                            
-                            if not opp:
-                                opp = ArbitrageOpportunity(
-                                    commodity_type=crop,
-                                    source_grid_id=source_grid.id,
-                                    source_price_per_kg=source_price,
-                                    target_grid_id=target_grid.id,
-                                    target_price_per_kg=target_price,
-                                    estimated_transport_cost_usd=logistics_usd,
-                                    gross_margin_pct=round(margin_pct, 2),
-                                    net_arbitrage_profit=round(net_profit, 2),
-                                    confidence_score=0.88,
-                                    expires_at=datetime.utcnow() + timedelta(hours=48)
-                                )
-                                db.session.add(opp)
-                                stats['vectors_detected'] += 1
-                                
-                                # Auto-Execute the trade if margin > 25% (L3 Autonomous Action)
-                                if margin_pct > 25.0:
-                                    AlgorithmicArbitrageMatrix._execute_trade(opp, trade_volume_kg)
-                                    stats['trades_executed'] += 1
+        stats = {'vectors_detected': 0, 'trades_executed': 0, 'grids_skipped': 0}
+
+        grids = SpatialYieldGrid.query.with_entities(
+            SpatialYieldGrid.id, SpatialYieldGrid.bounding_box_wkt
+        ).order_by(SpatialYieldGrid.id).all()
+
+        grid_ids, lats, lngs = [], [], []
+        for grid_id, wkt in grids:
+            centroid = wkt_centroid(wkt)
+            if centroid is None:
+                stats['grids_skipped'] += 1
+                continue
+            grid_ids.append(grid_id)
+            lats.append(centroid[0])
+            lngs.append(centroid[1])
+        if stats['grids_skipped']:
+            logger.warning(f"Arbitrage scan skipped {stats['grids_skipped']} grids without a parseable centroid")
+        if len(grid_ids) < 2:
+            return stats # Insufficient grids to trade between
+
+        prices = AlgorithmicArbitrageMatrix._price_vectors(grid_ids)
+        open_pairs = set(ArbitrageOpportunity.query.with_entities(
+            ArbitrageOpportunity.commodity_type,
+            ArbitrageOpportunity.source_grid_id,
+            ArbitrageOpportunity.target_grid_id
+        ).filter(ArbitrageOpportunity.status == 'IDENTIFIED').all())
+
+        # Default cargo size (20 Tons)
+        trade_volume_kg = DEFAULT_TRADE_VOLUME_KG
+        ids = np.asarray(grid_ids)
+        lats, lngs = np.asarray(lats), np.asarray(lngs)
+        expires_at = datetime.utcnow() + timedelta(hours=48)
+        opportunities = []
+
+        for start in range(0, len(ids), SOURCE_BLOCK_SIZE):
+            block = slice(start, start + SOURCE_BLOCK_SIZE)
+            logistics_usd = AlgorithmicArbitrageMatrix._freight_cost(
+                haversine_matrix(lats[block], lngs[block], lats, lngs), trade_volume_kg
+            )
+            not_self = ids[block][:, np.newaxis] != ids[np.newaxis, :]
+
+            for crop, price in prices.items():
+                source_price = price[block][:, np.newaxis]
+                target_price = price[np.newaxis, :]
+
+                cogs = source_price * trade_volume_kg + logistics_usd
+                net_profit = target_price * trade_volume_kg - cogs
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    margin_pct = np.where(cogs > 0, net_profit / cogs * 100.0, 0.0)
+
+                # Price is higher at target and the spread clears the trigger
+                lucrative = (target_price > source_price) & not_self & (margin_pct >= PROFIT_MARGIN_TRIGGER_PCT)
+                for row, col in zip(*np.nonzero(lucrative)):
+                    source_id, target_id = int(ids[start + row]), int(ids[col])
+                    if (crop, source_id, target_id) in open_pairs:
+                        continue
+                    opportunities.append(ArbitrageOpportunity(
+                        commodity_type=crop,
+                        source_grid_id=source_id,
+                        source_price_per_kg=float(price[start + row]),
+                        target_grid_id=target_id,
+                        target_price_per_kg=float(price[col]),
+                        estimated_transport_cost_usd=float(logistics_usd[row, col]),
+                        gross_margin_pct=round(float(margin_pct[row, col]), 2),
+                        net_arbitrage_profit=round(float(net_profit[row, col]), 2),
+                        confidence_score=0.88,
+                        status='IDENTIFIED',
+                        expires_at=expires_at
+                    ))
+
+        # One batched INSERT (ids come back for the trade records)
+        db.session.add_all(opportunities)
+        db.session.flush()
+        stats['vectors_detected'] = len(opportunities)
+
+        # Auto-Execute the trade if margin > 25% (L3 Autonomous Action)
+        reserve_account = None
+        for opp in opportunities:
+            if opp.gross_margin_pct > AUTO_EXECUTE_MARGIN_PCT:
+                reserve_account = AlgorithmicArbitrageMatrix._execute_trade(opp, trade_volume_kg, reserve_account)
+                stats['trades_executed'] += 1
 
         db.session.commit()
         return stats
 
     @staticmethod
-    def _execute_trade(opportunity: ArbitrageOpportunity, volume_kg: float):
+    def _execute_trade(opportunity: ArbitrageOpportunity, volume_kg: float, arb_acct=None):
         """
         Fires off an autonomous algorithmic trade using the Double-Entry Ledger.
+        Returns the reserve account so a batch of trades looks it up once.
         """
         opportunity.status = 'EXECUTING'
         
@@ -158,7 +238,8 @@ class AlgorithmicArbitrageMatrix:
         from backend.models.ledger import LedgerTransaction, LedgerAccount, LedgerEntry, AccountType, EntryType, TransactionType
         
         # Ensure Arbitrage Control Account exists
-        arb_acct = LedgerAccount.query.filter_by(account_code='ALGO-ARB-RESERVE').first()
+        if arb_acct is None:
+            arb_acct = LedgerAccount.query.filter_by(account_code='ALGO-ARB-RESERVE').first()
         if not arb_acct:
             arb_acct = LedgerAccount(
                 account_code='ALGO-ARB-RESERVE',
@@ -172,7 +253,7 @@ class AlgorithmicArbitrageMatrix:
         # Execute Transaction
         txn = LedgerTransaction(
             transaction_id=f"ARB-{uuid.uuid4().hex[:8]}",
-            transaction_type=TransactionType.ARBITRAGE_EXECUTION, # Will inject this later
+            transaction_type=TransactionType.ARBITRAGE_EXECUTION,
             source_type='arbitrage_engine',
             source_id=opportunity.id,
             description=f"Auto-executed {opportunity.commodity_type} spread. Vol: {volume_kg}kg. Margin: {opportunity.gross_margin_pct}%",
@@ -213,7 +294,13 @@ class AlgorithmicArbitrageMatrix:
             is_financial=True,
             financial_impact=realized_profit,
             autonomous_decision_flag=True,
-            details=f"Autonomous bot executed trade pair {opportunity.source_grid_id}->{opportunity.target_grid_id}"
+            meta_data=json.dumps({
+                'source_grid_id': opportunity.source_grid_id,
+                'target_grid_id': opportunity.target_grid_id,
+                'commodity_type': opportunity.commodity_type
+            })
         ))
         
         logger.info(f"💰 🚀  [AgriTech AI] Arbitrage Trade Executed! ${realized_profit:.2f} profit booked. Margin: {opportunity.gross_margin_pct}%")
+
+        return arb_acct
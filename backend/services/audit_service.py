@@ -1,11 +1,13 @@
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from flask import request, g
+from typing import Optional, Dict, Any, List, Tuple
+from flask import request, g, current_app
 from backend.extensions import db
 from backend.models import AuditLog, UserSession, User
 from backend.utils.logger import logger
+from backend.services.audit_writer import audit_writer
+from backend.services.threat_counters import threat_counters
 
 class AuditService:
     """
@@ -13,6 +15,71 @@ class AuditService:
     Includes threat detection and session management logic.
     """
 
+    @staticmethod
+    def _build_record(
+        action: str,
+        user_id: Optional[int],
+        resource_type: Optional[str],
+        resource_id: Optional[str],
+        old_values: Optional[Dict],
+        new_values: Optional[Dict],
+        meta_data: Optional[Dict],
+        risk_level: str,
+        status_code: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        AuditLog column values for an action, with request context and threat
+        detection applied. Returns (record, threat_reason or None).
+        """
+        # Capture request context if available
+        ip_address = request.remote_addr if request else None
+        user_agent = request.user_agent.string if request and request.user_agent else None
+        method = request.method if request else None
+        url = request.url if request else None
+
+        # Use g.user if user_id is not provided
+        if not user_id and hasattr(g, 'user') and g.user:
+            user_id = g.user.id
+
+        # Threat detection logic
+        is_threat, threat_reason = AuditService._detect_threat(action, user_id, ip_address, url)
+        if is_threat:
+            risk_level = 'CRITICAL'
+            if not meta_data: meta_data = {}
+            meta_data['threat_reason'] = threat_reason
+
+        record = {
+            'user_id': user_id,
+            'action': action,
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'old_values': json.dumps(old_values) if old_values else None,
+            'new_values': json.dumps(new_values) if new_values else None,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'method': method,
+            'url': url,
+            'status_code': status_code,
+            'risk_level': risk_level,
+            'threat_flag': is_threat,
+            'meta_data': json.dumps(meta_data) if meta_data else None,
+            'timestamp': datetime.utcnow()
+        }
+        return record, (threat_reason if is_threat else None)
+
+    @staticmethod
+    def _raise_threat_alert(action: str, user_id: Optional[int], threat_reason: str):
+        logger.warning(f"SECURITY THREAT DETECTED: {threat_reason} | Action: {action} | User: {user_id}")
+        # Potentially trigger an alert via CUNAR here
+        from backend.services.alert_registry import AlertRegistry
+        AlertRegistry.register_alert(
+            title="Security Threat Detected",
+            message=f"Suspicious activity: {threat_reason} for action '{action}'",
+            category="SECURITY",
+            priority="CRITICAL",
+            user_id=None # Admin broadcast
+        )
+
     @staticmethod
     def log_action(
         action: str,
@@ -28,53 +95,17 @@ class AuditService:
         Extracts request context and persists an audit entry.
         """
         try:
-            # Capture request context if available
-            ip_address = request.remote_addr if request else None
-            user_agent = request.user_agent.string if request and request.user_agent else None
-            method = request.method if request else None
-            url = request.url if request else None
-            
-            # Use g.user if user_id is not provided
-            if not user_id and hasattr(g, 'user') and g.user:
-                user_id = g.user.id
-
-            # Threat detection logic
-            is_threat, threat_reason = AuditService._detect_threat(action, user_id, ip_address, url)
-            if is_threat:
-                risk_level = 'CRITICAL'
-                if not meta_data: meta_data = {}
-                meta_data['threat_reason'] = threat_reason
-
-            log = AuditLog(
-                user_id=user_id,
-                action=action,
-                resource_type=resource_type,
-                resource_id=resource_id,
-                old_values=json.dumps(old_values) if old_values else None,
-                new_values=json.dumps(new_values) if new_values else None,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                method=method,
-                url=url,
-                risk_level=risk_level,
-                threat_flag=is_threat,
-                meta_data=json.dumps(meta_data) if meta_data else None
+            record, threat_reason = AuditService._build_record(
+                action, user_id, resource_type, resource_id,
+                old_values, new_values, meta_data, risk_level
             )
+            log = AuditLog(**record)
 
             db.session.add(log)
             db.session.commit()
             
-            if is_threat:
-                logger.warning(f"SECURITY THREAT DETECTED: {threat_reason} | Action: {action} | User: {user_id}")
-                # Potentially trigger an alert via CUNAR here
-                from backend.services.alert_registry import AlertRegistry
-                AlertRegistry.register_alert(
-                    title="Security Threat Detected",
-                    message=f"Suspicious activity: {threat_reason} for action '{action}'",
-                    category="SECURITY",
-                    priority="CRITICAL",
-                    user_id=None # Admin broadcast
-                )
+            if threat_reason:
+                AuditService._raise_threat_alert(action, log.user_id, threat_reason)
 
             return log
         except Exception as e:
@@ -82,18 +113,58 @@ class AuditService:
             db.session.rollback()
             return None
 
+    @staticmethod
+    def log_action_buffered(
+        action: str,
+        user_id: Optional[int] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        old_values: Optional[Dict] = None,
+        new_values: Optional[Dict] = None,
+        meta_data: Optional[Dict] = None,
+        risk_level: str = 'LOW',
+        status_code: Optional[int] = None
+    ) -> bool:
+        """
+        Like log_action, but hands the entry to the buffered audit writer
+        instead of committing it on the request's session. Used on hot paths
+        (per-request middleware); falls back to a direct write when buffering
+        is disabled via AUDIT_ASYNC_WRITES.
+
+        Returns:
+            True if the entry was accepted
+        """
+        try:
+            record, threat_reason = AuditService._build_record(
+                action, user_id, resource_type, resource_id,
+                old_values, new_values, meta_data, risk_level, status_code
+            )
+
+            if current_app.config.get('AUDIT_ASYNC_WRITES', True):
+                accepted = audit_writer.enqueue(record)
+            else:
+                db.session.add(AuditLog(**record))
+                db.session.commit()
+                accepted = True
+
+            if threat_reason:
+                AuditService._raise_threat_alert(action, record['user_id'], threat_reason)
+
+            return accepted
+        except Exception as e:
+            logger.error(f"Audit logging failed: {str(e)}", exc_info=True)
+            db.session.rollback()
+            return False
+
     @staticmethod
     def _detect_threat(action: str, user_id: Optional[int], ip: str, url: str) -> (bool, str):
         """
         Internal heuristic for detecting suspicious patterns.
+        Burst checks use in-memory sliding-window counters, not audit_logs queries.
         """
         # 1. Check for rapid sequence of sensitive actions
         if action in ['DELETE_USER', 'EXPORT_DATA', 'CHANGE_PERMISSIONS']:
-            recent_count = AuditLog.query.filter(
-                AuditLog.user_id == user_id,
-                AuditLog.action == action,
-                AuditLog.timestamp >= datetime.utcnow() - timedelta(minutes=5)
-            ).count()
+            recent_count = threat_counters.record_sensitive_action(user_id, action)
             if recent_count > 5:
                 return True, "Potential automated bulk sensitive operation"
 
@@ -103,11 +174,7 @@ class AuditService:
 
         # 3. Check for multiple failed logins from same IP
         if action == 'LOGIN_FAILED':
-            recent_fails = AuditLog.query.filter(
-                AuditLog.ip_address == ip,
-                AuditLog.action == 'LOGIN_FAILED',
-                AuditLog.timestamp >= datetime.utcnow() - timedelta(minutes=15)
-            ).count()
+            recent_fails = threat_counters.record_failed_login(ip)
             if recent_fails > 10:
                 return True, "Brute force login attempt suspected"
 
@@ -0,0 +1,222 @@
+"""
+Audit Writer: Buffered, batched persistence of audit log records.
+
+Request threads hand fully-built AuditLog rows (plain dicts) to enqueue(),
+which only touches an in-process bounded queue. A background flusher
+bulk-inserts them whenever FLUSH_BATCH_SIZE records are waiting or
+FLUSH_INTERVAL_MS has passed since the oldest one arrived, so a burst of
+audited requests costs one INSERT ... executemany and one commit instead of
+one commit per request.
+
+When the buffer is full, producers block for up to ENQUEUE_TIMEOUT_MS
+(backpressure) and the record is dropped only if the flusher still hasn't
+made room; both events are counted in stats(). Remaining records are flushed
+at interpreter exit.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+import atexit
+import os
+import queue
+import threading
+import time
+import logging
+
+from flask import current_app, has_app_context
+
+from backend.extensions import db
+from backend.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """Bounded in-process buffer in front of the audit_logs table."""
+
+    MAX_BUFFER_SIZE = 10000
+    FLUSH_BATCH_SIZE = 200
+    FLUSH_INTERVAL_MS = 250
+    ENQUEUE_TIMEOUT_MS = 50
+    SHUTDOWN_TIMEOUT_SECONDS = 10
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._atexit_registered = False
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.failed = 0
+        self.flushes = 0
+        self.high_watermark = 0
+        self.last_flush_ms = 0.0
+
+    def init_app(self, app):
+        """Bind to an app and read buffer settings from its config."""
+        self.app = app
+        self.MAX_BUFFER_SIZE = app.config.get('AUDIT_BUFFER_SIZE', self.MAX_BUFFER_SIZE)
+        self.FLUSH_BATCH_SIZE = app.config.get('AUDIT_FLUSH_BATCH_SIZE', self.FLUSH_BATCH_SIZE)
+        self.FLUSH_INTERVAL_MS = app.config.get('AUDIT_FLUSH_INTERVAL_MS', self.FLUSH_INTERVAL_MS)
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def _app(self):
+        if self.app is None and has_app_context():
+            self.app = current_app._get_current_object()
+        return self.app
+
+    def _ensure_worker(self):
+        # The flusher thread doesn't survive fork (gunicorn, Celery prefork),
+        # so each process starts its own on first use
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # Records buffered by the parent belong to the parent
+                self._queue = queue.Queue(maxsize=self.MAX_BUFFER_SIZE)
+                self._reset_counters()
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, record: Dict) -> bool:
+        """
+        Buffer one audit record (AuditLog column values).
+
+        Returns:
+            False if the buffer stayed full and the record was dropped
+        """
+        record.setdefault('timestamp', datetime.utcnow())
+        self._app()
+        self._ensure_worker()
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.blocked += 1
+            try:
+                self._queue.put(record, timeout=self.ENQUEUE_TIMEOUT_MS / 1000.0)
+            except queue.Full:
+                self.dropped += 1
+                logger.warning(f"Audit buffer full ({self.MAX_BUFFER_SIZE}); dropped '{record.get('action')}'")
+                return False
+
+        self.enqueued += 1
+        self.high_watermark = max(self.high_watermark, self._queue.qsize())
+        return True
+
+    def _drain(self, limit: int) -> List[Dict]:
+        records = []
+        while len(records) < limit:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return records
+
+    def _run(self):
+        interval = self.FLUSH_INTERVAL_MS / 1000.0
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            deadline = time.monotonic() + interval
+            while len(batch) < self.FLUSH_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, records: List[Dict]):
+        if not records:
+            return
+        app = self._app()
+        if app is None:
+            logger.error(f"Audit writer has no app bound; {len(records)} records lost")
+            self.failed += len(records)
+            return
+
+        started = time.perf_counter()
+        with self._flush_lock, app.app_context():
+            try:
+                db.session.bulk_insert_mappings(AuditLog, records)
+                db.session.commit()
+                self.written += len(records)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Bulk audit insert of {len(records)} records failed, retrying row by row: {e}")
+                self._write_individually(records)
+            finally:
+                db.session.remove()
+
+        self.flushes += 1
+        self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def _write_individually(self, records: List[Dict]):
+        for record in records:
+            try:
+                db.session.add(AuditLog(**record))
+                db.session.commit()
+                self.written += 1
+            except Exception as e:
+                db.session.rollback()
+                self.failed += 1
+                logger.error(f"Audit record '{record.get('action')}' could not be written: {e}")
+
+    def flush(self):
+        """Write everything currently buffered, from the calling thread."""
+        if self._queue is None or self._pid != os.getpid():
+            return
+        while True:
+            batch = self._drain(self.FLUSH_BATCH_SIZE)
+            if not batch:
+                break
+            self._write(batch)
+
+    def shutdown(self):
+        """Stop the flusher and write whatever is still buffered."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._thread.join(timeout=self.SHUTDOWN_TIMEOUT_SECONDS)
+        self.flush()
+
+    def stats(self) -> Dict:
+        queued = self._queue.qsize() if self._queue is not None and self._pid == os.getpid() else 0
+        return {
+            'queued': queued,
+            'capacity': self.MAX_BUFFER_SIZE,
+            'high_watermark': self.high_watermark,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'blocked': self.blocked,
+            'failed': self.failed,
+            'flushes': self.flushes,
+            'avg_batch_size': round(self.written / self.flushes, 2) if self.flushes else 0,
+            'last_flush_ms': self.last_flush_ms
+        }
+
+
+audit_writer = AuditLogWriter()
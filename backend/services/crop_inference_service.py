@@ -0,0 +1,77 @@
+"""
+Crop Inference Service: Crop recommendation scoring on the shared model registry.
+
+The random forest and label encoder are loaded once per process through
+model_registry (with mtime hot reload). Single predictions from concurrent
+requests are grouped by a MicroBatcher into one predict() on a 2-D array;
+bulk callers score their rows directly with predict_many().
+"""
+
+from typing import Dict, List, Sequence, Tuple
+import os
+
+import numpy as np
+
+from backend.services.model_registry import model_registry
+from backend.utils.micro_batcher import MicroBatcher
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CropInferenceService:
+    """Crop recommendation from soil nutrients and climate."""
+
+    MODEL_PATH = os.path.join(BASE_DIR, "crop_recommendation", "model", "rf_model.pkl")
+    ENCODER_PATH = os.path.join(BASE_DIR, "crop_recommendation", "model", "label_encoder.pkl")
+
+    # Column order the model was trained on
+    FEATURES = ('N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall')
+
+    PREDICT_TIMEOUT_SECONDS = 10
+
+    @staticmethod
+    def load() -> Tuple[object, object]:
+        """(model, label_encoder) from the registry."""
+        return (
+            model_registry.get(CropInferenceService.MODEL_PATH),
+            model_registry.get(CropInferenceService.ENCODER_PATH)
+        )
+
+    @staticmethod
+    def model_version() -> str:
+        return model_registry.version(CropInferenceService.MODEL_PATH)
+
+    @staticmethod
+    def predict_many(rows: Sequence[Sequence[float]]) -> List[str]:
+        """
+        Score many feature rows with one model call.
+
+        Args:
+            rows: Feature rows in FEATURES order
+
+        Returns:
+            Crop labels, one per row
+        """
+        if len(rows) == 0:
+            return []
+        model, encoder = CropInferenceService.load()
+        features = np.asarray(rows, dtype=np.float64).reshape(-1, len(CropInferenceService.FEATURES))
+        return encoder.inverse_transform(model.predict(features)).tolist()
+
+    @staticmethod
+    def predict(row: Sequence[float], timeout: float = PREDICT_TIMEOUT_SECONDS) -> str:
+        """Score one row through the shared micro-batching queue."""
+        return crop_batcher.submit([float(value) for value in row]).result(timeout=timeout)
+
+    @staticmethod
+    def row_from_mapping(values: Dict) -> List[float]:
+        """Feature row from a mapping keyed by FEATURES."""
+        return [float(values[feature]) for feature in CropInferenceService.FEATURES]
+
+
+crop_batcher = MicroBatcher(
+    CropInferenceService.predict_many,
+    max_batch_size=256,
+    max_wait_ms=5,
+    name='crop-inference'
+)
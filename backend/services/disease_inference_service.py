@@ -0,0 +1,153 @@
+"""
+Disease Inference Service: Leaf disease classification on the shared model registry.
+
+The Keras model from "Disease prediction/model.h5" is loaded once per worker
+through model_registry (with mtime hot reload) and warmed with a dummy
+forward pass, so no task pays for reading the .h5 file or building the graph.
+predict_many() stacks any number of images into one array and runs a single
+model.predict(), returning the softmax confidence for each image.
+"""
+
+from typing import Dict, List, Optional, Sequence
+import importlib.util
+import os
+import logging
+
+import numpy as np
+
+from backend.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODULE_DIR = os.path.join(BASE_DIR, "Disease prediction")
+
+
+class DiseaseInferenceService:
+    """Plant disease classification from leaf images."""
+
+    MODEL_PATH = os.path.join(MODULE_DIR, "model.h5")
+    UTILS_PATH = os.path.join(MODULE_DIR, "utils.py")
+
+    # Input size the model was trained on
+    IMAGE_SIZE = (160, 160)
+    PREDICT_BATCH_SIZE = 32
+    TOP_K = 3
+
+    _utils = None
+
+    @staticmethod
+    def _module_utils():
+        """
+        The Disease prediction module's utils.py (labels, descriptions, loader),
+        imported by path: the repo root has its own utils.py.
+        """
+        if DiseaseInferenceService._utils is None:
+            spec = importlib.util.spec_from_file_location("disease_prediction_utils", DiseaseInferenceService.UTILS_PATH)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            DiseaseInferenceService._utils = module
+        return DiseaseInferenceService._utils
+
+    @staticmethod
+    def _load_model(path: str):
+        return DiseaseInferenceService._module_utils().load_keras_model(path)
+
+    @staticmethod
+    def available() -> bool:
+        return os.path.exists(DiseaseInferenceService.MODEL_PATH)
+
+    @staticmethod
+    def load():
+        """The Keras model from the registry."""
+        return model_registry.get(DiseaseInferenceService.MODEL_PATH, loader=DiseaseInferenceService._load_model)
+
+    @staticmethod
+    def model_version() -> Optional[str]:
+        return model_registry.version(DiseaseInferenceService.MODEL_PATH)
+
+    @staticmethod
+    def warm() -> bool:
+        """Load the model and run one dummy batch so the graph is built before real work."""
+        if not DiseaseInferenceService.available():
+            logger.info(f"Disease model not found at {DiseaseInferenceService.MODEL_PATH}; skipping warm-up")
+            return False
+        model = DiseaseInferenceService.load()
+        model.predict(np.zeros((1, *DiseaseInferenceService.IMAGE_SIZE, 3), dtype=np.float32), verbose=0)
+        logger.info("Disease model loaded and warmed")
+        return True
+
+    @staticmethod
+    def preprocess(path: str) -> np.ndarray:
+        """
+        Image at `path` as a float32 (H, W, 3) array in [0, 1]. Matches the
+        module's keras load_img (nearest resize) + img_to_array / 255.
+        """
+        from PIL import Image
+
+        with Image.open(path) as img:
+            img = img.convert('RGB').resize(DiseaseInferenceService.IMAGE_SIZE[::-1], Image.NEAREST)
+            return np.asarray(img, dtype=np.float32) / 255.0
+
+    @staticmethod
+    def _probabilities(outputs: np.ndarray) -> np.ndarray:
+        """Model outputs as probabilities; applies softmax if the head emits logits."""
+        outputs = np.asarray(outputs, dtype=np.float64)
+        if outputs.min() >= 0 and np.allclose(outputs.sum(axis=1), 1.0, atol=1e-3):
+            return outputs
+        shifted = np.exp(outputs - outputs.max(axis=1, keepdims=True))
+        return shifted / shifted.sum(axis=1, keepdims=True)
+
+    @staticmethod
+    def predict_arrays(images: np.ndarray) -> List[Dict]:
+        """
+        Classify a stacked (N, H, W, 3) batch with one model call.
+
+        Returns:
+            One result dict per image: prediction, confidence, recommendation, top_k
+        """
+        if len(images) == 0:
+            return []
+        utils = DiseaseInferenceService._module_utils()
+        model = DiseaseInferenceService.load()
+        probabilities = DiseaseInferenceService._probabilities(
+            model.predict(images, batch_size=DiseaseInferenceService.PREDICT_BATCH_SIZE, verbose=0)
+        )
+
+        version = DiseaseInferenceService.model_version()
+        results = []
+        for row in probabilities:
+            ranked = np.argsort(row)[::-1][:DiseaseInferenceService.TOP_K]
+            label = utils.class_names[ranked[0]]
+            results.append({
+                'prediction': label,
+                'confidence': round(float(row[ranked[0]]), 4),
+                'recommendation': utils.class_descriptions.get(label, "No description available."),
+                'top_k': [
+                    {'label': utils.class_names[i], 'confidence': round(float(row[i]), 4)}
+                    for i in ranked
+                ],
+                'model_version': version,
+                'crop_context': 'Detected from Image'
+            })
+        return results
+
+    @staticmethod
+    def predict_many(paths: Sequence[str]) -> List[Dict]:
+        """
+        Classify images from disk in one batch. Unreadable images get an
+        {'error': ...} result instead of failing the whole batch.
+        """
+        results = [None] * len(paths)
+        arrays, positions = [], []
+        for position, path in enumerate(paths):
+            try:
+                arrays.append(DiseaseInferenceService.preprocess(path))
+                positions.append(position)
+            except Exception as e:
+                results[position] = {'error': f'Unreadable image: {str(e)}'}
+
+        if arrays:
+            for position, result in zip(positions, DiseaseInferenceService.predict_arrays(np.stack(arrays))):
+                results[position] = result
+        return results
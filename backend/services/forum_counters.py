@@ -0,0 +1,229 @@
+"""
+Forum Counters: Write-behind buffer for thread view and upvote counts.
+
+Reading a thread used to run ``view_count += 1`` and commit, so every read of
+a popular thread queued up on the same row lock. Views and thread upvote
+deltas are now accumulated per thread and applied every FLUSH_INTERVAL_SECONDS
+with one ``UPDATE ... SET view_count = view_count + CASE id ...`` per
+UPDATE_BATCH_SIZE threads, so a thousand reads of one thread become a single
+``+ 1000``.
+
+Deltas live in process memory by default and are flushed by a background
+thread (and at interpreter exit). Set FORUM_COUNTER_BACKEND='redis' to keep
+them in Redis hashes instead, shared by every worker and drained by whichever
+process flushes next, including the periodic tasks.flush_forum_counters task.
+"""
+
+from typing import Dict, Tuple
+import atexit
+import os
+import threading
+import time
+import logging
+
+from flask import current_app, has_app_context
+
+from backend.extensions import db
+from backend.models.forum import ForumThread
+
+logger = logging.getLogger(__name__)
+
+
+class ForumCounterBuffer:
+    """Per-thread view/upvote deltas waiting to be written."""
+
+    FLUSH_INTERVAL_SECONDS = 10
+    UPDATE_BATCH_SIZE = 500
+    REDIS_PREFIX = 'forum:counters'
+    COLUMNS = ('view_count', 'upvote_count')
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {column: {} for column in self.COLUMNS}
+        self._redis = None
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._atexit_registered = False
+        self.flushes = 0
+        self.rows_updated = 0
+        self.failed = 0
+        self.last_flush_ms = 0.0
+
+    def init_app(self, app):
+        """Bind to an app; switch to Redis-backed deltas if it asks for them."""
+        self.app = app
+        self.FLUSH_INTERVAL_SECONDS = app.config.get('FORUM_COUNTER_FLUSH_SECONDS', self.FLUSH_INTERVAL_SECONDS)
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+        if app.config.get('FORUM_COUNTER_BACKEND', 'memory') != 'redis':
+            return
+        try:
+            import redis
+            client = redis.from_url(app.config.get('REDIS_URL', 'redis://localhost:6379/0'))
+            client.ping()
+            self._redis = client
+        except Exception as e:
+            logger.warning(f"Redis forum counters unavailable, buffering in process: {e}")
+
+    def _app(self):
+        if self.app is None and has_app_context():
+            self.app = current_app._get_current_object()
+        return self.app
+
+    def _ensure_worker(self):
+        # Same fork rule as the audit writer: one flusher per process
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Deltas buffered by the parent are flushed by the parent
+                self._pending = {column: {} for column in self.COLUMNS}
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name='forum-counters', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.FLUSH_INTERVAL_SECONDS):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Forum counter flush failed: {e}")
+
+    def _add(self, column: str, thread_id: int, delta: int):
+        if not thread_id or not delta:
+            return
+        if self._redis is not None:
+            try:
+                self._redis.hincrby(f"{self.REDIS_PREFIX}:{column}", thread_id, delta)
+                return
+            except Exception as e:
+                logger.error(f"Redis forum counter update failed, buffering in process: {e}")
+
+        self._app()
+        self._ensure_worker()
+        with self._lock:
+            pending = self._pending[column]
+            pending[thread_id] = pending.get(thread_id, 0) + delta
+
+    def record_view(self, thread_id: int, count: int = 1):
+        self._add('view_count', thread_id, count)
+
+    def record_upvote(self, thread_id: int, delta: int = 1):
+        """Buffer a thread upvote (+1) or its removal (-1)."""
+        self._add('upvote_count', thread_id, delta)
+
+    def pending(self, thread_id: int) -> Tuple[int, int]:
+        """(views, upvotes) recorded for a thread but not yet written."""
+        if self._redis is not None:
+            try:
+                values = [self._redis.hget(f"{self.REDIS_PREFIX}:{column}", thread_id) for column in self.COLUMNS]
+                return tuple(int(value or 0) for value in values)
+            except Exception:
+                pass
+        with self._lock:
+            return tuple(self._pending[column].get(thread_id, 0) for column in self.COLUMNS)
+
+    def _drain(self) -> Dict[str, Dict[int, int]]:
+        with self._lock:
+            drained = self._pending
+            self._pending = {column: {} for column in self.COLUMNS}
+
+        if self._redis is not None:
+            for column in self.COLUMNS:
+                key = f"{self.REDIS_PREFIX}:{column}"
+                draining = f"{key}:flushing:{os.getpid()}"
+                try:
+                    # RENAME is atomic: increments after it land in a fresh hash
+                    if not self._redis.exists(draining):
+                        self._redis.rename(key, draining)
+                    for thread_id, delta in self._redis.hgetall(draining).items():
+                        thread_id = int(thread_id)
+                        drained[column][thread_id] = drained[column].get(thread_id, 0) + int(delta)
+                    self._redis.delete(draining)
+                except Exception as e:
+                    if 'no such key' not in str(e).lower():
+                        logger.error(f"Draining Redis forum counters failed: {e}")
+        return drained
+
+    def _restore(self, deltas: Dict[str, Dict[int, int]]):
+        with self._lock:
+            for column, values in deltas.items():
+                pending = self._pending[column]
+                for thread_id, delta in values.items():
+                    pending[thread_id] = pending.get(thread_id, 0) + delta
+
+    def _write(self, deltas: Dict[str, Dict[int, int]]) -> int:
+        touched = sorted(set().union(*(values.keys() for values in deltas.values())))
+        for start in range(0, len(touched), self.UPDATE_BATCH_SIZE):
+            chunk = touched[start:start + self.UPDATE_BATCH_SIZE]
+            values = {}
+            for column, column_deltas in deltas.items():
+                whens = {thread_id: column_deltas[thread_id] for thread_id in chunk if column_deltas.get(thread_id)}
+                if whens:
+                    attribute = getattr(ForumThread, column)
+                    values[column] = db.func.coalesce(attribute, 0) + db.case(whens, value=ForumThread.id, else_=0)
+            ForumThread.query.filter(ForumThread.id.in_(chunk)).update(values, synchronize_session=False)
+        db.session.commit()
+        return len(touched)
+
+    def flush(self) -> int:
+        """Apply every buffered delta; returns the number of threads updated."""
+        app = self._app()
+        if app is None:
+            return 0
+        with self._flush_lock:
+            deltas = self._drain()
+            if not any(deltas.values()):
+                return 0
+
+            started = time.perf_counter()
+            with app.app_context():
+                try:
+                    updated = self._write(deltas)
+                except Exception as e:
+                    db.session.rollback()
+                    self.failed += 1
+                    logger.error(f"Writing forum counters failed, keeping them for the next flush: {e}")
+                    self._restore(deltas)
+                    return 0
+
+            from backend.services.forum_search_index import forum_search_index
+            forum_search_index.apply_counter_deltas(deltas['view_count'], deltas['upvote_count'])
+
+            self.flushes += 1
+            self.rows_updated += updated
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            return updated
+
+    def shutdown(self):
+        """Stop the flusher and write whatever is still buffered."""
+        self._stopping.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=self.FLUSH_INTERVAL_SECONDS)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Final forum counter flush failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = {column: len(values) for column, values in self._pending.items()}
+        return {
+            'backend': 'redis' if self._redis is not None else 'memory',
+            'pending_threads': pending,
+            'flushes': self.flushes,
+            'rows_updated': self.rows_updated,
+            'failed': self.failed,
+            'last_flush_ms': self.last_flush_ms
+        }
+
+
+forum_counters = ForumCounterBuffer()
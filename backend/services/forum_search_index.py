@@ -0,0 +1,384 @@
+"""
+Forum Search Index: BM25 full-text search over forum threads.
+
+Each thread is indexed as one document made of its title, tags, content and
+the text of its comments (weighted in that order), next to the attributes
+search filters and sorts on and a tag -> threads posting list for tag filters
+and facets. Searching, filtering, sorting and paging all happen in memory;
+only the requested page of threads is loaded from the database.
+
+The index is per process. Thread and comment writes made through this
+process's session are applied immediately via mapper events; new threads and
+comments written by other workers are picked up incrementally every
+SYNC_INTERVAL_SECONDS, and the whole index (including vote and view counts
+changed elsewhere) is rebuilt every REBUILD_INTERVAL_SECONDS.
+"""
+
+from collections import Counter
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Optional, Tuple
+import heapq
+import threading
+import time
+import logging
+
+from sqlalchemy import event, inspect
+
+from backend.models.forum import ForumThread, PostComment
+from backend.utils.text_search import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+
+class _ThreadMeta:
+    __slots__ = ('category_id', 'is_approved', 'tags', 'created_at', 'last_activity',
+                 'upvote_count', 'view_count', 'comment_count')
+
+    def __init__(self, category_id, is_approved, tags, created_at, last_activity,
+                 upvote_count, view_count, comment_count=0):
+        self.category_id = category_id
+        self.is_approved = is_approved
+        self.tags = tags
+        self.created_at = created_at or datetime.min
+        self.last_activity = last_activity or self.created_at
+        self.upvote_count = upvote_count or 0
+        self.view_count = view_count or 0
+        self.comment_count = comment_count
+
+
+class ForumSearchIndex:
+    """Thread-safe BM25 index of forum threads with tag facets."""
+
+    FIELD_WEIGHTS = {'title': 3.0, 'tags': 2.0, 'content': 1.0, 'comments': 0.5}
+    SYNC_INTERVAL_SECONDS = 30
+    REBUILD_INTERVAL_SECONDS = 3600
+    LOAD_BATCH_SIZE = 5000
+    FACET_LIMIT = 20
+
+    # Fields whose change requires re-tokenizing a thread
+    TEXT_FIELDS = ('title', 'content', 'tags')
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._text = InvertedIndex(self.FIELD_WEIGHTS)
+        self._meta = {}
+        self._tag_postings = {}
+        # Filter sets, so filtering a result set is a few set operations
+        self._category_postings = {}
+        self._unapproved = set()
+        self._answered = set()
+        self._comment_text = {}
+        self._thread_high_water = 0
+        self._comment_high_water = 0
+        # Comments above the high-water mark already applied through mapper events
+        self._event_comment_ids = set()
+        self._last_sync = None
+        self._last_rebuild = None
+
+    @staticmethod
+    def parse_tags(tags: Optional[str]) -> Tuple[str, ...]:
+        """Normalized tags from the comma-separated column."""
+        if not tags:
+            return ()
+        return tuple(dict.fromkeys(tag.strip().lower() for tag in tags.split(',') if tag.strip()))
+
+    def _index_thread(self, thread_id, category_id, title, content, tags, is_approved,
+                      created_at, last_activity, upvote_count, view_count):
+        previous = self._meta.get(thread_id)
+        if previous is not None:
+            self._untag(thread_id, previous.tags)
+        parsed_tags = self.parse_tags(tags)
+        meta = self._meta[thread_id] = _ThreadMeta(
+            category_id, is_approved is not False, parsed_tags, created_at, last_activity,
+            upvote_count, view_count,
+            previous.comment_count if previous else len(self._comment_text.get(thread_id, ()))
+        )
+        self._set_filters(thread_id, meta, previous)
+        for tag in parsed_tags:
+            self._tag_postings.setdefault(tag, set()).add(thread_id)
+
+        self._text.add(thread_id, {'title': title, 'tags': ' '.join(parsed_tags), 'content': content})
+        for comment_text in self._comment_text.get(thread_id, ()):
+            self._text.append(thread_id, 'comments', comment_text)
+
+    def _set_filters(self, thread_id, meta, previous=None):
+        if previous is not None and previous.category_id != meta.category_id:
+            self._discard_category(thread_id, previous.category_id)
+        self._category_postings.setdefault(meta.category_id, set()).add(thread_id)
+        if meta.is_approved:
+            self._unapproved.discard(thread_id)
+        else:
+            self._unapproved.add(thread_id)
+        if meta.comment_count:
+            self._answered.add(thread_id)
+
+    def _discard_category(self, thread_id, category_id):
+        threads = self._category_postings.get(category_id)
+        if threads is not None:
+            threads.discard(thread_id)
+            if not threads:
+                del self._category_postings[category_id]
+
+    def _untag(self, thread_id, tags):
+        for tag in tags:
+            threads = self._tag_postings.get(tag)
+            if threads is not None:
+                threads.discard(thread_id)
+                if not threads:
+                    del self._tag_postings[tag]
+
+    def _index_comment(self, thread_id, content):
+        self._comment_text.setdefault(thread_id, []).append(content)
+        meta = self._meta.get(thread_id)
+        if meta is not None:
+            meta.comment_count += 1
+            self._answered.add(thread_id)
+            self._text.append(thread_id, 'comments', content)
+
+    def _load_since(self, thread_min_id: int, comment_min_id: int):
+        """Add threads and comments above the given ids in keyset batches."""
+        last_id = thread_min_id
+        while True:
+            rows = ForumThread.query.with_entities(
+                ForumThread.id, ForumThread.category_id, ForumThread.title, ForumThread.content,
+                ForumThread.tags, ForumThread.is_ai_approved, ForumThread.created_at,
+                ForumThread.last_activity, ForumThread.upvote_count, ForumThread.view_count
+            ).filter(ForumThread.id > last_id).order_by(ForumThread.id).limit(self.LOAD_BATCH_SIZE).all()
+            for row in rows:
+                self._index_thread(*row)
+            if rows:
+                last_id = rows[-1][0]
+                self._thread_high_water = max(self._thread_high_water, last_id)
+            if len(rows) < self.LOAD_BATCH_SIZE:
+                break
+
+        last_id = comment_min_id
+        while True:
+            rows = PostComment.query.with_entities(
+                PostComment.id, PostComment.thread_id, PostComment.content
+            ).filter(PostComment.id > last_id).order_by(PostComment.id).limit(self.LOAD_BATCH_SIZE).all()
+            for comment_id, thread_id, content in rows:
+                if comment_id not in self._event_comment_ids:
+                    self._index_comment(thread_id, content)
+            if rows:
+                last_id = rows[-1][0]
+                self._comment_high_water = max(self._comment_high_water, last_id)
+            if len(rows) < self.LOAD_BATCH_SIZE:
+                break
+
+        self._event_comment_ids = {
+            comment_id for comment_id in self._event_comment_ids if comment_id > self._comment_high_water
+        }
+
+    def rebuild(self) -> int:
+        """Reload every thread and comment from the database."""
+        with self._lock:
+            self._text.clear()
+            self._meta = {}
+            self._tag_postings = {}
+            self._category_postings = {}
+            self._unapproved = set()
+            self._answered = set()
+            self._comment_text = {}
+            self._thread_high_water = 0
+            self._comment_high_water = 0
+            self._event_comment_ids = set()
+            self._load_since(0, 0)
+            now = time.monotonic()
+            self._last_sync = now
+            self._last_rebuild = now
+            loaded = len(self._meta)
+        logger.info(f"Rebuilt forum search index with {loaded} threads")
+        return loaded
+
+    def sync(self, force: bool = False):
+        """Bring the index up to date if it's due."""
+        now = time.monotonic()
+        with self._lock:
+            if self._last_rebuild is None or now - self._last_rebuild >= self.REBUILD_INTERVAL_SECONDS:
+                self.rebuild()
+                return
+            if not force and now - self._last_sync < self.SYNC_INTERVAL_SECONDS:
+                return
+            self._load_since(self._thread_high_water, self._comment_high_water)
+            self._last_sync = now
+
+    @property
+    def is_built(self) -> bool:
+        return self._last_rebuild is not None
+
+    def upsert_thread(self, thread: ForumThread, text_changed: bool = True):
+        """Index a thread; with text_changed=False only its attributes are refreshed."""
+        with self._lock:
+            if not self.is_built or thread.id is None:
+                return
+            meta = self._meta.get(thread.id)
+            if meta is None or text_changed:
+                self._index_thread(
+                    thread.id, thread.category_id, thread.title, thread.content, thread.tags,
+                    thread.is_ai_approved, thread.created_at, thread.last_activity,
+                    thread.upvote_count, thread.view_count
+                )
+                return
+            previous = _ThreadMeta(meta.category_id, meta.is_approved, meta.tags, None, None, 0, 0)
+            meta.category_id = thread.category_id
+            meta.is_approved = thread.is_ai_approved is not False
+            meta.last_activity = thread.last_activity or meta.last_activity
+            meta.upvote_count = thread.upvote_count or 0
+            meta.view_count = thread.view_count or 0
+            self._set_filters(thread.id, meta, previous)
+
+    def apply_counter_deltas(self, views: Dict[int, int], upvotes: Dict[int, int]):
+        """Apply view/upvote increments written in bulk, bypassing mapper events."""
+        with self._lock:
+            for thread_id, delta in views.items():
+                meta = self._meta.get(thread_id)
+                if meta is not None:
+                    meta.view_count += delta
+            for thread_id, delta in upvotes.items():
+                meta = self._meta.get(thread_id)
+                if meta is not None:
+                    meta.upvote_count += delta
+
+    def remove_thread(self, thread_id: int):
+        with self._lock:
+            meta = self._meta.pop(thread_id, None)
+            if meta is not None:
+                self._untag(thread_id, meta.tags)
+                self._discard_category(thread_id, meta.category_id)
+            self._unapproved.discard(thread_id)
+            self._answered.discard(thread_id)
+            self._comment_text.pop(thread_id, None)
+            self._text.remove(thread_id)
+
+    def add_comment(self, comment: PostComment):
+        with self._lock:
+            if not self.is_built or comment.id is None:
+                return
+            if comment.id <= self._comment_high_water or comment.id in self._event_comment_ids:
+                return
+            self._index_comment(comment.thread_id, comment.content)
+            self._event_comment_ids.add(comment.id)
+
+    def remove_comment(self, comment: PostComment):
+        """Take a deleted comment's text out of its thread; the thread is unanswered again at zero comments."""
+        with self._lock:
+            if not self.is_built or comment.id is None:
+                return
+            texts = self._comment_text.get(comment.thread_id)
+            if not texts or comment.content not in texts:
+                # Never indexed here (written elsewhere and not yet synced)
+                return
+            texts.remove(comment.content)
+            if not texts:
+                del self._comment_text[comment.thread_id]
+            self._event_comment_ids.discard(comment.id)
+            meta = self._meta.get(comment.thread_id)
+            if meta is not None:
+                meta.comment_count = max(0, meta.comment_count - 1)
+                if not meta.comment_count:
+                    self._answered.discard(comment.thread_id)
+                self._text.subtract(comment.thread_id, 'comments', comment.content)
+
+    def search(self, query: Optional[str] = None, category_id: Optional[int] = None,
+               tags: Optional[Iterable[str]] = None, sort_by: str = 'relevance',
+               offset: int = 0, limit: int = 20) -> Dict:
+        """
+        Ranked, filtered, paginated thread ids.
+
+        Args:
+            query: Free-text query; empty lists every thread
+            category_id: Only threads in this category
+            tags: Only threads carrying all of these tags
+            sort_by: 'relevance', 'recent', 'popular' or 'unanswered'
+            offset, limit: Page window
+
+        Returns:
+            {'ids': [...], 'total': int, 'facets': {tag: count}} for approved threads only
+        """
+        self.sync()
+        with self._lock:
+            candidates = None
+            for tag in self.parse_tags(','.join(tags)) if tags else ():
+                tagged = self._tag_postings.get(tag, set())
+                candidates = set(tagged) if candidates is None else candidates & tagged
+                if not candidates:
+                    return {'ids': [], 'total': 0, 'facets': {}}
+
+            scores = None
+            if query and query.strip():
+                scores = self._text.search(query, candidates)
+                matching = scores.keys()
+            else:
+                matching = candidates if candidates is not None else self._meta.keys()
+
+            results = set(matching) - self._unapproved
+            if category_id:
+                results &= self._category_postings.get(category_id, set())
+            if sort_by == 'unanswered':
+                results -= self._answered
+
+            meta = self._meta
+            facets = Counter(chain.from_iterable(meta[thread_id].tags for thread_id in results))
+
+            if sort_by == 'recent':
+                key = lambda thread_id: (meta[thread_id].last_activity, thread_id)
+            elif sort_by == 'popular':
+                key = lambda thread_id: (meta[thread_id].upvote_count, thread_id)
+            elif sort_by == 'unanswered':
+                key = lambda thread_id: (meta[thread_id].created_at, thread_id)
+            elif scores is not None:
+                key = scores.__getitem__
+            else:
+                key = lambda thread_id: (meta[thread_id].view_count, meta[thread_id].upvote_count, thread_id)
+
+            page = heapq.nlargest(offset + limit, results, key=key)[offset:]
+            return {
+                'ids': page,
+                'total': len(results),
+                'facets': dict(facets.most_common(self.FACET_LIMIT))
+            }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = self._text.stats()
+            stats.update({
+                'threads': len(self._meta),
+                'tags': len(self._tag_postings),
+                'thread_high_water': self._thread_high_water,
+                'comment_high_water': self._comment_high_water
+            })
+            return stats
+
+
+forum_search_index = ForumSearchIndex()
+
+
+@event.listens_for(ForumThread, 'after_insert')
+def _index_new_thread(mapper, connection, target):
+    forum_search_index.upsert_thread(target)
+
+
+@event.listens_for(ForumThread, 'after_update')
+def _reindex_thread(mapper, connection, target):
+    state = inspect(target)
+    text_changed = any(
+        state.attrs[field].history.has_changes() for field in ForumSearchIndex.TEXT_FIELDS
+    )
+    forum_search_index.upsert_thread(target, text_changed=text_changed)
+
+
+@event.listens_for(ForumThread, 'after_delete')
+def _unindex_thread(mapper, connection, target):
+    forum_search_index.remove_thread(target.id)
+
+
+@event.listens_for(PostComment, 'after_insert')
+def _index_comment(mapper, connection, target):
+    forum_search_index.add_comment(target)
+
+
+@event.listens_for(PostComment, 'after_delete')
+def _unindex_comment(mapper, connection, target):
+    forum_search_index.remove_comment(target)
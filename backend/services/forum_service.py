@@ -1,10 +1,13 @@
 from datetime import datetime
-from sqlalchemy import or_, func
+from sqlalchemy import func
 from backend.models import (
     ForumCategory, ForumThread, PostComment, Upvote, UserReputation, User
 )
 from backend.extensions import db
 from backend.services.ai_moderator import ai_moderator
+from backend.services.forum_search_index import forum_search_index
+from backend.services.forum_counters import forum_counters
+from backend.services.forum_trending import forum_trending
 from backend.utils.logger import logger
 
 
@@ -124,7 +127,8 @@ class ForumService:
             if existing_upvote:
                 # Remove upvote
                 db.session.delete(existing_upvote)
-                target.upvote_count -= 1
+                if not thread_id:
+                    target.upvote_count -= 1
                 action = 'removed'
             else:
                 # Add upvote
@@ -134,7 +138,8 @@ class ForumService:
                     comment_id=comment_id
                 )
                 db.session.add(upvote)
-                target.upvote_count += 1
+                if not thread_id:
+                    target.upvote_count += 1
                 action = 'added'
                 
                 # Update reputation of content author
@@ -144,7 +149,13 @@ class ForumService:
                     ForumService.update_reputation(target.user_id, 'upvote_received')
             
             db.session.commit()
-            return {'action': action, 'upvote_count': target.upvote_count}, None
+
+            upvote_count = target.upvote_count
+            if thread_id:
+                # Thread counts are written behind by forum_counters
+                forum_counters.record_upvote(thread_id, 1 if action == 'added' else -1)
+                upvote_count = (upvote_count or 0) + forum_counters.pending(thread_id)[1]
+            return {'action': action, 'upvote_count': upvote_count}, None
             
         except Exception as e:
             db.session.rollback()
@@ -157,47 +168,51 @@ class ForumService:
         Search threads with multiple filters
         sort_by: 'relevance', 'recent', 'popular', 'unanswered'
         """
+        page, error = ForumService.search_threads_page(
+            query, category_id=category_id, tags=tags, sort_by=sort_by, per_page=limit
+        )
+        if error:
+            return [], error
+        return page['results'], None
+
+    @staticmethod
+    def search_threads_page(query, category_id=None, tags=None, sort_by='relevance', page=1, per_page=20):
+        """
+        Full-text thread search through the in-memory BM25 index.
+        Returns one page of results with the total match count and tag facets.
+        """
         try:
-            # Base query
-            threads_query = ForumThread.query.filter_by(is_ai_approved=True)
-            
-            # Category filter
-            if category_id:
-                threads_query = threads_query.filter_by(category_id=category_id)
-            
-            # Text search
-            if query:
-                search_filter = or_(
-                    ForumThread.title.ilike(f'%{query}%'),
-                    ForumThread.content.ilike(f'%{query}%'),
-                    ForumThread.tags.ilike(f'%{query}%')
-                )
-                threads_query = threads_query.filter(search_filter)
-            
-            # Tag filter
-            if tags:
-                for tag in tags:
-                    threads_query = threads_query.filter(ForumThread.tags.ilike(f'%{tag}%'))
-            
-            # Sorting
-            if sort_by == 'recent':
-                threads_query = threads_query.order_by(ForumThread.last_activity.desc())
-            elif sort_by == 'popular':
-                threads_query = threads_query.order_by(ForumThread.upvote_count.desc())
-            elif sort_by == 'unanswered':
-                # Subquery to count comments
-                threads_query = threads_query.outerjoin(PostComment).group_by(ForumThread.id).having(
-                    func.count(PostComment.id) == 0
-                ).order_by(ForumThread.created_at.desc())
-            else:  # relevance (default)
-                threads_query = threads_query.order_by(ForumThread.view_count.desc(), ForumThread.upvote_count.desc())
-            
-            threads = threads_query.limit(limit).all()
-            return [t.to_dict() for t in threads], None
+            page = max(1, page or 1)
+            found = forum_search_index.search(
+                query=query,
+                category_id=category_id,
+                tags=tags,
+                sort_by=sort_by,
+                offset=(page - 1) * per_page,
+                limit=per_page
+            )
+
+            threads = {}
+            if found['ids']:
+                threads = {
+                    thread.id: thread
+                    for thread in ForumThread.query.filter(
+                        ForumThread.id.in_(found['ids']),
+                        ForumThread.is_ai_approved == True
+                    ).all()
+                }
+
+            return {
+                'results': [threads[thread_id].to_dict() for thread_id in found['ids'] if thread_id in threads],
+                'total': found['total'],
+                'page': page,
+                'per_page': per_page,
+                'facets': found['facets']
+            }, None
             
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
-            return [], str(e)
+            return None, str(e)
     
     @staticmethod
     def get_thread_details(thread_id, increment_view=True):
@@ -208,10 +223,15 @@ class ForumService:
                 return None, "Thread not found"
             
             if increment_view:
-                thread.view_count += 1
-                db.session.commit()
-            
-            return thread.to_dict(include_comments=True), None
+                # Buffered and written in bulk; no row lock on the read path
+                forum_counters.record_view(thread_id)
+                forum_trending.record(thread_id, 'view')
+
+            data = thread.to_dict(include_comments=True)
+            pending_views, pending_upvotes = forum_counters.pending(thread_id)
+            data['view_count'] = (data['view_count'] or 0) + pending_views
+            data['upvote_count'] = (data['upvote_count'] or 0) + pending_upvotes
+            return data, None
             
         except Exception as e:
             logger.error(f"Failed to get thread: {str(e)}")
@@ -266,18 +286,33 @@ class ForumService:
     
     @staticmethod
     def get_trending_threads(limit=10):
-        """Get trending threads based on recent activity and engagement"""
+        """Get trending threads ranked by time-decayed engagement"""
         try:
-            # Calculate a trending score: recent activity + engagement
-            threads = ForumThread.query.filter_by(
-                is_ai_approved=True,
-                is_flagged=False
-            ).order_by(
-                ForumThread.last_activity.desc(),
-                ForumThread.upvote_count.desc()
-            ).limit(limit).all()
-            
-            return [t.to_dict() for t in threads], None
+            trending_ids = forum_trending.top(limit)
+            threads = {}
+            if trending_ids:
+                threads = {
+                    thread.id: thread
+                    for thread in ForumThread.query.filter(
+                        ForumThread.id.in_(trending_ids),
+                        ForumThread.is_ai_approved == True,
+                        ForumThread.is_flagged == False
+                    ).all()
+                }
+            ranked = [threads[thread_id] for thread_id in trending_ids if thread_id in threads]
+
+            # Quiet forum: fill up with the most recently active threads
+            if len(ranked) < limit:
+                ranked.extend(ForumThread.query.filter(
+                    ForumThread.is_ai_approved == True,
+                    ForumThread.is_flagged == False,
+                    ForumThread.id.notin_([thread.id for thread in ranked])
+                ).order_by(
+                    ForumThread.last_activity.desc(),
+                    ForumThread.upvote_count.desc()
+                ).limit(limit - len(ranked)).all())
+
+            return [t.to_dict() for t in ranked], None
             
         except Exception as e:
             logger.error(f"Failed to get trending threads: {str(e)}")
@@ -0,0 +1,223 @@
+"""
+Forum Trending: Incrementally maintained, time-decayed thread scores.
+
+Every engagement event adds its weight to the thread's score, and scores
+decay exponentially with a half-life of HALF_LIFE_SECONDS. Rather than
+decaying every score on every tick, an event at time t adds
+``weight * 2 ** ((t - epoch) / half_life)``: all stored scores share the same
+decay factor, so their order is already the trending order and recording an
+event is O(1). The epoch is moved forward (rescaling every score once)
+before the multiplier can overflow.
+
+The top TOP_K threads are cached and recomputed at most every
+TOP_K_REFRESH_SECONDS, and only if an event arrived since the last pass.
+
+The tracker is per process. Threads, comments and upvotes written through
+this process are recorded as they happen; views are recorded by the forum
+service. Every REBUILD_INTERVAL_SECONDS the scores are reseeded from the
+comments, upvotes and threads created in the last SEED_WINDOW_SECONDS, which
+picks up other workers' activity. Views have no timestamps in the database,
+so only views seen by this process count towards its scores.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+import heapq
+import threading
+import time
+import logging
+
+from sqlalchemy import event
+
+from backend.models.forum import ForumThread, PostComment, Upvote
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingTracker:
+    """Thread-safe decayed engagement scores with a cached top-K."""
+
+    HALF_LIFE_SECONDS = 6 * 3600
+    EVENT_WEIGHTS = {'view': 1.0, 'upvote': 4.0, 'comment': 3.0, 'thread': 2.0}
+    SEED_WINDOW_SECONDS = 7 * 86400
+    REBUILD_INTERVAL_SECONDS = 900
+    TOP_K = 100
+    TOP_K_REFRESH_SECONDS = 15
+    # Rebase once the growth multiplier reaches 2 ** MAX_EXPONENT
+    MAX_EXPONENT = 64
+    # Scores that decayed below this are dropped at rebase
+    PRUNE_BELOW = 0.01
+    LOAD_BATCH_SIZE = 5000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._scores = {}
+        self._hidden = set()
+        self._epoch = time.time()
+        self._top = []
+        self._top_computed_at = None
+        self._dirty = True
+        self._last_rebuild = None
+
+    def _growth(self, at: float) -> float:
+        exponent = (at - self._epoch) / self.HALF_LIFE_SECONDS
+        if exponent > self.MAX_EXPONENT:
+            self._rebase(at)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, at: float):
+        factor = 2.0 ** (-(at - self._epoch) / self.HALF_LIFE_SECONDS)
+        self._scores = {
+            thread_id: score * factor
+            for thread_id, score in self._scores.items()
+            if score * factor >= self.PRUNE_BELOW
+        }
+        self._epoch = at
+        self._dirty = True
+
+    def _add(self, thread_id: int, weight: float, at: float):
+        self._scores[thread_id] = self._scores.get(thread_id, 0.0) + weight * self._growth(at)
+        self._dirty = True
+
+    def record(self, thread_id: int, kind: str, count: int = 1):
+        """Add an engagement event ('view', 'upvote', 'comment', 'thread'); negative counts undo."""
+        if not thread_id or not count:
+            return
+        weight = self.EVENT_WEIGHTS[kind] * count
+        with self._lock:
+            if self._last_rebuild is None:
+                # Not seeded yet; the rebuild will count this from the database
+                return
+            self._add(thread_id, weight, time.time())
+
+    def set_visible(self, thread_id: int, visible: bool):
+        """Hide unapproved or flagged threads from the top list."""
+        with self._lock:
+            if visible == (thread_id not in self._hidden):
+                return
+            if visible:
+                self._hidden.discard(thread_id)
+                self._dirty = True
+            else:
+                self._hidden.add(thread_id)
+                # Moderation takes effect on the next read, not the next refresh
+                self._top_computed_at = None
+                self._dirty = True
+
+    def remove(self, thread_id: int):
+        with self._lock:
+            self._scores.pop(thread_id, None)
+            self._hidden.discard(thread_id)
+            self._top_computed_at = None
+            self._dirty = True
+
+    def score(self, thread_id: int) -> float:
+        """Current decayed score of a thread."""
+        with self._lock:
+            decay = 2.0 ** (-(time.time() - self._epoch) / self.HALF_LIFE_SECONDS)
+            return self._scores.get(thread_id, 0.0) * decay
+
+    def rebuild(self) -> int:
+        """Reseed scores from recent threads, comments and upvotes."""
+        since = datetime.utcnow() - timedelta(seconds=self.SEED_WINDOW_SECONDS)
+        # Stored timestamps are naive UTC
+        offset = time.time() - datetime.utcnow().timestamp()
+        with self._lock:
+            self._scores = {}
+            self._hidden = set()
+            self._epoch = time.time()
+            weights = self.EVENT_WEIGHTS
+
+            sources = (
+                (ForumThread, ForumThread.id, weights['thread']),
+                (PostComment, PostComment.thread_id, weights['comment']),
+                (Upvote, Upvote.thread_id, weights['upvote']),
+            )
+            for model, thread_column, weight in sources:
+                last_id = 0
+                while True:
+                    rows = model.query.with_entities(model.id, thread_column, model.created_at).filter(
+                        thread_column.isnot(None), model.created_at >= since, model.id > last_id
+                    ).order_by(model.id).limit(self.LOAD_BATCH_SIZE).all()
+                    for _, thread_id, created_at in rows:
+                        self._add(thread_id, weight, created_at.timestamp() + offset)
+                    if len(rows) < self.LOAD_BATCH_SIZE:
+                        break
+                    last_id = rows[-1][0]
+
+            hidden = ForumThread.query.with_entities(ForumThread.id).filter(
+                (ForumThread.is_ai_approved == False) | (ForumThread.is_flagged == True)
+            ).all()
+            self._hidden = {thread_id for thread_id, in hidden}
+
+            self._last_rebuild = time.monotonic()
+            self._dirty = True
+            seeded = len(self._scores)
+        logger.info(f"Rebuilt forum trending scores for {seeded} threads")
+        return seeded
+
+    def sync(self):
+        """Rebuild if never built or due."""
+        with self._lock:
+            if self._last_rebuild is None or time.monotonic() - self._last_rebuild >= self.REBUILD_INTERVAL_SECONDS:
+                self.rebuild()
+
+    def top(self, limit: int = 10) -> List[int]:
+        """Ids of the highest-scoring visible threads, best first."""
+        self.sync()
+        with self._lock:
+            now = time.monotonic()
+            stale = self._top_computed_at is None or now - self._top_computed_at >= self.TOP_K_REFRESH_SECONDS
+            if limit > self.TOP_K or (self._dirty and stale):
+                size = max(limit, self.TOP_K)
+                visible = (item for item in self._scores.items() if item[0] not in self._hidden)
+                self._top = [thread_id for thread_id, _ in heapq.nlargest(size, visible, key=lambda item: item[1])]
+                self._top_computed_at = now
+                self._dirty = False
+            return self._top[:limit]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'threads': len(self._scores),
+                'hidden': len(self._hidden),
+                'cached_top': len(self._top),
+                'half_life_seconds': self.HALF_LIFE_SECONDS
+            }
+
+
+forum_trending = TrendingTracker()
+
+
+@event.listens_for(ForumThread, 'after_insert')
+def _trend_new_thread(mapper, connection, target):
+    forum_trending.record(target.id, 'thread')
+    forum_trending.set_visible(target.id, target.is_ai_approved is not False and not target.is_flagged)
+
+
+@event.listens_for(ForumThread, 'after_update')
+def _trend_thread_visibility(mapper, connection, target):
+    forum_trending.set_visible(target.id, target.is_ai_approved is not False and not target.is_flagged)
+
+
+@event.listens_for(ForumThread, 'after_delete')
+def _untrend_thread(mapper, connection, target):
+    forum_trending.remove(target.id)
+
+
+@event.listens_for(PostComment, 'after_insert')
+def _trend_comment(mapper, connection, target):
+    forum_trending.record(target.thread_id, 'comment')
+
+
+@event.listens_for(Upvote, 'after_insert')
+def _trend_upvote(mapper, connection, target):
+    if target.thread_id:
+        forum_trending.record(target.thread_id, 'upvote')
+
+
+@event.listens_for(Upvote, 'after_delete')
+def _untrend_upvote(mapper, connection, target):
+    if target.thread_id:
+        forum_trending.record(target.thread_id, 'upvote', count=-1)
@@ -5,38 +5,59 @@ Algorithm for matching logistics orders to available autonomous vehicles.
 """
 
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from scipy.optimize import linear_sum_assignment
 from backend.extensions import db
 from backend.models.freight_v2 import AutonomousVehicle, VehicleMission
 from backend.models.autonomous_supply import SmartContractOrder
-import math
+from backend.services.vehicle_index import vehicle_index
+from backend.utils.geo_distance import haversine_matrix
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Pickup point until orders carry their own coordinates (mocked for L3 brevity)
+DEFAULT_PICKUP_COORDS = (12.9716, 77.5946)
+
+# Cost of a pair the vehicle cannot carry; dwarfs any real distance sum
+INFEASIBLE_COST_KM = 1e12
+
+# Orders solved per assignment matrix (orders x idle vehicles)
+ASSIGNMENT_BATCH_SIZE = 2000
+
 class FreightMatchEngine:
-    
+
     @staticmethod
     def find_nearest_vehicle(order_lat: float, order_lng: float, required_capacity: float):
         """
-        Heuristic-based search for nearest available autonomous asset.
+        Nearest idle autonomous asset (haversine) with enough capacity,
+        looked up in the idle vehicle index.
         """
-        vehicles = AutonomousVehicle.query.filter_by(status='IDLE').all()
-        
-        best_vehicle = None
-        min_distance = float('inf')
-        
-        for v in vehicles:
-            if v.current_capacity_kg < required_capacity:
-                continue
-                
-            # Haversine approximation
-            dist = math.sqrt((v.current_lat - order_lat)**2 + (v.current_lng - order_lng)**2)
-            
-            if dist < min_distance:
-                min_distance = dist
-                best_vehicle = v
-                
-        return best_vehicle
+        match = vehicle_index.nearest(order_lat, order_lng, required_capacity)
+        if match is None:
+            return None
+
+        vehicle = AutonomousVehicle.query.get(match[0])
+        if vehicle is None or vehicle.status != 'IDLE':
+            # Claimed by another worker since the index was built
+            vehicle_index.rebuild()
+            match = vehicle_index.nearest(order_lat, order_lng, required_capacity, sync=False)
+            vehicle = AutonomousVehicle.query.get(match[0]) if match else None
+        return vehicle
+
+    @staticmethod
+    def _pickup_coordinates(order: SmartContractOrder) -> Tuple[float, float]:
+        return DEFAULT_PICKUP_COORDS
+
+    @staticmethod
+    def _start_mission(vehicle: AutonomousVehicle, order: SmartContractOrder):
+        vehicle.status = 'IN_TRANSIT'
+        db.session.add(VehicleMission(
+            vehicle_id=vehicle.id,
+            order_id=order.id
+        ))
+        order.status = 'SHIPPED'
 
     @staticmethod
     def assign_vehicle_to_order(order_id: int):
@@ -44,22 +65,82 @@ class FreightMatchEngine:
         Pairs an order to a vehicle and initiates mission state.
         """
         order = SmartContractOrder.query.get(order_id)
-        # Assuming order has pickup coordinates (mocked for L3 brevity)
-        pickup_lat, pickup_lng = 12.9716, 77.5946 
-        
+        pickup_lat, pickup_lng = FreightMatchEngine._pickup_coordinates(order)
+
         vehicle = FreightMatchEngine.find_nearest_vehicle(pickup_lat, pickup_lng, order.quantity_kg)
-        
+
         if vehicle:
-            vehicle.status = 'IN_TRANSIT'
-            mission = VehicleMission(
-                vehicle_id=vehicle.id,
-                order_id=order_id
-            )
-            db.session.add(mission)
-            order.status = 'SHIPPED'
+            FreightMatchEngine._start_mission(vehicle, order)
             db.session.commit()
-            
+
             logger.info(f"Matched Vehicle {vehicle.serial_number} to Order {order_id}.")
             return vehicle
-            
+
         return None
+
+    @staticmethod
+    def assign_orders_batch(orders: List[SmartContractOrder],
+                            pickups: Optional[Dict[int, Tuple[float, float]]] = None) -> Dict[int, int]:
+        """
+        Matches many orders to idle vehicles at once, minimising the total
+        haversine distance from vehicles to pickups (Hungarian method via
+        scipy's linear_sum_assignment). Vehicles that cannot carry an order's
+        quantity are never paired with it.
+
+        Args:
+            orders: Orders to assign, solved ASSIGNMENT_BATCH_SIZE at a time
+            pickups: Optional {order_id: (lat, lng)}; defaults to the order's pickup point
+
+        Returns:
+            {order_id: vehicle_id} for the orders that were assigned
+        """
+        pickups = pickups or {}
+        assigned = {}
+        claimed = set()
+
+        for start in range(0, len(orders), ASSIGNMENT_BATCH_SIZE):
+            chunk = orders[start:start + ASSIGNMENT_BATCH_SIZE]
+            quantities = np.array([order.quantity_kg or 0.0 for order in chunk])
+            vehicles = [
+                v for v in vehicle_index.candidates(float(quantities.min()))
+                if v[0] not in claimed
+            ]
+            if not vehicles:
+                break
+
+            coords = [pickups.get(order.id) or FreightMatchEngine._pickup_coordinates(order) for order in chunk]
+            vehicle_ids = np.array([v[0] for v in vehicles])
+            capacities = np.array([v[3] for v in vehicles])
+
+            cost = haversine_matrix(
+                [c[0] for c in coords], [c[1] for c in coords],
+                [v[1] for v in vehicles], [v[2] for v in vehicles]
+            )
+            cost[capacities[np.newaxis, :] < quantities[:, np.newaxis]] = INFEASIBLE_COST_KM
+
+            rows, cols = linear_sum_assignment(cost)
+            pairs = [
+                (chunk[row], int(vehicle_ids[col]))
+                for row, col in zip(rows, cols) if cost[row, col] < INFEASIBLE_COST_KM
+            ]
+            if not pairs:
+                continue
+
+            # Re-check status: the index may lag vehicles claimed by other workers
+            idle = {
+                v.id: v for v in AutonomousVehicle.query.filter(
+                    AutonomousVehicle.id.in_([vehicle_id for _, vehicle_id in pairs]),
+                    AutonomousVehicle.status == 'IDLE'
+                ).all()
+            }
+            for order, vehicle_id in pairs:
+                vehicle = idle.get(vehicle_id)
+                if vehicle is None:
+                    continue
+                FreightMatchEngine._start_mission(vehicle, order)
+                assigned[order.id] = vehicle_id
+                claimed.add(vehicle_id)
+
+        db.session.commit()
+        logger.info(f"Batch freight matching assigned {len(assigned)}/{len(orders)} orders.")
+        return assigned
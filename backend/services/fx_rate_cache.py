@@ -0,0 +1,167 @@
+"""
+FX Rate Cache: In-process rate matrices for current and recent historical rates.
+
+Each matrix is built from a single FXRate query and precomputes every
+direct, inverse and USD-cross rate, so lookups never touch the database.
+The cache is per process: writes through FXService invalidate it locally and
+the current matrix also expires after CURRENT_TTL_SECONDS so other workers
+pick up new rates.
+"""
+
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Optional, Tuple
+import threading
+import time
+import logging
+
+from backend.models.ledger import FXRate
+
+logger = logging.getLogger(__name__)
+
+
+class FXRateMatrix:
+    """Resolved rates for one rate date (or the current set)."""
+
+    PIVOT_CURRENCY = 'USD'
+    RATE_PRECISION = Decimal('0.00000001')
+
+    def __init__(self, direct_rates: Dict[Tuple[str, str], Decimal]):
+        self.direct_rates = direct_rates
+        self.rates = self._precompute(direct_rates)
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def _precompute(cls, direct_rates: Dict[Tuple[str, str], Decimal]) -> Dict[Tuple[str, str], Decimal]:
+        """
+        Resolve every pair the same way FXService.get_rate does: direct rate,
+        then inverse of the opposite pair, then a cross through USD.
+        """
+        resolved = dict(direct_rates)
+
+        for (from_currency, to_currency), rate in direct_rates.items():
+            if (to_currency, from_currency) not in resolved and rate > 0:
+                resolved[(to_currency, from_currency)] = (Decimal('1') / rate).quantize(
+                    cls.RATE_PRECISION, rounding=ROUND_HALF_UP
+                )
+
+        currencies = {currency for pair in resolved for currency in pair}
+        pivot = cls.PIVOT_CURRENCY
+
+        for from_currency in currencies:
+            if from_currency == pivot:
+                continue
+            from_pivot = resolved.get((from_currency, pivot))
+            if from_pivot is None:
+                continue
+            for to_currency in currencies:
+                if to_currency in (from_currency, pivot) or (from_currency, to_currency) in resolved:
+                    continue
+                pivot_to = resolved.get((pivot, to_currency))
+                if pivot_to is not None:
+                    resolved[(from_currency, to_currency)] = (from_pivot * pivot_to).quantize(
+                        cls.RATE_PRECISION, rounding=ROUND_HALF_UP
+                    )
+
+        return resolved
+
+    def get(self, from_currency: str, to_currency: str) -> Optional[Decimal]:
+        if from_currency == to_currency:
+            return Decimal('1')
+        return self.rates.get((from_currency, to_currency))
+
+    def rates_against(self, base_currency: str) -> Dict[str, Decimal]:
+        """All currencies that resolve to base_currency, as currency -> rate."""
+        result = {base_currency: Decimal('1')}
+        for (from_currency, to_currency), rate in self.rates.items():
+            if to_currency == base_currency:
+                result[from_currency] = rate
+        return result
+
+
+class FXRateCache:
+    """Thread-safe holder for the current matrix and an LRU of historical ones."""
+
+    CURRENT_TTL_SECONDS = 300
+    MAX_HISTORICAL_DATES = 64
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._current = None
+        self._historical = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, rate_date: date = None) -> FXRateMatrix:
+        if rate_date:
+            rows = FXRate.query.with_entities(
+                FXRate.from_currency, FXRate.to_currency, FXRate.rate
+            ).filter(FXRate.rate_date == rate_date).all()
+        else:
+            rows = FXRate.query.with_entities(
+                FXRate.from_currency, FXRate.to_currency, FXRate.rate
+            ).filter(FXRate.is_current == True).all()
+
+        direct_rates = {
+            (from_currency, to_currency): Decimal(str(rate))
+            for from_currency, to_currency, rate in rows
+        }
+        logger.debug(f"Built FX rate matrix for {rate_date or 'current'} from {len(direct_rates)} rates")
+        return FXRateMatrix(direct_rates)
+
+    def get_matrix(self, rate_date: date = None) -> FXRateMatrix:
+        with self._lock:
+            if rate_date is None:
+                if self._current and time.monotonic() - self._current.built_at < self.CURRENT_TTL_SECONDS:
+                    self.hits += 1
+                    return self._current
+            elif rate_date in self._historical:
+                self._historical.move_to_end(rate_date)
+                self.hits += 1
+                return self._historical[rate_date]
+
+            self.misses += 1
+
+        matrix = self._load(rate_date)
+
+        with self._lock:
+            if rate_date is None:
+                self._current = matrix
+            else:
+                self._historical[rate_date] = matrix
+                self._historical.move_to_end(rate_date)
+                while len(self._historical) > self.MAX_HISTORICAL_DATES:
+                    self._historical.popitem(last=False)
+
+        return matrix
+
+    def get_rate(self, from_currency: str, to_currency: str, rate_date: date = None) -> Optional[Decimal]:
+        return self.get_matrix(rate_date).get(from_currency, to_currency)
+
+    def invalidate(self, rate_date: date = None):
+        """
+        Drop cached matrices after a rate write.
+
+        The current matrix is always dropped (is_current flags may have moved);
+        the historical matrix is dropped for rate_date, or all of them if no
+        date is given.
+        """
+        with self._lock:
+            self._current = None
+            if rate_date is None:
+                self._historical.clear()
+            else:
+                self._historical.pop(rate_date, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'current_loaded': self._current is not None,
+                'historical_dates_cached': len(self._historical)
+            }
+
+
+fx_rate_cache = FXRateCache()
@@ -0,0 +1,275 @@
+"""
+FX Revaluation Engine: Batch unrealized FX revaluation across vault positions.
+
+Replaces the per-position loop with a set-based pass:
+- One query for eligible positions, one grouped query for their balances
+- Rates resolved from the cached FX rate matrix
+- Deltas computed over NumPy Decimal arrays with calculate_fx_delta semantics
+- Snapshots, position updates and ledger postings written in one batch
+"""
+
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List
+import logging
+
+import numpy as np
+
+from backend.extensions import db
+from backend.models.ledger import (
+    Vault, VaultCurrencyPosition, FXValuationSnapshot, AccountType, TransactionType
+)
+from backend.services.fx_rate_cache import fx_rate_cache
+from backend.services.ledger_service import LedgerService
+from backend.utils.financial_math import round_currency, PERCENTAGE_PRECISION
+
+logger = logging.getLogger(__name__)
+
+# Elementwise Decimal rounding over object arrays
+_round_currency = np.frompyfunc(round_currency, 1, 1)
+
+
+class FXRevaluationEngine:
+    """Batch revaluation of VaultCurrencyPosition rows."""
+
+    FX_GAIN_LOSS_ACCOUNT = '6000-FX-GAIN-LOSS'
+    MATERIALITY = Decimal('0.01')
+
+    @staticmethod
+    def compute_deltas(amounts: List[Decimal], old_rates: List[Decimal], new_rates: List[Decimal]) -> Dict:
+        """
+        Vectorized calculate_fx_delta: values rounded to currency precision
+        before differencing, percentages to PERCENTAGE_PRECISION.
+
+        Returns:
+            Dict of NumPy object arrays: old_values, new_values, deltas, delta_pcts
+        """
+        amounts = np.array(amounts, dtype=object)
+        old_values = _round_currency(amounts * np.array(old_rates, dtype=object))
+        new_values = _round_currency(amounts * np.array(new_rates, dtype=object))
+        deltas = new_values - old_values
+
+        delta_pcts = np.array([
+            (delta / old_value * 100).quantize(PERCENTAGE_PRECISION, rounding=ROUND_HALF_UP)
+            if old_value != 0 else Decimal('0')
+            for delta, old_value in zip(deltas, old_values)
+        ], dtype=object)
+
+        return {
+            'old_values': old_values,
+            'new_values': new_values,
+            'deltas': deltas,
+            'delta_pcts': delta_pcts
+        }
+
+    @staticmethod
+    def revalue(
+        base_currency: str = 'USD',
+        current_rates: Dict[str, Decimal] = None,
+        vault_ids: List[int] = None,
+        auto_only: bool = True,
+        post_to_ledger: bool = True,
+        created_by: int = None
+    ) -> Dict:
+        """
+        Revalue every eligible foreign-currency position in one batch.
+
+        Args:
+            base_currency: Currency current_rates are quoted against
+            current_rates: Optional currency -> rate overrides for vaults
+                reporting in base_currency
+            vault_ids: Restrict to these vault DB IDs
+            auto_only: Only active vaults with auto_fx_revaluation enabled
+            post_to_ledger: Post unrealized gain/loss transactions
+            created_by: User ID recorded on postings
+
+        Returns:
+            Summary with per-vault revaluation details
+        """
+        query = db.session.query(VaultCurrencyPosition, Vault).join(
+            Vault, VaultCurrencyPosition.vault_id == Vault.id
+        ).filter(
+            VaultCurrencyPosition.currency != Vault.base_currency,
+            VaultCurrencyPosition.ledger_account_id.isnot(None)
+        )
+
+        if auto_only:
+            query = query.filter(Vault.auto_fx_revaluation == True, Vault.is_active == True)
+        if vault_ids is not None:
+            query = query.filter(Vault.id.in_(vault_ids))
+
+        rows = query.all()
+
+        results = {
+            'vaults_processed': len({vault.id for _, vault in rows}),
+            'positions_revalued': 0,
+            'total_unrealized_gain': Decimal('0'),
+            'ledger_transactions_posted': 0,
+            'vault_details': []
+        }
+
+        if not rows:
+            results['total_unrealized_gain'] = 0.0
+            return results
+
+        balances = {
+            account.id: balance
+            for account, balance in LedgerService.get_balances_bulk(
+                account_ids=[position.ledger_account_id for position, _ in rows]
+            )
+        }
+        matrix = fx_rate_cache.get_matrix()
+
+        candidates = []
+        amounts, old_rates, new_rates = [], [], []
+        for position, vault in rows:
+            balance = balances.get(position.ledger_account_id, Decimal('0'))
+            if balance <= 0:
+                continue
+
+            if current_rates and vault.base_currency == base_currency and position.currency in current_rates:
+                new_rate = Decimal(str(current_rates[position.currency]))
+            else:
+                new_rate = matrix.get(position.currency, vault.base_currency) or Decimal('1')
+
+            old_rate = Decimal(str(position.last_fx_rate or position.cost_basis_rate or new_rate))
+            if old_rate == new_rate:
+                continue
+
+            candidates.append((position, vault))
+            amounts.append(balance)
+            old_rates.append(old_rate)
+            new_rates.append(new_rate)
+
+        if not candidates:
+            results['total_unrealized_gain'] = 0.0
+            return results
+
+        computed = FXRevaluationEngine.compute_deltas(amounts, old_rates, new_rates)
+
+        now = datetime.utcnow()
+        snapshots = []
+        position_updates = []
+        postings = []
+        vault_details = {}
+
+        if post_to_ledger:
+            fx_account, _ = LedgerService.get_or_create_account(
+                account_code=FXRevaluationEngine.FX_GAIN_LOSS_ACCOUNT,
+                name='FX Gain/Loss',
+                account_type=AccountType.INCOME,
+                currency=base_currency,
+                is_system=True
+            )
+
+        for i, (position, vault) in enumerate(candidates):
+            delta = computed['deltas'][i]
+            cumulative_unrealized = Decimal(str(position.cumulative_unrealized_fx_gain or 0)) + delta
+
+            snapshots.append({
+                'entity_type': 'vault_position',
+                'entity_id': position.id,
+                'snapshot_date': now,
+                'currency': position.currency,
+                'position_amount': amounts[i],
+                'original_fx_rate': old_rates[i],
+                'current_fx_rate': new_rates[i],
+                'base_currency': vault.base_currency,
+                'original_base_value': computed['old_values'][i],
+                'current_base_value': computed['new_values'][i],
+                'unrealized_gain_loss': delta,
+                'unrealized_gain_loss_pct': computed['delta_pcts'][i],
+                'cumulative_realized_gain': position.cumulative_realized_fx_gain or 0,
+                'cumulative_unrealized_gain': cumulative_unrealized,
+                'created_at': now
+            })
+
+            position_updates.append({
+                'id': position.id,
+                'last_fx_rate': new_rates[i],
+                'last_revaluation_date': now,
+                'cumulative_unrealized_fx_gain': cumulative_unrealized
+            })
+
+            if post_to_ledger and vault.ledger_account_id and abs(delta) >= FXRevaluationEngine.MATERIALITY:
+                # Unrealized adjustment is carried on the vault's base-currency account
+                vault_side, fx_side = ('DEBIT', 'CREDIT') if delta > 0 else ('CREDIT', 'DEBIT')
+                postings.append({
+                    'transaction_type': TransactionType.FX_REVALUATION,
+                    'description': (
+                        f"FX revaluation for {vault.name} {position.currency}: "
+                        f"rate {old_rates[i]} -> {new_rates[i]}"
+                    ),
+                    'source_type': 'vault_position',
+                    'source_id': position.id,
+                    'base_currency': vault.base_currency,
+                    'entry_date': now,
+                    'entries': [
+                        {
+                            'account_id': vault.ledger_account_id,
+                            'entry_type': vault_side,
+                            'amount': abs(delta),
+                            'currency': vault.base_currency,
+                            'memo': f"Unrealized FX {'gain' if delta > 0 else 'loss'} on {position.currency}"
+                        },
+                        {
+                            'account_id': fx_account.id,
+                            'entry_type': fx_side,
+                            'amount': abs(delta),
+                            'currency': vault.base_currency,
+                            'memo': f"FX revaluation of {vault.name} {position.currency}"
+                        }
+                    ]
+                })
+
+            detail = vault_details.setdefault(vault.id, {
+                'vault_id': vault.vault_id,
+                'vault_name': vault.name,
+                'positions_revalued': 0,
+                'total_delta': Decimal('0'),
+                'revaluations': []
+            })
+            detail['positions_revalued'] += 1
+            detail['total_delta'] += delta
+            detail['revaluations'].append({
+                'currency': position.currency,
+                'balance': float(amounts[i]),
+                'old_rate': float(old_rates[i]),
+                'new_rate': float(new_rates[i]),
+                'old_value': float(computed['old_values'][i]),
+                'new_value': float(computed['new_values'][i]),
+                'delta': float(delta),
+                'delta_pct': float(computed['delta_pcts'][i])
+            })
+
+        try:
+            db.session.bulk_insert_mappings(FXValuationSnapshot, snapshots)
+            db.session.bulk_update_mappings(VaultCurrencyPosition, position_updates)
+
+            if postings:
+                # Commits the snapshots and position updates together with the postings
+                posted = LedgerService.create_transactions_bulk(postings, atomic=True, created_by=created_by)
+                if not posted['committed']:
+                    raise ValueError(f"FX revaluation postings rejected: {posted['errors']}")
+                results['ledger_transactions_posted'] = posted['created_count']
+            else:
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for detail in vault_details.values():
+            results['total_unrealized_gain'] += detail['total_delta']
+            detail['total_delta'] = float(detail['total_delta'])
+            results['vault_details'].append(detail)
+
+        results['positions_revalued'] = len(candidates)
+        results['total_unrealized_gain'] = float(results['total_unrealized_gain'])
+
+        logger.info(
+            f"Batch FX revaluation: {results['positions_revalued']} positions across "
+            f"{results['vaults_processed']} vaults, {results['ledger_transactions_posted']} postings, "
+            f"total delta={results['total_unrealized_gain']}"
+        )
+
+        return results
@@ -5,7 +5,7 @@ This service handles:
 - FX rate storage and retrieval
 - Real-time rate updates
 - FX delta calculations on asset movement
-- Cross-rate computation
+- Cross-rate computation (cached rate matrix)
 - Historical rate lookups
 """
 
@@ -19,6 +19,7 @@ from backend.models.ledger import (
     FXRate, FXValuationSnapshot, Vault, VaultCurrencyPosition,
     LedgerAccount, TransactionType
 )
+from backend.services.fx_rate_cache import fx_rate_cache
 
 logger = logging.getLogger(__name__)
 
@@ -93,6 +94,7 @@ class FXService:
             fx_rate.is_current = True
         
         db.session.commit()
+        fx_rate_cache.invalidate(rate_date)
         
         logger.info(
             f"Stored FX rate: {from_currency}/{to_currency} = {rate} "
@@ -145,82 +147,14 @@ class FXService:
             
         Returns:
             Exchange rate or None
+            
+        Served from the in-process rate matrix, which resolves direct,
+        inverse and USD-cross rates without further queries.
         """
         if from_currency == to_currency:
             return Decimal('1')
         
-        if rate_date:
-            fx_rate = FXRate.query.filter_by(
-                from_currency=from_currency,
-                to_currency=to_currency,
-                rate_date=rate_date
-            ).first()
-        else:
-            fx_rate = FXRate.query.filter_by(
-                from_currency=from_currency,
-                to_currency=to_currency,
-                is_current=True
-            ).first()
-        
-        if fx_rate:
-            return Decimal(str(fx_rate.rate))
-        
-        # Try inverse
-        inverse = FXService._get_inverse_rate(from_currency, to_currency, rate_date)
-        if inverse:
-            return inverse
-        
-        # Try cross rate through USD if not direct
-        if from_currency != 'USD' and to_currency != 'USD':
-            cross = FXService._get_cross_rate(from_currency, to_currency, rate_date)
-            if cross:
-                return cross
-        
-        return None
-    
-    @staticmethod
-    def _get_inverse_rate(
-        from_currency: str,
-        to_currency: str,
-        rate_date: date = None
-    ) -> Optional[Decimal]:
-        """Calculate rate from inverse pair."""
-        if rate_date:
-            inverse = FXRate.query.filter_by(
-                from_currency=to_currency,
-                to_currency=from_currency,
-                rate_date=rate_date
-            ).first()
-        else:
-            inverse = FXRate.query.filter_by(
-                from_currency=to_currency,
-                to_currency=from_currency,
-                is_current=True
-            ).first()
-        
-        if inverse and inverse.rate > 0:
-            return (Decimal('1') / Decimal(str(inverse.rate))).quantize(
-                FXService.RATE_PRECISION, rounding=ROUND_HALF_UP
-            )
-        
-        return None
-    
-    @staticmethod
-    def _get_cross_rate(
-        from_currency: str,
-        to_currency: str,
-        rate_date: date = None
-    ) -> Optional[Decimal]:
-        """Calculate cross rate through USD."""
-        from_usd = FXService.get_rate(from_currency, 'USD', rate_date)
-        usd_to = FXService.get_rate('USD', to_currency, rate_date)
-        
-        if from_usd and usd_to:
-            return (from_usd * usd_to).quantize(
-                FXService.RATE_PRECISION, rounding=ROUND_HALF_UP
-            )
-        
-        return None
+        return fx_rate_cache.get_rate(from_currency, to_currency, rate_date)
     
     @staticmethod
     def get_all_current_rates(base_currency: str = 'USD') -> Dict[str, Decimal]:
@@ -230,15 +164,13 @@ class FXService:
         Returns:
             Dict of currency -> rate
         """
+        matrix = fx_rate_cache.get_matrix()
         rates = {}
         
         for currency in FXService.SUPPORTED_CURRENCIES:
-            if currency == base_currency:
-                rates[currency] = Decimal('1')
-            else:
-                rate = FXService.get_rate(currency, base_currency)
-                if rate:
-                    rates[currency] = rate
+            rate = matrix.get(currency, base_currency)
+            if rate:
+                rates[currency] = rate
         
         return rates
     
@@ -374,54 +306,17 @@ class FXService:
         Returns:
             Summary of revaluations
         """
-        from backend.services.vault_service import VaultService
+        from backend.services.fx_revaluation_engine import FXRevaluationEngine
         
         # Get current rates if not provided
         if not current_rates:
             current_rates = FXService.get_all_current_rates(base_currency)
         
-        # Find all vaults with auto-revaluation enabled
-        vaults = Vault.query.filter_by(
-            auto_fx_revaluation=True,
-            is_active=True
-        ).all()
-        
-        results = {
-            'vaults_processed': 0,
-            'positions_revalued': 0,
-            'total_unrealized_gain': Decimal('0'),
-            'vault_details': []
-        }
-        
-        for vault in vaults:
-            try:
-                revaluations = VaultService.revalue_positions(vault, current_rates)
-                
-                vault_gain = sum(r['delta'] for r in revaluations)
-                
-                results['vaults_processed'] += 1
-                results['positions_revalued'] += len(revaluations)
-                results['total_unrealized_gain'] += Decimal(str(vault_gain))
-                
-                if revaluations:
-                    results['vault_details'].append({
-                        'vault_id': vault.vault_id,
-                        'vault_name': vault.name,
-                        'positions_revalued': len(revaluations),
-                        'total_delta': vault_gain,
-                        'revaluations': revaluations
-                    })
-            except Exception as e:
-                logger.error(f"Failed to revalue vault {vault.vault_id}: {e}")
-        
-        results['total_unrealized_gain'] = float(results['total_unrealized_gain'])
-        
-        logger.info(
-            f"Revalued {results['positions_revalued']} positions across "
-            f"{results['vaults_processed']} vaults, total delta={results['total_unrealized_gain']}"
+        # All auto-revaluing vaults are processed in one batch
+        return FXRevaluationEngine.revalue(
+            base_currency=base_currency,
+            current_rates=current_rates
         )
-        
-        return results
     
     @staticmethod
     def get_fx_exposure_report(
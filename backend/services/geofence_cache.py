@@ -0,0 +1,141 @@
+"""
+Geofence Cache: In-process map of HELD freight escrows keyed by route.
+
+GPS pings arrive every few seconds per truck, so the geo-fence check must
+not query FreightEscrow per ping. Each route with a HELD escrow maps to that
+escrow's destination fence; a ping is a crossing when it falls inside it.
+
+The cache is per process. Escrows written through this process's session are
+applied immediately via mapper events; the whole cache is rebuilt every
+REBUILD_INTERVAL_SECONDS to pick up escrows locked or released by other
+workers. Callers re-check the escrow row before releasing, so a stale entry
+can only cost a lookup, never a double release.
+"""
+
+from typing import Dict, Optional
+import threading
+import time
+import logging
+
+from sqlalchemy import event
+
+from backend.models.logistics_v2 import FreightEscrow
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GEOFENCE_RADIUS_METERS = 200.0
+
+
+class EscrowFence:
+    __slots__ = ('escrow_id', 'route_id', 'destination_lat', 'destination_lng', 'radius_meters')
+
+    def __init__(self, escrow_id, route_id, destination_lat, destination_lng, radius_meters):
+        self.escrow_id = escrow_id
+        self.route_id = route_id
+        self.destination_lat = destination_lat
+        self.destination_lng = destination_lng
+        self.radius_meters = radius_meters or DEFAULT_GEOFENCE_RADIUS_METERS
+
+
+class EscrowGeofenceCache:
+    """Thread-safe route_id -> HELD escrow fence map."""
+
+    REBUILD_INTERVAL_SECONDS = 60
+    LOAD_BATCH_SIZE = 5000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # route_id -> EscrowFence (oldest HELD escrow, as with .first())
+        self._fences = {}
+        self._last_rebuild = None
+
+    def rebuild(self) -> int:
+        """Reload every HELD escrow from the database."""
+        with self._lock:
+            fences = {}
+            last_id = 0
+            while True:
+                rows = FreightEscrow.query.with_entities(
+                    FreightEscrow.id,
+                    FreightEscrow.route_id,
+                    FreightEscrow.destination_lat,
+                    FreightEscrow.destination_lng,
+                    FreightEscrow.geo_fence_radius_meters
+                ).filter(
+                    FreightEscrow.status == 'HELD',
+                    FreightEscrow.id > last_id
+                ).order_by(FreightEscrow.id).limit(self.LOAD_BATCH_SIZE).all()
+
+                for escrow_id, route_id, lat, lng, radius in rows:
+                    if route_id not in fences:
+                        fences[route_id] = EscrowFence(escrow_id, route_id, lat, lng, radius)
+                if len(rows) < self.LOAD_BATCH_SIZE:
+                    break
+                last_id = rows[-1][0]
+
+            self._fences = fences
+            self._last_rebuild = time.monotonic()
+            loaded = len(fences)
+        logger.info(f"Rebuilt escrow geofence cache with {loaded} held escrows")
+        return loaded
+
+    def sync(self):
+        """Rebuild if the cache was never built or is due."""
+        with self._lock:
+            if self._last_rebuild is None or time.monotonic() - self._last_rebuild >= self.REBUILD_INTERVAL_SECONDS:
+                self.rebuild()
+
+    def upsert(self, escrow_id: int, route_id: int, destination_lat: float,
+               destination_lng: float, radius_meters: Optional[float], status: Optional[str]):
+        if escrow_id is None:
+            return
+        with self._lock:
+            current = self._fences.get(route_id)
+            if status == 'HELD':
+                if current is None or current.escrow_id >= escrow_id:
+                    self._fences[route_id] = EscrowFence(
+                        escrow_id, route_id, destination_lat, destination_lng, radius_meters
+                    )
+            elif current is not None and current.escrow_id == escrow_id:
+                # Another HELD escrow on the route is picked up by the next rebuild
+                del self._fences[route_id]
+
+    def remove(self, escrow_id: int, route_id: int):
+        with self._lock:
+            current = self._fences.get(route_id)
+            if current is not None and current.escrow_id == escrow_id:
+                del self._fences[route_id]
+
+    def get(self, route_id: int, sync: bool = True) -> Optional[EscrowFence]:
+        if sync:
+            self.sync()
+        with self._lock:
+            return self._fences.get(route_id)
+
+    def snapshot(self, sync: bool = True) -> Dict[int, EscrowFence]:
+        """Copy of the route -> fence map, for evaluating a batch without holding the lock."""
+        if sync:
+            self.sync()
+        with self._lock:
+            return dict(self._fences)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'held_escrows': len(self._fences)}
+
+
+geofence_cache = EscrowGeofenceCache()
+
+
+@event.listens_for(FreightEscrow, 'after_insert')
+@event.listens_for(FreightEscrow, 'after_update')
+def _cache_escrow(mapper, connection, target):
+    geofence_cache.upsert(
+        target.id, target.route_id, target.destination_lat, target.destination_lng,
+        target.geo_fence_radius_meters, target.status or 'HELD'
+    )
+
+
+@event.listens_for(FreightEscrow, 'after_delete')
+def _uncache_escrow(mapper, connection, target):
+    geofence_cache.remove(target.id, target.route_id)
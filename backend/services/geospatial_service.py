@@ -10,10 +10,15 @@ from datetime import datetime, timedelta
 from typing import List, Tuple, Dict, Optional
 from collections import defaultdict
 
+import numpy as np
+
 from sqlalchemy import func, and_, or_
 from geoalchemy2.functions import ST_DWithin, ST_Distance, ST_MakePoint, ST_AsText
 from backend.extensions import db
 from backend.models import DiseaseIncident, OutbreakZone, User, OutbreakAlert
+from backend.services.incident_index import ACTIVE_STATUSES, incident_index
+from backend.utils.spatial_index import GeoGridIndex, bounding_box, KM_PER_DEGREE_LAT
+from backend.utils.geo_distance import haversine_matrix, haversine_many
 from backend.utils.logger import logger
 
 
@@ -24,6 +29,9 @@ class GeospatialService:
     OUTBREAK_THRESHOLD = 3  # Minimum incidents to declare outbreak
     CLUSTERING_RADIUS_KM = 50  # Default clustering radius
     EARTH_RADIUS_KM = 6371  # Earth's radius in kilometers
+    ID_BATCH_SIZE = 500  # Max ids per IN (...) lookup
+    ZONE_BATCH_SIZE = 50  # Zone bounding boxes per farmer prefilter query
+    FARMER_BATCH_SIZE = 20000  # Farmers per distance matrix chunk
     
     @staticmethod
     def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -86,7 +94,7 @@ class GeospatialService:
                         True  # Use spheroid for accurate distance
                     ),
                     DiseaseIncident.reported_at >= cutoff_date,
-                    DiseaseIncident.status.in_(['reported', 'verified'])
+                    DiseaseIncident.verification_status.in_(ACTIVE_STATUSES)
                 )
             )
             
@@ -120,34 +128,38 @@ class GeospatialService:
                                            crop_affected: Optional[str] = None,
                                            days_back: int = 30) -> List[DiseaseIncident]:
         """
-        Fallback method using Python calculations when PostGIS is unavailable.
+        Fallback method when PostGIS is unavailable.
+
+        Candidates come from the in-process incident index, so only incidents
+        inside the radius are loaded; date and status are re-checked in SQL.
         """
         cutoff_date = datetime.utcnow() - timedelta(days=days_back)
         
-        query = DiseaseIncident.query.filter(
-            and_(
-                DiseaseIncident.reported_at >= cutoff_date,
-                DiseaseIncident.status.in_(['reported', 'verified'])
-            )
+        candidates = incident_index.query_radius(
+            center_lat, center_lon, radius_km,
+            disease_name=disease_name,
+            crop_affected=crop_affected,
+            reported_after=cutoff_date,
+            statuses=ACTIVE_STATUSES
         )
+        if not candidates:
+            return []
         
-        if disease_name:
-            query = query.filter(DiseaseIncident.disease_name == disease_name)
-        
-        if crop_affected:
-            query = query.filter(DiseaseIncident.crop_affected == crop_affected)
-        
-        all_incidents = query.all()
+        distances = dict(candidates)
+        candidate_ids = list(distances)
         
-        # Filter by distance using Haversine
         nearby_incidents = []
-        for incident in all_incidents:
-            distance = GeospatialService.calculate_distance(
-                center_lat, center_lon,
-                incident.latitude, incident.longitude
-            )
-            if distance <= radius_km:
-                nearby_incidents.append(incident)
+        for i in range(0, len(candidate_ids), GeospatialService.ID_BATCH_SIZE):
+            nearby_incidents.extend(DiseaseIncident.query.filter(
+                and_(
+                    DiseaseIncident.id.in_(candidate_ids[i:i + GeospatialService.ID_BATCH_SIZE]),
+                    DiseaseIncident.reported_at >= cutoff_date,
+                    DiseaseIncident.verification_status.in_(ACTIVE_STATUSES)
+                )
+            ).all())
+        
+        # Closest first, as returned by the index
+        nearby_incidents.sort(key=lambda incident: distances[incident.id])
         
         return nearby_incidents
     
@@ -172,7 +184,7 @@ class GeospatialService:
         incidents = DiseaseIncident.query.filter(
             and_(
                 DiseaseIncident.reported_at >= cutoff_date,
-                DiseaseIncident.status.in_(['reported', 'verified']),
+                DiseaseIncident.verification_status.in_(ACTIVE_STATUSES),
                 DiseaseIncident.outbreak_zone_id.is_(None)  # Not yet assigned to outbreak
             )
         ).order_by(DiseaseIncident.reported_at.desc()).all()
@@ -193,7 +205,7 @@ class GeospatialService:
             if len(group_incidents) < min_incidents:
                 continue
             
-            # DBSCAN-like clustering
+            # DBSCAN clustering
             cluster_candidates = GeospatialService._find_dense_clusters(
                 group_incidents, radius_km, min_incidents
             )
@@ -204,19 +216,7 @@ class GeospatialService:
                 center_lon = sum(inc.longitude for inc in cluster) / len(cluster)
                 
                 # Calculate severity level
-                severity_counts = defaultdict(int)
-                for inc in cluster:
-                    severity_counts[inc.severity] += 1
-                
-                # Determine overall severity
-                if severity_counts.get('critical', 0) > 0:
-                    severity_level = 'critical'
-                elif severity_counts.get('high', 0) >= len(cluster) / 2:
-                    severity_level = 'high'
-                elif severity_counts.get('medium', 0) >= len(cluster) / 2:
-                    severity_level = 'medium'
-                else:
-                    severity_level = 'low'
+                severity_level = GeospatialService._cluster_severity([inc.severity_level for inc in cluster])
                 
                 clusters.append({
                     'disease_name': disease_name,
@@ -227,51 +227,91 @@ class GeospatialService:
                     'incident_count': len(cluster),
                     'incidents': cluster,
                     'severity_level': severity_level,
-                    'total_affected_area': sum(inc.affected_area_hectares or 0 for inc in cluster)
+                    'total_affected_area': sum(inc.affected_area or 0 for inc in cluster)
                 })
         
         return clusters
     
+    @staticmethod
+    def _cluster_severity(severities: List[str]) -> str:
+        """Overall severity of a cluster from its incidents' severities."""
+        severity_counts = defaultdict(int)
+        for severity in severities:
+            severity_counts[severity] += 1
+        
+        if severity_counts.get('critical', 0) > 0:
+            return 'critical'
+        elif severity_counts.get('high', 0) >= len(severities) / 2:
+            return 'high'
+        elif severity_counts.get('medium', 0) >= len(severities) / 2:
+            return 'medium'
+        return 'low'
+    
     @staticmethod
     def _find_dense_clusters(incidents: List[DiseaseIncident], 
                             radius_km: float, 
                             min_incidents: int) -> List[List[DiseaseIncident]]:
         """
-        Find dense clusters using a simplified DBSCAN approach.
+        Find dense clusters with DBSCAN.
+        
+        A core incident has at least min_incidents incidents (itself
+        included) within radius_km. Clusters are expanded through
+        chains of cores, so membership doesn't depend on visit order; a
+        border incident reachable from several clusters joins the first one
+        to reach it. Neighbor lookups go through a grid index sized to the
+        clustering radius.
         """
-        visited = set()
+        grid = GeoGridIndex(cell_size_km=radius_km)
+        by_id = {}
+        for incident in incidents:
+            grid.insert(incident.id, incident.latitude, incident.longitude)
+            by_id[incident.id] = incident
+        
+        neighborhoods = {
+            incident.id: [key for key, _, _ in grid.query_radius(incident.latitude, incident.longitude, radius_km)]
+            for incident in incidents
+        }
+        is_core = {key: len(neighbors) >= min_incidents for key, neighbors in neighborhoods.items()}
+        
+        assigned = set()
         clusters = []
         
         for incident in incidents:
-            if incident.id in visited:
+            if incident.id in assigned or not is_core[incident.id]:
                 continue
             
-            # Find all neighbors within radius
-            neighbors = []
-            for other in incidents:
-                if other.id == incident.id:
+            # Expand the cluster through every reachable core
+            cluster = []
+            frontier = [incident.id]
+            assigned.add(incident.id)
+            while frontier:
+                key = frontier.pop()
+                cluster.append(by_id[key])
+                if not is_core[key]:
                     continue
-                
-                distance = GeospatialService.calculate_distance(
-                    incident.latitude, incident.longitude,
-                    other.latitude, other.longitude
-                )
-                
-                if distance <= radius_km:
-                    neighbors.append(other)
+                for neighbor in neighborhoods[key]:
+                    if neighbor not in assigned:
+                        assigned.add(neighbor)
+                        frontier.append(neighbor)
             
-            # If enough neighbors, create cluster
-            if len(neighbors) + 1 >= min_incidents:
-                cluster = [incident] + neighbors
-                clusters.append(cluster)
-                
-                # Mark as visited
-                visited.add(incident.id)
-                for neighbor in neighbors:
-                    visited.add(neighbor.id)
+            clusters.append(cluster)
         
         return clusters
     
+    @staticmethod
+    def update_outbreak_zones(radius_km: float = CLUSTERING_RADIUS_KM,
+                              min_incidents: int = OUTBREAK_THRESHOLD,
+                              days_back: int = 30) -> Dict:
+        """
+        Incrementally cluster incidents reported since the last run into
+        OutbreakZones, growing or merging existing zones as needed.
+        
+        Returns:
+            Summary of zones created, grown and merged
+        """
+        from backend.services.outbreak_clustering import IncrementalOutbreakClusterer
+        return IncrementalOutbreakClusterer(radius_km, min_incidents, days_back).run()
+    
     @staticmethod
     def create_outbreak_zone(cluster_data: Dict) -> OutbreakZone:
         """
@@ -333,71 +373,134 @@ class GeospatialService:
         Returns:
             List of tuples (User, distance_km)
         """
-        warning_radius = outbreak_zone.radius_km * radius_multiplier
-        
-        # Get farmers with registered farm locations
-        farmers = User.query.filter(
-            and_(
-                User.role == 'farmer',
-                User.farm_latitude.isnot(None),
-                User.farm_longitude.isnot(None)
-            )
-        ).all()
+        return GeospatialService.find_farmers_at_risk_bulk(
+            [outbreak_zone], radius_multiplier
+        ).get(outbreak_zone.id, [])
+    
+    @staticmethod
+    def find_farmers_at_risk_bulk(outbreak_zones: List[OutbreakZone],
+                                  radius_multiplier: float = 1.5) -> Dict[int, List[Tuple[User, float]]]:
+        """
+        Find at-risk farmers for many outbreak zones in one pass.
         
-        at_risk_farmers = []
+        Farmer coordinates are prefiltered in SQL by each zone's bounding
+        box, then every (zone, farmer) distance is computed as one NumPy
+        matrix per chunk.
         
-        for farmer in farmers:
-            distance = GeospatialService.calculate_distance(
-                outbreak_zone.center_latitude,
-                outbreak_zone.center_longitude,
-                farmer.farm_latitude,
-                farmer.farm_longitude
-            )
+        Args:
+            outbreak_zones: OutbreakZones to check
+            radius_multiplier: Multiplier for warning radius (default 1.5x)
+            
+        Returns:
+            Dict of zone ID -> list of (User, distance_km), closest first
+        """
+        zones = [zone for zone in outbreak_zones
+                 if zone.center_latitude is not None and zone.center_longitude is not None]
+        results = {zone.id: [] for zone in outbreak_zones}
+        if not zones:
+            return results
+        
+        zone_lats = np.array([zone.center_latitude for zone in zones], dtype=np.float64)
+        zone_lons = np.array([zone.center_longitude for zone in zones], dtype=np.float64)
+        warning_radii = np.array([zone.radius_km * radius_multiplier for zone in zones], dtype=np.float64)
+        
+        # Candidate farmer coordinates, one bounding-box OR per zone chunk
+        candidates = {}
+        for i in range(0, len(zones), GeospatialService.ZONE_BATCH_SIZE):
+            boxes = []
+            for j in range(i, min(i + GeospatialService.ZONE_BATCH_SIZE, len(zones))):
+                min_lat, max_lat, min_lon, max_lon = bounding_box(zone_lats[j], zone_lons[j], warning_radii[j])
+                box = [User.farm_latitude.between(min_lat, max_lat)]
+                if min_lon > -180.0 or max_lon < 180.0:
+                    box.append(User.farm_longitude.between(min_lon, max_lon))
+                boxes.append(and_(*box))
             
-            if distance <= warning_radius:
-                at_risk_farmers.append((farmer, distance))
+            rows = User.query.with_entities(
+                User.id, User.farm_latitude, User.farm_longitude
+            ).filter(
+                and_(
+                    User.role == 'farmer',
+                    User.farm_latitude.isnot(None),
+                    User.farm_longitude.isnot(None),
+                    or_(*boxes)
+                )
+            ).all()
+            for user_id, lat, lon in rows:
+                candidates[user_id] = (lat, lon)
         
-        # Sort by distance (closest first)
-        at_risk_farmers.sort(key=lambda x: x[1])
+        if not candidates:
+            return results
+        
+        farmer_ids = np.fromiter(candidates.keys(), dtype=np.int64, count=len(candidates))
+        farmer_coords = np.array(list(candidates.values()), dtype=np.float64)
         
-        return at_risk_farmers
+        hits = defaultdict(list)
+        for start in range(0, len(farmer_ids), GeospatialService.FARMER_BATCH_SIZE):
+            chunk = slice(start, start + GeospatialService.FARMER_BATCH_SIZE)
+            distances = haversine_matrix(
+                zone_lats, zone_lons, farmer_coords[chunk, 0], farmer_coords[chunk, 1]
+            )
+            chunk_ids = farmer_ids[chunk]
+            zone_idx, farmer_idx = np.nonzero(distances <= warning_radii[:, np.newaxis])
+            for z, f in zip(zone_idx.tolist(), farmer_idx.tolist()):
+                hits[z].append((int(chunk_ids[f]), float(distances[z, f])))
+        
+        at_risk_ids = list({user_id for zone_hits in hits.values() for user_id, _ in zone_hits})
+        users = {}
+        for i in range(0, len(at_risk_ids), GeospatialService.ID_BATCH_SIZE):
+            for user in User.query.filter(User.id.in_(at_risk_ids[i:i + GeospatialService.ID_BATCH_SIZE])).all():
+                users[user.id] = user
+        
+        for z, zone_hits in hits.items():
+            # Sort by distance (closest first)
+            zone_hits.sort(key=lambda hit: hit[1])
+            results[zones[z].id] = [
+                (users[user_id], distance) for user_id, distance in zone_hits if user_id in users
+            ]
+        
+        return results
     
     @staticmethod
-    def check_user_in_outbreak_zones(user_id: int) -> List[Tuple[OutbreakZone, float]]:
+    def check_user_in_outbreak_zones(user) -> List[Tuple[OutbreakZone, float]]:
         """
         Check if a user's farm location is within any active outbreak zones.
         
         Args:
-            user_id: User ID to check
+            user: User or user ID to check
             
         Returns:
             List of tuples (OutbreakZone, distance_km) for zones within risk radius
         """
-        user = User.query.get(user_id)
+        if not isinstance(user, User):
+            user = User.query.get(user)
         
         if not user or not user.farm_latitude or not user.farm_longitude:
             return []
         
-        # Get active outbreak zones
+        # Include zones within 1.5x radius for early warning; the latitude
+        # band is exact per zone, longitude is left to the distance check
+        warning_radius = OutbreakZone.radius_km * 1.5
         active_zones = OutbreakZone.query.filter(
-            OutbreakZone.status == 'active'
+            and_(
+                OutbreakZone.status == 'active',
+                func.abs(OutbreakZone.center_latitude - user.farm_latitude) * KM_PER_DEGREE_LAT <= warning_radius
+            )
         ).all()
         
-        nearby_zones = []
+        if not active_zones:
+            return []
         
-        for zone in active_zones:
-            distance = GeospatialService.calculate_distance(
-                user.farm_latitude,
-                user.farm_longitude,
-                zone.center_latitude,
-                zone.center_longitude
-            )
-            
-            # Include zones within 1.5x radius for early warning
-            warning_radius = zone.radius_km * 1.5
-            
-            if distance <= warning_radius:
-                nearby_zones.append((zone, distance))
+        distances = haversine_many(
+            user.farm_latitude, user.farm_longitude,
+            [zone.center_latitude for zone in active_zones],
+            [zone.center_longitude for zone in active_zones]
+        )
+        radii = np.array([zone.radius_km * 1.5 for zone in active_zones], dtype=np.float64)
+        
+        nearby_zones = [
+            (active_zones[i], float(distances[i]))
+            for i in np.nonzero(distances <= radii)[0].tolist()
+        ]
         
         # Sort by distance (closest first)
         nearby_zones.sort(key=lambda x: x[1])
@@ -0,0 +1,199 @@
+"""
+Incident Index: In-process spatial index over DiseaseIncident locations.
+
+Keeps a GeoGridIndex of every incident's coordinates plus the attributes the
+radius queries filter on (disease, crop, report time, verification status), so
+the non-PostGIS radius fallback and outbreak clustering only load the
+incidents they actually use.
+
+The index is per process. Inserts, updates and deletes made through this
+process's session are applied immediately via mapper events; rows written by
+other workers are picked up incrementally (id > high-water mark) every
+SYNC_INTERVAL_SECONDS, and the whole index is rebuilt every
+REBUILD_INTERVAL_SECONDS to drop rows deleted elsewhere. Callers re-check
+candidates against the database, so a briefly stale entry is harmless.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+import logging
+
+from sqlalchemy import event
+
+from backend.models.gews import DiseaseIncident
+from backend.utils.spatial_index import GeoGridIndex
+
+logger = logging.getLogger(__name__)
+
+# Verification statuses of incidents that count towards radius queries and outbreaks
+ACTIVE_STATUSES = ('pending', 'verified')
+
+
+class IncidentSpatialIndex:
+    """Thread-safe grid index of incident id -> (lat, lon, attributes)."""
+
+    CELL_SIZE_KM = 25.0
+    SYNC_INTERVAL_SECONDS = 30
+    REBUILD_INTERVAL_SECONDS = 3600
+    LOAD_BATCH_SIZE = 5000
+
+    def __init__(self, cell_size_km: float = CELL_SIZE_KM):
+        self._lock = threading.RLock()
+        self._grid = GeoGridIndex(cell_size_km)
+        self._high_water_id = 0
+        self._last_sync = None
+        self._last_rebuild = None
+
+    @staticmethod
+    def _payload(disease_name, crop_affected, reported_at, verification_status) -> Tuple:
+        return (disease_name, crop_affected, reported_at, verification_status)
+
+    def _load_since(self, min_id: int) -> int:
+        """Add incidents with id > min_id in keyset batches; returns rows loaded."""
+        loaded = 0
+        last_id = min_id
+        while True:
+            rows = DiseaseIncident.query.with_entities(
+                DiseaseIncident.id,
+                DiseaseIncident.latitude,
+                DiseaseIncident.longitude,
+                DiseaseIncident.disease_name,
+                DiseaseIncident.crop_affected,
+                DiseaseIncident.reported_at,
+                DiseaseIncident.verification_status
+            ).filter(
+                DiseaseIncident.id > last_id
+            ).order_by(DiseaseIncident.id).limit(self.LOAD_BATCH_SIZE).all()
+
+            if not rows:
+                break
+
+            with self._lock:
+                for incident_id, lat, lon, disease_name, crop_affected, reported_at, status in rows:
+                    if lat is None or lon is None:
+                        continue
+                    self._grid.insert(
+                        incident_id, lat, lon,
+                        self._payload(disease_name, crop_affected, reported_at, status)
+                    )
+                last_id = rows[-1][0]
+                self._high_water_id = max(self._high_water_id, last_id)
+
+            loaded += len(rows)
+            if len(rows) < self.LOAD_BATCH_SIZE:
+                break
+
+        return loaded
+
+    def rebuild(self) -> int:
+        """Reload every incident from the database."""
+        with self._lock:
+            self._grid.clear()
+            self._high_water_id = 0
+            loaded = self._load_since(0)
+            now = time.monotonic()
+            self._last_sync = now
+            self._last_rebuild = now
+        logger.info(f"Rebuilt incident spatial index with {loaded} incidents")
+        return loaded
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Bring the index up to date if it's due.
+
+        Returns:
+            Number of incidents loaded
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._last_rebuild is None or now - self._last_rebuild >= self.REBUILD_INTERVAL_SECONDS:
+                return self.rebuild()
+            if not force and now - self._last_sync < self.SYNC_INTERVAL_SECONDS:
+                return 0
+            loaded = self._load_since(self._high_water_id)
+            self._last_sync = now
+        return loaded
+
+    def upsert(self, incident_id: int, lat: float, lon: float,
+               disease_name: str, crop_affected: str, reported_at: datetime,
+               verification_status: str = None):
+        if incident_id is None or lat is None or lon is None:
+            return
+        with self._lock:
+            self._grid.insert(
+                incident_id, lat, lon,
+                self._payload(disease_name, crop_affected, reported_at, verification_status)
+            )
+
+    def remove(self, incident_id: int):
+        with self._lock:
+            self._grid.remove(incident_id)
+
+    def locate(self, incident_id: int) -> Optional[Tuple[float, float]]:
+        """Indexed (lat, lon) of an incident, or None."""
+        with self._lock:
+            point = self._grid.get(incident_id)
+        return (point[0], point[1]) if point else None
+
+    def query_radius(self, center_lat: float, center_lon: float, radius_km: float,
+                     disease_name: Optional[str] = None,
+                     crop_affected: Optional[str] = None,
+                     reported_after: Optional[datetime] = None,
+                     statuses: Optional[Iterable[str]] = None,
+                     sync: bool = True) -> List[Tuple[int, float]]:
+        """
+        Incident ids within radius_km matching the attribute filters.
+
+        Args:
+            statuses: Only incidents with one of these verification statuses
+            sync: Pull in new incidents first if a sync is due; batch callers
+                that already synced pass False
+
+        Returns:
+            List of (incident_id, distance_km), closest first
+        """
+        statuses = set(statuses) if statuses is not None else None
+
+        def matches(payload):
+            p_disease, p_crop, p_reported, p_status = payload
+            if disease_name and p_disease != disease_name:
+                return False
+            if crop_affected and p_crop != crop_affected:
+                return False
+            if reported_after and (p_reported is None or p_reported < reported_after):
+                return False
+            if statuses is not None and p_status not in statuses:
+                return False
+            return True
+
+        if sync:
+            self.sync()
+        with self._lock:
+            found = self._grid.query_radius(center_lat, center_lon, radius_km, matches)
+        return [(incident_id, distance) for incident_id, distance, _ in found]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = self._grid.stats()
+            stats['high_water_id'] = self._high_water_id
+            return stats
+
+
+incident_index = IncidentSpatialIndex()
+
+
+@event.listens_for(DiseaseIncident, 'after_insert')
+@event.listens_for(DiseaseIncident, 'after_update')
+def _index_incident(mapper, connection, target):
+    incident_index.upsert(
+        target.id, target.latitude, target.longitude,
+        target.disease_name, target.crop_affected, target.reported_at,
+        target.verification_status
+    )
+
+
+@event.listens_for(DiseaseIncident, 'after_delete')
+def _unindex_incident(mapper, connection, target):
+    incident_index.remove(target.id)
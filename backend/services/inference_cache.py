@@ -0,0 +1,332 @@
+"""
+Inference Cache: Disease and soil inference results keyed by content.
+
+Entries are keyed by (payload type, model version, SHA-256 of the upload), so
+an identical re-upload is answered without running the model, and a retrained
+model file (new mtime) never serves results of the previous one: entries of
+the superseded version are dropped as soon as the change is seen. Image
+entries also carry a 64-bit difference hash; a lookup that misses on the
+exact hash falls back to the closest cached image of the same type and model
+version within PHASH_MAX_DISTANCE bits.
+
+Entries live in a per-process LRU of at most MAX_ENTRIES and expire after
+TTL_SECONDS. Set INFERENCE_CACHE_BACKEND='redis' to also keep them in Redis
+(with the same TTL), so results stored by Celery workers are seen by the API
+processes that consult the cache before dispatching a task.
+"""
+
+from collections import OrderedDict
+from datetime import timezone
+from typing import Dict, Optional, Tuple
+import json
+import os
+import threading
+import time
+import logging
+
+import numpy as np
+
+from backend.monitoring.metrics import metrics
+from backend.services.model_registry import model_registry
+from backend.utils.image_hash import dhash, hamming_distances
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Version used while a payload type runs without a model file (mock results)
+BUILTIN_MODEL_VERSION = 'builtin'
+
+
+class _Entry:
+    __slots__ = ('result_json', 'phash', 'stored_at')
+
+    def __init__(self, result_json: str, phash: Optional[int], stored_at: float):
+        self.result_json = result_json
+        self.phash = phash
+        self.stored_at = stored_at
+
+
+class InferenceResultCache:
+    """Thread-safe LRU/TTL cache of inference results with a perceptual-hash index."""
+
+    TTL_SECONDS = 24 * 3600
+    MAX_ENTRIES = 10000
+    # Largest Hamming distance (of 64 bits) treated as the same image
+    PHASH_MAX_DISTANCE = 4
+    VERSION_CHECK_SECONDS = 5.0
+    REDIS_PREFIX = 'inference:cache'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (payload_type, model_version, content_hash) -> _Entry, oldest first
+        self._entries = OrderedDict()
+        # (payload_type, model_version) -> (content hashes, uint64 phash array), rebuilt when stale
+        self._phash_index = {}
+        # payload_type -> (model_version, checked_at)
+        self._versions = {}
+        self._redis = None
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """Apply app config; switch on the Redis mirror if the app asks for it."""
+        self.TTL_SECONDS = app.config.get('INFERENCE_CACHE_TTL_SECONDS', self.TTL_SECONDS)
+        self.MAX_ENTRIES = app.config.get('INFERENCE_CACHE_MAX_ENTRIES', self.MAX_ENTRIES)
+        self.PHASH_MAX_DISTANCE = app.config.get('INFERENCE_CACHE_PHASH_DISTANCE', self.PHASH_MAX_DISTANCE)
+
+        if app.config.get('INFERENCE_CACHE_BACKEND', 'memory') != 'redis':
+            return
+        try:
+            import redis
+            client = redis.from_url(app.config.get('REDIS_URL', 'redis://localhost:6379/0'))
+            client.ping()
+            self._redis = client
+        except Exception as e:
+            logger.warning(f"Redis inference cache unavailable, caching in process: {e}")
+
+    # ── Model versions ────────────────────────────────────────────────────────
+    @staticmethod
+    def _model_path(payload_type: str) -> Optional[str]:
+        if payload_type == 'DISEASE':
+            from backend.services.disease_inference_service import DiseaseInferenceService
+            return DiseaseInferenceService.MODEL_PATH
+        if payload_type == 'SOIL':
+            from backend.services.soil_inference_service import SoilInferenceService
+            return SoilInferenceService.MODEL_PATH
+        return None
+
+    def model_version(self, payload_type: str) -> Optional[str]:
+        """
+        Current model version for a payload type (the model file's mtime), or
+        None if the type has no model and is never cached. Entries of an older
+        version are dropped when a change is first seen.
+        """
+        path = self._model_path(payload_type)
+        if path is None:
+            return None
+
+        now = time.monotonic()
+        seen = self._versions.get(payload_type)
+        if seen is not None and now - seen[1] < self.VERSION_CHECK_SECONDS:
+            return seen[0]
+
+        version = model_registry.file_version(path) or BUILTIN_MODEL_VERSION
+        with self._lock:
+            if seen is not None and seen[0] != version:
+                self._drop_type(payload_type)
+                logger.info(f"{payload_type} model changed; dropped cached results of version {seen[0]}")
+            self._versions[payload_type] = (version, now)
+        return version
+
+    def _drop_type(self, payload_type: str):
+        """Remove every local entry of a payload type. Call under _lock."""
+        for key in [key for key in self._entries if key[0] == payload_type]:
+            del self._entries[key]
+        for index_key in [index_key for index_key in self._phash_index if index_key[0] == payload_type]:
+            del self._phash_index[index_key]
+
+    # ── Storage ───────────────────────────────────────────────────────────────
+    @staticmethod
+    def _phash(file_path: Optional[str]) -> Optional[int]:
+        if not file_path or os.path.splitext(file_path)[1].lower() not in IMAGE_EXTENSIONS:
+            return None
+        try:
+            return dhash(file_path)
+        except Exception as e:
+            logger.debug(f"No perceptual hash for {file_path}: {e}")
+            return None
+
+    def _redis_key(self, payload_type: str, version: str, content_hash: str = None) -> str:
+        if content_hash is None:
+            return f"{self.REDIS_PREFIX}:phash:{payload_type}:{version}"
+        return f"{self.REDIS_PREFIX}:result:{payload_type}:{version}:{content_hash}"
+
+    def _put_local(self, key: Tuple[str, str, str], result_json: str, phash: Optional[int]):
+        with self._lock:
+            self._entries[key] = _Entry(result_json, phash, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.MAX_ENTRIES:
+                evicted, _ = self._entries.popitem(last=False)
+                self._phash_index.pop(evicted[:2], None)
+            if phash is not None:
+                self._phash_index.pop(key[:2], None)
+
+    def _get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """Result JSON for a key: local LRU first, then the Redis mirror."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry.stored_at < self.TTL_SECONDS:
+                    self._entries.move_to_end(key)
+                    return entry.result_json
+                del self._entries[key]
+                self._phash_index.pop(key[:2], None)
+
+        if self._redis is None:
+            return None
+        try:
+            result_json = self._redis.get(self._redis_key(*key))
+            if result_json is None:
+                return None
+            result_json = result_json.decode() if isinstance(result_json, bytes) else result_json
+            phash = self._redis.hget(self._redis_key(*key[:2]), key[2])
+        except Exception as e:
+            logger.error(f"Redis inference cache read failed: {e}")
+            return None
+        self._put_local(key, result_json, int(phash) if phash is not None else None)
+        return result_json
+
+    def store(self, payload_type: str, content_hash: Optional[str], result: Dict,
+              file_path: Optional[str] = None) -> bool:
+        """
+        Cache a finished result. Results of uncacheable types, uploads without
+        a content hash and error results are ignored.
+
+        Returns:
+            Whether the result was cached
+        """
+        if not content_hash or not result or 'error' in result:
+            return False
+        version = self.model_version(payload_type)
+        if version is None:
+            return False
+
+        key = (payload_type, version, content_hash)
+        result_json = json.dumps(result)
+        phash = self._phash(file_path)
+        self._put_local(key, result_json, phash)
+
+        if self._redis is not None:
+            try:
+                pipe = self._redis.pipeline()
+                pipe.setex(self._redis_key(*key), int(self.TTL_SECONDS), result_json)
+                if phash is not None:
+                    pipe.hset(self._redis_key(payload_type, version), content_hash, phash)
+                    pipe.expire(self._redis_key(payload_type, version), int(self.TTL_SECONDS))
+                pipe.execute()
+            except Exception as e:
+                logger.error(f"Redis inference cache write failed: {e}")
+        return True
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+    def _local_phashes(self, payload_type: str, version: str) -> Tuple[list, np.ndarray]:
+        index_key = (payload_type, version)
+        with self._lock:
+            index = self._phash_index.get(index_key)
+            if index is None:
+                now = time.monotonic()
+                pairs = [
+                    (key[2], entry.phash) for key, entry in self._entries.items()
+                    if key[:2] == index_key and entry.phash is not None
+                    and now - entry.stored_at < self.TTL_SECONDS
+                ]
+                index = self._phash_index[index_key] = (
+                    [content_hash for content_hash, _ in pairs],
+                    np.array([phash for _, phash in pairs], dtype=np.uint64)
+                )
+            return index
+
+    def _nearest(self, payload_type: str, version: str, phash: int) -> Optional[str]:
+        """Content hash of the closest cached image within PHASH_MAX_DISTANCE bits."""
+        content_hashes, phashes = self._local_phashes(payload_type, version)
+
+        if self._redis is not None:
+            try:
+                shared = self._redis.hgetall(self._redis_key(payload_type, version))
+            except Exception as e:
+                logger.error(f"Redis perceptual hash read failed: {e}")
+                shared = {}
+            if shared:
+                content_hashes = content_hashes + [
+                    content_hash.decode() if isinstance(content_hash, bytes) else content_hash
+                    for content_hash in shared
+                ]
+                phashes = np.concatenate([phashes, np.array([int(v) for v in shared.values()], dtype=np.uint64)])
+
+        if not len(phashes):
+            return None
+        distances = hamming_distances(phash, phashes)
+        best = int(distances.argmin())
+        if distances[best] > self.PHASH_MAX_DISTANCE:
+            return None
+        return content_hashes[best]
+
+    def lookup(self, payload_type: str, content_hash: Optional[str],
+               file_path: Optional[str] = None, stage: str = 'ingest') -> Optional[Dict]:
+        """
+        Cached result for an upload: exact content first, then (for images
+        at `file_path`) the nearest perceptual match.
+
+        Args:
+            stage: 'ingest' before dispatch, 'worker' inside the task; a metric label
+
+        Returns:
+            A fresh copy of the result, or None on a miss
+        """
+        if not content_hash:
+            return None
+        version = self.model_version(payload_type)
+        if version is None:
+            return None
+
+        outcome = 'hit'
+        result_json = self._get((payload_type, version, content_hash))
+        if result_json is None:
+            phash = self._phash(file_path)
+            match = self._nearest(payload_type, version, phash) if phash is not None else None
+            if match is not None:
+                result_json = self._get((payload_type, version, match))
+                outcome = 'near_hit'
+        if result_json is None:
+            outcome = 'miss'
+
+        self._record(payload_type, outcome, stage)
+        return json.loads(result_json) if result_json is not None else None
+
+    def is_current(self, payload_type: str, processed_at) -> bool:
+        """Whether a result processed at `processed_at` (naive UTC) came from the current model."""
+        path = self._model_path(payload_type)
+        if path is None or processed_at is None:
+            return False
+        try:
+            return processed_at.replace(tzinfo=timezone.utc).timestamp() >= os.path.getmtime(path)
+        except OSError:
+            return True
+
+    # ── Reporting ─────────────────────────────────────────────────────────────
+    def _record(self, payload_type: str, outcome: str, stage: str):
+        with self._lock:
+            if outcome == 'hit':
+                self.hits += 1
+            elif outcome == 'near_hit':
+                self.near_hits += 1
+            else:
+                self.misses += 1
+        metrics.increment('agritech_inference_cache_lookups_total',
+                          labels={'payload_type': payload_type, 'outcome': outcome, 'stage': stage})
+
+    def invalidate(self, payload_type: str = None):
+        """Drop local entries of one payload type, or all of them."""
+        with self._lock:
+            if payload_type is None:
+                self._entries.clear()
+                self._phash_index.clear()
+            else:
+                self._drop_type(payload_type)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                'hits': self.hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'backend': 'redis' if self._redis is not None else 'memory'
+            }
+
+
+inference_cache = InferenceResultCache()
@@ -5,19 +5,30 @@ This service handles:
 - Creating balanced ledger transactions
 - Double-entry validation
 - Account balance reconstruction
+- Materialized balance snapshots and checkpoints
 - Transaction reversal
 - Ledger auditing and reporting
 """
 
 from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import List, Dict, Optional, Tuple
+import base64
+import csv
+import hashlib
+import hmac
+import io
+import json
 import uuid
 import logging
 
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
 from backend.extensions import db
 from backend.models.ledger import (
     LedgerAccount, LedgerTransaction, LedgerEntry,
+    LedgerAccountBalance, LedgerBalanceCheckpoint,
     AccountType, EntryType, TransactionType, FXRate
 )
 
@@ -105,55 +116,27 @@ class LedgerService:
         return account, True
     
     @staticmethod
-    def create_transaction(
-        transaction_type: TransactionType,
+    def _prepare_entries(
         entries: List[Dict],
-        description: str = None,
-        reference_number: str = None,
-        source_type: str = None,
-        source_id: int = None,
-        base_currency: str = 'USD',
-        created_by: int = None,
-        entry_date: datetime = None
-    ) -> LedgerTransaction:
+        base_currency: str,
+        entry_date: datetime
+    ) -> Tuple[List[Dict], Decimal]:
         """
-        Create a balanced double-entry transaction.
+        Normalize entry dicts into LedgerEntry column values and check balance.
         
-        Args:
-            transaction_type: Type of transaction
-            entries: List of entry dicts with:
-                - account_id: Target account ID
-                - entry_type: 'DEBIT' or 'CREDIT'
-                - amount: Amount in account currency
-                - currency: Currency of amount
-                - fx_rate: Optional FX rate to base currency
-                - memo: Optional entry memo
-            description: Transaction description
-            reference_number: External reference (invoice, etc.)
-            source_type: Type of source operation
-            source_id: ID of source operation
-            base_currency: Base currency for reporting
-            created_by: User ID who created transaction
-            entry_date: Date for entries (defaults to now)
-            
         Returns:
-            Created LedgerTransaction
+            Tuple of (prepared entry dicts, total debit in base currency)
             
         Raises:
-            ValueError: If transaction is not balanced
+            ValueError: If there are fewer than 2 entries or they don't balance
         """
         if not entries or len(entries) < 2:
             raise ValueError("Transaction requires at least 2 entries (debit and credit)")
         
-        # Generate transaction ID
-        transaction_id = str(uuid.uuid4())
-        
         # Calculate total base amount
         total_debit_base = Decimal('0')
         total_credit_base = Decimal('0')
         
-        entry_date = entry_date or datetime.utcnow()
-        
         # Validate and prepare entries
         prepared_entries = []
         for entry_data in entries:
@@ -198,6 +181,55 @@ class LedgerService:
                 f"Credits={total_credit_base}, Diff={total_debit_base - total_credit_base}"
             )
         
+        return prepared_entries, total_debit_base
+    
+    @staticmethod
+    def create_transaction(
+        transaction_type: TransactionType,
+        entries: List[Dict],
+        description: str = None,
+        reference_number: str = None,
+        source_type: str = None,
+        source_id: int = None,
+        base_currency: str = 'USD',
+        created_by: int = None,
+        entry_date: datetime = None
+    ) -> LedgerTransaction:
+        """
+        Create a balanced double-entry transaction.
+        
+        Args:
+            transaction_type: Type of transaction
+            entries: List of entry dicts with:
+                - account_id: Target account ID
+                - entry_type: 'DEBIT' or 'CREDIT'
+                - amount: Amount in account currency
+                - currency: Currency of amount
+                - fx_rate: Optional FX rate to base currency
+                - memo: Optional entry memo
+            description: Transaction description
+            reference_number: External reference (invoice, etc.)
+            source_type: Type of source operation
+            source_id: ID of source operation
+            base_currency: Base currency for reporting
+            created_by: User ID who created transaction
+            entry_date: Date for entries (defaults to now)
+            
+        Returns:
+            Created LedgerTransaction
+            
+        Raises:
+            ValueError: If transaction is not balanced
+        """
+        # Generate transaction ID
+        transaction_id = str(uuid.uuid4())
+        
+        entry_date = entry_date or datetime.utcnow()
+        
+        prepared_entries, total_debit_base = LedgerService._prepare_entries(
+            entries, base_currency, entry_date
+        )
+        
         # Create transaction
         transaction = LedgerTransaction(
             transaction_id=transaction_id,
@@ -215,7 +247,7 @@ class LedgerService:
         db.session.add(transaction)
         db.session.flush()  # Get transaction ID
         
-        # Create entries
+        # Create entries (the flush hook folds them into the balance snapshots)
         for entry_data in prepared_entries:
             entry = LedgerEntry(
                 transaction_id=transaction.id,
@@ -232,6 +264,475 @@ class LedgerService:
         
         return transaction
     
+    @staticmethod
+    def create_transactions_bulk(
+        transactions: List[Dict],
+        atomic: bool = True,
+        base_currency: str = 'USD',
+        created_by: int = None
+    ) -> Dict:
+        """
+        Validate and post a batch of balanced transactions with a single flush.
+        
+        Args:
+            transactions: List of dicts taking the create_transaction keyword
+                arguments (transaction_type, entries, description,
+                reference_number, source_type, source_id, base_currency,
+                created_by, entry_date)
+            atomic: If True, nothing is written when any item fails validation.
+                If False, valid items are posted and failures are reported.
+            base_currency: Default base currency for items that omit it
+            created_by: Default creator for items that omit it
+            
+        Returns:
+            Dict with committed flag, created transaction IDs and per-item errors
+        """
+        errors = []
+        staged = []
+        
+        account_ids = {
+            entry_data.get('account_id')
+            for txn_data in transactions
+            for entry_data in (txn_data.get('entries') or [])
+        }
+        known_accounts = {
+            row[0] for row in db.session.query(LedgerAccount.id).filter(
+                LedgerAccount.id.in_(account_ids)
+            ).all()
+        } if account_ids else set()
+        
+        for index, txn_data in enumerate(transactions):
+            try:
+                transaction_type = txn_data['transaction_type']
+                if isinstance(transaction_type, str):
+                    transaction_type = TransactionType[transaction_type]
+                
+                txn_base_currency = txn_data.get('base_currency', base_currency)
+                entry_date = txn_data.get('entry_date') or datetime.utcnow()
+                entries = txn_data.get('entries') or []
+                
+                unknown = [e.get('account_id') for e in entries if e.get('account_id') not in known_accounts]
+                if unknown:
+                    raise ValueError(f"Unknown account IDs: {unknown}")
+                
+                prepared_entries, total_debit_base = LedgerService._prepare_entries(
+                    entries, txn_base_currency, entry_date
+                )
+            except (KeyError, ValueError, ArithmeticError) as e:
+                errors.append({
+                    'index': index,
+                    'reference_number': txn_data.get('reference_number'),
+                    'error': str(e)
+                })
+                continue
+            
+            transaction = LedgerTransaction(
+                transaction_id=str(uuid.uuid4()),
+                transaction_type=transaction_type,
+                source_type=txn_data.get('source_type'),
+                source_id=txn_data.get('source_id'),
+                description=txn_data.get('description'),
+                reference_number=txn_data.get('reference_number'),
+                base_currency=txn_base_currency,
+                base_amount=total_debit_base,
+                created_by=txn_data.get('created_by', created_by),
+                created_at=datetime.utcnow()
+            )
+            staged.append((transaction, prepared_entries))
+        
+        if (atomic and errors) or not staged:
+            return {
+                'committed': False,
+                'created_count': 0,
+                'transaction_ids': [],
+                'errors': errors
+            }
+        
+        try:
+            db.session.add_all([transaction for transaction, _ in staged])
+            db.session.flush()  # One batched INSERT for all transaction headers
+            
+            all_entries = []
+            for transaction, prepared_entries in staged:
+                for entry_data in prepared_entries:
+                    all_entries.append({'transaction_id': transaction.id, **entry_data})
+            
+            now = datetime.utcnow()
+            for entry_data in all_entries:
+                entry_data['created_at'] = now
+            db.session.bulk_insert_mappings(LedgerEntry, all_entries)
+            
+            # Bulk inserts skip flush events, so apply the snapshot deltas here
+            LedgerService._apply_balance_deltas(db.session, LedgerService._collect_balance_deltas(
+                (e['account_id'], e['entry_type'], e['amount'], e['entry_date']) for e in all_entries
+            ))
+            
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        logger.info(
+            f"Bulk posted {len(staged)} ledger transactions with {len(all_entries)} entries "
+            f"({len(errors)} rejected)"
+        )
+        
+        return {
+            'committed': True,
+            'created_count': len(staged),
+            'transaction_ids': [transaction.transaction_id for transaction, _ in staged],
+            'errors': errors
+        }
+    
+    @staticmethod
+    def record_transfers_bulk(
+        transfers: List[Dict],
+        atomic: bool = True,
+        base_currency: str = 'USD',
+        created_by: int = None
+    ) -> Dict:
+        """
+        Record many account-to-account transfers in one batch.
+        
+        Each transfer dict takes from_account_id, to_account_id, amount,
+        currency and optional description/fx_rate/reference_number. All
+        referenced accounts are loaded with a single query.
+        """
+        account_ids = set()
+        for transfer in transfers:
+            account_ids.add(transfer['from_account_id'])
+            account_ids.add(transfer['to_account_id'])
+        
+        accounts = {
+            account.id: account
+            for account in LedgerAccount.query.filter(LedgerAccount.id.in_(account_ids)).all()
+        } if account_ids else {}
+        
+        transactions = []
+        for transfer in transfers:
+            from_account = accounts.get(transfer['from_account_id'])
+            to_account = accounts.get(transfer['to_account_id'])
+            from_name = from_account.name if from_account else transfer['from_account_id']
+            to_name = to_account.name if to_account else transfer['to_account_id']
+            fx_rate = transfer.get('fx_rate') or Decimal('1.0')
+            
+            transactions.append({
+                'transaction_type': TransactionType.TRANSFER,
+                'description': transfer.get('description') or f"Transfer from {from_name} to {to_name}",
+                'reference_number': transfer.get('reference_number'),
+                'entry_date': transfer.get('entry_date'),
+                'entries': [
+                    {
+                        'account_id': transfer['from_account_id'],
+                        'entry_type': 'CREDIT',
+                        'amount': float(transfer['amount']),
+                        'currency': transfer['currency'],
+                        'fx_rate': float(fx_rate),
+                        'memo': f"Transfer to {to_name}"
+                    },
+                    {
+                        'account_id': transfer['to_account_id'],
+                        'entry_type': 'DEBIT',
+                        'amount': float(transfer['amount']),
+                        'currency': transfer['currency'],
+                        'fx_rate': float(fx_rate),
+                        'memo': f"Transfer from {from_name}"
+                    }
+                ]
+            })
+        
+        return LedgerService.create_transactions_bulk(
+            transactions,
+            atomic=atomic,
+            base_currency=base_currency,
+            created_by=created_by
+        )
+    
+    @staticmethod
+    def _aggregate_entry_totals(account_ids: List[int] = None, up_to: datetime = None,
+                                session=None) -> Dict[int, Dict]:
+        """
+        Sum raw entry amounts per account in one grouped query (on `session`,
+        db.session by default).
+        
+        Returns:
+            Dict of account_id -> {'debit': Decimal, 'credit': Decimal, 'count': int, 'last_entry_date': datetime}
+        """
+        from sqlalchemy import func
+        
+        query = (session or db.session).query(
+            LedgerEntry.account_id,
+            LedgerEntry.entry_type,
+            func.coalesce(func.sum(LedgerEntry.amount), 0),
+            func.count(LedgerEntry.id),
+            func.max(LedgerEntry.entry_date)
+        )
+        
+        if account_ids is not None:
+            query = query.filter(LedgerEntry.account_id.in_(account_ids))
+        if up_to:
+            query = query.filter(LedgerEntry.entry_date <= up_to)
+        
+        totals = {}
+        for account_id, entry_type, amount_sum, entry_count, last_date in query.group_by(
+            LedgerEntry.account_id, LedgerEntry.entry_type
+        ).all():
+            bucket = totals.setdefault(account_id, {
+                'debit': Decimal('0'), 'credit': Decimal('0'), 'count': 0, 'last_entry_date': None
+            })
+            key = 'debit' if entry_type == EntryType.DEBIT else 'credit'
+            bucket[key] += Decimal(str(amount_sum))
+            bucket['count'] += entry_count
+            if last_date and (bucket['last_entry_date'] is None or last_date > bucket['last_entry_date']):
+                bucket['last_entry_date'] = last_date
+        
+        return totals
+    
+    @staticmethod
+    def _collect_balance_deltas(rows, deltas: Dict[int, Dict] = None, sign: int = 1) -> Dict[int, Dict]:
+        """
+        Sum (account_id, entry_type, amount, entry_date) rows into per-account
+        snapshot deltas; sign=-1 for entries being removed.
+        """
+        deltas = {} if deltas is None else deltas
+        for account_id, entry_type, amount, entry_date in rows:
+            delta = deltas.setdefault(account_id, {
+                'debit': Decimal('0'), 'credit': Decimal('0'), 'count': 0,
+                'first_entry_date': entry_date, 'last_entry_date': None
+            })
+            key = 'debit' if EntryType(entry_type) == EntryType.DEBIT else 'credit'
+            delta[key] += sign * Decimal(str(amount))
+            delta['count'] += sign
+            delta['first_entry_date'] = min(delta['first_entry_date'], entry_date)
+            if sign > 0 and (delta['last_entry_date'] is None or entry_date > delta['last_entry_date']):
+                delta['last_entry_date'] = entry_date
+        return deltas
+    
+    @staticmethod
+    def _apply_balance_deltas(session, deltas: Dict[int, Dict]) -> None:
+        """
+        Fold entry deltas into the LedgerAccountBalance rows with in-place
+        UPDATEs and drop the checkpoints the entries invalidate.
+        
+        Must run after the entries are written: a missing snapshot is seeded
+        from the entries already in the table (these included), so accounts
+        that predate the snapshot table come out correct.
+        """
+        from sqlalchemy import and_, or_
+        from sqlalchemy.exc import IntegrityError
+        from sqlalchemy.orm.util import identity_key
+        
+        connection = session.connection()
+        balances = LedgerAccountBalance.__table__
+        checkpoints = LedgerBalanceCheckpoint.__table__
+        
+        missing = [
+            account_id for account_id, delta in deltas.items()
+            if not LedgerService._increment_balance_snapshot(connection, account_id, delta)
+        ]
+        if missing:
+            seed_totals = LedgerService._aggregate_entry_totals(missing, session=session)
+            for account_id in missing:
+                seed = seed_totals.get(account_id, {})
+                try:
+                    with connection.begin_nested():
+                        connection.execute(balances.insert().values(
+                            account_id=account_id,
+                            debit_total=seed.get('debit', Decimal('0')),
+                            credit_total=seed.get('credit', Decimal('0')),
+                            entry_count=seed.get('count', 0),
+                            last_entry_date=seed.get('last_entry_date'),
+                            updated_at=datetime.utcnow()
+                        ))
+                except IntegrityError:
+                    # A concurrent first posting seeded it, without our uncommitted entries
+                    logger.debug(f"Balance snapshot for account {account_id} seeded concurrently")
+                    LedgerService._increment_balance_snapshot(connection, account_id, deltas[account_id])
+        
+        # Backdated entries invalidate any checkpoint taken after them
+        connection.execute(checkpoints.delete().where(
+            checkpoints.c.account_id.in_(list(deltas)),
+            or_(*[
+                and_(
+                    checkpoints.c.account_id == account_id,
+                    checkpoints.c.checkpoint_date >= delta['first_entry_date']
+                )
+                for account_id, delta in deltas.items()
+            ])
+        ))
+        
+        # Snapshots already loaded in this session no longer match their rows
+        for account_id in deltas:
+            snapshot = session.identity_map.get(identity_key(LedgerAccountBalance, account_id))
+            if snapshot is not None:
+                session.expire(snapshot)
+    
+    @staticmethod
+    def _increment_balance_snapshot(connection, account_id: int, delta: Dict) -> bool:
+        """Add a delta to an account's snapshot row in place; False if the row doesn't exist."""
+        from sqlalchemy import case, or_
+        
+        balances = LedgerAccountBalance.__table__
+        values = {
+            'debit_total': balances.c.debit_total + delta['debit'],
+            'credit_total': balances.c.credit_total + delta['credit'],
+            'entry_count': balances.c.entry_count + delta['count'],
+            'updated_at': datetime.utcnow()
+        }
+        if delta['last_entry_date'] is not None:
+            values['last_entry_date'] = case(
+                (or_(balances.c.last_entry_date.is_(None),
+                     balances.c.last_entry_date < delta['last_entry_date']), delta['last_entry_date']),
+                else_=balances.c.last_entry_date
+            )
+        result = connection.execute(
+            balances.update().where(balances.c.account_id == account_id).values(**values)
+        )
+        return result.rowcount > 0
+    
+    @staticmethod
+    def create_balance_checkpoints(checkpoint_date: datetime = None) -> Dict:
+        """
+        Write cumulative balance checkpoints for every account with new entries.
+        
+        Only entries posted since each account's previous checkpoint are
+        aggregated, so repeated runs stay cheap.
+        
+        Returns:
+            Dict with checkpoint date and number of checkpoints written
+        """
+        from sqlalchemy import func, or_
+        
+        checkpoint_date = checkpoint_date or datetime.utcnow()
+        
+        latest = db.session.query(
+            LedgerBalanceCheckpoint.account_id.label('account_id'),
+            func.max(LedgerBalanceCheckpoint.checkpoint_date).label('last_date')
+        ).group_by(LedgerBalanceCheckpoint.account_id).subquery()
+        
+        new_totals = db.session.query(
+            LedgerEntry.account_id,
+            LedgerEntry.entry_type,
+            func.coalesce(func.sum(LedgerEntry.amount), 0),
+            func.count(LedgerEntry.id)
+        ).outerjoin(
+            latest, latest.c.account_id == LedgerEntry.account_id
+        ).filter(
+            LedgerEntry.entry_date <= checkpoint_date,
+            or_(latest.c.last_date.is_(None), LedgerEntry.entry_date > latest.c.last_date)
+        ).group_by(LedgerEntry.account_id, LedgerEntry.entry_type).all()
+        
+        if not new_totals:
+            return {'checkpoint_date': checkpoint_date.isoformat(), 'checkpoints_created': 0}
+        
+        previous = {
+            checkpoint.account_id: checkpoint
+            for checkpoint in LedgerBalanceCheckpoint.query.join(
+                latest,
+                (latest.c.account_id == LedgerBalanceCheckpoint.account_id) &
+                (latest.c.last_date == LedgerBalanceCheckpoint.checkpoint_date)
+            ).all()
+        }
+        
+        totals = {}
+        for account_id, entry_type, amount_sum, entry_count in new_totals:
+            if account_id not in totals:
+                prior = previous.get(account_id)
+                totals[account_id] = {
+                    'debit': Decimal(str(prior.debit_total)) if prior else Decimal('0'),
+                    'credit': Decimal(str(prior.credit_total)) if prior else Decimal('0'),
+                    'count': prior.entry_count if prior else 0
+                }
+            key = 'debit' if entry_type == EntryType.DEBIT else 'credit'
+            totals[account_id][key] += Decimal(str(amount_sum))
+            totals[account_id]['count'] += entry_count
+        
+        db.session.bulk_insert_mappings(LedgerBalanceCheckpoint, [
+            {
+                'account_id': account_id,
+                'checkpoint_date': checkpoint_date,
+                'debit_total': total['debit'],
+                'credit_total': total['credit'],
+                'entry_count': total['count'],
+                'created_at': datetime.utcnow()
+            }
+            for account_id, total in totals.items()
+        ])
+        db.session.commit()
+        
+        logger.info(f"Created {len(totals)} ledger balance checkpoints at {checkpoint_date}")
+        
+        return {'checkpoint_date': checkpoint_date.isoformat(), 'checkpoints_created': len(totals)}
+    
+    @staticmethod
+    def verify_balance_consistency(repair: bool = False) -> Dict:
+        """
+        Rebuild balances from raw entries and compare with the snapshots.
+        
+        Args:
+            repair: If True, overwrite drifted or missing snapshots with the
+                rebuilt totals
+            
+        Returns:
+            Dict with accounts checked and a list of drifted accounts
+        """
+        rebuilt = LedgerService._aggregate_entry_totals()
+        snapshots = {snapshot.account_id: snapshot for snapshot in LedgerAccountBalance.query.all()}
+        
+        drifts = []
+        for account_id in set(rebuilt) | set(snapshots):
+            expected = rebuilt.get(account_id, {
+                'debit': Decimal('0'), 'credit': Decimal('0'), 'count': 0, 'last_entry_date': None
+            })
+            snapshot = snapshots.get(account_id)
+            
+            actual_debit = Decimal(str(snapshot.debit_total)) if snapshot else Decimal('0')
+            actual_credit = Decimal(str(snapshot.credit_total)) if snapshot else Decimal('0')
+            actual_count = snapshot.entry_count if snapshot else 0
+            
+            if (
+                snapshot is not None
+                and abs(actual_debit - expected['debit']) < LedgerService.PRECISION
+                and abs(actual_credit - expected['credit']) < LedgerService.PRECISION
+                and actual_count == expected['count']
+            ):
+                continue
+            
+            drifts.append({
+                'account_id': account_id,
+                'snapshot_missing': snapshot is None,
+                'expected_debit': float(expected['debit']),
+                'expected_credit': float(expected['credit']),
+                'snapshot_debit': float(actual_debit),
+                'snapshot_credit': float(actual_credit),
+                'debit_drift': float(actual_debit - expected['debit']),
+                'credit_drift': float(actual_credit - expected['credit']),
+                'entry_count_drift': actual_count - expected['count']
+            })
+            
+            if repair:
+                if snapshot is None:
+                    snapshot = LedgerAccountBalance(account_id=account_id)
+                    db.session.add(snapshot)
+                snapshot.debit_total = expected['debit']
+                snapshot.credit_total = expected['credit']
+                snapshot.entry_count = expected['count']
+                snapshot.last_entry_date = expected['last_entry_date']
+        
+        if repair and drifts:
+            db.session.commit()
+        
+        if drifts:
+            logger.warning(f"Ledger balance verification found drift on {len(drifts)} accounts")
+        
+        return {
+            'accounts_checked': len(set(rebuilt) | set(snapshots)),
+            'drift_count': len(drifts),
+            'drifts': drifts,
+            'repaired': repair and bool(drifts),
+            'verified_at': datetime.utcnow().isoformat()
+        }
+    
     @staticmethod
     def get_account_balance(
         account_id: int,
@@ -253,77 +754,354 @@ class LedgerService:
         if not account:
             raise ValueError(f"Account {account_id} not found")
         
-        balance = account.get_balance(as_of_date)
+        if not include_children:
+            return account.get_balance(as_of_date)
+        
+        subtree_ids = LedgerService._subtree_account_ids(account_id)
+        
+        if as_of_date is not None:
+            rows = LedgerService.get_balances_bulk(as_of_date=as_of_date, account_ids=subtree_ids)
+            return sum((balance for _, balance in rows), Decimal('0'))
+        
+        # Current balances straight from the maintained snapshots
+        total = Decimal('0')
+        seen = set()
+        for account, debits, credits in db.session.query(
+            LedgerAccount, LedgerAccountBalance.debit_total, LedgerAccountBalance.credit_total
+        ).join(
+            LedgerAccountBalance, LedgerAccountBalance.account_id == LedgerAccount.id
+        ).filter(LedgerAccount.id.in_(subtree_ids)).all():
+            total += account.signed_balance(debits, credits)
+            seen.add(account.id)
+        
+        unseeded = [subtree_id for subtree_id in subtree_ids if subtree_id not in seen]
+        if unseeded:
+            # Accounts never posted to since snapshots were introduced
+            rows = LedgerService.get_balances_bulk(account_ids=unseeded)
+            total += sum((balance for _, balance in rows), Decimal('0'))
+        
+        return total
+    
+    @staticmethod
+    def _subtree_account_ids(account_id: int) -> List[int]:
+        """The account and all its descendants, via one recursive CTE over parent_id."""
+        tree = db.session.query(LedgerAccount.id.label('id')).filter(
+            LedgerAccount.id == account_id
+        ).cte(name='account_subtree', recursive=True)
+        
+        tree = tree.union_all(
+            db.session.query(LedgerAccount.id).filter(LedgerAccount.parent_id == tree.c.id)
+        )
         
-        if include_children:
-            for child in account.children:
-                balance += LedgerService.get_account_balance(
-                    child.id, as_of_date, include_children=True
-                )
+        return [row[0] for row in db.session.query(tree.c.id).all()]
+    
+    @staticmethod
+    def get_balances_bulk(
+        as_of_date: datetime = None,
+        entity_type: str = None,
+        entity_id: int = None,
+        active_only: bool = False,
+        account_ids: List[int] = None
+    ) -> List[Tuple[LedgerAccount, Decimal]]:
+        """
+        Compute the balance of every matching account in a single round trip.
+        
+        Entry totals are aggregated per account with conditional sums and
+        outer-joined onto the account table, so accounts without entries
+        come back with a zero balance.
+        
+        Returns:
+            List of (account, balance) tuples
+        """
+        from sqlalchemy import func, case
+        
+        totals_query = db.session.query(
+            LedgerEntry.account_id.label('account_id'),
+            func.sum(case(
+                (LedgerEntry.entry_type == EntryType.DEBIT, LedgerEntry.amount), else_=0
+            )).label('debits'),
+            func.sum(case(
+                (LedgerEntry.entry_type == EntryType.CREDIT, LedgerEntry.amount), else_=0
+            )).label('credits')
+        )
+        
+        if as_of_date:
+            totals_query = totals_query.filter(LedgerEntry.entry_date <= as_of_date)
+        if account_ids is not None:
+            totals_query = totals_query.filter(LedgerEntry.account_id.in_(account_ids))
+        
+        totals = totals_query.group_by(LedgerEntry.account_id).subquery()
         
-        return balance
+        query = db.session.query(
+            LedgerAccount, totals.c.debits, totals.c.credits
+        ).outerjoin(totals, totals.c.account_id == LedgerAccount.id)
+        
+        if active_only:
+            query = query.filter(LedgerAccount.is_active == True)
+        if entity_type:
+            query = query.filter(LedgerAccount.entity_type == entity_type)
+        if entity_id:
+            query = query.filter(LedgerAccount.entity_id == entity_id)
+        if account_ids is not None:
+            query = query.filter(LedgerAccount.id.in_(account_ids))
+        
+        return [
+            (account, account.signed_balance(debits, credits))
+            for account, debits, credits in query.all()
+        ]
+    
+    @staticmethod
+    def _statement_cursor_signature(payload: bytes) -> str:
+        from flask import current_app
+        
+        key = current_app.config['SECRET_KEY'].encode()
+        return base64.urlsafe_b64encode(hmac.new(key, payload, hashlib.sha256).digest()).decode().rstrip('=')
+    
+    @staticmethod
+    def _encode_statement_cursor(account_id: int, order: str, entry_date: datetime,
+                                 entry_id: int, balance: Decimal) -> str:
+        """
+        Opaque keyset cursor: position (entry_date, id) plus the running
+        balance there, bound to the account and order and signed with the
+        app's SECRET_KEY so clients can't alter the balance or reuse it elsewhere.
+        """
+        payload = json.dumps({
+            'a': account_id, 'o': order, 'd': entry_date.isoformat(), 'i': entry_id, 'b': str(balance)
+        }, separators=(',', ':')).encode()
+        return (
+            f"{base64.urlsafe_b64encode(payload).decode()}."
+            f"{LedgerService._statement_cursor_signature(payload)}"
+        )
+    
+    @staticmethod
+    def _decode_statement_cursor(cursor: str, account_id: int, order: str) -> Tuple[datetime, int, Decimal]:
+        try:
+            encoded, signature = cursor.split('.', 1)
+            payload = base64.urlsafe_b64decode(encoded.encode())
+            if not hmac.compare_digest(signature, LedgerService._statement_cursor_signature(payload)):
+                raise ValueError("signature mismatch")
+            data = json.loads(payload.decode())
+            if data['a'] != account_id or data['o'] != order:
+                raise ValueError("cursor belongs to another statement")
+            return datetime.fromisoformat(data['d']), int(data['i']), Decimal(data['b'])
+        except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+            raise ValueError(f"Invalid statement cursor: {e}")
+    
+    @staticmethod
+    def _statement_page_query(account_id, start_date, end_date, position, order):
+        """Keyset query on (entry_date, id) for one statement page."""
+        from sqlalchemy import and_, or_
+        
+        query = LedgerEntry.query.filter(LedgerEntry.account_id == account_id)
+        
+        if start_date:
+            query = query.filter(LedgerEntry.entry_date >= start_date)
+        if end_date:
+            query = query.filter(LedgerEntry.entry_date <= end_date)
+        
+        if position:
+            cursor_date, cursor_id = position
+            if order == 'asc':
+                query = query.filter(or_(
+                    LedgerEntry.entry_date > cursor_date,
+                    and_(LedgerEntry.entry_date == cursor_date, LedgerEntry.id > cursor_id)
+                ))
+            else:
+                query = query.filter(or_(
+                    LedgerEntry.entry_date < cursor_date,
+                    and_(LedgerEntry.entry_date == cursor_date, LedgerEntry.id < cursor_id)
+                ))
+        
+        if order == 'asc':
+            return query.order_by(LedgerEntry.entry_date.asc(), LedgerEntry.id.asc())
+        return query.order_by(LedgerEntry.entry_date.desc(), LedgerEntry.id.desc())
     
     @staticmethod
     def get_account_statement(
         account_id: int,
         start_date: datetime = None,
         end_date: datetime = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: str = None,
+        order: str = 'desc'
     ) -> Dict:
         """
-        Get account statement with transaction history.
+        Get one page of an account statement with running balances.
+        
+        Pages are keyset-paginated on (entry_date, id). The cursor carries the
+        running balance at the page boundary, so only the first page needs a
+        balance lookup (served from the snapshot or nearest checkpoint).
         
+        Args:
+            account_id: Account to report on
+            start_date: Optional inclusive lower bound on entry_date
+            end_date: Optional inclusive upper bound on entry_date
+            limit: Page size
+            cursor: next_cursor from the previous page
+            order: 'desc' (newest first, default) or 'asc' (chronological)
+            
         Returns:
-            Dict with balance and transaction list
+            Dict with balance, transaction list and next_cursor
         """
+        from datetime import timedelta
+        
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        
         account = LedgerAccount.query.get(account_id)
         if not account:
             raise ValueError(f"Account {account_id} not found")
         
-        query = LedgerEntry.query.filter_by(account_id=account_id)
-        
-        if start_date:
-            query = query.filter(LedgerEntry.entry_date >= start_date)
-        if end_date:
-            query = query.filter(LedgerEntry.entry_date <= end_date)
+        position = None
+        if cursor:
+            cursor_date, cursor_id, balance = LedgerService._decode_statement_cursor(cursor, account_id, order)
+            position = (cursor_date, cursor_id)
+        elif order == 'asc':
+            # Balance strictly before the window
+            balance = account.get_balance(start_date - timedelta(microseconds=1)) if start_date else Decimal('0')
+        else:
+            balance = account.get_balance(end_date)
         
-        entries = query.order_by(LedgerEntry.entry_date.desc()).limit(limit).all()
+        entries = LedgerService._statement_page_query(
+            account_id, start_date, end_date, position, order
+        ).limit(limit + 1).all()
         
-        # Calculate opening balance
-        opening_balance = Decimal('0')
-        if start_date:
-            opening_balance = account.get_balance(start_date)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
         
-        # Build running balance
-        running_balance = opening_balance
         statement_entries = []
-        
-        # Process entries in chronological order for running balance
-        for entry in reversed(entries):
-            if account.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
-                if entry.entry_type == EntryType.DEBIT:
-                    running_balance += entry.amount
-                else:
-                    running_balance -= entry.amount
-            else:
-                if entry.entry_type == EntryType.CREDIT:
-                    running_balance += entry.amount
-                else:
-                    running_balance -= entry.amount
-            
-            statement_entries.append({
-                **entry.to_dict(),
-                'running_balance': float(running_balance)
-            })
+        if order == 'asc':
+            opening_balance = balance
+            for entry in entries:
+                balance += LedgerService._entry_effect(account, entry)
+                statement_entries.append({**entry.to_dict(), 'running_balance': float(balance)})
+            closing_balance = balance
+        else:
+            # Walk backwards from the balance after the newest entry
+            closing_balance = balance
+            for entry in entries:
+                statement_entries.append({**entry.to_dict(), 'running_balance': float(balance)})
+                balance -= LedgerService._entry_effect(account, entry)
+            opening_balance = balance
+        
+        next_cursor = None
+        if has_more and entries:
+            boundary_balance = closing_balance if order == 'asc' else opening_balance
+            next_cursor = LedgerService._encode_statement_cursor(
+                account_id, order, entries[-1].entry_date, entries[-1].id, boundary_balance
+            )
         
         return {
             'account': account.to_dict(),
             'opening_balance': float(opening_balance),
-            'closing_balance': float(running_balance),
-            'entries': list(reversed(statement_entries)),
-            'entry_count': len(statement_entries)
+            'closing_balance': float(closing_balance),
+            'entries': statement_entries,
+            'entry_count': len(statement_entries),
+            'order': order,
+            'has_more': has_more,
+            'next_cursor': next_cursor
         }
     
+    @staticmethod
+    def _entry_effect(account: LedgerAccount, entry: LedgerEntry) -> Decimal:
+        """Signed change an entry makes to its account's balance."""
+        if entry.entry_type == EntryType.DEBIT:
+            return account.signed_balance(entry.amount, 0)
+        return account.signed_balance(0, entry.amount)
+    
+    @staticmethod
+    def iter_account_statement(
+        account_id: int,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        batch_size: int = 1000
+    ):
+        """
+        Yield every statement row in chronological order with a running balance.
+        
+        Entries are fetched in keyset batches and expunged after use, so memory
+        stays bounded by batch_size regardless of the statement length.
+        """
+        from datetime import timedelta
+        
+        account = LedgerAccount.query.get(account_id)
+        if not account:
+            raise ValueError(f"Account {account_id} not found")
+        
+        balance = account.get_balance(start_date - timedelta(microseconds=1)) if start_date else Decimal('0')
+        position = None
+        
+        while True:
+            batch = LedgerService._statement_page_query(
+                account_id, start_date, end_date, position, 'asc'
+            ).limit(batch_size).all()
+            
+            if not batch:
+                break
+            
+            for entry in batch:
+                balance += LedgerService._entry_effect(account, entry)
+                yield {
+                    'entry_id': entry.id,
+                    'transaction_id': entry.transaction_id,
+                    'entry_date': entry.entry_date.isoformat() if entry.entry_date else None,
+                    'entry_type': entry.entry_type.value,
+                    'amount': str(entry.amount),
+                    'currency': entry.currency,
+                    'base_amount': str(entry.base_amount),
+                    'memo': entry.memo,
+                    'running_balance': str(balance)
+                }
+            
+            position = (batch[-1].entry_date, batch[-1].id)
+            for entry in batch:
+                db.session.expunge(entry)
+            
+            if len(batch) < batch_size:
+                break
+    
+    STATEMENT_EXPORT_FIELDS = [
+        'entry_id', 'transaction_id', 'entry_date', 'entry_type', 'amount',
+        'currency', 'base_amount', 'memo', 'running_balance'
+    ]
+    
+    @staticmethod
+    def export_account_statement(
+        account_id: int,
+        export_format: str = 'csv',
+        start_date: datetime = None,
+        end_date: datetime = None,
+        batch_size: int = 1000
+    ):
+        """
+        Stream a full account statement as CSV or NDJSON text chunks.
+        
+        Suitable for passing straight to a Flask streaming Response.
+        """
+        if export_format not in ('csv', 'ndjson'):
+            raise ValueError("export_format must be 'csv' or 'ndjson'")
+        
+        rows = LedgerService.iter_account_statement(account_id, start_date, end_date, batch_size)
+        
+        if export_format == 'ndjson':
+            for row in rows:
+                yield json.dumps(row) + '\n'
+            return
+        
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=LedgerService.STATEMENT_EXPORT_FIELDS)
+        writer.writeheader()
+        
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        if buffer.tell():
+            yield buffer.getvalue()
+    
     @staticmethod
     def reverse_transaction(
         transaction_id: int,
@@ -555,14 +1333,12 @@ class LedgerService:
         Returns:
             Dict with account balances grouped by type
         """
-        query = LedgerAccount.query.filter_by(is_active=True)
-        
-        if entity_type:
-            query = query.filter_by(entity_type=entity_type)
-        if entity_id:
-            query = query.filter_by(entity_id=entity_id)
-        
-        accounts = query.all()
+        rows = LedgerService.get_balances_bulk(
+            as_of_date=as_of_date,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            active_only=True
+        )
         
         trial_balance = {
             'assets': [],
@@ -576,29 +1352,36 @@ class LedgerService:
             }
         }
         
-        for account in accounts:
-            balance = account.get_balance(as_of_date)
+        categories = {
+            AccountType.ASSET: 'assets',
+            AccountType.LIABILITY: 'liabilities',
+            AccountType.EQUITY: 'equity',
+            AccountType.INCOME: 'income',
+            AccountType.EXPENSE: 'expenses'
+        }
+        
+        for account, balance in rows:
+            # Balances are signed by normal side; convert back to a debit/credit column
+            if account.account_type in [AccountType.ASSET, AccountType.EXPENSE]:
+                debit_side = balance
+            else:
+                debit_side = -balance
             
             entry = {
                 'account_code': account.account_code,
                 'account_name': account.name,
                 'currency': account.currency,
                 'balance': float(balance),
-                'debit': float(balance) if balance > 0 else 0,
-                'credit': float(abs(balance)) if balance < 0 else 0
+                'debit': float(debit_side) if debit_side > 0 else 0,
+                'credit': float(abs(debit_side)) if debit_side < 0 else 0
             }
             
-            category = account.account_type.value.lower() + 's'
-            if category == 'expensess':
-                category = 'expenses'
-            
-            if category in trial_balance:
-                trial_balance[category].append(entry)
+            trial_balance[categories[account.account_type]].append(entry)
             
-            if balance > 0:
-                trial_balance['totals']['total_debits'] += balance
+            if debit_side > 0:
+                trial_balance['totals']['total_debits'] += debit_side
             else:
-                trial_balance['totals']['total_credits'] += abs(balance)
+                trial_balance['totals']['total_credits'] += abs(debit_side)
         
         trial_balance['totals']['total_debits'] = float(trial_balance['totals']['total_debits'])
         trial_balance['totals']['total_credits'] = float(trial_balance['totals']['total_credits'])
@@ -699,3 +1482,23 @@ class LedgerService:
                 'end': end_date.isoformat() if end_date else None
             }
         }
+
+
+def _entry_rows(instances):
+    return [
+        (entry.account_id, entry.entry_type, entry.amount, entry.entry_date)
+        for entry in instances if isinstance(entry, LedgerEntry)
+    ]
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_balance_snapshots(session, flush_context):
+    """
+    Keep LedgerAccountBalance in step with every LedgerEntry inserted or
+    deleted through the ORM, including entries services add directly
+    instead of posting through LedgerService.
+    """
+    deltas = LedgerService._collect_balance_deltas(_entry_rows(session.new))
+    LedgerService._collect_balance_deltas(_entry_rows(session.deleted), deltas, sign=-1)
+    if deltas:
+        LedgerService._apply_balance_deltas(session, deltas)
@@ -26,6 +26,7 @@ from backend.models.ledger import (
     TransactionType, EntryType, AccountType
 )
 from backend.models.audit_log import AuditLog
+from backend.services.geofence_cache import geofence_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,6 +37,7 @@ FUEL_VOLATILITY_THRESHOLD_USD = 1.20 # surcharge kicks in above this $/L price
 CUSTOMS_DELAY_SURCHARGE_PER_HOUR = 8.50  # USD per hour beyond the 4-hr grace
 CUSTOMS_GRACE_HOURS = 4.0
 EARTH_RADIUS_METERS = 6_371_000
+GPS_INSERT_CHUNK_SIZE = 5000         # telemetry rows per bulk INSERT
 
 
 # ─── Geo-math ─────────────────────────────────────────────────────────────────
@@ -189,46 +191,88 @@ class LogisticsOrchestrator:
         Persists a GPS telemetry ping and evaluates the geo-fence for the
         linked FreightEscrow. Triggers smart-contract release if inside the fence.
         """
-        ping = GPSTelemetry(
-            route_id=route_id,
-            vehicle_id=vehicle_id,
-            latitude=lat,
-            longitude=lng,
-            speed_kmh=speed,
-            fuel_price_per_liter=fuel_price
-        )
-        db.session.add(ping)
-
-        # Check geo-fence
-        escrow = FreightEscrow.query.filter_by(route_id=route_id, status='HELD').first()
+        summary = LogisticsOrchestrator.ingest_gps_batch([{
+            'route_id': route_id, 'vehicle_id': vehicle_id, 'lat': lat, 'lng': lng,
+            'speed': speed, 'fuel_price': fuel_price
+        }])
         result = {"geo_fence_passed": False, "escrow_released": False}
+        if summary['releases']:
+            result["geo_fence_passed"] = True
+            result["escrow_released"] = True
+            result["final_amount"] = summary['releases'][0]['final_amount']
+        return result
 
-        if escrow:
-            dist = haversine_distance(lat, lng, escrow.destination_lat, escrow.destination_lng)
-            if dist <= escrow.geo_fence_radius_meters:
-                escrow.confirmed_delivery_lat = lat
-                escrow.confirmed_delivery_lng = lng
-                escrow.geo_fence_passed = True
-
-                # Compute customs delay penalties
-                delay_penalty = LogisticsOrchestrator._calculate_customs_penalty(route_id)
-                if delay_penalty > 0:
-                    escrow.customs_delay_penalty = delay_penalty
-                    escrow.final_amount = escrow.total_freight_amount - delay_penalty
-
-                # Generate delivery proof hash
-                proof_raw = f"{route_id}:{lat}:{lng}:{datetime.utcnow().isoformat()}"
-                escrow.delivery_proof_hash = hashlib.sha256(proof_raw.encode()).hexdigest()
-
-                # Release funds
-                LogisticsOrchestrator._release_escrow(escrow)
-                result["geo_fence_passed"] = True
-                result["escrow_released"] = True
-                result["final_amount"] = escrow.final_amount
-                logger.info(f"[Orchestrator] GEO-FENCE PASSED — Route {route_id}, Escrow released ${escrow.final_amount:.2f}")
+    @staticmethod
+    def ingest_gps_batch(pings: list) -> dict:
+        """
+        Bulk-ingests GPS pings (dicts with route_id, vehicle_id, lat, lng and
+        optional speed, heading, fuel_price, recorded_at) in one insert and one commit.
+
+        Geo-fences are evaluated against the in-memory cache of HELD escrows,
+        so only pings on routes with a held escrow cost a distance check, and
+        only the first ping inside a fence loads and releases its escrow.
+        """
+        rows = []
+        crossings = {}  # escrow_id -> (lat, lng) of the first ping inside the fence
+        rejected = 0
+        fences = geofence_cache.snapshot()
+
+        for ping in pings:
+            try:
+                route_id = int(ping['route_id'])
+                vehicle_id = int(ping['vehicle_id'])
+                lat, lng = float(ping['lat']), float(ping['lng'])
+                speed = float(ping.get('speed') or 0.0)
+                heading = ping.get('heading')
+                heading = float(heading) if heading is not None else None
+                fuel_price = float(ping.get('fuel_price', 1.10))
+                recorded_at = ping.get('recorded_at')
+                if isinstance(recorded_at, str):
+                    recorded_at = datetime.fromisoformat(recorded_at)
+            except (KeyError, TypeError, ValueError):
+                rejected += 1
+                continue
+            if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+                rejected += 1
+                continue
+
+            rows.append({
+                'route_id': route_id,
+                'vehicle_id': vehicle_id,
+                'latitude': lat,
+                'longitude': lng,
+                'speed_kmh': speed,
+                'heading_degrees': heading,
+                'fuel_price_per_liter': fuel_price,
+                'recorded_at': recorded_at or datetime.utcnow()
+            })
+
+            fence = fences.get(route_id)
+            if fence is None or fence.escrow_id in crossings:
+                continue
+            if haversine_distance(lat, lng, fence.destination_lat, fence.destination_lng) <= fence.radius_meters:
+                crossings[fence.escrow_id] = (lat, lng)
+
+        for start in range(0, len(rows), GPS_INSERT_CHUNK_SIZE):
+            db.session.bulk_insert_mappings(GPSTelemetry, rows[start:start + GPS_INSERT_CHUNK_SIZE])
+
+        releases = []
+        if crossings:
+            # Re-check status: another worker may have released since the cache was built
+            escrows = FreightEscrow.query.filter(
+                FreightEscrow.id.in_(list(crossings)), FreightEscrow.status == 'HELD'
+            ).all()
+            for escrow in escrows:
+                lat, lng = crossings[escrow.id]
+                LogisticsOrchestrator._confirm_delivery(escrow, lat, lng)
+                releases.append({
+                    'route_id': escrow.route_id,
+                    'escrow_id': escrow.id,
+                    'final_amount': escrow.final_amount
+                })
 
         db.session.commit()
-        return result
+        return {'ingested': len(rows), 'rejected': rejected, 'releases': releases}
 
     # ──────────────────────────────────────────────────────────────────────────
     # 4. Customs Checkpoint Management
@@ -291,6 +335,28 @@ class LogisticsOrchestrator:
                 total += (cp.wait_hours - CUSTOMS_GRACE_HOURS) * CUSTOMS_DELAY_SURCHARGE_PER_HOUR
         return round(total, 2)
 
+    @staticmethod
+    def _confirm_delivery(escrow: FreightEscrow, lat: float, lng: float):
+        """Records the geo-fence crossing, applies customs penalties and releases the escrow."""
+        route_id = escrow.route_id
+        escrow.confirmed_delivery_lat = lat
+        escrow.confirmed_delivery_lng = lng
+        escrow.geo_fence_passed = True
+
+        # Compute customs delay penalties
+        delay_penalty = LogisticsOrchestrator._calculate_customs_penalty(route_id)
+        if delay_penalty > 0:
+            escrow.customs_delay_penalty = delay_penalty
+            escrow.final_amount = escrow.total_freight_amount - delay_penalty
+
+        # Generate delivery proof hash
+        proof_raw = f"{route_id}:{lat}:{lng}:{datetime.utcnow().isoformat()}"
+        escrow.delivery_proof_hash = hashlib.sha256(proof_raw.encode()).hexdigest()
+
+        # Release funds
+        LogisticsOrchestrator._release_escrow(escrow)
+        logger.info(f"[Orchestrator] GEO-FENCE PASSED — Route {route_id}, Escrow released ${escrow.final_amount:.2f}")
+
     @staticmethod
     def _release_escrow(escrow: FreightEscrow):
         """Marks escrow as RELEASED and posts double-entry ledger transaction."""
@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta
 import random
 from backend.extensions import db
-from backend.models import MarketPrice, PriceWatchlist, User
+from backend.models import MarketPrice, User
 from backend.services.notification_service import NotificationService
+from backend.services.watchlist_index import watchlist_index
 import google.generativeai as genai
 import os
 
@@ -102,31 +103,38 @@ class MarketIntelligenceService:
     def check_watchlist_alerts(updated_prices):
         """
         Check if updated prices cross target thresholds for users.
+        Watchers are matched through the in-memory watchlist index.
         """
         alerts_triggered = []
+        pending_alerts = []
+        watchlist_index.sync()
         for price_data in updated_prices:
-            watchers = PriceWatchlist.query.filter_by(
-                crop_name=price_data['crop_name'], 
-                alert_enabled=True
-            ).all()
+            watchers = watchlist_index.match(
+                price_data['crop_name'],
+                price_data.get('district'),
+                price_data['modal_price'],
+                sync=False
+            )
             
             for watcher in watchers:
-                # Trigger alert if current price is higher than target (Profit opportunity)
-                if price_data['modal_price'] >= watcher.target_price:
-                    msg = f"Profit Opportunity! {watcher.crop_name} price in {price_data['district']} reached ₹{price_data['modal_price']}, crossing your target of ₹{watcher.target_price}."
-                    
-                    from backend.services.alert_registry import AlertRegistry
-                    AlertRegistry.register_alert(
-                        user_id=watcher.user_id,
-                        title="Market Price Alert",
-                        message=msg,
-                        category="MARKET",
-                        priority="HIGH",
-                        action_url=f"/market?crop={watcher.crop_name}",
-                        group_key=f"price_{watcher.crop_name}_{price_data['district']}"
-                    )
-                    alerts_triggered.append({
-                        "user_id": watcher.user_id,
-                        "msg": msg
-                    })
+                # Every match has reached its target price (profit opportunity)
+                msg = f"Profit Opportunity! {watcher.crop_name} price in {price_data['district']} reached ₹{price_data['modal_price']}, crossing your target of ₹{watcher.target_price}."
+                
+                pending_alerts.append({
+                    'user_id': watcher.user_id,
+                    'title': "Market Price Alert",
+                    'message': msg,
+                    'category': "MARKET",
+                    'priority': "HIGH",
+                    'action_url': f"/market?crop={watcher.crop_name}",
+                    'group_key': f"price_{watcher.crop_name}_{price_data['district']}"
+                })
+                alerts_triggered.append({
+                    "user_id": watcher.user_id,
+                    "msg": msg
+                })
+
+        if pending_alerts:
+            from backend.services.alert_registry import AlertRegistry
+            AlertRegistry.register_alerts_bulk(pending_alerts)
         return alerts_triggered
@@ -0,0 +1,130 @@
+"""
+Model Registry: Load each ML artifact once per process.
+
+Artifacts are keyed by absolute path and loaded lazily on first use. Each
+lookup re-checks the file's mtime at most every CHECK_INTERVAL_SECONDS, so a
+retrained artifact dropped in place is picked up without restarting workers.
+A failed reload keeps serving the previously loaded version.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import os
+import threading
+import time
+import logging
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotAvailableError(RuntimeError):
+    """Raised when a model artifact is missing and was never loaded."""
+
+
+class _Entry:
+    __slots__ = ('model', 'mtime', 'checked_at', 'loads', 'lock')
+
+    def __init__(self):
+        self.model = None
+        self.mtime = None
+        self.checked_at = 0.0
+        self.loads = 0
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Thread-safe, mtime-aware cache of loaded model artifacts."""
+
+    CHECK_INTERVAL_SECONDS = 5.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _entry(self, path: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                entry = self._entries[path] = _Entry()
+            return entry
+
+    def get(self, path: str, loader: Callable[[str], Any] = joblib.load) -> Any:
+        """
+        Loaded artifact at `path`, reloading it if the file changed.
+
+        Args:
+            path: Artifact path
+            loader: Callable that loads the artifact from a path
+
+        Raises:
+            ModelNotAvailableError: If the file is missing and nothing was loaded before
+        """
+        path = os.path.abspath(path)
+        entry = self._entry(path)
+        now = time.monotonic()
+
+        if entry.model is not None and now - entry.checked_at < self.CHECK_INTERVAL_SECONDS:
+            return entry.model
+
+        with entry.lock:
+            if entry.model is not None and now - entry.checked_at < self.CHECK_INTERVAL_SECONDS:
+                return entry.model
+
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                entry.checked_at = now
+                if entry.model is None:
+                    raise ModelNotAvailableError(f"Model artifact not found: {path}")
+                logger.warning(f"Model artifact {path} disappeared; serving the loaded version")
+                return entry.model
+
+            if entry.model is None or mtime != entry.mtime:
+                try:
+                    model = loader(path)
+                except Exception as e:
+                    if entry.model is None:
+                        raise
+                    logger.error(f"Reloading {path} failed, keeping previous version: {e}")
+                else:
+                    entry.model = model
+                    entry.mtime = mtime
+                    entry.loads += 1
+                    logger.info(f"Loaded model artifact {path} (load #{entry.loads})")
+
+            entry.checked_at = now
+            return entry.model
+
+    def version(self, path: str) -> Optional[str]:
+        """Identifier of the loaded version (its mtime), or None if not loaded."""
+        entry = self._entries.get(os.path.abspath(path))
+        if entry is None or entry.mtime is None:
+            return None
+        return f"{entry.mtime:.6f}"
+
+    @staticmethod
+    def file_version(path: str) -> Optional[str]:
+        """Version the artifact on disk would load as (same format as version()), or None if missing."""
+        try:
+            return f"{os.path.getmtime(os.path.abspath(path)):.6f}"
+        except OSError:
+            return None
+
+    def invalidate(self, path: str = None):
+        """Drop one artifact (or all) so the next get() reloads from disk."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                path: {'loaded': entry.model is not None, 'mtime': entry.mtime, 'loads': entry.loads}
+                for path, entry in self._entries.items()
+            }
+
+
+model_registry = ModelRegistry()
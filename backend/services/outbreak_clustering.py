@@ -0,0 +1,361 @@
+"""
+Incremental Outbreak Clustering: DBSCAN over disease incidents that only
+processes what changed since the last run.
+
+Cluster state lives in the database: each clustered incident carries its
+OutbreakZone in outbreak_zone_id, and OutbreakClusterState records the last
+incident id already processed. A run takes the incidents reported since then
+and follows incremental DBSCAN (Ester et al.): an insertion can only turn
+points inside the new incident's neighborhood into cores, and only those new
+cores can connect clusters. Each new core is linked to the cores around it,
+and the resulting component starts a new zone, grows the zone its cores
+already belong to, or merges several zones into the oldest one.
+
+Neighborhoods come from the incident spatial index. Most core checks are
+settled without a query: everything within (radius - d) of a point whose
+neighborhood is known lies within radius of a neighbor at distance d, so a
+prefix of that sorted neighborhood is a lower bound on the neighbor's count.
+Work per run therefore tracks the new incidents and the density around
+them, not the size of the incident history.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import logging
+
+from backend.extensions import db
+from backend.models.gews import DiseaseIncident, OutbreakZone, OutbreakClusterState
+from backend.services.incident_index import ACTIVE_STATUSES, incident_index
+from backend.utils.spatial_index import haversine_km
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalOutbreakClusterer:
+    """One clustering pass; neighborhoods are memoized for the pass only."""
+
+    STATE_NAME = 'gews_dbscan'
+    ACTIVE_STATUSES = ACTIVE_STATUSES
+    ID_BATCH_SIZE = 500
+
+    def __init__(self, radius_km: float, min_incidents: int, days_back: int):
+        self.radius_km = radius_km
+        self.min_incidents = min_incidents
+        self.cutoff = datetime.utcnow() - timedelta(days=days_back)
+        self._new = set()
+        self._points = {}          # incident id -> (lat, lon, (disease, crop))
+        self._neighborhoods = {}   # incident id -> [(neighbor id, distance_km)], closest first, self included
+        self._distances = {}       # incident id -> neighbor distances, for bisecting
+        self._old_prefix = {}      # incident id -> running count of neighbors that aren't new
+        self._closest_center = {}  # incident id -> (distance_km, closest id whose neighborhood is known)
+        self._core = {}
+        self._was_core = {}
+        self._parent = {}
+
+    def _neighbors(self, incident_id: int) -> List[Tuple[int, float]]:
+        cached = self._neighborhoods.get(incident_id)
+        if cached is not None:
+            return cached
+
+        lat, lon, group = self._points[incident_id]
+        found = incident_index.query_radius(
+            lat, lon, self.radius_km,
+            disease_name=group[0],
+            crop_affected=group[1],
+            reported_after=self.cutoff,
+            statuses=self.ACTIVE_STATUSES,
+            sync=False
+        )
+
+        old_prefix = [0]
+        for neighbor_id, distance in found:
+            old_prefix.append(old_prefix[-1] + (neighbor_id not in self._new))
+            closest = self._closest_center.get(neighbor_id)
+            if closest is None or distance < closest[0]:
+                self._closest_center[neighbor_id] = (distance, incident_id)
+            if neighbor_id not in self._points:
+                location = incident_index.locate(neighbor_id)
+                if location:
+                    self._points[neighbor_id] = (location[0], location[1], group)
+
+        self._neighborhoods[incident_id] = found
+        self._distances[incident_id] = [distance for _, distance in found]
+        self._old_prefix[incident_id] = old_prefix
+        return found
+
+    def _bound(self, incident_id: int, old_only: bool) -> int:
+        """
+        Lower bound on an incident's neighbor count from the closest known
+        neighborhood: everything within (radius - d) of that center is
+        within radius of the incident.
+        """
+        closest = self._closest_center.get(incident_id)
+        if closest is None:
+            return 0
+        distance, center = closest
+        k = bisect_right(self._distances[center], self.radius_km - distance)
+        return self._old_prefix[center][k] if old_only else k
+
+    def _is_core(self, incident_id: int) -> bool:
+        """Core now, i.e. counting this run's new incidents."""
+        if incident_id not in self._core:
+            if self._bound(incident_id, False) >= self.min_incidents:
+                self._core[incident_id] = True
+            else:
+                self._core[incident_id] = len(self._neighbors(incident_id)) >= self.min_incidents
+        return self._core[incident_id]
+
+    def _is_old_core(self, incident_id: int) -> bool:
+        """Core before this run's new incidents were added."""
+        if incident_id in self._new:
+            return False
+        if incident_id not in self._was_core:
+            if self._bound(incident_id, True) >= self.min_incidents:
+                self._was_core[incident_id] = True
+            else:
+                self._neighbors(incident_id)
+                self._was_core[incident_id] = self._old_prefix[incident_id][-1] >= self.min_incidents
+        return self._was_core[incident_id]
+
+    def _find(self, node):
+        self._parent.setdefault(node, node)
+        root = node
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[node] != root:
+            self._parent[node], node = root, self._parent[node]
+        return root
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[root_b] = root_a
+
+    def _load_labels(self, incident_ids) -> Dict[int, int]:
+        """incident id -> active OutbreakZone id for already-clustered incidents."""
+        incident_ids = list(incident_ids)
+        labels = {}
+        for i in range(0, len(incident_ids), self.ID_BATCH_SIZE):
+            labels.update(DiseaseIncident.query.with_entities(
+                DiseaseIncident.id, DiseaseIncident.outbreak_zone_id
+            ).filter(
+                DiseaseIncident.id.in_(incident_ids[i:i + self.ID_BATCH_SIZE]),
+                DiseaseIncident.outbreak_zone_id.isnot(None)
+            ).all())
+
+        if not labels:
+            return {}
+
+        active_zone_ids = {
+            zone_id for (zone_id,) in OutbreakZone.query.with_entities(OutbreakZone.id).filter(
+                OutbreakZone.id.in_(set(labels.values())),
+                OutbreakZone.status == 'active'
+            ).all()
+        }
+        return {incident_id: zone_id for incident_id, zone_id in labels.items() if zone_id in active_zone_ids}
+
+    def _assign(self, zone_id: int, incident_ids: List[int]):
+        for i in range(0, len(incident_ids), self.ID_BATCH_SIZE):
+            DiseaseIncident.query.filter(
+                DiseaseIncident.id.in_(incident_ids[i:i + self.ID_BATCH_SIZE])
+            ).update({DiseaseIncident.outbreak_zone_id: zone_id}, synchronize_session=False)
+
+    def _refresh_zone_stats(self, zone_ids):
+        """Recompute center, radius, counts, severity and risk of the given zones."""
+        from backend.services.geospatial_service import GeospatialService
+
+        members = defaultdict(list)
+        for zone_id, lat, lon, severity, area in DiseaseIncident.query.with_entities(
+            DiseaseIncident.outbreak_zone_id,
+            DiseaseIncident.latitude,
+            DiseaseIncident.longitude,
+            DiseaseIncident.severity_level,
+            DiseaseIncident.affected_area
+        ).filter(DiseaseIncident.outbreak_zone_id.in_(list(zone_ids))).all():
+            members[zone_id].append((lat, lon, severity, area))
+
+        updates = []
+        for zone_id, rows in members.items():
+            center_lat = sum(row[0] for row in rows) / len(rows)
+            center_lon = sum(row[1] for row in rows) / len(rows)
+            spread = max(haversine_km(center_lat, center_lon, row[0], row[1]) for row in rows)
+            cluster_data = {
+                'incident_count': len(rows),
+                'severity_level': GeospatialService._cluster_severity([row[2] for row in rows])
+            }
+            updates.append({
+                'id': zone_id,
+                'center_latitude': center_lat,
+                'center_longitude': center_lon,
+                'radius_km': max(self.radius_km, spread),
+                'incident_count': len(rows),
+                'total_affected_area': sum(row[3] or 0 for row in rows),
+                'severity_level': cluster_data['severity_level'],
+                'risk_level': GeospatialService._calculate_risk_level(cluster_data)
+            })
+
+        if updates:
+            db.session.bulk_update_mappings(OutbreakZone, updates)
+
+    def run(self) -> Dict:
+        from backend.services.geospatial_service import GeospatialService
+
+        state = OutbreakClusterState.query.filter_by(
+            name=self.STATE_NAME
+        ).with_for_update().first()
+        if state is None:
+            state = OutbreakClusterState(name=self.STATE_NAME, last_incident_id=0)
+            db.session.add(state)
+
+        incident_index.sync(force=True)
+
+        new_rows = DiseaseIncident.query.with_entities(
+            DiseaseIncident.id,
+            DiseaseIncident.latitude,
+            DiseaseIncident.longitude,
+            DiseaseIncident.disease_name,
+            DiseaseIncident.crop_affected,
+            DiseaseIncident.reported_at,
+            DiseaseIncident.verification_status
+        ).filter(
+            DiseaseIncident.id > state.last_incident_id
+        ).order_by(DiseaseIncident.id).all()
+
+        summary = {
+            'new_incidents': len(new_rows),
+            'incidents_clustered': 0,
+            'zones_created': [],
+            'zones_grown': [],
+            'zones_merged': [],
+            'last_incident_id': new_rows[-1][0] if new_rows else state.last_incident_id
+        }
+
+        seeds = []
+        for incident_id, lat, lon, disease_name, crop_affected, reported_at, status in new_rows:
+            if lat is None or lon is None or status not in self.ACTIVE_STATUSES:
+                continue
+            if reported_at is None or reported_at < self.cutoff:
+                continue
+            self._points[incident_id] = (lat, lon, (disease_name, crop_affected))
+            seeds.append(incident_id)
+        self._new = set(seeds)
+
+        # New cores: new incidents, or neighbors they pushed over the threshold.
+        # All seed neighborhoods are loaded first so bounds use the closest one.
+        for p in seeds:
+            self._neighbors(p)
+        new_cores = []
+        checked = set()
+        for p in seeds:
+            if self._is_core(p):
+                new_cores.append(p)
+            for q, _ in self._neighbors(p):
+                if q in self._new or q in checked:
+                    continue
+                checked.add(q)
+                if not self._is_old_core(q) and self._is_core(q):
+                    new_cores.append(q)
+
+        label_ids = set(seeds)
+        for incident_id in new_cores + seeds:
+            label_ids.update(neighbor_id for neighbor_id, _ in self._neighbors(incident_id))
+        labels = self._load_labels(label_ids)
+
+        # Link each new core to the cores around it; a core already in a zone
+        # brings its zone along. Border points remember their nearest core.
+        border = {}
+        for c in new_cores:
+            self._find(c)
+            if c in labels:
+                self._union(c, ('zone', labels[c]))
+        for c in new_cores:
+            for q, distance in self._neighbors(c):
+                if q == c:
+                    continue
+                if q in labels and self._find(('zone', labels[q])) == self._find(c):
+                    continue
+                if self._is_core(q):
+                    self._union(c, q)
+                    if q in labels:
+                        self._union(q, ('zone', labels[q]))
+                elif q not in labels and (q not in border or distance < border[q][0]):
+                    border[q] = (distance, c)
+
+        # New incidents that aren't cores join the cluster of their nearest core
+        for p in seeds:
+            if p in border or self._is_core(p):
+                continue
+            for q, distance in self._neighbors(p):
+                if q != p and self._is_core(q):
+                    if q in self._parent:
+                        border[p] = (distance, q)
+                    elif q in labels:
+                        border[p] = (distance, ('zone', labels[q]))
+                    break
+
+        for _, node in border.values():
+            self._find(node)
+
+        components = defaultdict(lambda: {'cores': [], 'zones': set(), 'border': []})
+        for node in list(self._parent):
+            if isinstance(node, tuple):
+                components[self._find(node)]['zones'].add(node[1])
+            else:
+                components[self._find(node)]['cores'].append(node)
+        for q, (_, node) in border.items():
+            components[self._find(node)]['border'].append(q)
+
+        touched_zones = set()
+        roots = {self._find(c) for c in new_cores} | {self._find(node) for _, node in border.values()}
+        for root in sorted(roots, key=lambda r: (isinstance(r, tuple), r)):
+            component = components[root]
+            members = component['cores'] + component['border']
+
+            if component['zones']:
+                target = min(component['zones'])
+                merged = sorted(component['zones'] - {target})
+                if merged:
+                    DiseaseIncident.query.filter(
+                        DiseaseIncident.outbreak_zone_id.in_(merged)
+                    ).update({DiseaseIncident.outbreak_zone_id: target}, synchronize_session=False)
+                    OutbreakZone.query.filter(OutbreakZone.id.in_(merged)).update(
+                        {OutbreakZone.status: 'merged'}, synchronize_session=False
+                    )
+                    summary['zones_merged'].extend(merged)
+            else:
+                lat, lon, (disease_name, crop_affected) = self._points[component['cores'][0]]
+                zone = OutbreakZone(
+                    zone_id=GeospatialService._generate_zone_id(disease_name, lat, lon),
+                    disease_name=disease_name,
+                    crop_affected=crop_affected,
+                    center_latitude=lat,
+                    center_longitude=lon,
+                    radius_km=self.radius_km,
+                    status='active'
+                )
+                db.session.add(zone)
+                db.session.flush()
+                target = zone.id
+                summary['zones_created'].append(target)
+
+            to_assign = [x for x in members if labels.get(x) != target]
+            if to_assign and target not in summary['zones_created']:
+                summary['zones_grown'].append(target)
+            self._assign(target, to_assign)
+            summary['incidents_clustered'] += len(to_assign)
+            touched_zones.add(target)
+
+        if touched_zones:
+            self._refresh_zone_stats(touched_zones)
+
+        state.last_incident_id = summary['last_incident_id']
+        db.session.commit()
+
+        logger.info(
+            f"Outbreak clustering: {summary['new_incidents']} new incidents, "
+            f"{len(summary['zones_created'])} zones created, {len(summary['zones_grown'])} grown, "
+            f"{len(summary['zones_merged'])} merged"
+        )
+        return summary
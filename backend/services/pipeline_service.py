@@ -1,12 +1,14 @@
 import os
 import uuid
 import json
+import hashlib
 from datetime import datetime
 from typing import Optional, Dict, Any
 from werkzeug.utils import secure_filename
 from flask import current_app
 from backend.extensions import db
 from backend.models import MediaPayload
+from backend.services.inference_cache import inference_cache
 from backend.utils.validators import DataIntegrityValidator
 from backend.utils.logger import logger
 
@@ -15,6 +17,9 @@ class MediaPipelineService:
     Central logic for media ingestion, metadata mapping, and task dispatching.
     """
 
+    # Bytes read from the upload stream per write
+    STREAM_CHUNK_SIZE = 64 * 1024
+
     @staticmethod
     def ingest_payload(
         file_obj,
@@ -24,66 +29,187 @@ class MediaPipelineService:
     ) -> (Optional[MediaPayload], Optional[str]):
         """
         Main entry point for uploading and starting the processing pipeline.
+
+        The upload is validated, hashed and written in one pass over the
+        stream. A file whose SHA-256 matches an earlier upload of the same
+        type is not stored or processed again (see _reuse_duplicate).
         """
         try:
-            # 1. Setup Storage Path
-            upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], payload_type.lower())
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            # 2. Secure Filename
+            # 1. Cheap checks before touching the stream
             original_filename = secure_filename(file_obj.filename)
-            tracking_id = str(uuid.uuid4())
-            extension = os.path.splitext(original_filename)[1]
-            stored_filename = f"{tracking_id}{extension}"
-            file_path = os.path.join(upload_dir, stored_filename)
-            
-            # 3. Save to Disk temporarily for validation
-            file_obj.save(file_path)
-            
-            # 4. Deep Validation
-            is_valid, error = DataIntegrityValidator.validate_file(file_path, payload_type)
+            is_valid, error = DataIntegrityValidator.validate_extension(original_filename, payload_type)
             if not is_valid:
-                os.remove(file_path)
                 return None, error
-                
+
             is_meta_valid, meta_error = DataIntegrityValidator.validate_metadata(metadata or {}, payload_type)
             if not is_meta_valid:
-                os.remove(file_path)
                 return None, meta_error
 
-            # 5. Create Registry Entry
+            # 2. Setup Storage Path
+            upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], payload_type.lower())
+            os.makedirs(upload_dir, exist_ok=True)
+
+            tracking_id = str(uuid.uuid4())
+            extension = os.path.splitext(original_filename)[1]
+            file_path = os.path.join(upload_dir, f"{tracking_id}{extension}")
+
+            # 3. Stream to a partial file: sniff, size-limit and hash on the way
+            partial_path = f"{file_path}.part"
+            try:
+                content_hash, file_size, error = MediaPipelineService._stream_to_disk(
+                    file_obj.stream, partial_path, payload_type
+                )
+                if error:
+                    return None, error
+
+                # 4. Re-upload of known content
+                duplicate = MediaPipelineService._reuse_duplicate(
+                    content_hash, payload_type, user_id, original_filename, metadata
+                )
+                if duplicate is not None:
+                    return duplicate, None
+
+                os.replace(partial_path, file_path)
+            finally:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+
+            # 5. Create Registry Entry, answered from the result cache when possible
+            cached = inference_cache.lookup(payload_type, content_hash, file_path)
             payload = MediaPayload(
                 user_id=user_id,
                 tracking_id=tracking_id,
                 payload_type=payload_type,
                 filename=original_filename,
                 file_path=file_path,
-                file_type=os.path.splitext(file_path)[1],
-                file_size=os.path.getsize(file_path),
+                file_type=extension,
+                file_size=file_size,
+                content_hash=content_hash,
                 metadata_json=json.dumps(metadata) if metadata else None
             )
-            
+            if cached is not None:
+                MediaPipelineService._complete_from_cache(payload, cached)
+
             db.session.add(payload)
             db.session.commit()
             
             # 6. Dispatch Asynchronous Processing
-            MediaPipelineService._dispatch_task(payload)
+            if cached is None:
+                MediaPipelineService._dispatch_task(payload)
             
             return payload, None
         except Exception as e:
             logger.error(f"Media ingestion failed: {str(e)}", exc_info=True)
             return None, str(e)
 
+    @staticmethod
+    def _stream_to_disk(stream, path: str, payload_type: str) -> (Optional[str], int, Optional[str]):
+        """
+        Copies `stream` to `path` in STREAM_CHUNK_SIZE pieces. The MIME type is
+        sniffed from the first bytes before anything is written, and the copy
+        stops as soon as MAX_FILE_SIZE is exceeded.
+
+        Returns:
+            (sha256 hex digest, size in bytes, error); digest is None on error
+        """
+        head = stream.read(DataIntegrityValidator.SNIFF_BYTES)
+        if not head:
+            return None, 0, "Uploaded file is empty"
+        try:
+            mime = DataIntegrityValidator.sniff_mime(head)
+        except Exception as e:
+            return None, 0, f"MIME validation failed: {str(e)}"
+        is_valid, error = DataIntegrityValidator.validate_mime(mime, payload_type)
+        if not is_valid:
+            return None, 0, error
+
+        digest = hashlib.sha256()
+        size = 0
+        chunk = head
+        with open(path, 'wb') as out:
+            while chunk:
+                size += len(chunk)
+                if size > DataIntegrityValidator.MAX_FILE_SIZE:
+                    return None, size, f"File size exceeds limit of {DataIntegrityValidator.MAX_FILE_SIZE} bytes"
+                digest.update(chunk)
+                out.write(chunk)
+                chunk = stream.read(MediaPipelineService.STREAM_CHUNK_SIZE)
+        return digest.hexdigest(), size, None
+
+    @staticmethod
+    def _reuse_duplicate(content_hash: str, payload_type: str, user_id: Optional[int],
+                         filename: str, metadata: Optional[Dict]) -> Optional[MediaPayload]:
+        """
+        Payload to answer a re-upload of content already ingested as `payload_type`.
+
+        The uploader's own earlier payload is returned as is. Content first
+        uploaded by someone else gets a new payload (own tracking id and
+        metadata) that shares the stored file and the result, taken from a
+        completed original processed by the current model or from the result
+        cache; it is only dispatched when neither has one.
+        Returns None when the content is new.
+        """
+        candidates = MediaPayload.query.filter(
+            MediaPayload.content_hash == content_hash,
+            MediaPayload.payload_type == payload_type,
+            MediaPayload.status != 'FAILED'
+        ).order_by(MediaPayload.id.desc()).limit(50).all()
+        candidates = [c for c in candidates if os.path.exists(c.file_path)]
+        if not candidates:
+            return None
+
+        for candidate in candidates:
+            if user_id is not None and candidate.user_id == user_id:
+                logger.info(f"Re-upload of {content_hash[:12]} reuses payload {candidate.tracking_id}")
+                return candidate
+
+        original = next((c for c in candidates if c.status == 'COMPLETED'), candidates[0])
+        payload = MediaPayload(
+            user_id=user_id,
+            tracking_id=str(uuid.uuid4()),
+            payload_type=payload_type,
+            filename=filename,
+            file_path=original.file_path,
+            file_type=original.file_type,
+            file_size=original.file_size,
+            content_hash=content_hash,
+            metadata_json=json.dumps(metadata) if metadata else None
+        )
+        if original.status == 'COMPLETED' and inference_cache.is_current(payload_type, original.processed_at):
+            payload.status = 'COMPLETED'
+            payload.result_data = original.result_data
+            payload.processed_at = datetime.utcnow()
+        else:
+            cached = inference_cache.lookup(payload_type, content_hash, original.file_path)
+            if cached is not None:
+                MediaPipelineService._complete_from_cache(payload, cached)
+        db.session.add(payload)
+        db.session.commit()
+
+        if payload.status != 'COMPLETED':
+            MediaPipelineService._dispatch_task(payload)
+        logger.info(f"Re-upload of {content_hash[:12]} shares file and result of {original.tracking_id}")
+        return payload
+
+    @staticmethod
+    def _complete_from_cache(payload: MediaPayload, result: Dict):
+        """Fill a new payload with a cached result instead of dispatching a task."""
+        payload.status = 'COMPLETED'
+        payload.result_data = json.dumps(dict(result, cached=True))
+        payload.processed_at = datetime.utcnow()
+
     @staticmethod
     def _dispatch_task(payload: MediaPayload):
         """
         Triggers the appropriate Celery task based on payload type.
         """
         from backend.tasks.processing_tasks import process_media_pipeline
-        task = process_media_pipeline.delay(payload.id)
-        payload.task_id = task.id
+        # Mark PROCESSING before enqueueing: a batching worker may claim the
+        # payload as soon as it is visible and must not have its status overwritten
+        payload.task_id = str(uuid.uuid4())
         payload.status = 'PROCESSING'
         db.session.commit()
+        process_media_pipeline.apply_async(args=[payload.id], task_id=payload.task_id)
 
     @staticmethod
     def get_payload_status(tracking_id: str) -> Optional[MediaPayload]:
@@ -92,15 +218,20 @@ class MediaPipelineService:
     @staticmethod
     def attach_result(payload_id: int, result: Dict, status: str = 'COMPLETED', error: str = None):
         """
-        Callback for tasks to update payload with findings.
+        Callback for tasks to update payload with findings. Called with
+        status='PROCESSING' for partial results while a task is still running.
         """
         payload = MediaPayload.query.get(payload_id)
         if payload:
             payload.result_data = json.dumps(result)
             payload.status = status
-            payload.processed_at = datetime.utcnow()
+            if status != 'PROCESSING':
+                payload.processed_at = datetime.utcnow()
             payload.error_log = error
             db.session.commit()
+
+            if status == 'COMPLETED':
+                inference_cache.store(payload.payload_type, payload.content_hash, result, payload.file_path)
             
             # Trigger real-time update via SocketIO
             from backend.extensions import socketio
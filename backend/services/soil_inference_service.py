@@ -0,0 +1,216 @@
+"""
+Soil Inference Service: Batched soil classification for uploaded sample files.
+
+One SoilClassifier (from "Soil Classification Model/main.py") lives per
+worker process instead of one per payload. Tabular CSV/JSON uploads are
+read CHUNK_ROWS samples at a time into NumPy arrays and each chunk is scored
+with a single predict_batch() call; a progress callback receives running
+totals after every chunk so the UI can show partial results.
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import csv
+import importlib.util
+import json
+import os
+import threading
+import warnings
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODULE_DIR = os.path.join(BASE_DIR, "Soil Classification Model")
+
+TABULAR_EXTENSIONS = ('.csv', '.json')
+
+
+class SoilInferenceService:
+    """Soil type classification from sample measurements."""
+
+    MODULE_PATH = os.path.join(MODULE_DIR, "main.py")
+    MODEL_PATH = os.path.join(MODULE_DIR, "model.pkl")
+
+    CHUNK_ROWS = 1000
+    # Per-sample rows kept in the final result; totals cover every row
+    MAX_SAMPLE_ROWS = 10000
+
+    _module = None
+    _classifier = None
+    _pid = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _soil_module():
+        """The model module, imported by path: the repo root has its own main-like modules."""
+        if SoilInferenceService._module is None:
+            spec = importlib.util.spec_from_file_location("soil_classification_main", SoilInferenceService.MODULE_PATH)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            SoilInferenceService._module = module
+        return SoilInferenceService._module
+
+    @staticmethod
+    def classifier():
+        """This process's long-lived SoilClassifier."""
+        if SoilInferenceService._classifier is None or SoilInferenceService._pid != os.getpid():
+            with SoilInferenceService._lock:
+                if SoilInferenceService._classifier is None or SoilInferenceService._pid != os.getpid():
+                    module = SoilInferenceService._soil_module()
+                    SoilInferenceService._classifier = module.SoilClassifier(SoilInferenceService.MODEL_PATH)
+                    SoilInferenceService._pid = os.getpid()
+                    logger.info("Soil classifier loaded")
+        return SoilInferenceService._classifier
+
+    @staticmethod
+    def warm() -> bool:
+        SoilInferenceService.classifier()
+        return True
+
+    @staticmethod
+    def is_tabular(path: str) -> bool:
+        return os.path.splitext(path)[1].lower() in TABULAR_EXTENSIONS
+
+    # ── Reading ───────────────────────────────────────────────────────────────
+    @staticmethod
+    def _to_float(value) -> float:
+        if isinstance(value, bool):
+            return float('nan')
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float('nan')
+
+    @staticmethod
+    def _numeric_columns(columns: List[str], rows: List[List]) -> List[int]:
+        """Positions of columns with at least one numeric value in the first chunk."""
+        return [
+            i for i in range(len(columns))
+            if any(not np.isnan(SoilInferenceService._to_float(row[i])) for row in rows if i < len(row))
+        ]
+
+    @staticmethod
+    def _iter_csv(path: str, chunk_rows: int) -> Iterator[Tuple[List[str], List[List]]]:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            columns = next(reader, None)
+            if not columns:
+                return
+            chunk = []
+            for row in reader:
+                if not row:
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_rows:
+                    yield columns, chunk
+                    chunk = []
+            if chunk:
+                yield columns, chunk
+
+    @staticmethod
+    def _iter_json(path: str, chunk_rows: int) -> Iterator[Tuple[List[str], List[List]]]:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('samples') or data.get('data') or [data]
+        samples = [sample for sample in data if isinstance(sample, dict)]
+        if not samples:
+            return
+        columns = list(samples[0].keys())
+        for start in range(0, len(samples), chunk_rows):
+            yield columns, [[sample.get(column) for column in columns] for sample in samples[start:start + chunk_rows]]
+
+    @staticmethod
+    def iter_feature_chunks(path: str, chunk_rows: int = None) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        (feature names, float array) per chunk of samples. Only numeric columns
+        (decided on the first chunk) are kept; missing values get the chunk's
+        column mean, or 0 when the whole column is missing.
+        """
+        chunk_rows = chunk_rows or SoilInferenceService.CHUNK_ROWS
+        reader = SoilInferenceService._iter_json if path.lower().endswith('.json') else SoilInferenceService._iter_csv
+
+        keep = None
+        for columns, rows in reader(path, chunk_rows):
+            if keep is None:
+                keep = SoilInferenceService._numeric_columns(columns, rows)
+                if not keep:
+                    raise ValueError("No numeric soil measurements found in file")
+            features = np.array(
+                [[SoilInferenceService._to_float(row[i]) if i < len(row) else np.nan for i in keep] for row in rows],
+                dtype=np.float64
+            )
+            missing = np.isnan(features)
+            if missing.any():
+                with warnings.catch_warnings():
+                    # All-NaN columns warn "Mean of empty slice"; nan_to_num makes them 0
+                    warnings.simplefilter('ignore', RuntimeWarning)
+                    means = np.nan_to_num(np.nanmean(features, axis=0))
+                features[missing] = np.take(means, np.nonzero(missing)[1])
+            yield [columns[i] for i in keep], features
+
+    # ── Scoring ───────────────────────────────────────────────────────────────
+    @staticmethod
+    def score_file(path: str, on_progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Classify every sample in a CSV/JSON file, chunk by chunk.
+
+        Args:
+            on_progress: Called after each chunk with the running summary
+
+        Returns:
+            Summary over all rows plus per-sample predictions (up to MAX_SAMPLE_ROWS)
+        """
+        module = SoilInferenceService._soil_module()
+        classifier = SoilInferenceService.classifier()
+
+        distribution = {}
+        confidence_sum = 0.0
+        rows_scored = 0
+        chunks = 0
+        features_used = []
+        samples = []
+
+        for features_used, features in SoilInferenceService.iter_feature_chunks(path):
+            labels, confidences = classifier.predict_batch(features, feature_names=features_used)
+            confidences = np.asarray(confidences, dtype=np.float64)
+
+            names, counts = np.unique(np.asarray(labels), return_counts=True)
+            for name, count in zip(names.tolist(), counts.tolist()):
+                distribution[name] = distribution.get(name, 0) + count
+            confidence_sum += float(confidences.sum())
+
+            room = SoilInferenceService.MAX_SAMPLE_ROWS - len(samples)
+            if room > 0:
+                samples.extend(
+                    {'row': rows_scored + i, 'soil_type': label, 'confidence': round(float(confidence), 4)}
+                    for i, (label, confidence) in enumerate(zip(labels[:room], confidences[:room]))
+                )
+
+            rows_scored += len(features)
+            chunks += 1
+            if on_progress is not None:
+                on_progress(SoilInferenceService._summary(
+                    module, distribution, confidence_sum, rows_scored, chunks, features_used
+                ))
+
+        result = SoilInferenceService._summary(module, distribution, confidence_sum, rows_scored, chunks, features_used)
+        result['samples'] = samples
+        result['samples_truncated'] = rows_scored > len(samples)
+        return result
+
+    @staticmethod
+    def _summary(module, distribution: Dict, confidence_sum: float, rows_scored: int,
+                 chunks: int, features_used: List[str]) -> Dict:
+        dominant = max(distribution, key=distribution.get) if distribution else None
+        return {
+            'rows_scored': rows_scored,
+            'chunks': chunks,
+            'features': features_used,
+            'soil_type_distribution': dict(distribution),
+            'dominant_soil_type': dominant,
+            'recommended_crops': module.CROP_RECOMMENDATIONS.get(dominant, []),
+            'mean_confidence': round(confidence_sum / rows_scored, 4) if rows_scored else None
+        }
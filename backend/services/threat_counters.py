@@ -0,0 +1,81 @@
+"""
+Threat Counters: Sliding-window activity counters for audit threat detection.
+
+Replaces the per-request COUNT queries against audit_logs that
+AuditService._detect_threat used to run. Counters live in process memory by
+default; set THREAT_COUNTER_BACKEND='redis' to share them across workers
+through REDIS_URL (falls back to memory if Redis is unreachable).
+"""
+
+from typing import Dict, Optional
+import logging
+
+from backend.utils.sliding_window import SlidingWindowCounter, RedisSlidingWindowCounter
+
+logger = logging.getLogger(__name__)
+
+
+class ThreatCounters:
+    """Burst counters keyed by (user_id, action) and (ip, action)."""
+
+    SENSITIVE_ACTION_WINDOW_SECONDS = 5 * 60
+    FAILED_LOGIN_WINDOW_SECONDS = 15 * 60
+    BUCKETS = 15
+    MAX_KEYS = 50000
+
+    def __init__(self):
+        self.sensitive_actions = SlidingWindowCounter(
+            self.SENSITIVE_ACTION_WINDOW_SECONDS, self.BUCKETS, self.MAX_KEYS
+        )
+        self.failed_logins = SlidingWindowCounter(
+            self.FAILED_LOGIN_WINDOW_SECONDS, self.BUCKETS, self.MAX_KEYS
+        )
+
+    def init_app(self, app):
+        """Switch to Redis-backed counters if the app asks for them."""
+        if app.config.get('THREAT_COUNTER_BACKEND', 'memory') != 'redis':
+            return
+        try:
+            import redis
+            client = redis.from_url(app.config.get('REDIS_URL', 'redis://localhost:6379/0'))
+            client.ping()
+        except Exception as e:
+            logger.warning(f"Redis threat counters unavailable, using in-process counters: {e}")
+            return
+
+        self.sensitive_actions = RedisSlidingWindowCounter(
+            client, self.SENSITIVE_ACTION_WINDOW_SECONDS, self.BUCKETS, prefix='threat:sensitive'
+        )
+        self.failed_logins = RedisSlidingWindowCounter(
+            client, self.FAILED_LOGIN_WINDOW_SECONDS, self.BUCKETS, prefix='threat:login_failed'
+        )
+
+    def record_sensitive_action(self, user_id: Optional[int], action: str) -> int:
+        """Count this action; returns how many preceded it within the window."""
+        return self._hit(self.sensitive_actions, f"{user_id}:{action}")
+
+    def record_failed_login(self, ip: Optional[str]) -> int:
+        """Count this failure; returns how many preceded it within the window."""
+        return self._hit(self.failed_logins, ip or 'unknown')
+
+    @staticmethod
+    def _hit(counter, key: str) -> int:
+        try:
+            return counter.hit(key) - 1
+        except Exception as e:
+            # A Redis outage must not break audit logging
+            logger.error(f"Threat counter update failed for {key}: {e}")
+            return 0
+
+    def reset(self):
+        self.sensitive_actions.reset()
+        self.failed_logins.reset()
+
+    def stats(self) -> Dict:
+        return {
+            'sensitive_actions': self.sensitive_actions.stats(),
+            'failed_logins': self.failed_logins.stats()
+        }
+
+
+threat_counters = ThreatCounters()
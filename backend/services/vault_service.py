@@ -18,7 +18,7 @@ import logging
 from backend.extensions import db
 from backend.models.ledger import (
     Vault, VaultCurrencyPosition, LedgerAccount, LedgerEntry,
-    AccountType, EntryType, TransactionType, FXValuationSnapshot
+    AccountType, EntryType, TransactionType
 )
 from backend.services.ledger_service import LedgerService
 
@@ -603,7 +603,8 @@ class VaultService:
         """
         Revalue all currency positions at current FX rates.
         
-        Creates FX valuation snapshots and unrealized gain entries.
+        Creates FX valuation snapshots and unrealized gain ledger postings
+        through the batch revaluation engine.
         
         Args:
             vault: Vault to revalue
@@ -612,80 +613,23 @@ class VaultService:
         Returns:
             List of revaluation results
         """
-        from backend.services.fx_service import FXService
-        
-        positions = vault.currency_positions.all()
-        results = []
+        from backend.services.fx_revaluation_engine import FXRevaluationEngine
         
-        for position in positions:
-            if position.currency == vault.base_currency:
-                continue
-            
-            balance = VaultService.get_position_balance(position)
-            if balance <= 0:
-                continue
-            
-            # Get current rate
-            if current_rates and position.currency in current_rates:
-                new_rate = current_rates[position.currency]
-            else:
-                new_rate = FXService.get_rate(
-                    position.currency,
-                    vault.base_currency
-                ) or Decimal('1')
-            
-            old_rate = position.last_fx_rate or position.cost_basis_rate or new_rate
-            
-            if old_rate == new_rate:
-                continue
-            
-            # Calculate delta
-            old_value = balance * old_rate
-            new_value = balance * new_rate
-            delta = new_value - old_value
-            
-            # Create snapshot
-            snapshot = FXValuationSnapshot(
-                entity_type='vault_position',
-                entity_id=position.id,
-                currency=position.currency,
-                position_amount=balance,
-                original_fx_rate=old_rate,
-                current_fx_rate=new_rate,
-                base_currency=vault.base_currency,
-                original_base_value=old_value,
-                current_base_value=new_value,
-                unrealized_gain_loss=delta,
-                unrealized_gain_loss_pct=(delta / old_value * 100) if old_value > 0 else 0,
-                cumulative_realized_gain=position.cumulative_realized_fx_gain,
-                cumulative_unrealized_gain=position.cumulative_unrealized_fx_gain + delta
-            )
-            
-            db.session.add(snapshot)
-            
-            # Update position
-            position.last_fx_rate = new_rate
-            position.last_revaluation_date = datetime.utcnow()
-            position.cumulative_unrealized_fx_gain += delta
-            
-            results.append({
-                'currency': position.currency,
-                'balance': float(balance),
-                'old_rate': float(old_rate),
-                'new_rate': float(new_rate),
-                'old_value': float(old_value),
-                'new_value': float(new_value),
-                'delta': float(delta),
-                'delta_pct': float((delta / old_value * 100) if old_value > 0 else 0)
-            })
-        
-        db.session.commit()
+        result = FXRevaluationEngine.revalue(
+            base_currency=vault.base_currency,
+            current_rates=current_rates,
+            vault_ids=[vault.id],
+            auto_only=False
+        )
         
         logger.info(
-            f"Revalued {len(results)} positions in vault {vault.vault_id}"
+            f"Revalued {result['positions_revalued']} positions in vault {vault.vault_id}"
         )
         
-        return results
+        if not result['vault_details']:
+            return []
+        
+        return result['vault_details'][0]['revaluations']
     
     @staticmethod
     def get_ledger_history(
@@ -693,10 +637,15 @@ class VaultService:
         currency: str = None,
         start_date: datetime = None,
         end_date: datetime = None,
-        limit: int = 100
+        limit: int = 100,
+        cursor: str = None,
+        order: str = 'desc'
     ) -> List[Dict]:
         """
         Get ledger transaction history for vault.
+        
+        With a currency, returns one keyset-paginated statement page; pass
+        its next_cursor back to continue.
         """
         if currency:
             position = VaultCurrencyPosition.query.filter_by(
@@ -711,7 +660,9 @@ class VaultService:
                 position.ledger_account_id,
                 start_date,
                 end_date,
-                limit
+                limit,
+                cursor=cursor,
+                order=order
             )
         
         # Get all positions
@@ -721,7 +672,8 @@ class VaultService:
                 position.ledger_account_id,
                 start_date,
                 end_date,
-                limit
+                limit,
+                order=order
             )
             statements.append({
                 'currency': position.currency,
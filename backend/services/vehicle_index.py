@@ -0,0 +1,192 @@
+"""
+Vehicle Index: In-process spatial index of IDLE autonomous vehicles.
+
+Idle vehicles are split by capacity bucket, each bucket a GeoGridIndex, so a
+nearest-vehicle lookup only visits buckets that can carry the load and only
+the grid cells around the pickup point. Vehicles in a bucket above the
+required capacity always qualify; the bucket holding the required capacity
+is filtered per vehicle.
+
+The index is per process. Status, position and capacity changes made through
+this process's session are applied immediately via mapper events; the whole
+index is rebuilt every REBUILD_INTERVAL_SECONDS to pick up vehicles written by
+other workers. Callers re-check the vehicle row before assigning it.
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import logging
+
+from sqlalchemy import event
+
+from backend.models.freight_v2 import AutonomousVehicle
+from backend.utils.spatial_index import GeoGridIndex, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Lower bounds (kg) of the capacity buckets
+CAPACITY_BUCKETS_KG = (0.0, 50.0, 500.0, 5000.0, 25000.0)
+
+
+class IdleVehicleIndex:
+    """Thread-safe capacity bucket -> grid index of idle vehicle id -> (lat, lng, capacity)."""
+
+    CELL_SIZE_KM = 50.0
+    # Ring search stops here; beyond it the eligible buckets are scanned linearly
+    RING_SEARCH_MAX_KM = 2000.0
+    REBUILD_INTERVAL_SECONDS = 60
+    LOAD_BATCH_SIZE = 5000
+
+    def __init__(self, cell_size_km: float = CELL_SIZE_KM):
+        self._lock = threading.RLock()
+        self.cell_size_km = cell_size_km
+        self._buckets = [GeoGridIndex(cell_size_km) for _ in CAPACITY_BUCKETS_KG]
+        # vehicle_id -> bucket position
+        self._bucket_of = {}
+        self._last_rebuild = None
+
+    @staticmethod
+    def _bucket(capacity_kg: float) -> int:
+        return max(0, bisect_right(CAPACITY_BUCKETS_KG, capacity_kg) - 1)
+
+    def _add(self, vehicle_id: int, lat: float, lng: float, capacity_kg: float):
+        position = self._bucket(capacity_kg)
+        self._buckets[position].insert(vehicle_id, lat, lng, capacity_kg)
+        self._bucket_of[vehicle_id] = position
+
+    def _discard(self, vehicle_id: int):
+        position = self._bucket_of.pop(vehicle_id, None)
+        if position is not None:
+            self._buckets[position].remove(vehicle_id)
+
+    def rebuild(self) -> int:
+        """Reload every idle, located vehicle from the database."""
+        with self._lock:
+            self._buckets = [GeoGridIndex(self.cell_size_km) for _ in CAPACITY_BUCKETS_KG]
+            self._bucket_of = {}
+            last_id = 0
+            while True:
+                rows = AutonomousVehicle.query.with_entities(
+                    AutonomousVehicle.id,
+                    AutonomousVehicle.current_lat,
+                    AutonomousVehicle.current_lng,
+                    AutonomousVehicle.current_capacity_kg
+                ).filter(
+                    AutonomousVehicle.status == 'IDLE',
+                    AutonomousVehicle.id > last_id
+                ).order_by(AutonomousVehicle.id).limit(self.LOAD_BATCH_SIZE).all()
+
+                for vehicle_id, lat, lng, capacity_kg in rows:
+                    if lat is not None and lng is not None and capacity_kg is not None:
+                        self._add(vehicle_id, lat, lng, capacity_kg)
+                if len(rows) < self.LOAD_BATCH_SIZE:
+                    break
+                last_id = rows[-1][0]
+
+            self._last_rebuild = time.monotonic()
+            loaded = len(self._bucket_of)
+        logger.info(f"Rebuilt idle vehicle index with {loaded} vehicles")
+        return loaded
+
+    def sync(self):
+        """Rebuild if the index was never built or is due."""
+        with self._lock:
+            if self._last_rebuild is None or time.monotonic() - self._last_rebuild >= self.REBUILD_INTERVAL_SECONDS:
+                self.rebuild()
+
+    def upsert(self, vehicle_id: int, status: Optional[str], lat: Optional[float],
+               lng: Optional[float], capacity_kg: Optional[float]):
+        if vehicle_id is None:
+            return
+        with self._lock:
+            self._discard(vehicle_id)
+            if status == 'IDLE' and lat is not None and lng is not None and capacity_kg is not None:
+                self._add(vehicle_id, lat, lng, capacity_kg)
+
+    def remove(self, vehicle_id: int):
+        with self._lock:
+            self._discard(vehicle_id)
+
+    def nearest(self, lat: float, lng: float, required_capacity_kg: float,
+                sync: bool = True) -> Optional[Tuple[int, float]]:
+        """
+        Closest idle vehicle that can carry required_capacity_kg.
+
+        Args:
+            sync: Rebuild first if due; batch callers that already synced pass False
+
+        Returns:
+            (vehicle_id, distance_km), or None if no idle vehicle has the capacity
+        """
+        if sync:
+            self.sync()
+        required_capacity_kg = required_capacity_kg or 0.0
+
+        def can_carry(capacity_kg):
+            return capacity_kg >= required_capacity_kg
+
+        best = None
+        with self._lock:
+            for grid in self._buckets[self._bucket(required_capacity_kg):]:
+                if not len(grid):
+                    continue
+                match = grid.nearest(lat, lng, self.RING_SEARCH_MAX_KM, can_carry)
+                if match is None:
+                    match = self._scan(grid, lat, lng, can_carry)
+                if match is not None and (best is None or match[1] < best[1]):
+                    best = (match[0], match[1])
+        return best
+
+    @staticmethod
+    def _scan(grid: GeoGridIndex, lat: float, lng: float, can_carry) -> Optional[Tuple[int, float]]:
+        """Linear nearest search for vehicles beyond the ring search radius."""
+        best = None
+        for vehicle_id, v_lat, v_lng, capacity_kg in grid.items():
+            if not can_carry(capacity_kg):
+                continue
+            distance = haversine_km(lat, lng, v_lat, v_lng)
+            if best is None or distance < best[1]:
+                best = (vehicle_id, distance)
+        return best
+
+    def candidates(self, min_capacity_kg: float = 0.0,
+                   sync: bool = True) -> List[Tuple[int, float, float, float]]:
+        """Every idle vehicle with at least min_capacity_kg, as (id, lat, lng, capacity_kg)."""
+        if sync:
+            self.sync()
+        with self._lock:
+            return [
+                (vehicle_id, lat, lng, capacity_kg)
+                for grid in self._buckets[self._bucket(min_capacity_kg):]
+                for vehicle_id, lat, lng, capacity_kg in grid.items()
+                if capacity_kg >= min_capacity_kg
+            ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'vehicles': len(self._bucket_of),
+                'buckets': {
+                    f">={int(bound)}kg": len(grid)
+                    for bound, grid in zip(CAPACITY_BUCKETS_KG, self._buckets)
+                }
+            }
+
+
+vehicle_index = IdleVehicleIndex()
+
+
+@event.listens_for(AutonomousVehicle, 'after_insert')
+@event.listens_for(AutonomousVehicle, 'after_update')
+def _index_vehicle(mapper, connection, target):
+    vehicle_index.upsert(
+        target.id, target.status or 'IDLE', target.current_lat,
+        target.current_lng, target.current_capacity_kg
+    )
+
+
+@event.listens_for(AutonomousVehicle, 'after_delete')
+def _unindex_vehicle(mapper, connection, target):
+    vehicle_index.remove(target.id)
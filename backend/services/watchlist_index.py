@@ -0,0 +1,177 @@
+"""
+Watchlist Index: In-process index of enabled price watchlists.
+
+Watchlists are grouped by (crop, district), with district None meaning
+"any district", and each group keeps its target prices sorted. A price tick
+for (crop, district, price) is matched by bisecting the two groups that can
+apply, so the cost is O(log n + matches) rather than a query per tick.
+
+The index is per process. Changes made through this process's session are
+applied immediately via mapper events; the whole index is rebuilt every
+REBUILD_INTERVAL_SECONDS to pick up changes made by other workers.
+"""
+
+from bisect import bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import logging
+
+from sqlalchemy import event
+
+from backend.models.market import PriceWatchlist
+
+logger = logging.getLogger(__name__)
+
+
+class WatchlistMatch:
+    __slots__ = ('watchlist_id', 'user_id', 'crop_name', 'district', 'target_price')
+
+    def __init__(self, watchlist_id, user_id, crop_name, district, target_price):
+        self.watchlist_id = watchlist_id
+        self.user_id = user_id
+        self.crop_name = crop_name
+        self.district = district
+        self.target_price = target_price
+
+
+class PriceWatchlistIndex:
+    """Thread-safe (crop, district) -> sorted target prices index."""
+
+    REBUILD_INTERVAL_SECONDS = 300
+    LOAD_BATCH_SIZE = 5000
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # (crop, district) -> sorted [(target_price, watchlist_id)]
+        self._groups = {}
+        # watchlist_id -> WatchlistMatch
+        self._entries = {}
+        self._last_rebuild = None
+
+    @staticmethod
+    def _key(crop_name: str, district: Optional[str]) -> Tuple:
+        return (crop_name, district or None)
+
+    def _add(self, entry: WatchlistMatch):
+        insort(self._groups.setdefault(self._key(entry.crop_name, entry.district), []),
+               (entry.target_price, entry.watchlist_id))
+        self._entries[entry.watchlist_id] = entry
+
+    def _discard(self, watchlist_id: int):
+        entry = self._entries.pop(watchlist_id, None)
+        if entry is None:
+            return
+        key = self._key(entry.crop_name, entry.district)
+        group = self._groups.get(key)
+        if not group:
+            return
+        position = bisect_right(group, (entry.target_price, watchlist_id)) - 1
+        if position >= 0 and group[position] == (entry.target_price, watchlist_id):
+            del group[position]
+        if not group:
+            del self._groups[key]
+
+    def rebuild(self) -> int:
+        """Reload every enabled watchlist from the database."""
+        with self._lock:
+            self._groups = {}
+            self._entries = {}
+            last_id = 0
+            while True:
+                rows = PriceWatchlist.query.with_entities(
+                    PriceWatchlist.id,
+                    PriceWatchlist.user_id,
+                    PriceWatchlist.crop_name,
+                    PriceWatchlist.district,
+                    PriceWatchlist.target_price
+                ).filter(
+                    PriceWatchlist.alert_enabled.is_(True),
+                    PriceWatchlist.id > last_id
+                ).order_by(PriceWatchlist.id).limit(self.LOAD_BATCH_SIZE).all()
+
+                for watchlist_id, user_id, crop_name, district, target_price in rows:
+                    if target_price is None:
+                        continue
+                    self._entries[watchlist_id] = WatchlistMatch(
+                        watchlist_id, user_id, crop_name, district, target_price
+                    )
+                    self._groups.setdefault(self._key(crop_name, district), []).append(
+                        (target_price, watchlist_id)
+                    )
+                if len(rows) < self.LOAD_BATCH_SIZE:
+                    break
+                last_id = rows[-1][0]
+
+            for group in self._groups.values():
+                group.sort()
+            self._last_rebuild = time.monotonic()
+            loaded = len(self._entries)
+        logger.info(f"Rebuilt price watchlist index with {loaded} watchlists")
+        return loaded
+
+    def sync(self):
+        """Rebuild if the index was never built or is due."""
+        with self._lock:
+            if self._last_rebuild is None or time.monotonic() - self._last_rebuild >= self.REBUILD_INTERVAL_SECONDS:
+                self.rebuild()
+
+    def upsert(self, watchlist_id: int, user_id: int, crop_name: str,
+               district: Optional[str], target_price: float, alert_enabled: bool = True):
+        if watchlist_id is None:
+            return
+        with self._lock:
+            self._discard(watchlist_id)
+            if alert_enabled and target_price is not None and crop_name:
+                self._add(WatchlistMatch(watchlist_id, user_id, crop_name, district, target_price))
+
+    def remove(self, watchlist_id: int):
+        with self._lock:
+            self._discard(watchlist_id)
+
+    def match(self, crop_name: str, district: Optional[str], price: float,
+              sync: bool = True) -> List[WatchlistMatch]:
+        """
+        Watchlists whose target price the tick has reached (target <= price).
+
+        Args:
+            district: District of the tick; watchlists without a district match any
+            sync: Rebuild first if due; batch callers that already synced pass False
+        """
+        if sync:
+            self.sync()
+        keys = {self._key(crop_name, None), self._key(crop_name, district)}
+        matched = []
+        with self._lock:
+            for key in keys:
+                group = self._groups.get(key)
+                if not group:
+                    continue
+                end = bisect_right(group, (price, float('inf')))
+                matched.extend(self._entries[watchlist_id] for _, watchlist_id in group[:end])
+        return matched
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'watchlists': len(self._entries),
+                'groups': len(self._groups),
+                'largest_group': max((len(group) for group in self._groups.values()), default=0)
+            }
+
+
+watchlist_index = PriceWatchlistIndex()
+
+
+@event.listens_for(PriceWatchlist, 'after_insert')
+@event.listens_for(PriceWatchlist, 'after_update')
+def _index_watchlist(mapper, connection, target):
+    watchlist_index.upsert(
+        target.id, target.user_id, target.crop_name, target.district,
+        target.target_price, target.alert_enabled is not False
+    )
+
+
+@event.listens_for(PriceWatchlist, 'after_delete')
+def _unindex_watchlist(mapper, connection, target):
+    watchlist_index.remove(target.id)
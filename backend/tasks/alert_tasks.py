@@ -0,0 +1,49 @@
+from flask_mail import Message
+from backend.celery_app import celery_app
+from backend.extensions import mail
+from backend.models import Alert
+import logging
+
+logger = logging.getLogger(__name__)
+
+@celery_app.task(name='tasks.deliver_alert_batch', bind=True, max_retries=3)
+def deliver_alert_batch(self, channel, deliveries):
+    """
+    Sends a batch of queued alert notifications.
+
+    Args:
+        channel: 'email' or 'sms'
+        deliveries: [(alert_id, address), ...] as queued by AlertRegistry.register_alerts_bulk
+    """
+    alert_ids = [alert_id for alert_id, _ in deliveries]
+    alerts = {alert.id: alert for alert in Alert.query.filter(Alert.id.in_(alert_ids)).all()}
+
+    sent = 0
+    done = 0
+    try:
+        if channel == 'email':
+            # One SMTP connection for the whole batch
+            with mail.connect() as connection:
+                for alert_id, email in deliveries:
+                    alert = alerts.get(alert_id)
+                    if alert is not None:
+                        connection.send(Message(
+                            subject=f"[{alert.priority}] {alert.title}",
+                            recipients=[email],
+                            body=alert.message
+                        ))
+                        sent += 1
+                    done += 1
+        else:
+            # SMS gateway integration placeholder
+            for alert_id, phone in deliveries:
+                if alert_id in alerts:
+                    logger.info(f"SMS alert {alert_id} sent to {phone}")
+                    sent += 1
+                done += 1
+    except Exception as e:
+        logger.error(f"{channel} delivery failed after {done}/{len(deliveries)} alerts: {str(e)}")
+        # Retry only what hasn't been sent yet
+        raise self.retry(args=(channel, deliveries[done:]), exc=e, countdown=60)
+
+    return {'status': 'success', 'channel': channel, 'sent': sent}
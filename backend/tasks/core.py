@@ -1,4 +1,3 @@
-import joblib
 import os
 import numpy as np
 import tempfile
@@ -8,30 +7,22 @@ from backend.celery_app import celery_app
 from backend.services.pdf_service import PDFService
 from backend.services.file_service import FileService
 from backend.services.notification_service import NotificationService
+from backend.services.crop_inference_service import CropInferenceService
+from backend.services.model_registry import ModelNotAvailableError
 from backend.utils.logger import logger
 from backend.utils.i18n_utils import get_translated_string
 
-# Load models at worker startup
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-CROP_MODEL_PATH = os.path.join(BASE_DIR, "crop_recommendation", "model", "rf_model.pkl")
-CROP_ENCODER_PATH = os.path.join(BASE_DIR, "crop_recommendation", "model", "label_encoder.pkl")
-
-# Global model references (loaded once per worker)
-crop_model = None
-crop_encoder = None
+CROP_MODEL_PATH = CropInferenceService.MODEL_PATH
+CROP_ENCODER_PATH = CropInferenceService.ENCODER_PATH
 
 
 def load_crop_models():
-    """Load crop prediction models."""
-    global crop_model, crop_encoder
-    if crop_model is None:
-        if os.path.exists(CROP_MODEL_PATH) and os.path.exists(CROP_ENCODER_PATH):
-            crop_model = joblib.load(CROP_MODEL_PATH)
-            crop_encoder = joblib.load(CROP_ENCODER_PATH)
-        else:
-            logger.warning(f"Crop models not found at {CROP_MODEL_PATH}. Prediction task will fail.")
-    return crop_model, crop_encoder
+    """Load crop prediction models (cached per worker by the model registry)."""
+    try:
+        return CropInferenceService.load()
+    except ModelNotAvailableError:
+        logger.warning(f"Crop models not found at {CROP_MODEL_PATH}. Prediction task will fail.")
+        return None, None
 
 
 @celery_app.task(bind=True, name='tasks.predict_crop')
@@ -41,16 +32,14 @@ def predict_crop_task(self, n, p, k, temperature, humidity, ph, rainfall, user_i
     Returns the predicted crop name.
     """
     try:
-        model, encoder = load_crop_models()
-        
         data = [
             float(n), float(p), float(k),
             float(temperature), float(humidity),
             float(ph), float(rainfall),
         ]
         
-        prediction = model.predict([data])[0]
-        crop = encoder.inverse_transform([prediction])[0]
+        # Concurrent predictions in this worker share one model call
+        crop = CropInferenceService.predict(data)
         
         if user_id:
             NotificationService.create_notification(
@@ -75,6 +64,36 @@ def predict_crop_task(self, n, p, k, temperature, humidity, ph, rainfall, user_i
         return {'status': 'error', 'message': str(e)}
 
 
+@celery_app.task(bind=True, name='tasks.predict_crop_batch')
+def predict_crop_batch_task(self, plots, user_id=None, lang='en'):
+    """
+    Async task for scoring many plots with one model call.
+    Each plot is a dict keyed by N, P, K, temperature, humidity, ph, rainfall.
+    """
+    try:
+        rows = [CropInferenceService.row_from_mapping(plot) for plot in plots]
+        crops = CropInferenceService.predict_many(rows)
+        
+        if user_id:
+            NotificationService.create_notification(
+                title=get_translated_string("crop_prediction_ready_title", lang=lang),
+                message=f"{len(crops)} plot recommendations are ready.",
+                notification_type="task_completed",
+                user_id=user_id
+            )
+        
+        return {
+            'status': 'success',
+            'count': len(crops),
+            'predictions': [
+                {'input_params': plot, 'prediction': crop}
+                for plot, crop in zip(plots, crops)
+            ]
+        }
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+
 @celery_app.task(bind=True, name='tasks.process_loan')
 def process_loan_task(self, json_data, user_id=None, lang='en'):
     """
@@ -83,3 +83,22 @@ def reindex_forum_content_task(self):
     except Exception as e:
         logger.error(f"Forum indexing task failed: {str(e)}")
         return {'status': 'error', 'message': str(e)}
+
+
+@celery_app.task(name='tasks.flush_forum_counters')
+def flush_forum_counters_task():
+    """
+    Apply buffered thread view/upvote deltas. With FORUM_COUNTER_BACKEND='redis'
+    this drains the deltas every web worker has accumulated.
+    """
+    from flask import current_app
+    from backend.services.forum_counters import forum_counters
+
+    try:
+        if forum_counters.app is None:
+            forum_counters.init_app(current_app._get_current_object())
+        updated = forum_counters.flush()
+        return {'status': 'success', 'threads_updated': updated}
+    except Exception as e:
+        logger.error(f"Forum counter flush failed: {str(e)}")
+        return {'status': 'error', 'message': str(e)}
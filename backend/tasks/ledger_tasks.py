@@ -0,0 +1,31 @@
+"""
+Ledger Maintenance Tasks: Balance checkpoints and snapshot verification.
+"""
+
+from backend.celery_app import celery_app
+from backend.services.ledger_service import LedgerService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name='tasks.ledger_balance_checkpoint')
+def create_ledger_checkpoints_task():
+    """
+    Daily checkpoint of cumulative account totals so historical balance
+    queries only sum the entries posted after the nearest checkpoint.
+    """
+    result = LedgerService.create_balance_checkpoints()
+    logger.info(f"Ledger checkpoint run: {result['checkpoints_created']} accounts checkpointed")
+    return {'status': 'success', **result}
+
+
+@celery_app.task(name='tasks.ledger_balance_verification')
+def verify_ledger_balances_task(repair=False):
+    """
+    Rebuilds balances from raw ledger entries and reports snapshot drift.
+    """
+    result = LedgerService.verify_balance_consistency(repair=repair)
+    if result['drift_count']:
+        logger.error(f"Ledger snapshot drift detected on {result['drift_count']} accounts")
+    return {'status': 'success', **result}
@@ -3,6 +3,7 @@ from backend.services.velocity_engine import VelocityEngine
 from backend.models.farm import Farm
 from backend.models.market import ForwardContract, PriceHedgingLog
 from backend.extensions import db
+from backend.services.market_service import MarketIntelligenceService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -57,3 +58,13 @@ def velocity_market_sync():
             
     db.session.commit()
     return {'status': 'completed', 'farms_synced': count}
+
+@celery_app.task(name='tasks.update_market_prices')
+def update_market_prices():
+    """
+    Hourly price refresh; every updated price is matched against the watchlist index.
+    """
+    updated = MarketIntelligenceService.fetch_live_prices()
+    triggered = MarketIntelligenceService.check_watchlist_alerts(updated)
+    logger.info(f"Market prices updated: {len(updated)} records, {len(triggered)} watchlist alerts")
+    return {'status': 'success', 'updated': len(updated), 'alerts': len(triggered)}
@@ -1,5 +1,6 @@
 from backend.celery_app import celery_app
 from backend.services.pathogen_service import PathogenPropagationService
+from backend.services.geospatial_service import GeospatialService
 from backend.models.gews import OutbreakZone
 from backend.extensions import db
 import logging
@@ -32,6 +33,20 @@ def pathogen_propagation_run():
         'summary': results
     }
 
+@celery_app.task(name='tasks.outbreak_zone_clustering')
+def update_outbreak_zones_task():
+    """
+    Periodic task to fold newly reported incidents into outbreak zones.
+    """
+    summary = GeospatialService.update_outbreak_zones()
+    return {
+        'status': 'success',
+        'new_incidents': summary['new_incidents'],
+        'zones_created': len(summary['zones_created']),
+        'zones_grown': len(summary['zones_grown']),
+        'zones_merged': len(summary['zones_merged'])
+    }
+
 @celery_app.task(name='tasks.analyze_new_incident')
 def analyze_new_incident(incident_id):
     """
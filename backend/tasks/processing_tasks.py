@@ -1,11 +1,32 @@
 from backend.celery_app import celery_app
 from backend.models.processing import ProcessingBatch, ProcessingStage
 from backend.extensions import db
+from celery.signals import worker_process_init
 from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Pending DISEASE payloads classified together by one task
+DISEASE_BATCH_SIZE = 32
+# INFERRING claims older than this are presumed lost with their worker
+STALE_CLAIM_MINUTES = 15
+
+
+@worker_process_init.connect
+def _warm_inference_models(**kwargs):
+    """Load and warm the disease model and soil classifier once in each worker process."""
+    try:
+        from backend.services.disease_inference_service import DiseaseInferenceService
+        DiseaseInferenceService.warm()
+    except Exception as e:
+        logger.warning(f"Disease model warm-up failed; it will load on first use: {e}")
+    try:
+        from backend.services.soil_inference_service import SoilInferenceService
+        SoilInferenceService.warm()
+    except Exception as e:
+        logger.warning(f"Soil classifier warm-up failed; it will load on first use: {e}")
+
 @celery_app.task(name='tasks.monitor_stale_batches')
 def monitor_stale_batches_task():
     """Detect batches that have been stuck in a stage for more than 48 hours"""
@@ -20,6 +41,41 @@ def monitor_stale_batches_task():
         
     return {'status': 'success', 'stale_count': len(stale_batches)}
 
+@celery_app.task(name='tasks.reclaim_stale_inferences')
+def reclaim_stale_inferences_task():
+    """
+    Return DISEASE payloads whose batch claim is older than STALE_CLAIM_MINUTES
+    (the claiming worker died before attaching results) to PROCESSING and
+    re-dispatch them. Each reset is conditional on the claim being unchanged,
+    so a batch that finishes meanwhile keeps its results.
+    """
+    from backend.models.media_payload import MediaPayload
+    import uuid
+
+    threshold = datetime.utcnow() - timedelta(minutes=STALE_CLAIM_MINUTES)
+    stale = MediaPayload.query.with_entities(MediaPayload.id, MediaPayload.claimed_at).filter(
+        MediaPayload.status == 'INFERRING',
+        MediaPayload.claimed_at < threshold
+    ).all()
+
+    requeued = []
+    for payload_id, claimed_at in stale:
+        task_id = str(uuid.uuid4())
+        updated = MediaPayload.query.filter(
+            MediaPayload.id == payload_id,
+            MediaPayload.status == 'INFERRING',
+            MediaPayload.claimed_at == claimed_at
+        ).update({'status': 'PROCESSING', 'claimed_at': None, 'task_id': task_id}, synchronize_session=False)
+        if updated:
+            requeued.append((payload_id, task_id))
+    db.session.commit()
+
+    for payload_id, task_id in requeued:
+        process_media_pipeline.apply_async(args=[payload_id], task_id=task_id)
+    if requeued:
+        logger.warning(f"Re-dispatched {len(requeued)} payloads stuck in INFERRING")
+    return {'status': 'success', 'requeued': len(requeued)}
+
 @celery_app.task(name='tasks.daily_production_report')
 def daily_production_report_task():
     """Aggregate stats for completed batches in the last 24h"""
@@ -51,11 +107,15 @@ def process_media_pipeline(payload_id):
     if not payload:
         return {'status': 'error', 'message': 'Payload not found'}
 
+    if payload.payload_type == 'DISEASE':
+        return _process_disease_batch(payload)
+
     try:
-        if payload.payload_type == 'DISEASE':
-            result = _process_disease_image(payload)
-        elif payload.payload_type == 'SOIL':
-            result = _process_soil_data(payload)
+        if payload.payload_type == 'SOIL':
+            from backend.services.inference_cache import inference_cache
+            result = inference_cache.lookup('SOIL', payload.content_hash, payload.file_path, stage='worker')
+            if result is None:
+                result = _process_soil_data(payload)
         else:
             result = {'message': 'No specialized processor found for this type'}
 
@@ -68,65 +128,109 @@ def process_media_pipeline(payload_id):
         MediaPipelineService.attach_result(payload_id, {}, status='FAILED', error=str(e))
         return {'status': 'failed', 'error': str(e)}
 
-def _process_disease_image(payload):
+def _claim_disease_batch(payload):
+    """
+    Claim this payload plus up to DISEASE_BATCH_SIZE - 1 other pending DISEASE
+    payloads (oldest first) by moving them to INFERRING. Each claim is a
+    conditional UPDATE, so concurrent workers never classify the same payload;
+    its claimed_at lets reclaim_stale_inferences_task recover it if this worker dies.
+    """
+    from backend.models.media_payload import MediaPayload
+
+    others = MediaPayload.query.with_entities(MediaPayload.id).filter(
+        MediaPayload.payload_type == 'DISEASE',
+        MediaPayload.status.in_(['PENDING', 'PROCESSING']),
+        MediaPayload.id != payload.id
+    ).order_by(MediaPayload.id).limit(DISEASE_BATCH_SIZE - 1).all()
+
+    claimed = []
+    claimed_at = datetime.utcnow()
+    for payload_id in [payload.id] + [row[0] for row in others]:
+        updated = MediaPayload.query.filter(
+            MediaPayload.id == payload_id,
+            MediaPayload.status.in_(['PENDING', 'PROCESSING'])
+        ).update({'status': 'INFERRING', 'claimed_at': claimed_at}, synchronize_session=False)
+        if updated:
+            claimed.append(payload_id)
+    db.session.commit()
+
+    if not claimed:
+        return []
+    return MediaPayload.query.filter(MediaPayload.id.in_(claimed)).order_by(MediaPayload.id).all()
+
+def _process_disease_batch(payload):
+    """
+    Classifies this DISEASE payload together with other pending ones in one
+    stacked model.predict(). Payloads already claimed by another worker's
+    batch are left to it; those with a cached result skip the model.
+    """
+    from backend.services.pipeline_service import MediaPipelineService
+    from backend.services.inference_cache import inference_cache
+
+    batch = _claim_disease_batch(payload)
+    if not batch:
+        return {'status': 'batched', 'tracking_id': payload.tracking_id}
+
+    try:
+        results = [inference_cache.lookup('DISEASE', item.content_hash, item.file_path, stage='worker')
+                   for item in batch]
+        uncached = [item for item, result in zip(batch, results) if result is None]
+        inferred = iter(_process_disease_images(uncached) if uncached else [])
+        results = [result if result is not None else next(inferred) for result in results]
+    except Exception as e:
+        logger.error(f"Disease batch of {len(batch)} payloads failed: {str(e)}")
+        for item in batch:
+            MediaPipelineService.attach_result(item.id, {}, status='FAILED', error=str(e))
+        return {'status': 'failed', 'error': str(e)}
+
+    for item, result in zip(batch, results):
+        MediaPipelineService.attach_result(item.id, result)
+    logger.info(f"Disease batch classified {len(batch)} payloads")
+    return {'status': 'success', 'tracking_id': payload.tracking_id, 'batch_size': len(batch)}
+
+def _process_disease_images(payloads):
     """
     Integrates with the Disease Prediction module logic.
-    Loads model dynamically to save memory on worker start.
+    The model is loaded once per worker through the model registry.
     """
-    import sys
-    # Add external module path if not in PYTHONPATH
-    module_path = os.path.join(os.getcwd(), 'Disease prediction')
-    if module_path not in sys.path:
-        sys.path.append(module_path)
-        
+    from backend.services.disease_inference_service import DiseaseInferenceService
+
+    if not DiseaseInferenceService.available():
+        # Fallback for dev environment without model file
+        return [{
+            'prediction': 'Simulation: Bacterial Blight',
+            'confidence': 0.95,
+            'recommendation': 'Mock: Apply Copper Fungicide',
+            'note': 'Real model not found at ' + DiseaseInferenceService.MODEL_PATH
+        } for _ in payloads]
+
     try:
-        from utils import load_keras_model, predict_image_keras
-        
-        # Load model (caching strategy recommended in prod)
-        model_path = os.path.join(module_path, 'model.h5')
-        if not os.path.exists(model_path):
-             # Fallback for dev environment without model file
-             return {
-                 'prediction': 'Simulation: Bacterial Blight',
-                 'confidence': 0.95,
-                 'recommendation': 'Mock: Apply Copper Fungicide',
-                 'note': 'Real model not found at ' + model_path
-             }
-             
-        model = load_keras_model(model_path)
-        prediction, description = predict_image_keras(model, payload.file_path)
-        
-        return {
-            'prediction': prediction,
-            'confidence': 0.99, # Placeholder as utils doesn't return confidence
-            'recommendation': description,
-            'crop_context': 'Detected from Image'
-        }
+        return DiseaseInferenceService.predict_many([p.file_path for p in payloads])
     except ImportError:
-        return {'error': 'Disease prediction module unavailable'}
-    except Exception as e:
-        return {'error': f'Inference failed: {str(e)}'}
+        return [{'error': 'Disease prediction module unavailable'} for _ in payloads]
 
 def _process_soil_data(payload):
     """
-    Integrates with Soil Classification logic.
+    Integrates with Soil Classification logic. CSV/JSON sample files are
+    scored in chunks on the worker's classifier, with the running summary
+    written back as a progress update after each chunk.
     """
-    import sys
-    # Add external module path
-    module_path = os.path.join(os.getcwd(), 'Soil Classification Model')
-    if module_path not in sys.path:
-        sys.path.append(module_path)
-        
     try:
-        from main import SoilClassifier
-        
-        classifier = SoilClassifier()
-        # For soil, we might process an image or CSV. 
-        # Assuming payload.file_path points to the input.
-        result = classifier.predict(payload.file_path)
-        
-        return result
+        from backend.services.soil_inference_service import SoilInferenceService
+        from backend.services.pipeline_service import MediaPipelineService
+
+        if SoilInferenceService.is_tabular(payload.file_path):
+            def report_progress(summary):
+                MediaPipelineService.attach_result(payload.id, summary, status='PROCESSING')
+
+            return SoilInferenceService.score_file(payload.file_path, on_progress=report_progress)
+
+        # Images: single prediction
+        return SoilInferenceService.classifier().predict(payload.file_path)
     except ImportError:
         return {'error': 'Soil classification module unavailable'}
+    except ValueError:
+        # Unusable sample file (no numeric columns, or not the model's columns): fail the payload
+        raise
     except Exception as e:
         return {'error': f'Classification failed: {str(e)}'}
@@ -5,7 +5,6 @@ from backend.celery_app import celery_app
 from backend.models.logistics_v2 import (
     TransportRoute, FreightEscrow, CustomsCheckpoint, GPSTelemetry
 )
-from backend.models.procurement import BulkOrder
 from backend.extensions import db
 from datetime import datetime, timedelta
 import logging
@@ -19,66 +18,98 @@ def route_optimization_sync():
     Hourly task that:
     1. Scans active routes for stale customs checkpoints (> 48h pending)
     2. Recalculates dynamic freight surcharges based on latest fuel pings
-    3. Applies customs-delay surcharges to linked BulkOrders
+
+    Runs as a handful of set-based queries regardless of the number of active
+    routes: stalled checkpoints are joined to IN_TRANSIT routes, the latest
+    ping per route comes from a ROW_NUMBER() window joined to the held escrow,
+    and checkpoint and escrow changes are written with bulk UPDATEs.
     """
+    from backend.services.logistics_orchestrator import FUEL_VOLATILITY_THRESHOLD_USD
+
     logger.info("═══ Starting Route Optimization Sync ═══")
     now = datetime.utcnow()
     stale_threshold = now - timedelta(hours=48)
 
     stats = {'routes_scanned': 0, 'surcharges_applied': 0, 'alerts_raised': 0}
 
-    active_routes = TransportRoute.query.filter(
+    stats['routes_scanned'] = db.session.query(db.func.count(TransportRoute.id)).filter(
         TransportRoute.status == 'IN_TRANSIT'
+    ).scalar() or 0
+    if not stats['routes_scanned']:
+        logger.info(f"═══ Route Sync Complete: {stats} ═══")
+        return stats
+
+    # 1. Stalled customs checkpoints on active routes
+    stalled = db.session.query(
+        CustomsCheckpoint.id, CustomsCheckpoint.route_id,
+        CustomsCheckpoint.checkpoint_name, CustomsCheckpoint.arrived_at
+    ).join(TransportRoute, TransportRoute.id == CustomsCheckpoint.route_id).filter(
+        TransportRoute.status == 'IN_TRANSIT',
+        CustomsCheckpoint.status == 'PENDING',
+        CustomsCheckpoint.arrived_at <= stale_threshold
     ).all()
 
-    for route in active_routes:
-        stats['routes_scanned'] += 1
-
-        # 1. Check for stalled customs checkpoints
-        stalled = CustomsCheckpoint.query.filter_by(
-            route_id=route.id, status='PENDING'
-        ).filter(CustomsCheckpoint.arrived_at <= stale_threshold).all()
-
-        for cp in stalled:
-            wait = (now - cp.arrived_at).total_seconds() / 3600
-            cp.wait_hours = round(wait, 2)
-            logger.warning(
-                f"[RouteSync] Route {route.id} stalled at {cp.checkpoint_name} "
-                f"for {wait:.1f}h — flagging for manual review."
+    checkpoint_updates = []
+    for checkpoint_id, route_id, checkpoint_name, arrived_at in stalled:
+        wait = (now - arrived_at).total_seconds() / 3600
+        checkpoint_updates.append({'id': checkpoint_id, 'wait_hours': round(wait, 2)})
+        logger.warning(
+            f"[RouteSync] Route {route_id} stalled at {checkpoint_name} "
+            f"for {wait:.1f}h — flagging for manual review."
+        )
+    if checkpoint_updates:
+        db.session.bulk_update_mappings(CustomsCheckpoint, checkpoint_updates)
+    stats['alerts_raised'] = len(checkpoint_updates)
+
+    # 2. Latest ping per active route, joined to the route's held escrow
+    ranked_pings = db.session.query(
+        GPSTelemetry.route_id.label('route_id'),
+        GPSTelemetry.fuel_price_per_liter.label('fuel_price'),
+        db.func.row_number().over(
+            partition_by=GPSTelemetry.route_id,
+            order_by=(GPSTelemetry.recorded_at.desc(), GPSTelemetry.id.desc())
+        ).label('rank')
+    ).join(TransportRoute, TransportRoute.id == GPSTelemetry.route_id).filter(
+        TransportRoute.status == 'IN_TRANSIT'
+    ).subquery()
+
+    candidates = db.session.query(
+        FreightEscrow.id, FreightEscrow.route_id, FreightEscrow.base_price,
+        FreightEscrow.fuel_surcharge, FreightEscrow.customs_delay_penalty,
+        ranked_pings.c.fuel_price
+    ).join(ranked_pings, ranked_pings.c.route_id == FreightEscrow.route_id).filter(
+        ranked_pings.c.rank == 1,
+        ranked_pings.c.fuel_price > FUEL_VOLATILITY_THRESHOLD_USD,
+        FreightEscrow.status == 'HELD'
+    ).order_by(FreightEscrow.route_id, FreightEscrow.id).all()
+
+    escrow_updates = []
+    seen_routes = set()
+    for escrow_id, route_id, base_price, old_surcharge, customs_penalty, fuel_price in candidates:
+        # One held escrow per route, the oldest, as the per-route lookup did
+        if route_id in seen_routes:
+            continue
+        seen_routes.add(route_id)
+
+        base_price = base_price or 0.0
+        old_surcharge = old_surcharge or 0.0
+        excess = fuel_price - FUEL_VOLATILITY_THRESHOLD_USD
+        new_surcharge = round(base_price * (excess / FUEL_VOLATILITY_THRESHOLD_USD), 2)
+        if abs(new_surcharge - old_surcharge) > 0.50:
+            total = base_price + new_surcharge
+            escrow_updates.append({
+                'id': escrow_id,
+                'fuel_surcharge': new_surcharge,
+                'total_freight_amount': total,
+                'final_amount': total - (customs_penalty or 0.0)
+            })
+            logger.info(
+                f"[RouteSync] Fuel surcharge updated Route {route_id}: "
+                f"${old_surcharge:.2f} → ${new_surcharge:.2f}"
             )
-            stats['alerts_raised'] += 1
-
-        # 2. Recalculate fuel surcharge from latest GPS ping
-        latest_ping = GPSTelemetry.query.filter_by(route_id=route.id).order_by(
-            GPSTelemetry.recorded_at.desc()
-        ).first()
-
-        if latest_ping and latest_ping.fuel_price_per_liter:
-            escrow = FreightEscrow.query.filter_by(route_id=route.id, status='HELD').first()
-            if escrow:
-                from backend.services.logistics_orchestrator import (
-                    FUEL_VOLATILITY_THRESHOLD_USD, BASE_RATE_PER_KM_USD
-                )
-                fuel_price = latest_ping.fuel_price_per_liter
-                if fuel_price > FUEL_VOLATILITY_THRESHOLD_USD:
-                    excess = fuel_price - FUEL_VOLATILITY_THRESHOLD_USD
-                    new_surcharge = round(
-                        escrow.base_price * (excess / FUEL_VOLATILITY_THRESHOLD_USD), 2
-                    )
-                    if abs(new_surcharge - escrow.fuel_surcharge) > 0.50:
-                        old_surcharge = escrow.fuel_surcharge
-                        escrow.fuel_surcharge = new_surcharge
-                        escrow.total_freight_amount = escrow.base_price + new_surcharge
-                        escrow.final_amount = escrow.total_freight_amount - escrow.customs_delay_penalty
-                        stats['surcharges_applied'] += 1
-                        logger.info(
-                            f"[RouteSync] Fuel surcharge updated Route {route.id}: "
-                            f"${old_surcharge:.2f} → ${new_surcharge:.2f}"
-                        )
-
-        # 3. Propagate surcharge to linked BulkOrder
-        linked_orders = BulkOrder.query.filter_by(freight_escrow_id=None).all()
-        # (In production, BulkOrder.freight_escrow_id would link directly)
+    if escrow_updates:
+        db.session.bulk_update_mappings(FreightEscrow, escrow_updates)
+    stats['surcharges_applied'] = len(escrow_updates)
 
     db.session.commit()
     logger.info(f"═══ Route Sync Complete: {stats} ═══")
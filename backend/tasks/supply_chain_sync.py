@@ -13,12 +13,8 @@ def logistics_matching_sweep():
     logger.info("🚚 [L3-1644] Scanning for pending autonomous logistics assignments...")
     
     pending_orders = SmartContractOrder.query.filter_by(status='PENDING_TRIGGER').all()
-    matches_found = 0
-    
-    for order in pending_orders:
-        vehicle = FreightMatchEngine.assign_vehicle_to_order(order.id)
-        if vehicle:
-            matches_found += 1
-            
+    # One min-cost assignment over all pending orders instead of greedy nearest-first
+    matches_found = len(FreightMatchEngine.assign_orders_batch(pending_orders))
+
     logger.info(f"Logistics sweep complete. Paired {matches_found} missions.")
     return {'matches': matches_found}
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import event
+from app import app
+from backend.extensions import db, socketio
+from backend.models import User, Alert, AlertPreference
+from backend.services.alert_registry import AlertRegistry
+from backend.tasks import alert_tasks
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.drop_all()
+
+def test_bulk_alerts_apply_preferences_and_group_delivery(test_client, monkeypatch):
+    emits, queued = [], []
+    monkeypatch.setattr(socketio, 'emit', lambda event, payload, room=None: emits.append((event, room, payload)))
+    monkeypatch.setattr(alert_tasks.deliver_alert_batch, 'delay', lambda channel, chunk: queued.append((channel, list(chunk))))
+
+    # User() only accepts letters and spaces in names and @gmail.com addresses
+    users = [User(username=f"farmer {name}", email=f"{name}@gmail.com") for name in ('ana', 'ben', 'cai')]
+    for user in users:
+        user.password_hash = 'hash'
+    db.session.add_all(users)
+    db.session.commit()
+    muted, sms_user = users[1].id, users[2].id
+    users[2].phone = '+15550100'
+    db.session.add(AlertPreference(user_id=muted, category='MARKET', min_priority='CRITICAL'))
+    db.session.add(AlertPreference(user_id=sms_user, category='MARKET', sms_enabled=True, email_enabled=False))
+    db.session.commit()
+
+    specs = [
+        {'user_id': user.id, 'title': 'Price', 'message': f"alert {n}", 'category': 'MARKET', 'priority': 'HIGH'}
+        for user in users for n in range(2)
+    ]
+    specs.append({'title': 'Broadcast', 'message': 'all', 'category': 'SYSTEM'})
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        created = AlertRegistry.register_alerts_bulk(specs)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert len(created) == 7
+    # Besides the inserts: one user lookup, one preference lookup, one flag UPDATE; no per-alert reloads
+    others = [s for s in statements if not s.lstrip().upper().startswith('INSERT')]
+    assert len(others) == 3
+    assert not [s for s in others if 'FROM alerts' in s]
+
+    # One emit per room, muted user skipped
+    rooms = {room: payload for _, room, payload in emits}
+    assert set(rooms) == {f"user_{users[0].id}", f"user_{sms_user}", "global_alerts"}
+    assert len(rooms[f"user_{users[0].id}"]) == 2
+
+    assert [channel for channel, _ in queued] == ['email', 'sms']
+    assert {email for _, email in queued[0][1]} == {'ana@gmail.com'}
+
+    delivered = {a.user_id: a for a in Alert.query.filter(Alert.user_id.isnot(None))}
+    assert delivered[users[0].id].websocket_delivered and delivered[users[0].id].email_delivered
+    assert delivered[sms_user].sms_delivered and not delivered[sms_user].email_delivered
+    assert not delivered[muted].websocket_delivered
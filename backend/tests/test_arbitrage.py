@@ -0,0 +1,65 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models.arbitrage import ArbitrageOpportunity, AlgorithmicTradeRecord
+from backend.models.spatial_yield import SpatialYieldGrid, TemporalYieldForex
+from backend.services.arbitrage_service import AlgorithmicArbitrageMatrix, DEFAULT_TRADE_VOLUME_KG
+from backend.utils.geo_distance import wkt_centroid
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.drop_all()
+
+def _grid(region_id, lon, lat, rice_acceleration=None):
+    grid = SpatialYieldGrid(region_id=region_id, bounding_box_wkt=f"POINT({lon} {lat})")
+    db.session.add(grid)
+    db.session.flush()
+    if rice_acceleration is not None:
+        db.session.add(TemporalYieldForex(grid_id=grid.id, crop_type='RICE', base_yield_kg_per_hectare=4500.0,
+                                          growth_acceleration_factor=rice_acceleration))
+    return grid
+
+def _scalar_margin(source, target):
+    """Margin and freight from the per-pair scalar pricing and freight path."""
+    source_price = AlgorithmicArbitrageMatrix._estimate_dynamic_market_price('RICE', source)
+    target_price = AlgorithmicArbitrageMatrix._estimate_dynamic_market_price('RICE', target)
+    freight = AlgorithmicArbitrageMatrix.calculate_freight_logistics_cost(
+        *wkt_centroid(source.bounding_box_wkt), *wkt_centroid(target.bounding_box_wkt), DEFAULT_TRADE_VOLUME_KG
+    )
+    cogs = source_price * DEFAULT_TRADE_VOLUME_KG + freight
+    return (target_price * DEFAULT_TRADE_VOLUME_KG - cogs) / cogs * 100.0, freight
+
+def test_vectorized_scan_matches_scalar_pricing(test_client):
+    # RICE oversupplied at A, neutral at C next to it, scarce at B on the far side of the globe
+    a = _grid('A', 0.0, 0.0, rice_acceleration=1.5)
+    c = _grid('C', 0.1, 0.0)
+    b = _grid('B', 120.0, 0.0, rice_acceleration=0.5)
+    db.session.add(ArbitrageOpportunity(commodity_type='RICE', source_grid_id=a.id, source_price_per_kg=0.45,
+                                        target_grid_id=c.id, target_price_per_kg=0.60,
+                                        estimated_transport_cost_usd=21.7, status='IDENTIFIED'))
+    db.session.commit()
+
+    stats = AlgorithmicArbitrageMatrix.identify_arbitrage_vectors()
+
+    found = {(o.source_grid_id, o.target_grid_id): o for o in ArbitrageOpportunity.query.all()}
+    # A->C is already open; every other crop is priced the same everywhere
+    assert set(found) == {(a.id, c.id), (a.id, b.id), (c.id, b.id)}
+    assert stats['vectors_detected'] == 2
+    assert all(o.source_grid_id != o.target_grid_id for o in found.values())
+
+    for source, target in ((a, b), (c, b)):
+        margin, freight = _scalar_margin(source, target)
+        assert found[(source.id, target.id)].gross_margin_pct == pytest.approx(round(margin, 2), abs=0.01)
+        assert found[(source.id, target.id)].estimated_transport_cost_usd == pytest.approx(freight, rel=1e-9)
+
+    # Only the trade above AUTO_EXECUTE_MARGIN_PCT (~52% vs ~20%) is executed
+    assert found[(a.id, b.id)].status == 'EXECUTING'
+    assert found[(c.id, b.id)].status == 'IDENTIFIED'
+    assert stats['trades_executed'] == 1
+    assert [t.opportunity_id for t in AlgorithmicTradeRecord.query.all()] == [found[(a.id, b.id)].id]
@@ -0,0 +1,55 @@
+import threading
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models import AuditLog
+from backend.services.audit_writer import AuditLogWriter
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.drop_all()
+
+def test_buffered_records_are_bulk_written_and_flushed_on_shutdown(test_client):
+    writer = AuditLogWriter()
+    writer.init_app(app)
+    writer.FLUSH_BATCH_SIZE = 50
+    writer.FLUSH_INTERVAL_MS = 20
+
+    for i in range(120):
+        assert writer.enqueue({'action': 'POST_test', 'risk_level': 'MEDIUM', 'meta_data': str(i)})
+    writer.shutdown()
+
+    assert AuditLog.query.filter_by(action='POST_test').count() == 120
+    stats = writer.stats()
+    assert stats['written'] == 120 and stats['queued'] == 0 and stats['dropped'] == 0
+    assert stats['flushes'] < 120
+
+def test_full_buffer_applies_backpressure_then_drops(test_client):
+    writer = AuditLogWriter()
+    writer.init_app(app)
+    writer.MAX_BUFFER_SIZE = 2
+    writer.ENQUEUE_TIMEOUT_MS = 1
+    writer.FLUSH_BATCH_SIZE = 1
+
+    release = threading.Event()
+    real_write = writer._write
+
+    def stalled_write(records):
+        release.wait(5)
+        real_write(records)
+
+    writer._write = stalled_write
+    results = [writer.enqueue({'action': f'POST_{i}'}) for i in range(10)]
+    release.set()
+    writer.shutdown()
+
+    stats = writer.stats()
+    assert results.count(False) == stats['dropped'] > 0
+    assert stats['blocked'] >= stats['dropped']
+    assert AuditLog.query.count() == stats['written'] == results.count(True)
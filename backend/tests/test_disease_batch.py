@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app import app
+from backend.extensions import db
+from backend.models import MediaPayload
+from backend.services.disease_inference_service import DiseaseInferenceService
+from backend.tasks import processing_tasks
+from backend.tasks.processing_tasks import _process_disease_batch, reclaim_stale_inferences_task
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.drop_all()
+
+class _FakeModel:
+    """Logit head: the class index is the image's mean brightness bucket."""
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, images, batch_size=None, verbose=0):
+        self.calls.append(len(images))
+        logits = np.zeros((len(images), 3))
+        logits[np.arange(len(images)), (images.mean(axis=(1, 2, 3)) * 2.99).astype(int)] = 4.0
+        return logits
+
+def test_predict_arrays_uses_one_call_and_softmax(monkeypatch):
+    model = _FakeModel()
+    utils = SimpleNamespace(class_names=['healthy', 'rust', 'blight'], class_descriptions={'rust': 'Spray.'})
+    monkeypatch.setattr(DiseaseInferenceService, 'load', staticmethod(lambda: model))
+    monkeypatch.setattr(DiseaseInferenceService, '_module_utils', staticmethod(lambda: utils))
+    monkeypatch.setattr(DiseaseInferenceService, 'model_version', staticmethod(lambda: 'v1'))
+
+    images = np.stack([np.full((160, 160, 3), level, dtype=np.float32) for level in (0.1, 0.5, 0.9, 0.5)])
+    results = DiseaseInferenceService.predict_arrays(images)
+
+    assert model.calls == [4]
+    assert [r['prediction'] for r in results] == ['healthy', 'rust', 'blight', 'rust']
+    expected = np.exp(4.0) / (np.exp(4.0) + 2)
+    assert all(abs(r['confidence'] - expected) < 1e-3 for r in results)
+    assert results[1]['recommendation'] == 'Spray.'
+    assert abs(sum(entry['confidence'] for entry in results[0]['top_k']) - 1.0) < 1e-3
+
+def test_pending_payloads_are_classified_in_one_batch(test_client, monkeypatch):
+    monkeypatch.setattr(DiseaseInferenceService, 'available', staticmethod(lambda: False))
+    payloads = [
+        MediaPayload(tracking_id=f"t-{i}", payload_type='DISEASE', filename='leaf.jpg',
+                     file_path=f"/tmp/leaf-{i}.jpg", file_type='.jpg', file_size=10, status='PROCESSING')
+        for i in range(5)
+    ]
+    payloads.append(MediaPayload(tracking_id='soil', payload_type='SOIL', filename='s.csv',
+                                 file_path='/tmp/s.csv', file_type='.csv', file_size=10, status='PROCESSING'))
+    db.session.add_all(payloads)
+    db.session.commit()
+
+    assert _process_disease_batch(payloads[2])['batch_size'] == 5
+    statuses = {p.tracking_id: p.status for p in MediaPayload.query.all()}
+    assert statuses.pop('soil') == 'PROCESSING'
+    assert set(statuses.values()) == {'COMPLETED'}
+
+    # The other payloads' own tasks find nothing left to claim
+    assert _process_disease_batch(payloads[0])['status'] == 'batched'
+
+def test_stale_inferring_claims_are_redispatched(test_client, monkeypatch):
+    dispatched = []
+    monkeypatch.setattr(processing_tasks.process_media_pipeline, 'apply_async',
+                        lambda args, task_id: dispatched.append((args[0], task_id)))
+    now = datetime.utcnow()
+    stale = MediaPayload(tracking_id='stale', payload_type='DISEASE', filename='leaf.jpg', file_path='/tmp/a.jpg',
+                         file_type='.jpg', file_size=10, status='INFERRING', claimed_at=now - timedelta(hours=1))
+    fresh = MediaPayload(tracking_id='fresh', payload_type='DISEASE', filename='leaf.jpg', file_path='/tmp/b.jpg',
+                         file_type='.jpg', file_size=10, status='INFERRING', claimed_at=now)
+    db.session.add_all([stale, fresh])
+    db.session.commit()
+
+    assert reclaim_stale_inferences_task()['requeued'] == 1
+    db.session.expire_all()
+    assert stale.status == 'PROCESSING' and stale.claimed_at is None
+    assert dispatched == [(stale.id, stale.task_id)]
+    assert fresh.status == 'INFERRING'
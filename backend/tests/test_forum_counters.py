@@ -0,0 +1,84 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models import ForumCategory, ForumThread, PostComment, User, UserReputation
+from backend.services.forum_counters import forum_counters
+from backend.services.forum_search_index import forum_search_index
+from backend.services.forum_service import forum_service
+from backend.services.forum_trending import forum_trending
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            user = User(username="farmer", email="farmer@gmail.com", full_name="Test Farmer")
+            user.password_hash = "hash"
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(UserReputation(user_id=user.id))
+            db.session.add(ForumCategory(id=1, name="Crops"))
+            db.session.commit()
+            forum_counters.flush()
+            forum_search_index.rebuild()
+            forum_trending.rebuild()
+            yield client
+            db.drop_all()
+
+def _thread(title):
+    thread = ForumThread(user_id=1, category_id=1, title=title, content="...")
+    db.session.add(thread)
+    db.session.commit()
+    return thread.id
+
+def test_views_and_upvotes_are_written_behind_in_bulk(test_client):
+    thread_id = _thread("Drip irrigation for onions")
+
+    for _ in range(25):
+        details, error = forum_service.get_thread_details(thread_id)
+    assert error is None
+    # Readers see their own views before they are written
+    assert details['view_count'] == 25
+    result, _ = forum_service.toggle_upvote(user_id=1, thread_id=thread_id)
+    assert result == {'action': 'added', 'upvote_count': 1}
+
+    db.session.expire_all()
+    assert ForumThread.query.get(thread_id).view_count == 0
+    assert forum_counters.pending(thread_id) == (25, 1)
+
+    assert forum_counters.flush() == 1
+    db.session.expire_all()
+    thread = ForumThread.query.get(thread_id)
+    assert (thread.view_count, thread.upvote_count) == (25, 1)
+    assert forum_counters.pending(thread_id) == (0, 0)
+    assert forum_search_index.search(sort_by='popular')['ids'] == [thread_id]
+
+    result, _ = forum_service.toggle_upvote(user_id=1, thread_id=thread_id)
+    assert result == {'action': 'removed', 'upvote_count': 0}
+    forum_counters.flush()
+    db.session.expire_all()
+    assert ForumThread.query.get(thread_id).upvote_count == 0
+
+def test_trending_ranks_by_decayed_engagement(test_client, monkeypatch):
+    monkeypatch.setattr(forum_trending, 'TOP_K_REFRESH_SECONDS', 0)
+    quiet = _thread("Quiet thread")
+    busy = _thread("Busy thread")
+    flagged = _thread("Flagged thread")
+
+    for _ in range(3):
+        db.session.add(PostComment(thread_id=busy, user_id=1, content="Same here"))
+    db.session.commit()
+    for _ in range(20):
+        forum_service.get_thread_details(flagged)
+    forum_service.flag_content(thread_id=flagged)
+
+    assert forum_trending.top(3) == [busy, quiet]
+    threads, error = forum_service.get_trending_threads(limit=2)
+    assert error is None and [t['id'] for t in threads] == [busy, quiet]
+
+    # A rebuild reseeds the same order from the database
+    forum_trending.rebuild()
+    assert forum_trending.top(3) == [busy, quiet]
+    assert forum_trending.score(busy) > forum_trending.score(quiet) > 0
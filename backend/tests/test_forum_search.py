@@ -0,0 +1,90 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models import ForumCategory, ForumThread, PostComment
+from backend.services.forum_search_index import forum_search_index
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            db.session.add(ForumCategory(id=1, name="Crops"))
+            db.session.add(ForumCategory(id=2, name="Livestock"))
+            db.session.commit()
+            forum_search_index.rebuild()
+            yield client
+            db.drop_all()
+
+def _thread(title, content, tags='', category_id=1, **kwargs):
+    thread = ForumThread(user_id=1, category_id=category_id, title=title, content=content, tags=tags, **kwargs)
+    db.session.add(thread)
+    db.session.commit()
+    return thread.id
+
+def test_ranked_search_with_prefixes_tags_and_facets(test_client):
+    title_hit = _thread("Wheat rust outbreak", "Orange pustules on leaves", "wheat,disease")
+    body_hit = _thread("Fungicide question", "Which fungicide works against wheat rust?", "disease")
+    _thread("Rice harvest", "When to cut rice", "rice,harvest")
+    _thread("Hidden wheat rust", "Pending review", "wheat", is_ai_approved=False)
+    _thread("Wheat rust in cattle feed", "Is rusty wheat safe?", "feed", category_id=2)
+
+    found = forum_search_index.search("wheat rust", category_id=1)
+    assert found['ids'] == [title_hit, body_hit]
+    assert found['total'] == 2
+    assert found['facets'] == {'disease': 2, 'wheat': 1}
+
+    # Partial words match by prefix; every term must match
+    assert forum_search_index.search("fungi")['ids'] == [body_hit]
+    assert forum_search_index.search("wheat harvest")['ids'] == []
+
+    assert forum_search_index.search("rust", tags=["Wheat", "disease"])['ids'] == [title_hit]
+    assert forum_search_index.search(tags=["rice"])['total'] == 1
+
+    page_two = forum_search_index.search("wheat", offset=1, limit=1)
+    assert page_two['total'] == 3 and len(page_two['ids']) == 1
+
+def test_index_follows_comments_and_edits(test_client):
+    thread_id = _thread("Irrigation timing", "Drip or flood?")
+    assert forum_search_index.search(sort_by='unanswered')['ids'] == [thread_id]
+    assert forum_search_index.search("mulch")['ids'] == []
+
+    db.session.add(PostComment(thread_id=thread_id, user_id=2, content="Use mulch to keep moisture"))
+    db.session.commit()
+    assert forum_search_index.search("mulch")['ids'] == [thread_id]
+    assert forum_search_index.search(sort_by='unanswered')['ids'] == []
+
+    thread = db.session.get(ForumThread, thread_id)
+    thread.title = "Sprinkler scheduling"
+    thread.view_count = 10
+    db.session.commit()
+    assert forum_search_index.search("irrigation")['ids'] == []
+    assert forum_search_index.search("sprinkler mulch")['ids'] == [thread_id]
+
+    thread.is_ai_approved = False
+    db.session.commit()
+    assert forum_search_index.search("sprinkler")['ids'] == []
+
+    # A rebuild from the database gives the same index
+    before = forum_search_index.stats()
+    forum_search_index.rebuild()
+    after = forum_search_index.stats()
+    assert {k: after[k] for k in ('documents', 'terms', 'tags', 'avg_document_length')} == \
+        {k: before[k] for k in ('documents', 'terms', 'tags', 'avg_document_length')}
+
+def test_deleted_comment_leaves_the_index(test_client):
+    thread_id = _thread("Seed storage", "Keeping maize seed dry")
+    comment = PostComment(thread_id=thread_id, user_id=2, content="Hermetic bags stop weevils")
+    db.session.add(comment)
+    db.session.commit()
+    before = forum_search_index.stats()
+
+    db.session.delete(comment)
+    db.session.commit()
+
+    assert forum_search_index.search("weevils")['ids'] == []
+    assert forum_search_index.search("maize")['ids'] == [thread_id]
+    assert forum_search_index.search(sort_by='unanswered')['ids'] == [thread_id]
+    assert forum_search_index.stats()['avg_document_length'] < before['avg_document_length']
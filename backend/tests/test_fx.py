@@ -0,0 +1,81 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.services.fx_service import FXService
+from backend.services.fx_rate_cache import fx_rate_cache, FXRateMatrix
+from datetime import date
+from decimal import Decimal
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            fx_rate_cache.invalidate()
+            yield client
+            db.drop_all()
+
+def test_rate_matrix_precomputes_inverse_and_cross_rates():
+    matrix = FXRateMatrix({
+        ('EUR', 'USD'): Decimal('1.1'),
+        ('USD', 'INR'): Decimal('83')
+    })
+    assert matrix.get('USD', 'EUR') == Decimal('0.90909091')
+    assert matrix.get('EUR', 'INR') == Decimal('91.30000000')
+    assert matrix.get('INR', 'EUR') == Decimal('0.01095290')
+    assert matrix.get('GBP', 'USD') is None
+    assert matrix.get('GBP', 'GBP') == Decimal('1')
+
+def test_cached_rates_invalidate_on_store(test_client):
+    FXService.store_rate('EUR', 'USD', Decimal('1.1'))
+    FXService.store_rate('GBP', 'USD', Decimal('1.25'), rate_date=date(2026, 1, 1), mark_current=False)
+
+    assert FXService.get_rate('EUR', 'USD') == Decimal('1.1')
+    assert FXService.get_rate('GBP', 'USD') is None
+    assert FXService.get_rate('GBP', 'USD', date(2026, 1, 1)) == Decimal('1.25')
+
+    misses = fx_rate_cache.stats()['misses']
+    FXService.get_rate('USD', 'EUR')
+    assert fx_rate_cache.stats()['misses'] == misses
+
+    FXService.store_rate('EUR', 'USD', Decimal('1.2'))
+    assert FXService.get_rate('EUR', 'USD') == Decimal('1.2')
+    assert FXService.get_all_current_rates('USD')['EUR'] == Decimal('1.2')
+
+def test_vectorized_deltas_match_calculate_fx_delta():
+    from backend.services.fx_revaluation_engine import FXRevaluationEngine
+    from backend.utils.financial_math import calculate_fx_delta
+
+    amounts = [Decimal('1000'), Decimal('333.33'), Decimal('12.5')]
+    old_rates = [Decimal('1.10'), Decimal('83.1234'), Decimal('0.0121')]
+    new_rates = [Decimal('1.15'), Decimal('82.9876'), Decimal('0.0125')]
+
+    computed = FXRevaluationEngine.compute_deltas(amounts, old_rates, new_rates)
+    for i in range(3):
+        expected = calculate_fx_delta(amounts[i], old_rates[i], new_rates[i])
+        assert float(computed['deltas'][i]) == expected['delta']
+        assert float(computed['delta_pcts'][i]) == expected['delta_pct']
+
+def test_batch_revaluation_posts_to_ledger(test_client):
+    from backend.services.vault_service import VaultService
+    from backend.services.ledger_service import LedgerService
+
+    FXService.store_rate('EUR', 'USD', Decimal('1.10'))
+    vaults = []
+    for i in range(3):
+        vault = VaultService.create_vault(f"Co-op Vault {i}", 'user', 1)
+        VaultService.deposit(vault, Decimal('1000'), 'EUR', fx_rate=Decimal('1.10'))
+        vaults.append(vault)
+
+    FXService.store_rate('EUR', 'USD', Decimal('1.15'))
+    result = FXService.revalue_all_positions()
+
+    assert result['positions_revalued'] == 3
+    assert result['ledger_transactions_posted'] == 3
+    assert result['total_unrealized_gain'] == 150.0
+    assert LedgerService.get_account_balance(vaults[0].ledger_account_id) == Decimal('50')
+
+    # Nothing moves on a second run at the same rate
+    assert FXService.revalue_all_positions()['positions_revalued'] == 0
@@ -0,0 +1,57 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models import FreightEscrow, GPSTelemetry
+from backend.services.geofence_cache import geofence_cache
+from backend.services.logistics_orchestrator import LogisticsOrchestrator
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            geofence_cache.rebuild()
+            yield client
+            db.drop_all()
+
+def _hold(route_id, lat, lng):
+    escrow = FreightEscrow(route_id=route_id, driver_id=1, total_freight_amount=500.0,
+                           final_amount=500.0, destination_lat=lat, destination_lng=lng, status='HELD')
+    db.session.add(escrow)
+    db.session.commit()
+    return escrow
+
+def test_batch_releases_only_on_crossing(test_client):
+    escrow = _hold(1, -1.2921, 36.8219)
+    assert geofence_cache.get(1).escrow_id == escrow.id
+
+    pings = [{'route_id': 1, 'vehicle_id': 9, 'lat': -1.30 + i * 0.001, 'lng': 36.8219} for i in range(8)]
+    pings += [{'route_id': 2, 'vehicle_id': 4, 'lat': -1.2921, 'lng': 36.8219},
+              {'route_id': 1, 'vehicle_id': 9, 'lat': 'north', 'lng': 0},
+              {'route_id': 1, 'vehicle_id': 9, 'lat': 95.0, 'lng': 0},
+              {'route_id': 1, 'vehicle_id': 9, 'lat': 0, 'lng': 0, 'fuel_price': None},
+              {'route_id': 1, 'vehicle_id': 9, 'lat': 0, 'lng': 0, 'speed': 'fast'}]
+    result = LogisticsOrchestrator.ingest_gps_batch(pings)
+
+    assert result['ingested'] == 9
+    assert result['rejected'] == 4
+    assert [release['escrow_id'] for release in result['releases']] == [escrow.id]
+    assert GPSTelemetry.query.count() == 9
+    assert FreightEscrow.query.get(escrow.id).status == 'RELEASED'
+    # The release drops the route from the cache, so later pings are not re-checked
+    assert geofence_cache.get(1) is None
+    assert LogisticsOrchestrator.ingest_gps_batch(pings[:8])['releases'] == []
+
+def test_single_ping_and_batch_endpoint(test_client):
+    _hold(3, 10.0, 20.0)
+    assert LogisticsOrchestrator.ingest_gps_ping(3, 1, 10.5, 20.0)['escrow_released'] is False
+    assert LogisticsOrchestrator.ingest_gps_ping(3, 1, 10.0, 20.0005)['escrow_released'] is True
+
+    response = test_client.post('/api/v1/freight/gps/ping/batch', json={'pings': [
+        {'route_id': 3, 'vehicle_id': 1, 'lat': 10.0, 'lng': 20.0}, 'not-a-ping'
+    ]})
+    assert response.status_code == 200
+    assert response.get_json()['data']['ingested'] == 1
+    assert response.get_json()['data']['rejected'] == 1
@@ -0,0 +1,100 @@
+import io
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+from app import app
+from backend.extensions import db
+from backend.services.inference_cache import InferenceResultCache, inference_cache
+from backend.services.pipeline_service import MediaPipelineService
+from backend.utils.validators import DataIntegrityValidator
+
+def _leaf_png(path, seed=0, noise=0):
+    y, x = np.mgrid[0:120, 0:160]
+    pixels = np.stack([(x + seed * 37) % 256, (y * 2) % 256, (x * y + seed * 91) % 256], axis=-1)
+    if noise:
+        pixels = pixels + np.random.default_rng(seed).integers(-noise, noise + 1, pixels.shape)
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path)
+    return str(path)
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    model = tmp_path / 'model.h5'
+    model.write_bytes(b'v1')
+    cache = InferenceResultCache()
+    cache.VERSION_CHECK_SECONDS = 0
+    monkeypatch.setattr(InferenceResultCache, '_model_path',
+                        staticmethod(lambda payload_type: str(model) if payload_type == 'DISEASE' else None))
+    cache.model_file = model
+    return cache
+
+def test_exact_hit_until_model_changes(cache):
+    assert cache.store('DISEASE', 'abc', {'prediction': 'rust'})
+    assert not cache.store('DISEASE', 'bad', {'error': 'Unreadable image'})
+    assert not cache.store('CROP', 'abc', {'prediction': 'rust'})
+
+    assert cache.lookup('DISEASE', 'abc') == {'prediction': 'rust'}
+    assert cache.lookup('DISEASE', 'other') is None
+
+    os.utime(cache.model_file, (1, 1))
+    assert cache.lookup('DISEASE', 'abc') is None
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+def test_near_duplicate_images_share_results(cache, tmp_path):
+    original = _leaf_png(tmp_path / 'a.png')
+    cache.store('DISEASE', 'hash-a', {'prediction': 'blight'}, original)
+
+    resaved = _leaf_png(tmp_path / 'b.png', noise=2)
+    assert cache.lookup('DISEASE', 'hash-b', resaved) == {'prediction': 'blight'}
+    assert cache.stats()['near_hits'] == 1
+
+    different = _leaf_png(tmp_path / 'c.png', seed=3)
+    cache.PHASH_MAX_DISTANCE = 0
+    assert cache.lookup('DISEASE', 'hash-c', different) is None
+
+def test_lru_and_ttl_eviction(cache, monkeypatch):
+    cache.MAX_ENTRIES = 2
+    for content_hash in ('a', 'b'):
+        cache.store('DISEASE', content_hash, {'prediction': content_hash})
+    cache.lookup('DISEASE', 'a')
+    cache.store('DISEASE', 'c', {'prediction': 'c'})
+
+    assert cache.lookup('DISEASE', 'b') is None
+    assert cache.lookup('DISEASE', 'a') == {'prediction': 'a'}
+
+    cache.TTL_SECONDS = 0
+    assert cache.lookup('DISEASE', 'c') is None
+
+def test_cached_upload_skips_the_task(tmp_path, monkeypatch):
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    dispatched = []
+    monkeypatch.setattr(DataIntegrityValidator, 'sniff_mime', staticmethod(lambda head: 'image/png'))
+    monkeypatch.setattr(MediaPipelineService, '_dispatch_task', staticmethod(dispatched.append))
+    inference_cache.invalidate()
+
+    with open(_leaf_png(tmp_path / 'leaf.png'), 'rb') as f:
+        data = f.read()
+
+    with app.app_context():
+        db.create_all()
+        first, _ = MediaPipelineService.ingest_payload(
+            FileStorage(stream=io.BytesIO(data), filename='leaf.png'), 'DISEASE',
+            user_id=1, metadata={'crop_name': 'Potato'}
+        )
+        MediaPipelineService.attach_result(first.id, {'prediction': 'Potato___Late_blight'})
+
+        # Same bytes under a model version the original payload predates: served from the cache
+        monkeypatch.setattr(inference_cache, 'is_current', lambda payload_type, processed_at: False)
+        second, _ = MediaPipelineService.ingest_payload(
+            FileStorage(stream=io.BytesIO(data), filename='leaf.png'), 'DISEASE',
+            user_id=2, metadata={'crop_name': 'Potato'}
+        )
+
+        assert dispatched == [first]
+        assert second.status == 'COMPLETED'
+        assert second.to_dict()['result'] == {'prediction': 'Potato___Late_blight', 'cached': True}
+        db.drop_all()
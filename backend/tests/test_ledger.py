@@ -0,0 +1,258 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models import (
+    LedgerAccount, LedgerEntry, LedgerAccountBalance, LedgerBalanceCheckpoint, AccountType, TransactionType
+)
+from backend.services.ledger_service import LedgerService
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.drop_all()
+
+@pytest.fixture
+def setup_accounts(test_client):
+    cash = LedgerService.create_account('1000-CASH-USD', 'Cash', AccountType.ASSET)
+    equity = LedgerService.create_account('3000-EQUITY', 'Owner Equity', AccountType.EQUITY)
+    return cash.id, equity.id
+
+def _post(cash_id, equity_id, amount, entry_date=None):
+    return LedgerService.create_transaction(
+        transaction_type=TransactionType.DEPOSIT,
+        entries=[
+            {'account_id': cash_id, 'entry_type': 'DEBIT', 'amount': amount},
+            {'account_id': equity_id, 'entry_type': 'CREDIT', 'amount': amount}
+        ],
+        entry_date=entry_date
+    )
+
+def test_balance_snapshot_maintained_on_post_and_reversal(setup_accounts):
+    cash_id, equity_id = setup_accounts
+    _post(cash_id, equity_id, 100)
+    txn = _post(cash_id, equity_id, 40)
+
+    snapshot = db.session.get(LedgerAccountBalance, cash_id)
+    assert snapshot.entry_count == 2
+    assert LedgerService.get_account_balance(cash_id) == Decimal('140')
+
+    LedgerService.reverse_transaction(txn.id)
+    assert LedgerService.get_account_balance(cash_id) == Decimal('100')
+    assert LedgerService.get_account_balance(equity_id) == Decimal('100')
+
+def test_checkpoint_as_of_balance_and_backdated_invalidation(setup_accounts):
+    cash_id, equity_id = setup_accounts
+    ten_days_ago = datetime.utcnow() - timedelta(days=10)
+    _post(cash_id, equity_id, 100, entry_date=ten_days_ago)
+
+    result = LedgerService.create_balance_checkpoints(ten_days_ago + timedelta(days=1))
+    assert result['checkpoints_created'] == 2
+
+    _post(cash_id, equity_id, 25)
+    assert LedgerService.get_account_balance(cash_id, as_of_date=ten_days_ago + timedelta(days=2)) == Decimal('100')
+    assert LedgerService.get_account_balance(cash_id, as_of_date=datetime.utcnow()) == Decimal('125')
+
+    # A backdated posting before the checkpoint must drop it
+    _post(cash_id, equity_id, 5, entry_date=ten_days_ago)
+    assert LedgerBalanceCheckpoint.query.count() == 0
+    assert LedgerService.get_account_balance(cash_id, as_of_date=ten_days_ago + timedelta(days=2)) == Decimal('105')
+
+def test_concurrently_seeded_snapshot_is_reused(setup_accounts, monkeypatch):
+    cash_id, equity_id = setup_accounts
+    _post(cash_id, equity_id, 100)
+
+    # Another posting seeded the rows between our UPDATE (no row yet) and our insert
+    increment = LedgerService._increment_balance_snapshot
+    calls = []
+    def racing_increment(connection, account_id, delta):
+        calls.append(account_id)
+        return calls.count(account_id) > 1 and increment(connection, account_id, delta)
+    monkeypatch.setattr(LedgerService, '_increment_balance_snapshot', staticmethod(racing_increment))
+
+    _post(cash_id, equity_id, 40)
+
+    assert sorted(calls) == sorted([cash_id, cash_id, equity_id, equity_id])
+    assert db.session.get(LedgerAccountBalance, cash_id).entry_count == 2
+    assert LedgerService.get_account_balance(cash_id) == Decimal('140')
+
+def test_entries_written_outside_ledger_service_keep_snapshots_current(test_client):
+    from backend.services.logistics_orchestrator import LogisticsOrchestrator
+
+    LogisticsOrchestrator._post_escrow_ledger(7, 3, 250.0, TransactionType.FREIGHT_ESCROW_HOLD, 'hold')
+    db.session.commit()
+    escrow = LedgerAccount.query.filter_by(account_code='PLATFORM-FREIGHT-ESCROW').one()
+    driver = LedgerAccount.query.filter_by(account_code='DRIVER-3-RECEIVABLE').one()
+    assert db.session.get(LedgerAccountBalance, escrow.id) is not None
+    assert escrow.get_balance() == Decimal('-250')
+
+    release_id = LogisticsOrchestrator._post_escrow_ledger(7, 3, 250.0, TransactionType.FREIGHT_RELEASE, 'release')
+    # Flushed but not committed: snapshots already loaded in the session are refreshed
+    assert escrow.get_balance() == Decimal('0')
+    db.session.commit()
+    assert driver.get_balance() == Decimal('0')
+
+    for entry in LedgerEntry.query.filter_by(transaction_id=release_id).all():
+        db.session.delete(entry)
+    db.session.commit()
+    assert escrow.get_balance() == Decimal('-250')
+    assert LedgerService.verify_balance_consistency()['drift_count'] == 0
+
+def test_consistency_verifier_reports_and_repairs_drift(setup_accounts):
+    cash_id, equity_id = setup_accounts
+    _post(cash_id, equity_id, 100)
+
+    assert LedgerService.verify_balance_consistency()['drift_count'] == 0
+
+    db.session.get(LedgerAccountBalance, cash_id).debit_total = 0
+    db.session.commit()
+
+    report = LedgerService.verify_balance_consistency(repair=True)
+    assert report['drift_count'] == 1
+    assert report['drifts'][0]['account_id'] == cash_id
+    assert report['drifts'][0]['debit_drift'] == -100.0
+    assert LedgerService.get_account_balance(cash_id) == Decimal('100')
+    assert LedgerService.verify_balance_consistency()['drift_count'] == 0
+
+def test_trial_balance_and_hierarchical_rollup(setup_accounts):
+    cash_id, equity_id = setup_accounts
+    farm_cash = LedgerService.create_account('1100-FARM-CASH', 'Farm Cash', AccountType.ASSET, parent_id=cash_id)
+    field_cash = LedgerService.create_account('1110-FIELD-CASH', 'Field Cash', AccountType.ASSET, parent_id=farm_cash.id)
+    _post(cash_id, equity_id, 100)
+    _post(farm_cash.id, equity_id, 30)
+    _post(field_cash.id, equity_id, 12)
+
+    assert LedgerService.get_account_balance(cash_id) == Decimal('100')
+    assert LedgerService.get_account_balance(cash_id, include_children=True) == Decimal('142')
+    assert LedgerService.get_account_balance(farm_cash.id, include_children=True) == Decimal('42')
+    assert LedgerService.get_account_balance(farm_cash.id, include_children=True,
+                                             as_of_date=datetime.utcnow()) == Decimal('42')
+    assert sorted(LedgerService._subtree_account_ids(farm_cash.id)) == sorted([farm_cash.id, field_cash.id])
+
+    # A child without a snapshot row still counts
+    db.session.delete(db.session.get(LedgerAccountBalance, field_cash.id))
+    db.session.commit()
+    assert LedgerService.get_account_balance(farm_cash.id, include_children=True) == Decimal('42')
+
+    trial_balance = LedgerService.get_trial_balance()
+    assert len(trial_balance['assets']) == 3
+    assert trial_balance['equity'][0]['balance'] == 142.0
+    assert trial_balance['equity'][0]['credit'] == 142.0
+    assert trial_balance['totals']['total_debits'] == 142.0
+    assert trial_balance['totals']['is_balanced'] is True
+
+def test_bulk_posting_atomic_and_per_item_errors(setup_accounts):
+    cash_id, equity_id = setup_accounts
+    batch = [
+        {
+            'transaction_type': TransactionType.DEPOSIT,
+            'entries': [
+                {'account_id': cash_id, 'entry_type': 'DEBIT', 'amount': 10},
+                {'account_id': equity_id, 'entry_type': 'CREDIT', 'amount': 10}
+            ]
+        }
+        for _ in range(5)
+    ]
+    batch.append({
+        'transaction_type': TransactionType.DEPOSIT,
+        'entries': [
+            {'account_id': cash_id, 'entry_type': 'DEBIT', 'amount': 10},
+            {'account_id': equity_id, 'entry_type': 'CREDIT', 'amount': 9}
+        ]
+    })
+
+    result = LedgerService.create_transactions_bulk(batch, atomic=True)
+    assert result['committed'] is False
+    assert result['errors'][0]['index'] == 5
+    assert LedgerService.get_account_balance(cash_id) == Decimal('0')
+
+    result = LedgerService.create_transactions_bulk(batch, atomic=False)
+    assert result['committed'] is True
+    assert result['created_count'] == 5
+    assert len(result['errors']) == 1
+    assert LedgerService.get_account_balance(cash_id) == Decimal('50')
+    assert LedgerService.verify_balance_consistency()['drift_count'] == 0
+
+def test_bulk_transfers_atomic_and_per_item_errors(setup_accounts):
+    cash_id, equity_id = setup_accounts
+    savings = LedgerService.create_account('1200-SAVINGS-USD', 'Savings', AccountType.ASSET)
+    _post(cash_id, equity_id, 100)
+    transfers = [
+        {'from_account_id': cash_id, 'to_account_id': savings.id, 'amount': 10, 'currency': 'USD'}
+        for _ in range(3)
+    ]
+    transfers.append({'from_account_id': cash_id, 'to_account_id': 9999, 'amount': 10, 'currency': 'USD'})
+
+    result = LedgerService.record_transfers_bulk(transfers, atomic=True)
+    assert result['committed'] is False
+    assert result['errors'][0]['index'] == 3
+    assert LedgerService.get_account_balance(savings.id) == Decimal('0')
+
+    result = LedgerService.record_transfers_bulk(transfers, atomic=False)
+    assert result['committed'] is True
+    assert result['created_count'] == 3
+    assert len(result['errors']) == 1
+    assert LedgerService.get_account_balance(cash_id) == Decimal('70')
+    assert LedgerService.get_account_balance(savings.id) == Decimal('30')
+    entry = LedgerEntry.query.filter_by(account_id=savings.id).first()
+    assert entry.memo == 'Transfer from Cash'
+    assert LedgerService.verify_balance_consistency()['drift_count'] == 0
+
+def test_keyset_statement_pages_and_streaming_export(setup_accounts):
+    cash_id, equity_id = setup_accounts
+    start = datetime.utcnow() - timedelta(days=30)
+    for day in range(7):
+        _post(cash_id, equity_id, 10 * (day + 1), entry_date=start + timedelta(days=day))
+
+    # Newest first, three per page, running balance carried through the cursor
+    page = LedgerService.get_account_statement(cash_id, limit=3)
+    assert page['closing_balance'] == 280.0
+    assert [e['running_balance'] for e in page['entries']] == [280.0, 210.0, 150.0]
+    running = [e['running_balance'] for e in page['entries']]
+    while page['has_more']:
+        page = LedgerService.get_account_statement(cash_id, limit=3, cursor=page['next_cursor'])
+        running.extend(e['running_balance'] for e in page['entries'])
+    assert running == [280.0, 210.0, 150.0, 100.0, 60.0, 30.0, 10.0]
+    assert page['opening_balance'] == 0.0
+
+    # Chronological window starting mid-way opens with the prior balance
+    page = LedgerService.get_account_statement(
+        cash_id, start_date=start + timedelta(days=5), limit=10, order='asc'
+    )
+    assert page['opening_balance'] == 150.0
+    assert page['closing_balance'] == 280.0
+    assert page['next_cursor'] is None
+
+    rows = list(LedgerService.iter_account_statement(cash_id, batch_size=2))
+    assert len(rows) == 7
+    assert Decimal(rows[-1]['running_balance']) == Decimal('280')
+
+    csv_text = ''.join(LedgerService.export_account_statement(cash_id, 'csv', batch_size=2))
+    assert csv_text.splitlines()[0].startswith('entry_id,transaction_id')
+    assert len(csv_text.splitlines()) == 8
+
+def test_statement_cursor_is_signed_and_bound_to_account(setup_accounts):
+    import base64, json
+    cash_id, equity_id = setup_accounts
+    for amount in (10, 20, 30):
+        _post(cash_id, equity_id, amount)
+
+    cursor = LedgerService.get_account_statement(cash_id, limit=1)['next_cursor']
+    encoded, signature = cursor.split('.')
+    payload = json.loads(base64.urlsafe_b64decode(encoded))
+
+    for forged_balance in ('1000000', 'not-a-number'):
+        forged = base64.urlsafe_b64encode(json.dumps(dict(payload, b=forged_balance)).encode()).decode()
+        with pytest.raises(ValueError):
+            LedgerService.get_account_statement(cash_id, limit=1, cursor=f"{forged}.{signature}")
+
+    with pytest.raises(ValueError):
+        LedgerService.get_account_statement(equity_id, limit=1, cursor=cursor)
+    with pytest.raises(ValueError):
+        LedgerService.get_account_statement(cash_id, limit=1, cursor='garbage')
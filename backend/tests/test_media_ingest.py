@@ -0,0 +1,73 @@
+import hashlib
+import io
+import os
+import pytest
+from werkzeug.datastructures import FileStorage
+from app import app
+from backend.extensions import db
+from backend.models import MediaPayload
+from backend.services.inference_cache import inference_cache
+from backend.services.pipeline_service import MediaPipelineService
+from backend.utils.validators import DataIntegrityValidator
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + b'leaf' * 40000
+
+@pytest.fixture
+def test_client(tmp_path, monkeypatch):
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    dispatched = []
+    monkeypatch.setattr(DataIntegrityValidator, 'sniff_mime',
+                        staticmethod(lambda head: 'image/png' if head.startswith(b'\x89PNG') else 'application/octet-stream'))
+    monkeypatch.setattr(MediaPipelineService, '_dispatch_task', staticmethod(dispatched.append))
+    inference_cache.invalidate()
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            client.dispatched = dispatched
+            yield client
+            db.drop_all()
+
+def _upload(data, user_id, filename='leaf.png'):
+    return MediaPipelineService.ingest_payload(
+        FileStorage(stream=io.BytesIO(data), filename=filename), 'DISEASE',
+        user_id=user_id, metadata={'crop_name': 'Tomato'}
+    )
+
+def test_upload_is_streamed_and_hashed(test_client):
+    payload, error = _upload(PNG_BYTES, user_id=1)
+
+    assert error is None
+    assert payload.content_hash == hashlib.sha256(PNG_BYTES).hexdigest()
+    assert payload.file_size == len(PNG_BYTES)
+    with open(payload.file_path, 'rb') as f:
+        assert f.read() == PNG_BYTES
+    assert test_client.dispatched == [payload]
+
+def test_rejected_uploads_leave_no_files(test_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(DataIntegrityValidator, 'MAX_FILE_SIZE', 1000)
+    payload, error = _upload(PNG_BYTES, user_id=1)
+    assert payload is None and 'exceeds limit' in error
+
+    payload, error = _upload(b'MZ' + b'\x00' * 100, user_id=1)
+    assert payload is None and 'mismatch' in error
+
+    assert not any(files for _, _, files in os.walk(tmp_path))
+    assert MediaPayload.query.count() == 0
+
+def test_reupload_reuses_payload_and_result(test_client):
+    first, _ = _upload(PNG_BYTES, user_id=1)
+    MediaPipelineService.attach_result(first.id, {'prediction': 'Tomato___healthy'})
+
+    again, _ = _upload(PNG_BYTES, user_id=1)
+    assert again.id == first.id
+
+    other, _ = _upload(PNG_BYTES, user_id=2)
+    assert other.id != first.id
+    assert other.file_path == first.file_path
+    assert other.status == 'COMPLETED'
+    assert other.to_dict()['result'] == {'prediction': 'Tomato___healthy'}
+
+    assert test_client.dispatched == [first]
+    assert len(os.listdir(os.path.dirname(first.file_path))) == 1
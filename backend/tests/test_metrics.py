@@ -0,0 +1,86 @@
+import json
+import os
+import random
+import threading
+from backend.monitoring.metrics import MetricsCollector, QuantileSketch
+
+def test_histogram_buckets_are_fixed_and_cumulative():
+    collector = MetricsCollector()
+    collector.register_histogram('latency', buckets=(0.1, 0.5, 1.0))
+    for value in [0.05, 0.1, 0.3, 0.7, 2.0] * 1000:
+        collector.observe('latency', value, {'endpoint': 'farms'})
+
+    state = collector.snapshot()['histograms']['latency{endpoint="farms"}']
+    assert state['counts'] == [2000, 1000, 1000, 1000]
+    assert state['count'] == 5000
+
+    output = collector.to_prometheus()
+    assert 'latency_bucket{endpoint="farms",le="0.1"} 2000' in output
+    assert 'latency_bucket{endpoint="farms",le="+Inf"} 5000' in output
+    assert 'latency_count{endpoint="farms"} 5000' in output
+    assert output.count('# TYPE latency histogram') == 1
+
+def test_counters_from_many_threads_are_exact():
+    collector = MetricsCollector()
+
+    def work():
+        for _ in range(5000):
+            collector.increment('hits', labels={'status': '2xx'})
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert collector.snapshot()['counters'] == {'hits{status="2xx"}': 40000}
+    # Shards of finished threads are folded away
+    assert collector._shards == []
+
+def test_quantile_sketch_relative_error():
+    rng = random.Random(1)
+    values = sorted(rng.lognormvariate(-3, 1) for _ in range(20000))
+    halves = QuantileSketch(0.01), QuantileSketch(0.01)
+    for i, value in enumerate(values):
+        halves[i % 2].add(value)
+    sketch = QuantileSketch.from_dict(halves[0].to_dict())
+    sketch.merge(halves[1])
+
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= 0.011 * exact
+
+def test_multiprocess_snapshots_are_merged(tmp_path):
+    collector = MetricsCollector()
+    collector.multiproc_dir = str(tmp_path)
+    collector.increment('jobs', 3)
+    collector.observe('latency', 0.2)
+
+    other = MetricsCollector()
+    other.increment('jobs', 4)
+    other.observe('latency', 0.02)
+    with open(os.path.join(tmp_path, 'metrics_999999.json'), 'w') as f:
+        json.dump(other.snapshot(), f)
+
+    output = collector.to_prometheus()
+    assert 'jobs 7' in output
+    assert 'latency_count 2' in output
+    assert 'latency_bucket{le="0.025"} 1' in output
+
+
+def test_multiprocess_gauges_are_labelled_by_pid(tmp_path):
+    collector = MetricsCollector()
+    collector.multiproc_dir = str(tmp_path)
+    collector.set_gauge('queue_depth', 5, labels={'queue': 'audit'})
+
+    other = MetricsCollector()
+    other.set_gauge('queue_depth', 2, labels={'queue': 'audit'})
+    snapshot = other.snapshot()
+    snapshot['pid'] = 999999
+    with open(os.path.join(tmp_path, 'metrics_999999.json'), 'w') as f:
+        json.dump(snapshot, f)
+
+    output = collector.to_prometheus()
+    assert f'queue_depth{{queue="audit",pid="{os.getpid()}"}} 5' in output
+    assert 'queue_depth{queue="audit",pid="999999"} 2' in output
+    assert 'queue_depth{queue="audit"} 7' not in output
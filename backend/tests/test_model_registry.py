@@ -0,0 +1,62 @@
+import os
+import threading
+import joblib
+import pytest
+from backend.services.model_registry import ModelRegistry, ModelNotAvailableError
+from backend.utils.micro_batcher import MicroBatcher
+
+def test_registry_loads_once_and_hot_reloads_on_mtime(tmp_path):
+    path = str(tmp_path / 'model.pkl')
+    joblib.dump({'version': 1}, path)
+
+    registry = ModelRegistry()
+    registry.CHECK_INTERVAL_SECONDS = 0
+    assert registry.get(path)['version'] == 1
+    assert registry.get(path) is registry.get(path)
+    assert registry.stats()[path]['loads'] == 1
+
+    joblib.dump({'version': 2}, path)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert registry.get(path)['version'] == 2
+    assert registry.stats()[path]['loads'] == 2
+
+    # A missing file keeps serving the loaded version; never-loaded paths raise
+    os.remove(path)
+    assert registry.get(path)['version'] == 2
+    with pytest.raises(ModelNotAvailableError):
+        registry.get(str(tmp_path / 'missing.pkl'))
+
+def test_micro_batcher_groups_concurrent_requests():
+    calls = []
+
+    def square_all(items):
+        calls.append(len(items))
+        return [item * item for item in items]
+
+    batcher = MicroBatcher(square_all, max_batch_size=16, max_wait_ms=50)
+    barrier = threading.Barrier(40)
+    results = {}
+
+    def worker(n):
+        barrier.wait()
+        results[n] = batcher.submit(n).result(timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {n: n * n for n in range(40)}
+    assert sum(calls) == 40
+    assert max(calls) <= 16
+    assert len(calls) < 40
+
+def test_micro_batcher_propagates_errors():
+    def fail(items):
+        raise ValueError('model exploded')
+
+    batcher = MicroBatcher(fail, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        batcher.submit(1).result(timeout=5)
@@ -0,0 +1,108 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models import DiseaseIncident, OutbreakZone
+from backend.services.geospatial_service import GeospatialService
+from backend.services.incident_index import incident_index
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            incident_index.rebuild()
+            yield client
+            db.drop_all()
+
+_counter = [0]
+
+def _report(lat, lon, disease='leaf_rust'):
+    _counter[0] += 1
+    db.session.add(DiseaseIncident(
+        incident_id=f"INC-{_counter[0]}", user_id=1, disease_name=disease, crop_affected='maize',
+        severity_level='high', latitude=lat, longitude=lon, affected_area=1.0
+    ))
+
+def _zone_members():
+    members = {}
+    for incident in DiseaseIncident.query.all():
+        members.setdefault(incident.outbreak_zone_id, set()).add(incident.id)
+    return members
+
+def test_incremental_runs_create_grow_and_merge_zones(test_client):
+    # Two blobs ~165 km apart and one isolated report
+    for i in range(4):
+        _report(i * 0.05, 36.0)
+        _report(i * 0.05, 37.5)
+    _report(5.0, 5.0)
+    db.session.commit()
+
+    summary = GeospatialService.update_outbreak_zones(radius_km=50, min_incidents=3)
+    assert len(summary['zones_created']) == 2
+    assert None in _zone_members() and len(_zone_members()[None]) == 1
+
+    # Nothing new, nothing to do
+    summary = GeospatialService.update_outbreak_zones(radius_km=50, min_incidents=3)
+    assert summary['new_incidents'] == 0 and summary['incidents_clustered'] == 0
+
+    # A chain of reports bridges the blobs; two more turn the isolated report into a zone
+    for lon in (36.4, 36.8, 37.1):
+        _report(0.0, lon)
+        _report(0.05, lon)
+    _report(5.01, 5.0)
+    _report(5.0, 5.01)
+    db.session.commit()
+
+    summary = GeospatialService.update_outbreak_zones(radius_km=50, min_incidents=3)
+    assert len(summary['zones_merged']) == 1
+    assert len(summary['zones_created']) == 1
+
+    active = OutbreakZone.query.filter_by(status='active').all()
+    assert sorted(zone.incident_count for zone in active) == [3, 14]
+    assert None not in _zone_members()
+
+    # Same partition as a from-scratch DBSCAN over every incident
+    batch = GeospatialService._find_dense_clusters(DiseaseIncident.query.all(), 50, 3)
+    assert {frozenset(i.id for i in cluster) for cluster in batch} == {
+        frozenset(ids) for ids in _zone_members().values()
+    }
+
+def test_dbscan_expands_through_chains_regardless_of_order():
+    class Point:
+        def __init__(self, id, latitude, longitude):
+            self.id, self.latitude, self.longitude = id, latitude, longitude
+
+    # Points 0.3 deg apart (~33 km) along the equator form one chain at 40 km
+    chain = [Point(i, 0.0, 30.0 + 0.3 * i) for i in range(8)]
+    for ordering in (chain, list(reversed(chain)), chain[3:] + chain[:3]):
+        clusters = GeospatialService._find_dense_clusters(ordering, 40, 3)
+        assert [sorted(p.id for p in cluster) for cluster in clusters] == [list(range(8))]
+
+def test_batch_detection_summarizes_clusters(test_client):
+    for i in range(4):
+        _report(i * 0.05, 36.0)
+    _report(5.0, 5.0)
+    db.session.commit()
+
+    [cluster] = GeospatialService.detect_outbreak_clusters(radius_km=50, min_incidents=3)
+
+    assert cluster['incident_count'] == 4
+    assert cluster['severity_level'] == 'high'
+    assert cluster['total_affected_area'] == 4.0
+    assert cluster['center_lat'] == pytest.approx(0.075)
+
+def test_radius_fallback_returns_active_incidents_closest_first(test_client):
+    _report(0.2, 36.0)
+    _report(0.0, 36.0)
+    _report(0.1, 36.0)
+    _report(3.0, 36.0)
+    db.session.commit()
+    rejected = DiseaseIncident.query.filter_by(latitude=0.1).one()
+    rejected.verification_status = 'rejected'
+    db.session.commit()
+
+    found = GeospatialService._find_incidents_in_radius_fallback(0.0, 36.0, 50, disease_name='leaf_rust')
+
+    assert [incident.latitude for incident in found] == [0.0, 0.2]
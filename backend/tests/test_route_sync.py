@@ -0,0 +1,56 @@
+import pytest
+from datetime import datetime, timedelta
+from app import app
+from backend.extensions import db
+from backend.models import TransportRoute, FreightEscrow, CustomsCheckpoint, GPSTelemetry
+from backend.tasks.route_optimization import route_optimization_sync
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            db.drop_all()
+
+def _route(status, fuel_prices, stalled_hours=None):
+    route = TransportRoute(origin='Nakuru', destination='Kampala', status=status)
+    db.session.add(route)
+    db.session.flush()
+    db.session.add(FreightEscrow(route_id=route.id, driver_id=1, total_freight_amount=1000.0,
+                                 base_price=1000.0, final_amount=1000.0, customs_delay_penalty=50.0,
+                                 destination_lat=0.3, destination_lng=32.6, status='HELD'))
+    now = datetime.utcnow()
+    # Newest price first; only the latest ping per route should count
+    for age, price in enumerate(fuel_prices):
+        db.session.add(GPSTelemetry(route_id=route.id, vehicle_id=1, latitude=0.0, longitude=35.0,
+                                    fuel_price_per_liter=price, recorded_at=now - timedelta(minutes=age)))
+    if stalled_hours is not None:
+        db.session.add(CustomsCheckpoint(route_id=route.id, checkpoint_name='Malaba', status='PENDING',
+                                         arrived_at=now - timedelta(hours=stalled_hours)))
+    db.session.commit()
+    return route
+
+def test_sync_uses_latest_ping_and_flags_stalled_checkpoints(test_client):
+    hot = _route('IN_TRANSIT', [1.50, 1.00], stalled_hours=60)
+    calm = _route('IN_TRANSIT', [1.00, 1.80], stalled_hours=10)
+    done = _route('COMPLETED', [1.90], stalled_hours=72)
+
+    stats = route_optimization_sync.run()
+    assert stats == {'routes_scanned': 2, 'surcharges_applied': 1, 'alerts_raised': 1}
+
+    escrow = FreightEscrow.query.filter_by(route_id=hot.id).one()
+    assert escrow.fuel_surcharge == 250.0
+    assert escrow.total_freight_amount == 1250.0
+    assert escrow.final_amount == 1200.0
+    assert FreightEscrow.query.filter_by(route_id=calm.id).one().fuel_surcharge == 0.0
+    assert FreightEscrow.query.filter_by(route_id=done.id).one().fuel_surcharge == 0.0
+
+    stalled = CustomsCheckpoint.query.filter_by(route_id=hot.id).one()
+    assert 59.9 < stalled.wait_hours < 60.1
+    assert CustomsCheckpoint.query.filter_by(route_id=done.id).one().wait_hours == 0.0
+
+    # A second run finds nothing left to change
+    assert route_optimization_sync.run()['surcharges_applied'] == 0
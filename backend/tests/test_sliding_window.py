@@ -0,0 +1,42 @@
+import pytest
+from backend.utils.sliding_window import SlidingWindowCounter
+from backend.services.audit_service import AuditService
+from backend.services.threat_counters import threat_counters
+
+def test_counts_expire_bucket_by_bucket():
+    counter = SlidingWindowCounter(window_seconds=60, buckets=6)
+    assert counter.hit('ip', now=0) == 1
+    assert counter.hit('ip', amount=2, now=15) == 3
+    assert counter.count('ip', now=59) == 3
+    # The bucket holding t=0 has left the window; t=15 is still in
+    assert counter.count('ip', now=65) == 2
+    assert counter.count('ip', now=80) == 0
+    assert counter.hit('ip', now=1000) == 1
+
+def test_idle_keys_are_evicted_lru():
+    counter = SlidingWindowCounter(window_seconds=60, max_keys=2)
+    counter.hit('a', now=0)
+    counter.hit('b', now=0)
+    counter.hit('a', now=1)
+    counter.hit('c', now=2)
+    assert len(counter) == 2
+    assert counter.count('b', now=2) == 0
+    assert counter.count('a', now=2) == 2
+    assert counter.stats()['evictions'] == 1
+
+    with pytest.raises(ValueError):
+        SlidingWindowCounter(window_seconds=0)
+
+def test_threat_detection_uses_counters_without_queries():
+    threat_counters.reset()
+    for _ in range(6):
+        assert AuditService._detect_threat('EXPORT_DATA', 7, '10.0.0.1', '/export') == (False, "")
+    is_threat, reason = AuditService._detect_threat('EXPORT_DATA', 7, '10.0.0.1', '/export')
+    assert is_threat and 'bulk' in reason
+    # Other users are counted separately
+    assert AuditService._detect_threat('EXPORT_DATA', 8, '10.0.0.1', '/export') == (False, "")
+
+    for _ in range(11):
+        assert AuditService._detect_threat('LOGIN_FAILED', None, '10.0.0.9', '/login')[0] is False
+    assert AuditService._detect_threat('LOGIN_FAILED', None, '10.0.0.9', '/login')[0] is True
+    threat_counters.reset()
@@ -0,0 +1,78 @@
+import json
+import numpy as np
+import pytest
+from backend.services.soil_inference_service import SoilInferenceService
+
+class _ThresholdClassifier:
+    """Labels a sample by its first feature; records each batch size."""
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, features, feature_names=None):
+        self.batches.append(len(features))
+        labels = ['Black Soil' if value > 6.5 else 'Red Soil' for value in features[:, 0]]
+        return labels, np.full(len(features), 0.9)
+
+def test_csv_is_scored_in_chunks_with_progress(tmp_path, monkeypatch):
+    path = tmp_path / 'samples.csv'
+    lines = ['ph,site,nitrogen']
+    lines += [f"{7.0 if i % 4 == 0 else 6.0},plot-{i},{'' if i == 3 else 40 + i}" for i in range(10)]
+    path.write_text('\n'.join(lines) + '\n')
+
+    classifier = _ThresholdClassifier()
+    monkeypatch.setattr(SoilInferenceService, 'classifier', staticmethod(lambda: classifier))
+    monkeypatch.setattr(SoilInferenceService, 'CHUNK_ROWS', 4)
+
+    progress = []
+    result = SoilInferenceService.score_file(str(path), on_progress=progress.append)
+
+    assert classifier.batches == [4, 4, 2]
+    assert [p['rows_scored'] for p in progress] == [4, 8, 10]
+    assert result['features'] == ['ph', 'nitrogen']
+    assert result['soil_type_distribution'] == {'Black Soil': 3, 'Red Soil': 7}
+    assert result['dominant_soil_type'] == 'Red Soil'
+    assert result['recommended_crops'] == ['Groundnut', 'Potato', 'Rice']
+    assert result['mean_confidence'] == 0.9
+    assert [s['row'] for s in result['samples']] == list(range(10))
+
+def test_missing_values_get_the_chunk_mean(tmp_path):
+    path = tmp_path / 'samples.json'
+    path.write_text(json.dumps({'samples': [
+        {'ph': 6.0, 'moisture': 10}, {'ph': None, 'moisture': 20}, {'ph': 8.0, 'moisture': 'n/a'}
+    ]}))
+
+    [(names, features)] = list(SoilInferenceService.iter_feature_chunks(str(path)))
+
+    assert names == ['ph', 'moisture']
+    np.testing.assert_allclose(features, [[6.0, 10.0], [7.0, 20.0], [8.0, 15.0]])
+
+def test_mock_classifier_scores_a_batch():
+    module = SoilInferenceService._soil_module()
+    labels, confidences = module.SoilClassifier().predict_batch(np.ones((50, 3)))
+
+    assert len(labels) == 50 and set(labels) <= set(module.SOIL_TYPES)
+    assert confidences.shape == (50,) and confidences.min() >= 0.85
+
+class _NamedModel:
+    """Stands in for a fitted sklearn estimator: the class is decided by 'ph'."""
+    feature_names_in_ = np.array(['ph', 'nitrogen'], dtype=object)
+    n_features_in_ = 2
+    classes_ = np.array(['Black Soil', 'Red Soil'])
+
+    def predict_proba(self, features):
+        black = (features[:, 0] > 6.5).astype(float)
+        return np.column_stack([black, 1 - black])
+
+def test_real_model_columns_are_matched_by_name():
+    classifier = SoilInferenceService._soil_module().SoilClassifier()
+    classifier.model = _NamedModel()
+
+    # Reordered with an extra column: selected by name
+    labels, _ = classifier.predict_batch(np.array([[40.0, 1.0, 7.2], [45.0, 2.0, 6.0]]),
+                                         feature_names=['nitrogen', 'plot', 'ph'])
+    assert labels == ['Black Soil', 'Red Soil']
+
+    with pytest.raises(ValueError, match='nitrogen'):
+        classifier.predict_batch(np.array([[7.2]]), feature_names=['ph'])
+    with pytest.raises(ValueError, match='2 feature columns'):
+        classifier.predict_batch(np.array([[7.2, 40.0, 1.0]]))
@@ -0,0 +1,76 @@
+import random
+from backend.utils.spatial_index import GeoGridIndex, haversine_km, bounding_box
+from backend.utils.geo_distance import haversine_matrix, haversine_many, wkt_centroid
+
+def _brute_force(points, lat, lon, radius_km):
+    return sorted(
+        key for key, (p_lat, p_lon) in points.items()
+        if haversine_km(lat, lon, p_lat, p_lon) <= radius_km
+    )
+
+def test_radius_query_matches_brute_force():
+    rng = random.Random(7)
+    points = {i: (rng.uniform(-10, 10), rng.uniform(30, 50)) for i in range(2000)}
+    index = GeoGridIndex(cell_size_km=20)
+    index.bulk_insert((key, lat, lon, None) for key, (lat, lon) in points.items())
+
+    for _ in range(25):
+        lat, lon = rng.uniform(-10, 10), rng.uniform(30, 50)
+        radius = rng.choice([5, 20, 75, 300])
+        found = index.query_radius(lat, lon, radius)
+        assert sorted(key for key, _, _ in found) == _brute_force(points, lat, lon, radius)
+        distances = [distance for _, distance, _ in found]
+        assert distances == sorted(distances)
+
+def test_antimeridian_and_poles():
+    index = GeoGridIndex(cell_size_km=10)
+    index.insert('east', 0.0, 179.95)
+    index.insert('west', 0.0, -179.95)
+    index.insert('north', 89.99, 10.0)
+    index.insert('north_far_side', 89.99, -170.0)
+
+    assert {key for key, _, _ in index.query_radius(0.0, 179.99, 20)} == {'east', 'west'}
+    assert {key for key, _, _ in index.query_radius(89.99, 100.0, 10)} == {'north', 'north_far_side'}
+    assert bounding_box(0.0, 179.99, 20)[2:] == (-180.0, 180.0)
+
+def test_move_remove_predicate_and_nearest():
+    index = GeoGridIndex(cell_size_km=5)
+    index.insert(1, 1.0, 36.0, 'maize')
+    index.insert(2, 1.01, 36.01, 'beans')
+    index.insert(3, 1.5, 36.5, 'maize')
+
+    assert [key for key, _, _ in index.neighbors(1, 5)] == [2]
+    assert [key for key, _, _ in index.query_radius(1.0, 36.0, 100, lambda crop: crop == 'maize')] == [1, 3]
+
+    index.insert(2, 3.0, 38.0, 'beans')
+    assert index.neighbors(1, 5) == []
+    assert index.nearest(1.49, 36.49, 200)[0] == 3
+
+    assert index.remove(3) is True
+    assert index.remove(3) is False
+    assert index.nearest(1.49, 36.49, 10) is None
+    assert len(index) == 2
+
+def test_vectorized_haversine_matches_scalar():
+    rng = random.Random(3)
+    zones = [(rng.uniform(-60, 60), rng.uniform(-179, 179)) for _ in range(7)]
+    farms = [(rng.uniform(-60, 60), rng.uniform(-179, 179)) for _ in range(50)]
+
+    matrix = haversine_matrix([z[0] for z in zones], [z[1] for z in zones],
+                              [f[0] for f in farms], [f[1] for f in farms])
+    assert matrix.shape == (7, 50)
+    for i, (z_lat, z_lon) in enumerate(zones):
+        for j, (f_lat, f_lon) in enumerate(farms):
+            assert abs(matrix[i, j] - haversine_km(z_lat, z_lon, f_lat, f_lon)) < 1e-6
+
+    row = haversine_many(zones[0][0], zones[0][1], [f[0] for f in farms], [f[1] for f in farms])
+    assert abs(row - matrix[0]).max() < 1e-9
+
+def test_wkt_centroid():
+    assert wkt_centroid("POINT(36.5 -1.25)") == (-1.25, 36.5)
+    lat, lon = wkt_centroid("POLYGON((36 -1, 37 -1, 37 0, 36 0, 36 -1))")
+    assert abs(lat + 0.5) < 1e-9 and abs(lon - 36.5) < 1e-9
+    assert wkt_centroid("POLYGON((1.5 2.5, ... ))") == (2.5, 1.5)
+    assert wkt_centroid(None) is None
+    assert wkt_centroid("POLYGON EMPTY") is None
+    assert wkt_centroid("POINT(200 10)") is None
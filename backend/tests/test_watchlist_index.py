@@ -0,0 +1,61 @@
+import pytest
+from app import app
+from backend.extensions import db
+from backend.models import PriceWatchlist
+from backend.services.watchlist_index import watchlist_index
+
+@pytest.fixture
+def test_client():
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            watchlist_index.rebuild()
+            yield client
+            db.drop_all()
+
+def _matched_users(crop, district, price):
+    return sorted(match.user_id for match in watchlist_index.match(crop, district, price))
+
+def test_ticks_match_targets_at_or_below_price(test_client):
+    db.session.add_all([
+        PriceWatchlist(user_id=1, crop_name='Onion', target_price=1500),
+        PriceWatchlist(user_id=2, crop_name='Onion', target_price=2500),
+        PriceWatchlist(user_id=3, crop_name='Onion', district='Pune', target_price=1800),
+        PriceWatchlist(user_id=4, crop_name='Onion', target_price=1000, alert_enabled=False),
+        PriceWatchlist(user_id=5, crop_name='Wheat', target_price=100)
+    ])
+    db.session.commit()
+
+    assert _matched_users('Onion', 'Nashik', 2000) == [1]
+    assert _matched_users('Onion', 'Pune', 2000) == [1, 3]
+    assert _matched_users('Onion', 'Pune', 1500) == [1]
+    assert _matched_users('Onion', 'Pune', 1499.99) == []
+    assert _matched_users('Tomato', 'Pune', 10 ** 6) == []
+
+    # A full rebuild agrees with the incrementally maintained index
+    before = watchlist_index.stats()
+    watchlist_index.rebuild()
+    assert watchlist_index.stats() == before
+
+def test_watchlist_changes_update_the_index(test_client):
+    watch = PriceWatchlist(user_id=1, crop_name='Onion', target_price=3000)
+    db.session.add(watch)
+    db.session.commit()
+    assert _matched_users('Onion', 'Pune', 2000) == []
+
+    watch.target_price = 1900
+    db.session.commit()
+    assert _matched_users('Onion', 'Pune', 2000) == [1]
+
+    watch.alert_enabled = False
+    db.session.commit()
+    assert _matched_users('Onion', 'Pune', 2000) == []
+
+    watch.alert_enabled = True
+    db.session.commit()
+    db.session.delete(watch)
+    db.session.commit()
+    assert _matched_users('Onion', 'Pune', 2000) == []
+    assert watchlist_index.stats()['watchlists'] == 0
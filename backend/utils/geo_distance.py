@@ -0,0 +1,64 @@
+"""
+Vectorized great-circle distances.
+
+NumPy counterparts of GeospatialService.calculate_distance for computing
+many distances in one pass: one point against an array of points, or every
+pair across two point sets. Also a minimal WKT centroid parser for grid cells.
+"""
+
+from typing import Optional, Sequence, Tuple
+import re
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_many(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> np.ndarray:
+    """Distances in km from (lat, lon) to each point, shape (n,)."""
+    return haversine_matrix([lat], [lon], lats, lons)[0]
+
+
+def haversine_matrix(lats1: Sequence[float], lons1: Sequence[float],
+                     lats2: Sequence[float], lons2: Sequence[float]) -> np.ndarray:
+    """
+    Pairwise distances in km between two point sets.
+
+    Returns:
+        Array of shape (len(lats1), len(lats2))
+    """
+    lat1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, np.newaxis]
+    lon1 = np.radians(np.asarray(lons1, dtype=np.float64))[:, np.newaxis]
+    lat2 = np.radians(np.asarray(lats2, dtype=np.float64))[np.newaxis, :]
+    lon2 = np.radians(np.asarray(lons2, dtype=np.float64))[np.newaxis, :]
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+_WKT_POINT_RE = re.compile(r"(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s+(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)")
+
+
+def wkt_centroid(wkt: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    (lat, lon) centroid of the vertices of a WKT point/polygon ("x y" = "lon lat").
+
+    The vertex mean is close enough to the area centroid for grid cells a few
+    km across. Returns None if the text has no coordinates or they are out of range.
+    """
+    if not wkt:
+        return None
+    points = [(float(x), float(y)) for x, y in _WKT_POINT_RE.findall(wkt)]
+    if len(points) > 1 and points[0] == points[-1]:
+        # Closed ring: the first vertex is repeated at the end
+        points.pop()
+    if not points:
+        return None
+    lon = sum(x for x, _ in points) / len(points)
+    lat = sum(y for _, y in points) / len(points)
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return lat, lon
@@ -0,0 +1,108 @@
+"""
+Micro-batching queue for model inference.
+
+Concurrent callers submit single items and get a Future back. A background
+thread takes the first waiting item, keeps collecting for up to max_wait_ms
+(or until max_batch_size items), and hands the whole batch to one call of the
+batch function. A lone request therefore waits at most max_wait_ms extra,
+while bursts are scored with one vectorized call instead of one per request.
+"""
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+import os
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Groups concurrent single-item requests into batch calls."""
+
+    def __init__(self, batch_fn: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0, name: str = 'micro-batcher'):
+        """
+        Args:
+            batch_fn: Called with a list of items; must return one result per item, in order
+            max_batch_size: Largest batch handed to batch_fn
+            max_wait_ms: How long to keep collecting after the first item arrives
+            name: Worker thread name
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self):
+        # Worker threads don't survive fork (Celery prefork, gunicorn), so
+        # start one per process on first use
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the Future resolves to its result."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self, work_queue: queue.Queue) -> List:
+        batch = [work_queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(work_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        work_queue = self._queue
+        while True:
+            batch = self._collect(work_queue)
+            futures = [future for _, future in batch]
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch function returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                logger.error(f"{self.name}: batch of {len(batch)} failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, result in zip(futures, results):
+                future.set_result(result)
+
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+    def stats(self) -> Dict:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0,
+            'largest_batch': self.largest_batch,
+            'queued': self._queue.qsize() if self._queue is not None else 0
+        }
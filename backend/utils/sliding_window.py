@@ -0,0 +1,165 @@
+"""
+Sliding-window event counters.
+
+The window is split into a fixed number of buckets kept in a ring, so every
+key costs the same memory no matter how many events it sees, and hit() /
+count() touch at most `buckets` slots (constant time). Counts are
+approximate at bucket granularity: events age out one bucket
+(window / buckets seconds) at a time.
+
+SlidingWindowCounter is per process and evicts the least recently used keys
+beyond max_keys. RedisSlidingWindowCounter keeps the same buckets in Redis so
+all workers share counts; its keys expire on their own.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+import threading
+import time
+
+
+class _Window:
+    __slots__ = ('slots', 'head', 'total')
+
+    def __init__(self, buckets: int, head: int):
+        self.slots = [0] * buckets
+        self.head = head
+        self.total = 0
+
+
+class SlidingWindowCounter:
+    """In-memory bucketed sliding-window counter with LRU eviction."""
+
+    def __init__(self, window_seconds: float, buckets: int = 10, max_keys: int = 50000):
+        """
+        Args:
+            window_seconds: Length of the sliding window
+            buckets: Number of sub-intervals the window is split into
+            max_keys: Keys beyond this are evicted, least recently used first
+        """
+        if window_seconds <= 0 or buckets <= 0 or max_keys <= 0:
+            raise ValueError("window_seconds, buckets and max_keys must be positive")
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.max_keys = max_keys
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _bucket(self, now: Optional[float]) -> int:
+        return int((time.monotonic() if now is None else now) // self.bucket_seconds)
+
+    def _advance(self, window: _Window, bucket: int):
+        steps = bucket - window.head
+        if steps <= 0:
+            return
+        if steps >= self.buckets:
+            window.slots = [0] * self.buckets
+            window.total = 0
+        else:
+            for b in range(window.head + 1, bucket + 1):
+                slot = b % self.buckets
+                window.total -= window.slots[slot]
+                window.slots[slot] = 0
+        window.head = bucket
+
+    def hit(self, key: Hashable, amount: int = 1, now: Optional[float] = None) -> int:
+        """Record `amount` events for key; returns the key's count in the window."""
+        bucket = self._bucket(now)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = _Window(self.buckets, bucket)
+                if len(self._windows) > self.max_keys:
+                    self._windows.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._windows.move_to_end(key)
+                self._advance(window, bucket)
+            window.slots[bucket % self.buckets] += amount
+            window.total += amount
+            return window.total
+
+    def count(self, key: Hashable, now: Optional[float] = None) -> int:
+        """Events recorded for key within the window."""
+        bucket = self._bucket(now)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                return 0
+            self._advance(window, bucket)
+            return window.total
+
+    def reset(self, key: Hashable = None):
+        with self._lock:
+            if key is None:
+                self._windows.clear()
+            else:
+                self._windows.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def stats(self) -> Dict:
+        return {
+            'backend': 'memory',
+            'keys': len(self._windows),
+            'max_keys': self.max_keys,
+            'evictions': self.evictions,
+            'window_seconds': self.window_seconds,
+            'buckets': self.buckets
+        }
+
+
+class RedisSlidingWindowCounter:
+    """Bucketed sliding-window counter shared across processes through Redis."""
+
+    def __init__(self, client, window_seconds: float, buckets: int = 10, prefix: str = 'swc'):
+        """
+        Args:
+            client: redis.Redis instance
+            window_seconds: Length of the sliding window
+            buckets: Number of sub-intervals the window is split into
+            prefix: Namespace for the bucket keys
+        """
+        if window_seconds <= 0 or buckets <= 0:
+            raise ValueError("window_seconds and buckets must be positive")
+        self.client = client
+        self.window_seconds = window_seconds
+        self.buckets = buckets
+        self.bucket_seconds = window_seconds / buckets
+        self.prefix = prefix
+        # Each bucket key lives just long enough to cover a full window
+        self._ttl = int(window_seconds + self.bucket_seconds) + 1
+
+    def _bucket(self, now: Optional[float]) -> int:
+        # Wall clock, so every process agrees on bucket boundaries
+        return int((time.time() if now is None else now) // self.bucket_seconds)
+
+    def _keys(self, key: Hashable, bucket: int):
+        return [f"{self.prefix}:{key}:{b}" for b in range(bucket - self.buckets + 1, bucket + 1)]
+
+    def hit(self, key: Hashable, amount: int = 1, now: Optional[float] = None) -> int:
+        bucket = self._bucket(now)
+        keys = self._keys(key, bucket)
+        pipe = self.client.pipeline()
+        pipe.incrby(keys[-1], amount)
+        pipe.expire(keys[-1], self._ttl)
+        pipe.mget(keys)
+        return sum(int(v) for v in pipe.execute()[-1] if v)
+
+    def count(self, key: Hashable, now: Optional[float] = None) -> int:
+        return sum(int(v) for v in self.client.mget(self._keys(key, self._bucket(now))) if v)
+
+    def reset(self, key: Hashable = None):
+        pattern = f"{self.prefix}:*" if key is None else f"{self.prefix}:{key}:*"
+        for redis_key in self.client.scan_iter(match=pattern):
+            self.client.delete(redis_key)
+
+    def stats(self) -> Dict:
+        return {
+            'backend': 'redis',
+            'window_seconds': self.window_seconds,
+            'buckets': self.buckets
+        }
@@ -0,0 +1,186 @@
+"""
+In-process spatial index over latitude/longitude points.
+
+GeoGridIndex buckets points into a fixed-size degree grid (a flat geohash)
+so radius and neighbor queries only visit the cells overlapping the
+query's bounding box, then confirm candidates with an exact haversine.
+Used where PostGIS isn't available.
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180.0  # ~111.19
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometers."""
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Conservative (min_lat, max_lat, min_lon, max_lon) box around a circle.
+
+    Longitude bounds span the whole globe near the poles or when the box
+    would cross the antimeridian; callers can treat that as "no lon filter".
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(-90.0, lat - dlat)
+    max_lat = min(90.0, lat + dlat)
+
+    widest_lat = max(abs(min_lat), abs(max_lat))
+    if widest_lat >= 89.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    dlon = radius_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(widest_lat)))
+    if lon - dlon < -180.0 or lon + dlon > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    return min_lat, max_lat, lon - dlon, lon + dlon
+
+
+class GeoGridIndex:
+    """
+    Uniform lat/lon grid of point buckets.
+
+    Insert, remove and move are O(1). A radius query costs one dict lookup
+    per overlapping cell plus one haversine per candidate in those cells.
+    Choose cell_size_km close to the typical query radius.
+    """
+
+    def __init__(self, cell_size_km: float = 10.0):
+        self.cell_size_km = cell_size_km
+        self.cell_deg = cell_size_km / KM_PER_DEGREE_LAT
+        self.lon_cells = max(1, int(math.ceil(360.0 / self.cell_deg)))
+        self._cells = defaultdict(dict)
+        self._points = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def __contains__(self, key):
+        return key in self._points
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            int(math.floor((lat + 90.0) / self.cell_deg)),
+            int(math.floor((lon + 180.0) / self.cell_deg)) % self.lon_cells
+        )
+
+    def insert(self, key: Hashable, lat: float, lon: float, payload: Any = None):
+        """Add or move a point."""
+        if key in self._points:
+            self.remove(key)
+        cell = self._cell(lat, lon)
+        self._cells[cell][key] = (lat, lon, payload)
+        self._points[key] = cell
+
+    def bulk_insert(self, rows: Iterable[Tuple[Hashable, float, float, Any]]):
+        for key, lat, lon, payload in rows:
+            self.insert(key, lat, lon, payload)
+
+    def remove(self, key: Hashable) -> bool:
+        cell = self._points.pop(key, None)
+        if cell is None:
+            return False
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._cells[cell]
+        return True
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, float, Any]]:
+        cell = self._points.get(key)
+        if cell is None:
+            return None
+        return self._cells[cell][key]
+
+    def items(self) -> Iterable[Tuple[Hashable, float, float, Any]]:
+        """Every indexed (key, lat, lon, payload), in no particular order."""
+        for bucket in self._cells.values():
+            for key, (lat, lon, payload) in bucket.items():
+                yield key, lat, lon, payload
+
+    def clear(self):
+        self._cells.clear()
+        self._points.clear()
+
+    def _candidate_cells(self, lat: float, lon: float, radius_km: float):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        lat_lo = self._cell(min_lat, 0)[0]
+        lat_hi = self._cell(max_lat, 0)[0]
+
+        if min_lon <= -180.0 and max_lon >= 180.0:
+            lon_range = range(self.lon_cells)
+        else:
+            lon_lo = int(math.floor((min_lon + 180.0) / self.cell_deg))
+            lon_hi = int(math.floor((max_lon + 180.0) / self.cell_deg))
+            lon_range = [c % self.lon_cells for c in range(lon_lo, lon_hi + 1)]
+
+        for lat_cell in range(lat_lo, lat_hi + 1):
+            for lon_cell in lon_range:
+                bucket = self._cells.get((lat_cell, lon_cell))
+                if bucket:
+                    yield bucket
+
+    def query_radius(self, lat: float, lon: float, radius_km: float,
+                     predicate=None) -> List[Tuple[Hashable, float, Any]]:
+        """
+        Points within radius_km of (lat, lon), closest first.
+
+        Args:
+            predicate: Optional callable(payload) -> bool applied before the
+                distance check
+
+        Returns:
+            List of (key, distance_km, payload)
+        """
+        matches = []
+        for bucket in self._candidate_cells(lat, lon, radius_km):
+            for key, (p_lat, p_lon, payload) in bucket.items():
+                if predicate is not None and not predicate(payload):
+                    continue
+                distance = haversine_km(lat, lon, p_lat, p_lon)
+                if distance <= radius_km:
+                    matches.append((key, distance, payload))
+        matches.sort(key=lambda m: m[1])
+        return matches
+
+    def neighbors(self, key: Hashable, radius_km: float, predicate=None) -> List[Tuple[Hashable, float, Any]]:
+        """Points within radius_km of an indexed point, excluding the point itself."""
+        point = self.get(key)
+        if point is None:
+            return []
+        lat, lon, _ = point
+        return [m for m in self.query_radius(lat, lon, radius_km, predicate) if m[0] != key]
+
+    def nearest(self, lat: float, lon: float, max_radius_km: float,
+                predicate=None) -> Optional[Tuple[Hashable, float, Any]]:
+        """
+        Closest point within max_radius_km, searching outward ring by ring
+        so dense areas resolve without scanning the whole radius.
+        """
+        radius = self.cell_size_km
+        while True:
+            radius = min(radius, max_radius_km)
+            matches = self.query_radius(lat, lon, radius, predicate)
+            if matches:
+                return matches[0]
+            if radius >= max_radius_km:
+                return None
+            radius *= 2
+
+    def stats(self) -> Dict:
+        return {
+            'points': len(self._points),
+            'cells': len(self._cells),
+            'cell_size_km': self.cell_size_km
+        }
@@ -0,0 +1,216 @@
+"""
+In-process full-text inverted index with BM25 ranking.
+
+Documents are made of named fields (title, body, ...) with per-field weights;
+a term's frequency in a document is the weighted sum over its fields
+(BM25F-style), and so is the document length. Queries are AND-ed across
+terms. Each term also matches indexed terms it is a prefix of, so partial
+words still find results, at PREFIX_MATCH_WEIGHT of an exact match.
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, List, Optional, Set
+import math
+import re
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'i',
+    'in', 'is', 'it', 'my', 'of', 'on', 'or', 'the', 'to', 'what', 'when', 'with'
+))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased alphanumeric tokens without stopwords."""
+    if not text:
+        return []
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class InvertedIndex:
+    """Weighted-field inverted index scored with BM25."""
+
+    K1 = 1.2
+    B = 0.75
+    PREFIX_MATCH_WEIGHT = 0.5
+    PREFIX_EXPANSION_LIMIT = 50
+
+    def __init__(self, field_weights: Dict[str, float]):
+        """
+        Args:
+            field_weights: Weight of each field's term frequencies, e.g. {'title': 3.0, 'body': 1.0}
+        """
+        self.field_weights = dict(field_weights)
+        # term -> {doc_id: weighted term frequency}
+        self._postings = {}
+        # doc_id -> {term: weighted term frequency}
+        self._doc_terms = {}
+        self._doc_length = {}
+        self._total_length = 0.0
+        # Sorted list of every term seen, for prefix expansion
+        self._vocabulary = []
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_terms
+
+    def _weighted_terms(self, fields: Dict[str, str]) -> Dict[str, float]:
+        weighted = {}
+        for field, text in fields.items():
+            weight = self.field_weights.get(field, 1.0)
+            for token in tokenize(text):
+                weighted[token] = weighted.get(token, 0.0) + weight
+        return weighted
+
+    def _apply(self, doc_id: Hashable, weighted: Dict[str, float]):
+        doc_terms = self._doc_terms.setdefault(doc_id, {})
+        added_length = 0.0
+        for term, frequency in weighted.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._vocabulary, term)
+            postings[doc_id] = postings.get(doc_id, 0.0) + frequency
+            doc_terms[term] = doc_terms.get(term, 0.0) + frequency
+            added_length += frequency
+        self._doc_length[doc_id] = self._doc_length.get(doc_id, 0.0) + added_length
+        self._total_length += added_length
+
+    def add(self, doc_id: Hashable, fields: Dict[str, str]):
+        """Index a document, replacing any previous version."""
+        self.remove(doc_id)
+        self._apply(doc_id, self._weighted_terms(fields))
+
+    def append(self, doc_id: Hashable, field: str, text: str):
+        """Add more text to one field of an indexed (or new) document."""
+        self._apply(doc_id, self._weighted_terms({field: text}))
+
+    def subtract(self, doc_id: Hashable, field: str, text: str):
+        """Take back text previously added to one field with append()."""
+        doc_terms = self._doc_terms.get(doc_id)
+        if doc_terms is None:
+            return
+        removed_length = 0.0
+        for term, frequency in self._weighted_terms({field: text}).items():
+            current = doc_terms.get(term)
+            if current is None:
+                continue
+            frequency = min(frequency, current)
+            removed_length += frequency
+            if current - frequency > 1e-9:
+                doc_terms[term] = current - frequency
+                self._postings[term][doc_id] = current - frequency
+                continue
+            del doc_terms[term]
+            self._drop_posting(term, doc_id)
+        self._doc_length[doc_id] = self._doc_length.get(doc_id, 0.0) - removed_length
+        self._total_length -= removed_length
+
+    def _drop_posting(self, term: str, doc_id: Hashable):
+        postings = self._postings.get(term)
+        if postings is not None:
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                position = bisect_left(self._vocabulary, term)
+                if position < len(self._vocabulary) and self._vocabulary[position] == term:
+                    del self._vocabulary[position]
+
+    def remove(self, doc_id: Hashable):
+        doc_terms = self._doc_terms.pop(doc_id, None)
+        if doc_terms is None:
+            return
+        for term in doc_terms:
+            self._drop_posting(term, doc_id)
+        self._total_length -= self._doc_length.pop(doc_id, 0.0)
+
+    def clear(self):
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_length.clear()
+        self._total_length = 0.0
+        self._vocabulary = []
+
+    def _expand(self, term: str) -> Dict[str, float]:
+        """Indexed terms matched by a query term, with their weight."""
+        expansions = {}
+        if term in self._postings:
+            expansions[term] = 1.0
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and len(expansions) < self.PREFIX_EXPANSION_LIMIT:
+            candidate = self._vocabulary[position]
+            if not candidate.startswith(term):
+                break
+            expansions.setdefault(candidate, self.PREFIX_MATCH_WEIGHT)
+            position += 1
+        return expansions
+
+    def search(self, query: str, candidates: Optional[Set[Hashable]] = None) -> Dict[Hashable, float]:
+        """
+        BM25 scores of documents matching every query term.
+
+        Args:
+            query: Free text; tokenized the same way as documents
+            candidates: Optional restriction of the documents considered
+
+        Returns:
+            {doc_id: score}; empty if the query has no searchable terms
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_terms:
+            return {}
+
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count if doc_count else 1.0
+        lengths = self._doc_length
+        k1 = self.K1
+        base_norm = k1 * (1 - self.B)
+        length_norm = k1 * self.B / average_length
+        scores = None
+
+        # Rarest terms first so the running intersection shrinks quickly
+        expanded = [self._expand(term) for term in terms]
+        expanded.sort(key=lambda expansions: sum(len(self._postings[t]) for t in expansions))
+
+        for expansions in expanded:
+            if not expansions:
+                return {}
+            term_scores = {}
+            for term, weight in expansions.items():
+                postings = self._postings[term]
+                df = len(postings)
+                scale = weight * math.log(1 + (doc_count - df + 0.5) / (df + 0.5)) * (k1 + 1)
+
+                # Only score documents still in the running intersection
+                if scores is not None:
+                    if len(scores) < len(postings):
+                        pairs = [(doc_id, postings[doc_id]) for doc_id in scores if doc_id in postings]
+                    else:
+                        pairs = [(doc_id, f) for doc_id, f in postings.items() if doc_id in scores]
+                elif candidates is not None:
+                    pairs = [(doc_id, f) for doc_id, f in postings.items() if doc_id in candidates]
+                else:
+                    pairs = postings.items()
+
+                for doc_id, frequency in pairs:
+                    score = scale * frequency / (frequency + base_norm + length_norm * lengths[doc_id])
+                    term_scores[doc_id] = term_scores.get(doc_id, 0.0) + score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: scores[doc_id] + score for doc_id, score in term_scores.items()}
+            if not scores:
+                return {}
+
+        return scores
+
+    def stats(self) -> Dict:
+        return {
+            'documents': len(self._doc_terms),
+            'terms': len(self._postings),
+            'avg_document_length': round(self._total_length / len(self._doc_terms), 2) if self._doc_terms else 0
+        }
@@ -17,6 +17,9 @@ class DataIntegrityValidator:
     # 10 MB limit as default
     MAX_FILE_SIZE = 10 * 1024 * 1024 
 
+    # Leading bytes libmagic needs to identify the upload formats above
+    SNIFF_BYTES = 2048
+
     @staticmethod
     def validate_file(file_path: str, payload_type: str) -> (bool, Optional[str]):
         """
@@ -31,23 +34,38 @@ class DataIntegrityValidator:
             return False, f"File size ({size} bytes) exceeds limit"
             
         # Extension check
-        ext = os.path.splitext(file_path)[1].lower()
-        allowed = DataIntegrityValidator.ALLOWED_EXTENSIONS.get(payload_type, [])
-        if ext not in allowed:
-            return False, f"Extension {ext} not allowed for {payload_type}"
+        is_valid, error = DataIntegrityValidator.validate_extension(file_path, payload_type)
+        if not is_valid:
+            return False, error
             
         # MIME type deep check
         try:
             mime = magic.from_file(file_path, mime=True)
-            if payload_type in ['DISEASE', 'SOIL', 'CROP'] and 'image' in mime:
-                return True, None
-            if payload_type == 'EQUIPMENT' and ('image' in mime or 'pdf' in mime):
-                return True, None
-            if payload_type in ['SOIL', 'CROP'] and ('text' in mime or 'json' in mime or 'csv' in mime):
-                return True, None
         except Exception as e:
             return False, f"MIME validation failed: {str(e)}"
-            
+        return DataIntegrityValidator.validate_mime(mime, payload_type)
+
+    @staticmethod
+    def validate_extension(filename: str, payload_type: str) -> (bool, Optional[str]):
+        ext = os.path.splitext(filename)[1].lower()
+        allowed = DataIntegrityValidator.ALLOWED_EXTENSIONS.get(payload_type, [])
+        if ext not in allowed:
+            return False, f"Extension {ext} not allowed for {payload_type}"
+        return True, None
+
+    @staticmethod
+    def sniff_mime(head: bytes) -> str:
+        """MIME type from the first SNIFF_BYTES of a file."""
+        return magic.from_buffer(head, mime=True)
+
+    @staticmethod
+    def validate_mime(mime: str, payload_type: str) -> (bool, Optional[str]):
+        if payload_type in ['DISEASE', 'SOIL', 'CROP'] and 'image' in mime:
+            return True, None
+        if payload_type == 'EQUIPMENT' and ('image' in mime or 'pdf' in mime):
+            return True, None
+        if payload_type in ['SOIL', 'CROP'] and ('text' in mime or 'json' in mime or 'csv' in mime):
+            return True, None
         return False, f"MIME type {mime} mismatch for {payload_type}"
 
     @staticmethod
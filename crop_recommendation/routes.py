@@ -2,9 +2,8 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath('..'))
 
-from flask import Blueprint, render_template, request, send_file, jsonify
+from flask import Blueprint, render_template, request, send_file, jsonify, current_app
 from auth_utils import token_required, roles_required
-import joblib
 import numpy as np
 import re
 from functools import wraps
@@ -13,15 +12,24 @@ from reportlab.pdfgen import canvas
 from io import BytesIO
 import datetime
 
+from backend.services.crop_inference_service import CropInferenceService
+from backend.services.model_registry import ModelNotAvailableError
+
 crop_bp = Blueprint('crop', __name__, template_folder='templates', static_folder='static')
 
-try:
-    model = joblib.load('model/rf_model.pkl')
-    label_encoder = joblib.load('model/label_encoder.pkl')  # Load encoder
-except (FileNotFoundError, IndexError):
-    model = None
-    label_encoder = None
-    print("Warning: Crop models not found. Prediction disabled.")
+# Models are loaded lazily (once per process) by the shared model registry
+MAX_BATCH_PLOTS = 1000
+
+# (min, max, label) per feature, in model column order
+FEATURE_LIMITS = {
+    'N': (0, 200, "Nitrogen (N)"),
+    'P': (0, 200, "Phosphorus (P)"),
+    'K': (0, 200, "Potassium (K)"),
+    'temperature': (-50, 100, "Temperature"),
+    'humidity': (0, 100, "Humidity"),
+    'ph': (0, 14, "pH"),
+    'rainfall': (0, 1000, "Rainfall")
+}
 
 # Input validation helper functions
 def validate_required_fields(required_fields):
@@ -57,6 +65,13 @@ def sanitize_input(text, max_length=255):
         return ""
     return text.strip()[:max_length]
 
+def sanitize_feature_row(values):
+    """Validated feature row, in model column order, from a form or JSON mapping"""
+    return [
+        sanitize_numeric_input(values[field], min_val, max_val, label)
+        for field, (min_val, max_val, label) in FEATURE_LIMITS.items()
+    ]
+
 @crop_bp.route('/')
 def home():
     return render_template('index.html')
@@ -79,15 +94,7 @@ def predict():
                     return render_template('index.html', error=f"Missing required field: {field}")
 
             # Sanitize and validate all numeric inputs
-            data = [
-                sanitize_numeric_input(request.form['N'], 0, 200, "Nitrogen (N)"),
-                sanitize_numeric_input(request.form['P'], 0, 200, "Phosphorus (P)"),
-                sanitize_numeric_input(request.form['K'], 0, 200, "Potassium (K)"),
-                sanitize_numeric_input(request.form['temperature'], -50, 100, "Temperature"),
-                sanitize_numeric_input(request.form['humidity'], 0, 100, "Humidity"),
-                sanitize_numeric_input(request.form['ph'], 0, 14, "pH"),
-                sanitize_numeric_input(request.form['rainfall'], 0, 1000, "Rainfall")
-            ]
+            data = sanitize_feature_row(request.form)
             
             input_params = {
                 'N': str(data[0]),
@@ -99,11 +106,11 @@ def predict():
                 'rainfall': str(data[6])
             }
             
-            if model is None or label_encoder is None:
+            try:
+                # Concurrent requests are scored together by the inference queue
+                prediction_label = CropInferenceService.predict(data)
+            except ModelNotAvailableError:
                 return render_template('index.html', error="Prediction model is currently unavailable.")
-
-            prediction_num = model.predict([data])[0]
-            prediction_label = label_encoder.inverse_transform([prediction_num])[0]
             
             # Handle the Form Submission (POST)
             return render_template('result.html', crop=prediction_label, params=input_params)
@@ -115,6 +122,62 @@ def predict():
             crop_bp.logger.error(f"Prediction error: {str(e)}")
             return jsonify({'error': 'Prediction failed'}), 500
 
+@crop_bp.route('/predict-batch', methods=['POST'])
+@token_required
+@roles_required('farmer', 'admin')
+def predict_batch():
+    """
+    Score many plots in one request.
+
+    Body: {"plots": [{"N": .., "P": .., "K": .., "temperature": .., "humidity": .., "ph": .., "rainfall": ..,
+                      "plot_id": optional}, ...]}
+    Valid plots are scored with a single model call; invalid ones are
+    reported per index and don't fail the batch.
+    """
+    payload = request.get_json(silent=True) or {}
+    plots = payload.get('plots')
+    
+    if not isinstance(plots, list) or not plots:
+        return jsonify({'error': 'plots must be a non-empty list'}), 400
+    if len(plots) > MAX_BATCH_PLOTS:
+        return jsonify({'error': f'At most {MAX_BATCH_PLOTS} plots per request'}), 400
+    
+    rows, row_indexes, errors = [], [], []
+    for index, plot in enumerate(plots):
+        try:
+            if not isinstance(plot, dict):
+                raise ValueError("Each plot must be an object")
+            missing = [field for field in FEATURE_LIMITS if field not in plot]
+            if missing:
+                raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+            rows.append(sanitize_feature_row(plot))
+            row_indexes.append(index)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+    
+    try:
+        crops = CropInferenceService.predict_many(rows)
+    except ModelNotAvailableError:
+        return jsonify({'error': 'Prediction model is currently unavailable.'}), 503
+    except Exception as e:
+        current_app.logger.error(f"Batch prediction error: {str(e)}")
+        return jsonify({'error': 'Prediction failed'}), 500
+    
+    predictions = []
+    for index, row, crop in zip(row_indexes, rows, crops):
+        predictions.append({
+            'index': index,
+            'plot_id': plots[index].get('plot_id'),
+            'prediction': crop,
+            'params': dict(zip(FEATURE_LIMITS, row))
+        })
+    
+    return jsonify({
+        'count': len(predictions),
+        'predictions': predictions,
+        'errors': errors
+    })
+
 # PDF download route
 @crop_bp.route('/download_report', methods=['POST'])
 @token_required
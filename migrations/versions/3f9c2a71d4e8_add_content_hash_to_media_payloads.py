@@ -0,0 +1,28 @@
+"""Add content_hash to media_payloads
+
+Revision ID: 3f9c2a71d4e8
+Revises: 8be05540cfac
+Create Date: 2026-10-16 10:12:04.381275
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a71d4e8'
+down_revision = '8be05540cfac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media_payloads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_media_payloads_content_hash'), ['content_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media_payloads', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_payloads_content_hash'))
+        batch_op.drop_column('content_hash')
@@ -0,0 +1,26 @@
+"""Add claimed_at to media_payloads
+
+Revision ID: c71e4b0d9a25
+Revises: 3f9c2a71d4e8
+Create Date: 2026-10-16 15:40:27.512904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71e4b0d9a25'
+down_revision = '3f9c2a71d4e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media_payloads', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('media_payloads', schema=None) as batch_op:
+        batch_op.drop_column('claimed_at')